@@ -0,0 +1,50 @@
+"""Add geolocation to trading posts
+
+Stores geocoded coordinates on trading_posts and indexes them with the
+cube/earthdistance contrib extensions so "stores within N km" queries
+use a GiST index instead of scanning every store.
+
+The timescale/timescaledb image ships the PostgreSQL contrib modules, so
+no PostGIS install is required.
+
+Existing stores are geocoded separately with
+python -m app.scripts.geocode_trading_posts.
+
+Revision ID: 20260119_001
+Revises: 20260118_008
+Create Date: 2026-01-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20260119_001'
+down_revision = '20260118_008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add latitude/longitude columns and earthdistance index."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS cube")
+    op.execute("CREATE EXTENSION IF NOT EXISTS earthdistance")
+
+    op.add_column('trading_posts', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('trading_posts', sa.Column('longitude', sa.Float(), nullable=True))
+
+    # Expression must match the one used by the radius query exactly:
+    #   earth_box(ll_to_earth(:lat, :lng), :radius) @> ll_to_earth(latitude, longitude)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_trading_posts_earth
+        ON trading_posts USING gist (ll_to_earth(latitude, longitude))
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    """)
+
+
+def downgrade():
+    """Remove geolocation columns and index."""
+    op.execute("DROP INDEX IF EXISTS ix_trading_posts_earth")
+    op.drop_column('trading_posts', 'longitude')
+    op.drop_column('trading_posts', 'latitude')
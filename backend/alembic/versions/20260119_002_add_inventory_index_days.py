@@ -0,0 +1,52 @@
+"""Add precomputed inventory index series
+
+One row per user per day with packed float32 arrays of quantity-weighted
+price sums (daily and half-hourly, per price mode), maintained by the
+pricing refresh tasks so the inventory market-index chart no longer
+aggregates raw price_snapshots on every load.
+
+Populate history with the app.tasks.pricing.rebuild_inventory_index task.
+
+Revision ID: 20260119_002
+Revises: 20260119_001
+Create Date: 2026-01-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20260119_002'
+down_revision = '20260119_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create inventory_index_days table."""
+    op.create_table(
+        'inventory_index_days',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('daily', sa.LargeBinary(), nullable=False),
+        sa.Column('intraday', sa.LargeBinary(), nullable=True),
+        sa.Column('latest_snapshot_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_inventory_index_days_user_day',
+        'inventory_index_days',
+        ['user_id', 'day'],
+        unique=True,
+    )
+
+
+def downgrade():
+    """Drop inventory_index_days table."""
+    op.drop_index('ix_inventory_index_days_user_day', table_name='inventory_index_days')
+    op.drop_table('inventory_index_days')
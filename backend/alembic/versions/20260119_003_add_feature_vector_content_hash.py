@@ -0,0 +1,33 @@
+"""Add content hash to card feature vectors
+
+Records a hash of the card content each vector was built from so the
+embedding refresh can skip cards whose text and attributes are unchanged.
+Existing rows start without a hash and are re-embedded once.
+
+Revision ID: 20260119_003
+Revises: 20260119_002
+Create Date: 2026-01-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20260119_003'
+down_revision = '20260119_002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add content_hash column to card_feature_vectors."""
+    op.add_column(
+        'card_feature_vectors',
+        sa.Column('content_hash', sa.String(length=64), nullable=True),
+    )
+
+
+def downgrade():
+    """Remove content_hash column from card_feature_vectors."""
+    op.drop_column('card_feature_vectors', 'content_hash')
@@ -0,0 +1,115 @@
+"""Add card search indexes and normalized filter columns
+
+Adds trigram indexes over name and type line, a full-text index over
+name, type line and oracle text, and normalized filter columns
+(color bitmask, legality bitset, keyword array) so card search can push
+every filter into SQL instead of parsing JSON per card.
+
+color_mask and legal_formats are deliberately left unindexed. A GIN
+index does not serve `&` predicates on a scalar integer, and the filters
+are not selective (most cards are legal in commander, and a color matches a
+fifth to a third of the table), so the planner would not pick a btree or
+partial index for them either. They are evaluated as a cheap recheck on
+rows already narrowed by the trigram/full-text indexes, or on a sequential
+scan of cards when there is no query text.
+
+Existing rows are backfilled from the JSON columns. Some ingestion paths
+stored Python reprs rather than JSON, so the backfill matches either
+quote style.
+
+Revision ID: 20260119_004
+Revises: 20260119_003
+Create Date: 2026-01-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '20260119_004'
+down_revision = '20260119_003'
+branch_labels = None
+depends_on = None
+
+# Must match CARD_SEARCH_DOCUMENT in app/services/search/query.py
+SEARCH_DOCUMENT = (
+    "to_tsvector('english'::regconfig, "
+    "coalesce(name, '') || ' ' || coalesce(type_line, '') || ' ' || coalesce(oracle_text, ''))"
+)
+
+QUOTE = "[''\"]"
+
+# Snapshot of app.core.constants.COLOR_BITS / SEARCH_FORMATS at this revision
+COLOR_BITS = {"W": 1, "U": 2, "B": 4, "R": 8, "G": 16}
+SEARCH_FORMATS = (
+    "standard", "future", "historic", "timeless", "gladiator", "pioneer",
+    "explorer", "modern", "legacy", "pauper", "vintage", "penny", "commander",
+    "oathbreaker", "standardbrawl", "brawl", "alchemy", "paupercommander",
+    "duel", "oldschool", "premodern", "predh",
+)
+
+
+def upgrade():
+    """Add search columns, backfill them and create search indexes."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    op.add_column(
+        'cards',
+        sa.Column('color_mask', sa.SmallInteger(), server_default='0', nullable=False),
+    )
+    op.add_column(
+        'cards',
+        sa.Column('legal_formats', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.add_column(
+        'cards',
+        sa.Column('keyword_list', postgresql.ARRAY(sa.String(length=64)), nullable=True),
+    )
+
+    color_terms = " | ".join(
+        f"(CASE WHEN colors ~ '{QUOTE}{color}{QUOTE}' THEN {bit} ELSE 0 END)"
+        for color, bit in COLOR_BITS.items()
+    )
+    format_terms = " | ".join(
+        f"(CASE WHEN legalities ~ '{QUOTE}{name}{QUOTE}:\\s*{QUOTE}legal{QUOTE}' THEN {1 << index} ELSE 0 END)"
+        for index, name in enumerate(SEARCH_FORMATS)
+    )
+    op.execute(f"""
+        UPDATE cards SET
+            color_mask = CASE WHEN colors IS NULL THEN 0 ELSE {color_terms} END,
+            legal_formats = CASE WHEN legalities IS NULL THEN 0 ELSE {format_terms} END,
+            keyword_list = CASE WHEN keywords IS NULL THEN NULL ELSE ARRAY(
+                SELECT DISTINCT lower(m[1])
+                FROM regexp_matches(keywords, '{QUOTE}([^''"]+){QUOTE}', 'g') AS m
+                ORDER BY 1
+            ) END
+    """)
+
+    op.create_index(
+        'ix_cards_name_trgm', 'cards', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_cards_type_line_trgm', 'cards', ['type_line'],
+        postgresql_using='gin', postgresql_ops={'type_line': 'gin_trgm_ops'},
+    )
+    # Bitmask columns have no index on purpose; see the module docstring
+    op.create_index(
+        'ix_cards_keyword_list', 'cards', ['keyword_list'],
+        postgresql_using='gin',
+    )
+    op.execute(f'CREATE INDEX ix_cards_search_document ON cards USING gin ({SEARCH_DOCUMENT})')
+
+
+def downgrade():
+    """Drop search indexes and columns."""
+    op.execute('DROP INDEX IF EXISTS ix_cards_search_document')
+    op.drop_index('ix_cards_keyword_list', table_name='cards')
+    op.drop_index('ix_cards_type_line_trgm', table_name='cards')
+    op.drop_index('ix_cards_name_trgm', table_name='cards')
+    op.drop_column('cards', 'keyword_list')
+    op.drop_column('cards', 'legal_formats')
+    op.drop_column('cards', 'color_mask')
+    # pg_trgm is left installed; ix_users_search_trgm depends on it
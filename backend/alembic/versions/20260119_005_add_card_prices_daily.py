@@ -0,0 +1,82 @@
+"""Add card_prices_daily continuous aggregate
+
+Per-card daily rollup alongside card_prices_hourly so long-range card
+charts (90 days to 1 year) read at most one row per day per variant
+instead of re-aggregating raw price_snapshots on every request.
+
+Both card aggregates are backfilled over all existing snapshots, since
+the refresh policies only cover their last few buckets and the history
+endpoint reads materialized buckets only.
+
+Revision ID: 20260119_005
+Revises: 20260119_004
+Create Date: 2026-01-19 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20260119_005'
+down_revision = '20260119_004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the card_prices_daily continuous aggregate."""
+    op.execute("""
+        CREATE MATERIALIZED VIEW card_prices_daily
+        WITH (timescaledb.continuous) AS
+        SELECT
+            time_bucket('1 day', time) AS bucket,
+            card_id,
+            marketplace_id,
+            condition,
+            is_foil,
+            language,
+            currency,
+            AVG(price) AS avg_price,
+            AVG(price_market) AS avg_market_price,
+            MIN(price_low) AS min_price,
+            MAX(price_high) AS max_price,
+            SUM(num_listings) AS total_listings,
+            SUM(total_quantity) AS total_quantity
+        FROM price_snapshots
+        WHERE price > 0
+        GROUP BY bucket, card_id, marketplace_id, condition, is_foil, language, currency
+        WITH NO DATA
+    """)
+
+    op.execute("""
+        SELECT add_continuous_aggregate_policy('card_prices_daily',
+            start_offset => INTERVAL '3 days',
+            end_offset => INTERVAL '1 day',
+            schedule_interval => INTERVAL '1 day',
+            if_not_exists => TRUE
+        )
+    """)
+
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_card_prices_daily_card_bucket
+        ON card_prices_daily (card_id, bucket DESC)
+    """)
+
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_card_prices_daily_card_condition
+        ON card_prices_daily (card_id, condition, bucket DESC)
+    """)
+
+    # Materialize existing history (refresh_continuous_aggregate cannot
+    # run inside a transaction)
+    with op.get_context().autocommit_block():
+        op.execute("CALL refresh_continuous_aggregate('card_prices_hourly', NULL, NULL)")
+        op.execute("CALL refresh_continuous_aggregate('card_prices_daily', NULL, NULL)")
+
+
+def downgrade() -> None:
+    """Remove the card_prices_daily continuous aggregate."""
+    op.execute("""
+        SELECT remove_continuous_aggregate_policy('card_prices_daily', if_exists => TRUE)
+    """)
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS card_prices_daily CASCADE")
@@ -0,0 +1,60 @@
+"""Add data watermarks for cheap freshness checks
+
+One row per dataset recording when its jobs last ran, the newest data
+timestamp written and the rows written by the last run. Startup and
+health freshness checks read these rows instead of running MAX/COUNT
+over price_snapshots and the other large tables.
+
+Watermarks are seeded from the current data so freshness is correct
+before the next job run.
+
+Revision ID: 20260119_006
+Revises: 20260119_005
+Create Date: 2026-01-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20260119_006'
+down_revision = '20260119_005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create and seed data_watermarks table."""
+    op.create_table(
+        'data_watermarks',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('last_run_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('latest_data_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('rows_written', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('last_job', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_data_watermarks_name', 'data_watermarks', ['name'], unique=True)
+
+    op.execute("""
+        INSERT INTO data_watermarks (name, last_run_at, latest_data_at, rows_written, last_job)
+        SELECT name, now(), latest, 0, 'migration'
+        FROM (
+            SELECT 'price_snapshots' AS name, (SELECT MAX(time) FROM price_snapshots) AS latest
+            UNION ALL
+            SELECT 'metrics_cards_daily', (SELECT MAX(date)::timestamptz FROM metrics_cards_daily)
+            UNION ALL
+            SELECT 'recommendations', (SELECT MAX(created_at) FROM recommendations WHERE is_active)
+        ) seeds
+        WHERE latest IS NOT NULL
+    """)
+
+
+def downgrade():
+    """Drop data_watermarks table."""
+    op.drop_index('ix_data_watermarks_name', table_name='data_watermarks')
+    op.drop_table('data_watermarks')
@@ -0,0 +1,37 @@
+"""Add inventory fingerprint to the inventory index series
+
+Each inventory_index_days row records a hash of the (card, quantity)
+inventory it was weighted with, so chart reads can skip days computed
+before the user's inventory changed and compute them from raw snapshots
+instead. The intraday arrays also gain hourly and four-hour buckets.
+
+Existing rows have no fingerprint and are ignored until rebuilt by the
+nightly app.tasks.pricing.rebuild_inventory_index task.
+
+Revision ID: 20260119_007
+Revises: 20260119_006
+Create Date: 2026-01-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20260119_007'
+down_revision = '20260119_006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add inventory_hash column to inventory_index_days."""
+    op.add_column(
+        'inventory_index_days',
+        sa.Column('inventory_hash', sa.BigInteger(), nullable=True),
+    )
+
+
+def downgrade():
+    """Drop inventory_hash column from inventory_index_days."""
+    op.drop_column('inventory_index_days', 'inventory_hash')
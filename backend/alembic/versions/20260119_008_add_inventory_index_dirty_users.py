@@ -0,0 +1,47 @@
+"""Track users whose inventory index series needs restating
+
+Inventory edits record their owner in inventory_index_dirty_users, and
+the pricing tasks restate only those users' inventory_index_days rows
+instead of rebuilding every user's history nightly.
+
+Every user with an inventory is marked on upgrade, so days written
+before the inventory fingerprint existed are restated once.
+
+Revision ID: 20260119_008
+Revises: 20260119_007
+Create Date: 2026-01-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20260119_008'
+down_revision = '20260119_007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create inventory_index_dirty_users and mark every inventory owner."""
+    op.create_table(
+        'inventory_index_dirty_users',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('marked_at', sa.DateTime(timezone=True), server_default=sa.text('clock_timestamp()'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id'),
+    )
+    op.execute(
+        "INSERT INTO inventory_index_dirty_users (user_id) "
+        "SELECT DISTINCT user_id FROM inventory_items"
+    )
+
+
+def downgrade():
+    """Drop inventory_index_dirty_users table."""
+    op.drop_table('inventory_index_dirty_users')
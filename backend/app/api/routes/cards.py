@@ -2,18 +2,22 @@
 Card-related API endpoints.
 """
 import json
+from collections import defaultdict
 from datetime import datetime, timedelta, time, timezone
 from typing import Optional
 
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from redis.asyncio import Redis
 from sqlalchemy import select, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.constants import MAX_SEARCH_LENGTH
+from app.core.data_freshness import PRICE_SNAPSHOTS_WATERMARK, record_watermark
 
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import async_session_maker, get_db, get_replica_db
+from app.api.deps import get_redis
 from app.models import Card, PriceSnapshot, Marketplace, MetricsCardsDaily, Signal, Recommendation, CardNewsMention, NewsArticle, BuylistSnapshot, LegalityChange
 from app.core.hashids import decode_card_id
 from app.schemas.card import (
@@ -31,17 +35,22 @@ from app.schemas.card import (
     CardPublicResponse,
     CardPublicPriceResponse,
 )
+from app.api.utils.downsampling import lttb_indices
+from app.api.utils.http_cache import cache_response
 from app.api.utils.pagination import (
     apply_cursor_pagination,
     build_cursor_response,
 )
+from app.repositories.price_repo import PriceRepository
 from app.schemas.signal import SignalResponse, SignalListResponse
 from app.schemas.news import CardNewsResponse, CardNewsItem
 from app.schemas.buylist import CardBuylistResponse, BuylistPriceItem, BuylistRefreshResponse
 from app.schemas.legality import LegalityChangeItem, CardLegalityHistoryResponse
 from app.tasks.analytics import compute_card_metrics
 from app.tasks.recommendations import generate_card_recommendations
-from app.services.ingestion import ScryfallAdapter
+from app.services.ingestion import ScryfallAdapter, SnapshotRecord, copy_snapshots, prepare_copy_record
+from app.services.card_refresh import CardRefreshService
+from app.services.search import build_search_query, count_results, order_by_relevance
 from app.services.agents.analytics import AnalyticsAgent
 from app.services.agents.recommendation import RecommendationAgent
 
@@ -71,31 +80,26 @@ async def search_cards(
             detail=f"Search query too long. Maximum {MAX_SEARCH_LENGTH} characters.",
         )
 
-    # Escape SQL wildcard characters in user input to prevent wildcard abuse
-    q_escaped = q.replace("%", r"\%").replace("_", r"\_")
+    # Name match over the trigram index; set filter runs in SQL
+    query = build_search_query(q, {"set_code": set_code}, full_text=False)
+
+    # Planner estimate for broad queries instead of counting every match
+    total, total_is_estimate = await count_results(db, query)
+
+    # Apply ranking and pagination
+    query = order_by_relevance(query, q, full_text=False)
+    query = query.offset((page - 1) * page_size).limit(page_size)
 
-    # Build query
-    query = select(Card).where(Card.name.ilike(f"%{q_escaped}%", escape="\\"))
-    
-    if set_code:
-        query = query.where(Card.set_code == set_code.upper())
-    
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
-    
-    # Apply pagination
-    query = query.order_by(Card.name).offset((page - 1) * page_size).limit(page_size)
-    
     result = await db.execute(query)
     cards = result.scalars().all()
-    
+
     return CardSearchResponse(
         cards=[CardResponse.model_validate(c) for c in cards],
-        total=total or 0,
+        total=total,
         page=page,
         page_size=page_size,
-        has_more=(page * page_size) < (total or 0),
+        has_more=(page * page_size) < total,
+        total_is_estimate=total_is_estimate,
     )
 
 
@@ -129,20 +133,14 @@ async def search_cards_cursor(
             detail=f"Search query too long. Maximum {MAX_SEARCH_LENGTH} characters.",
         )
 
-    # Escape SQL wildcard characters in user input to prevent wildcard abuse
-    q_escaped = q.replace("%", r"\%").replace("_", r"\_")
-
-    # Build base query
-    query = select(Card).where(Card.name.ilike(f"%{q_escaped}%", escape="\\"))
+    # Build base query (name match over the trigram index)
+    query = build_search_query(q, {"set_code": set_code}, full_text=False)
 
-    if set_code:
-        query = query.where(Card.set_code == set_code.upper())
-
-    # Optional: Get total count (adds query overhead)
+    # Optional: Get total count (estimated for broad queries)
     total_count = None
+    total_is_estimate = False
     if include_count:
-        count_query = select(func.count()).select_from(query.subquery())
-        total_count = await db.scalar(count_query)
+        total_count, total_is_estimate = await count_results(db, query)
 
     # Apply cursor-based pagination
     # Order by name (ASC) with id as tiebreaker for stable ordering
@@ -171,6 +169,7 @@ async def search_cards_cursor(
         next_cursor=next_cursor,
         has_more=has_more,
         total_count=total_count,
+        total_is_estimate=total_is_estimate,
     )
 
 
@@ -218,6 +217,7 @@ async def get_card_public(
 
 
 @router.get("/public/{hashid}/prices", response_model=CardPublicPriceResponse)
+@cache_response(PRICE_SNAPSHOTS_WATERMARK)
 async def get_card_prices_public(
     hashid: str,
     days: int = Query(default=30, le=90, ge=1),
@@ -408,6 +408,35 @@ async def get_card_prices(
     )
 
 
+def _normalize_marketplace_name(marketplace_name: str, marketplace_slug: str, currency: str) -> str:
+    """
+    Normalize marketplace names to consolidate duplicates.
+    - Consolidate "Scryfall (TCGPlayer)" and "Scryfall" (USD) to "TCGPlayer"
+    - Keep other marketplace names as-is
+    """
+    # Normalize Scryfall TCGPlayer variants to just "TCGPlayer"
+    if marketplace_slug == "scryfall" and currency == "USD":
+        return "TCGPlayer"
+    if "scryfall" in marketplace_name.lower() and "tcgplayer" in marketplace_name.lower() and currency == "USD":
+        return "TCGPlayer"
+    if marketplace_slug == "tcgplayer":
+        return "TCGPlayer"
+    # Keep other names as-is
+    return marketplace_name
+
+
+def _ensure_timezone_aware(dt: Optional[datetime]) -> Optional[datetime]:
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _positive(value) -> Optional[float]:
+    return float(value) if value is not None and value > 0 else None
+
+
 @router.get("/{card_id}/history", response_model=CardHistoryResponse)
 async def get_card_history(
     card_id: int,
@@ -415,250 +444,94 @@ async def get_card_history(
     marketplace_id: Optional[int] = None,
     condition: Optional[str] = Query(None, description="Filter by condition (NM, LP, MP, HP, DMG)"),
     is_foil: Optional[bool] = Query(None, description="Filter by foil status (True for foil, False for non-foil, None for both)"),
-    db: AsyncSession = Depends(get_db),
+    points: Optional[int] = Query(None, ge=3, le=2000, description="Downsample each marketplace series to at most this many points"),
+    db: AsyncSession = Depends(get_replica_db),
 ):
     """
     Get price history for a card.
 
-    Returns daily price points for the specified time range.
-    Filters PriceSnapshot data by condition, foil status, and marketplace.
+    Returns hourly price points for ranges up to 7 days and daily points
+    beyond that (including the 30-day default), per marketplace. Points come from the card_prices_hourly
+    and card_prices_daily continuous aggregates, with the most recent
+    buckets computed from PriceSnapshot, so the cost of a request depends
+    on the number of buckets rather than the number of snapshots.
+
+    Pass `points` to downsample each marketplace series with
+    Largest-Triangle-Three-Buckets, which keeps peaks and troughs.
 
     Foil Filter Behavior:
     - is_foil=True: Returns only foil prices (price_market field). Returns empty if no foil prices exist.
-    - is_foil=False: Returns only non-foil prices (price field). Excludes snapshots with foil prices.
+    - is_foil=False: Returns only non-foil prices (price field). Excludes buckets where the
+      variant has foil prices (decided per hourly/daily bucket, not per snapshot).
     - is_foil=None: Returns non-foil prices by default. Includes price_foil in response if available.
 
     Condition Filter:
     - Accepts abbreviations (NM, LP, MP, HP, DMG) or full names (Near Mint, Lightly Played, etc.)
     - Normalized to standard CardCondition enum values
+    - With a condition, is_foil filters on the snapshot's foil flag
     """
     card = await db.get(Card, card_id)
     if not card:
         raise HTTPException(status_code=404, detail="Card not found")
-    
-    from_date = datetime.now(timezone.utc) - timedelta(days=days)
+
     now = datetime.now(timezone.utc)
-    
-    # Helper function to ensure timezone-aware datetime
-    def ensure_timezone_aware(dt):
-        if dt is None:
-            return None
-        if dt.tzinfo is None:
-            return dt.replace(tzinfo=timezone.utc)
-        return dt
-    
+    from_date = now - timedelta(days=days)
+
     # Import normalize_condition for condition filtering
     from app.core.constants import normalize_condition
 
-    # If condition is specified, filter PriceSnapshot by condition
-    if condition:
-        # Normalize condition to our standard enum value
-        normalized_condition_enum = normalize_condition(condition)
-        normalized_condition = normalized_condition_enum.value
-
-        # Query price snapshots grouped by time bucket and marketplace, filtered by condition
-        # Use date_trunc to bucket by day
-        bucket_expr = func.date_trunc('day', PriceSnapshot.time).label('bucket_time')
-
-        query = select(
-            bucket_expr,
-            PriceSnapshot.marketplace_id,
-            Marketplace.name.label('marketplace_name'),
-            Marketplace.slug.label('marketplace_slug'),
-            func.avg(PriceSnapshot.price).label('avg_price'),
-            func.min(PriceSnapshot.price).label('min_price'),
-            func.max(PriceSnapshot.price).label('max_price'),
-            func.count(PriceSnapshot.time).label('num_listings'),  # Count snapshots instead of listing IDs
-            func.max(PriceSnapshot.currency).label('currency'),
-        ).join(
-            Marketplace, PriceSnapshot.marketplace_id == Marketplace.id
-        ).where(
-            PriceSnapshot.card_id == card_id,
-            PriceSnapshot.time >= from_date,
-            PriceSnapshot.condition == normalized_condition,
-            PriceSnapshot.currency == "USD",  # USD-only mode
-            Marketplace.slug != "mtgo",  # Filter out MTGO
-        )
-
-        if marketplace_id:
-            query = query.where(PriceSnapshot.marketplace_id == marketplace_id)
-
-        if is_foil is not None:
-            query = query.where(PriceSnapshot.is_foil.is_(is_foil))
-
-        query = query.group_by(
-            bucket_expr,
-            PriceSnapshot.marketplace_id,
-            Marketplace.name,
-            Marketplace.slug
-        ).order_by(bucket_expr)
+    normalized_condition = normalize_condition(condition) if condition else None
+    # Without a condition, foil prices are read from price_market, where
+    # ingestion stores them alongside the non-foil price
+    foil_from_market_price = normalized_condition is None
+
+    rows = await PriceRepository(db).get_card_history_series(
+        card_id,
+        from_date,
+        condition=normalized_condition,
+        is_foil=None if foil_from_market_price else is_foil,
+        has_market_price=is_foil if foil_from_market_price else None,
+        marketplace_id=marketplace_id,
+        now=now,
+    )
 
-        result = await db.execute(query)
-        rows = result.all()
+    series: dict[int, list[PricePoint]] = defaultdict(list)
+    for row in rows:
+        use_market_price = foil_from_market_price and is_foil is True
+        price = _positive(row["avg_market_price"] if use_market_price else row["avg_price"])
+        if price is None:
+            continue
+        bucket_time = _ensure_timezone_aware(row["time"])
+        currency = row["currency"] or "USD"
+        series[row["marketplace_id"]].append(PricePoint(
+            date=bucket_time,
+            price=price,
+            marketplace=_normalize_marketplace_name(row["marketplace_name"], row["marketplace_slug"], currency),
+            currency=currency,
+            min_price=None if use_market_price else _positive(row["min_price"]),
+            max_price=None if use_market_price else _positive(row["max_price"]),
+            num_listings=int(row["total_listings"]) if row["total_listings"] is not None else None,
+            snapshot_time=bucket_time,
+            data_age_minutes=int((now - bucket_time).total_seconds() / 60),
+            condition=normalized_condition.value if normalized_condition else None,
+            price_foil=_positive(row["avg_market_price"]) if foil_from_market_price and is_foil is None else None,
+        ))
 
-        def normalize_marketplace_name(marketplace_name: str, marketplace_slug: str, currency: str) -> str:
-            """
-            Normalize marketplace names to consolidate duplicates.
-            - Consolidate "Scryfall (TCGPlayer)" and "Scryfall" (USD) to "TCGPlayer"
-            - Keep other marketplace names as-is
-            """
-            # Normalize Scryfall TCGPlayer variants to just "TCGPlayer"
-            if marketplace_slug == "scryfall" and currency == "USD":
-                return "TCGPlayer"
-            if "scryfall" in marketplace_name.lower() and "tcgplayer" in marketplace_name.lower() and currency == "USD":
-                return "TCGPlayer"
-            if marketplace_slug == "tcgplayer":
-                return "TCGPlayer"
-            # Keep other names as-is
-            return marketplace_name
-
-        history = [
-            PricePoint(
-                date=row.bucket_time,
-                price=float(row.avg_price),
-                marketplace=normalize_marketplace_name(row.marketplace_name, row.marketplace_slug, row.currency or "USD"),
-                currency=row.currency or "USD",
-                min_price=float(row.min_price) if row.min_price else None,
-                max_price=float(row.max_price) if row.max_price else None,
-                num_listings=row.num_listings,
-                snapshot_time=row.bucket_time,
-                data_age_minutes=int((now - ensure_timezone_aware(row.bucket_time)).total_seconds() / 60) if row.bucket_time else None,
-                condition=normalized_condition,
+    history = []
+    for marketplace_points in series.values():
+        if points:
+            keep = lttb_indices(
+                [p.date.timestamp() for p in marketplace_points],
+                [p.price for p in marketplace_points],
+                points,
             )
-            for row in rows
-        ]
+            marketplace_points = [marketplace_points[i] for i in keep]
+        history.extend(marketplace_points)
+    history.sort(key=lambda p: p.date)
 
-        latest_snapshot = max((row.bucket_time for row in rows), default=None) if rows else None
-    else:
-        # Use PriceSnapshot data (aggregated, no condition filter, USD only)
-        query = select(PriceSnapshot, Marketplace).join(
-            Marketplace, PriceSnapshot.marketplace_id == Marketplace.id
-        ).where(
-            PriceSnapshot.card_id == card_id,
-            PriceSnapshot.time >= from_date,
-            PriceSnapshot.currency == "USD",  # USD-only mode
-            Marketplace.slug != "mtgo",  # Filter out MTGO pricing
-        )
-        
-        if marketplace_id:
-            query = query.where(PriceSnapshot.marketplace_id == marketplace_id)
-        
-        def normalize_marketplace_name(marketplace_name: str, marketplace_slug: str, currency: str) -> str:
-            """
-            Normalize marketplace names to consolidate duplicates.
-            - Consolidate "Scryfall (TCGPlayer)" and "Scryfall" (USD) to "TCGPlayer"
-            - Keep other marketplace names as-is
-            """
-            # Normalize Scryfall TCGPlayer variants to just "TCGPlayer"
-            if marketplace_slug == "scryfall" and currency == "USD":
-                return "TCGPlayer"
-            if "scryfall" in marketplace_name.lower() and "tcgplayer" in marketplace_name.lower() and currency == "USD":
-                return "TCGPlayer"
-            if marketplace_slug == "tcgplayer":
-                return "TCGPlayer"
-            # Keep other names as-is
-            return marketplace_name
-        
-        # When is_foil is True, use price_foil if available, otherwise filter out entries without foil prices
-        # When is_foil is False, use regular price and exclude entries that have foil prices (pure non-foil only)
-        # When is_foil is None, prefer regular price but include foil price in response if available
-        # Add foil filter to SQL query for efficiency
-        if is_foil is True:
-            query = query.where(PriceSnapshot.price_market.isnot(None))
-        elif is_foil is False:
-            query = query.where(PriceSnapshot.price_market.is_(None))
-        # else: no filter needed (include all)
-        
-        query = query.order_by(PriceSnapshot.time)
-        
-        result = await db.execute(query)
-        rows = result.all()
-        
-        history = []
-        for snapshot, marketplace in rows:
-            if is_foil is True:
-                # Only include entries with foil prices (already filtered in query)
-                # Validate price is positive
-                if snapshot.price_market is not None and snapshot.price_market > 0:
-                    try:
-                        history.append(PricePoint(
-                            date=snapshot.time,
-                            price=float(snapshot.price_market),
-                            marketplace=normalize_marketplace_name(marketplace.name, marketplace.slug, snapshot.currency),
-                            currency=snapshot.currency,
-                            min_price=None,  # Foil prices don't have min/max in snapshot
-                            max_price=None,
-                            num_listings=snapshot.num_listings,
-                            snapshot_time=snapshot.time,
-                            data_age_minutes=int((now - ensure_timezone_aware(snapshot.time)).total_seconds() / 60) if snapshot.time else None,
-                        ))
-                    except (ValueError, TypeError) as e:
-                        logger.warning(
-                            "Invalid price_foil value",
-                            card_id=card_id,
-                            snapshot_id=getattr(snapshot, 'id', None),
-                            price_foil=snapshot.price_market,
-                            error=str(e),
-                        )
-                        continue
-            elif is_foil is False:
-                # Only include entries with regular (non-foil) prices (already filtered in query)
-                # Validate price is positive
-                if snapshot.price > 0:
-                    try:
-                        history.append(PricePoint(
-                            date=snapshot.time,
-                            price=float(snapshot.price),
-                            marketplace=normalize_marketplace_name(marketplace.name, marketplace.slug, snapshot.currency),
-                            currency=snapshot.currency,
-                            min_price=float(snapshot.price_low) if snapshot.price_low and snapshot.price_low > 0 else None,
-                            max_price=float(snapshot.price_high) if snapshot.price_high and snapshot.price_high > 0 else None,
-                            num_listings=snapshot.num_listings,
-                            snapshot_time=snapshot.time,
-                            data_age_minutes=int((now - ensure_timezone_aware(snapshot.time)).total_seconds() / 60) if snapshot.time else None,
-                        ))
-                    except (ValueError, TypeError) as e:
-                        logger.warning(
-                            "Invalid price value",
-                            card_id=card_id,
-                            snapshot_id=getattr(snapshot, 'id', None),
-                            price=snapshot.price,
-                            error=str(e),
-                        )
-                        continue
-            else:
-                # Include both, prefer regular price
-                # Validate price is positive
-                if snapshot.price > 0:
-                    try:
-                        history.append(PricePoint(
-                            date=snapshot.time,
-                            price=float(snapshot.price),
-                            marketplace=normalize_marketplace_name(marketplace.name, marketplace.slug, snapshot.currency),
-                            currency=snapshot.currency,
-                            min_price=float(snapshot.price_low) if snapshot.price_low and snapshot.price_low > 0 else None,
-                            max_price=float(snapshot.price_high) if snapshot.price_high and snapshot.price_high > 0 else None,
-                            num_listings=snapshot.num_listings,
-                            snapshot_time=snapshot.time,
-                            data_age_minutes=int((now - ensure_timezone_aware(snapshot.time)).total_seconds() / 60) if snapshot.time else None,
-                            price_foil=float(snapshot.price_market) if snapshot.price_market and snapshot.price_market > 0 else None,
-                        ))
-                    except (ValueError, TypeError) as e:
-                        logger.warning(
-                            "Invalid price value",
-                            card_id=card_id,
-                            snapshot_id=getattr(snapshot, 'id', None),
-                            price=snapshot.price,
-                            error=str(e),
-                        )
-                        continue
-        
-        latest_snapshot = max((snapshot.time for snapshot, _ in rows), default=None) if rows else None
-    
-    if latest_snapshot:
-        latest_snapshot = ensure_timezone_aware(latest_snapshot)
+    latest_snapshot = max((p.date for p in history), default=None)
     data_freshness = int((now - latest_snapshot).total_seconds() / 60) if latest_snapshot else None
-    
+
     return CardHistoryResponse(
         card_id=card_id,
         card_name=card.name,
@@ -719,30 +592,37 @@ async def get_card_signals(
 async def refresh_card_data(
     card_id: int,
     payload: dict | None = None,
-    sync: bool = Query(True, description="Run synchronously and return updated data immediately"),
+    sync: bool = Query(True, description="Refresh prices now (in the background) and return current data"),
     force: bool = Query(False, description="Force fetch new data, bypassing the 24-hour cache"),
     db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
 ):
     """
     Manually trigger a refresh for a card's prices, metrics, and recommendations.
 
-    If sync=True (default), fetches data immediately and returns updated card detail.
-    If sync=False, dispatches background tasks and returns task IDs.
+    If sync=True (default), starts a price refresh in the background and
+    returns the current card detail immediately with a refresh_job_id.
+    Concurrent requests for the same card join the running refresh instead
+    of starting another. Completion is published on the card:{card_id}
+    WebSocket channel as a "card_refresh" message with the job id.
+    If sync=False, dispatches analytics/recommendation tasks and returns task IDs.
     If force=True, always fetches new data even if recent data exists (bypasses 24-hour cache).
-
-    Note: Synchronous refresh can take 30-60 seconds for cards with historical data.
-    Consider using sync=False for background processing if you don't need immediate results.
     """
     card = await db.get(Card, card_id)
     if not card:
         raise HTTPException(status_code=404, detail="Card not found")
 
     if sync:
-        # Synchronous refresh - fetch data immediately and return
-        # Use fast_mode=True for instant refresh (skips heavy operations if data exists)
-        # If force=True, use fast_mode=False to always fetch new data
+        last_updated = await db.scalar(
+            select(func.max(PriceSnapshot.time)).where(PriceSnapshot.card_id == card_id)
+        )
+        service = CardRefreshService(
+            redis,
+            _background_refresh_card,
+            freshness=timedelta(hours=REFRESH_THRESHOLD_HOURS),
+        )
         try:
-            return await _sync_refresh_card(db, card, fast_mode=not force)
+            job = await service.request(card_id, last_updated=last_updated, force=force)
         except Exception as e:
             logger.error(
                 "Error during card refresh",
@@ -750,11 +630,16 @@ async def refresh_card_data(
                 error=str(e),
                 error_type=type(e).__name__,
             )
-            # Re-raise as HTTPException to ensure proper error response
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to refresh card: {str(e)}"
             )
+
+        detail = await get_card(card_id, refresh_if_stale=False, db=db)
+        detail.refresh_requested = job.requested
+        detail.refresh_reason = job.status if job.requested else None
+        detail.refresh_job_id = job.job_id
+        return detail
     
     # Async refresh - dispatch background tasks
     # Note: Price collection is handled by scheduled tasks, so we only dispatch analytics/recommendations
@@ -766,6 +651,14 @@ async def refresh_card_data(
     }
 
 
+async def _background_refresh_card(card_id: int, force: bool) -> None:
+    """Run a full card refresh outside the request, in its own session."""
+    async with async_session_maker() as db:
+        card = await db.get(Card, card_id)
+        if card:
+            await _sync_refresh_card(db, card, fast_mode=not force)
+
+
 async def _get_current_prices(
     db: AsyncSession,
     card_id: int,
@@ -1087,9 +980,13 @@ async def _sync_refresh_card(db: AsyncSession, card: Card, fast_mode: bool = Tru
 
     logger.info("Sync refresh starting", card_id=card_id, card_name=card_name, fast_mode=fast_mode)
     
+    # Snapshots written by this refresh, for the price_snapshots watermark
+    written: list[SnapshotRecord] = []
+
     # 1. Fetch prices from Scryfall broken down by marketplace
     scryfall = ScryfallAdapter()
     scryfall_snapshots_created = 0
+    pending: list[SnapshotRecord] = []
     try:
         # Fetch all marketplace prices (TCGPlayer USD, Cardmarket EUR, etc.)
         all_prices = await scryfall.fetch_all_marketplace_prices(
@@ -1136,15 +1033,15 @@ async def _sync_refresh_card(db: AsyncSession, card: Card, fast_mode: bool = Tru
             
             if not recent_snapshot:
                 # Create price snapshot for this marketplace
-                snapshot = PriceSnapshot(
+                pending.append(prepare_copy_record(
                     card_id=card_id,
                     marketplace_id=marketplace.id,
-                    snapshot_time=now,
+                    time=now,
                     price=price_data.price,
                     currency=price_data.currency,
-                    price_foil=price_data.price_foil,
-                )
-                db.add(snapshot)
+                    price_market=price_data.price_foil,
+                    source="api",
+                ))
                 scryfall_snapshots_created += 1
                 logger.debug(
                     "Price snapshot created",
@@ -1154,14 +1051,17 @@ async def _sync_refresh_card(db: AsyncSession, card: Card, fast_mode: bool = Tru
                     currency=price_data.currency,
                 )
         
-        await db.flush()
+        await copy_snapshots(db, pending, job="card_refresh")
+        written.extend(pending)
         logger.info(
             "Scryfall price snapshots created",
             card_id=card_id,
             count=scryfall_snapshots_created,
         )
     except Exception as e:
-        # Rollback the session if there was an error during flush
+        # Rollback the session if there was an error during flush;
+        # snapshots copied so far are rolled back with it
+        written.clear()
         try:
             await db.rollback()
         except Exception as rollback_error:
@@ -1201,20 +1101,21 @@ async def _sync_refresh_card(db: AsyncSession, card: Card, fast_mode: bool = Tru
                 
                 if not recent_snapshot:
                     # Create price snapshot
-                    snapshot = PriceSnapshot(
+                    record = prepare_copy_record(
                         card_id=card_id,
                         marketplace_id=cardtrader_mp.id,
-                        snapshot_time=now,
+                        time=now,
                         price=price_data.price,
                         currency=price_data.currency,
-                        price_foil=price_data.price_foil,
-                        min_price=price_data.price_low,
-                        max_price=price_data.price_high,
+                        price_market=price_data.price_foil,
+                        price_low=price_data.price_low,
+                        price_high=price_data.price_high,
                         num_listings=price_data.num_listings,
+                        source="api",
                     )
-                    db.add(snapshot)
+                    await copy_snapshots(db, [record], job="card_refresh")
+                    written.append(record)
                     cardtrader_snapshots_created += 1
-                    await db.flush()
                     logger.debug(
                         "CardTrader price snapshot created",
                         card_id=card_id,
@@ -1230,6 +1131,7 @@ async def _sync_refresh_card(db: AsyncSession, card: Card, fast_mode: bool = Tru
     # Note: MTGJSON file is cached for 7 days (updates weekly), so we don't need to download it every time
     # Always import MTGJSON for 30-day history to populate charts, even in fast mode
     mtgjson_snapshots_created = 0
+    pending = []
     # Always import MTGJSON historical data to populate charts with 30-day history
     from app.services.ingestion import get_adapter
     mtgjson = get_adapter("mtgjson", cached=True)
@@ -1278,18 +1180,19 @@ async def _sync_refresh_card(db: AsyncSession, card: Card, fast_mode: bool = Tru
                     existing = existing_result.scalar_one_or_none()
                     
                     if not existing:
-                        snapshot = PriceSnapshot(
+                        pending.append(prepare_copy_record(
                             card_id=card_id,
                             marketplace_id=marketplace.id,
-                            snapshot_time=price_data.snapshot_time,
+                            time=price_data.snapshot_time,
                             price=price_data.price,
                             currency=price_data.currency,
-                            price_foil=price_data.price_foil,
-                        )
-                        db.add(snapshot)
+                            price_market=price_data.price_foil,
+                            source="mtgjson",
+                        ))
                         mtgjson_snapshots_created += 1
                 
-                await db.flush()
+                await copy_snapshots(db, pending, job="card_refresh")
+                written.extend(pending)
                 logger.info(
                     "MTGJSON historical data stored by marketplace",
                     card_id=card_id,
@@ -1297,7 +1200,9 @@ async def _sync_refresh_card(db: AsyncSession, card: Card, fast_mode: bool = Tru
                     snapshots_created=mtgjson_snapshots_created,
                 )
     except Exception as e:
-        # Rollback the session if there was an error during flush
+        # Rollback the session if there was an error during flush;
+        # snapshots copied so far are rolled back with it
+        written.clear()
         try:
             await db.rollback()
         except Exception as rollback_error:
@@ -1420,6 +1325,11 @@ async def _sync_refresh_card(db: AsyncSession, card: Card, fast_mode: bool = Tru
     # We no longer scrape individual listings - focus on aggregated price data
     total_snapshots_created = scryfall_snapshots_created + cardtrader_snapshots_created + mtgjson_snapshots_created
     
+    if written:
+        await record_watermark(
+            db, PRICE_SNAPSHOTS_WATERMARK, len(written),
+            latest_data_at=max(r.time for r in written), job="card_refresh",
+        )
     await db.flush()
     logger.info(
         "Price data refreshed",
@@ -4,9 +4,10 @@ Collection statistics and milestones API endpoints.
 All collection endpoints require authentication and return data for the current user.
 """
 from decimal import Decimal
+from typing import Optional
 
 import structlog
-from fastapi import APIRouter, Depends, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from sqlalchemy import select, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -16,15 +17,19 @@ from app.models import (
     Card,
     CollectionStats,
     InventoryItem,
+    MTGSet,
     UserMilestone,
 )
 from app.schemas.collection import (
     CollectionStatsResponse,
     MilestoneList,
     MilestoneResponse,
+    MissingCard,
+    MissingCardList,
     SetCompletion,
     SetCompletionList,
 )
+from app.services.set_completion import SetProgress, get_set_index, load_owned_bitmap
 
 router = APIRouter()
 logger = structlog.get_logger()
@@ -57,69 +62,16 @@ async def calculate_collection_stats(
     unique_cards = totals.unique_cards or 0
     total_value = totals.total_value or Decimal("0.00")
 
-    # Get set completion data - count distinct sets user has cards from
-    sets_query = select(
-        func.count(func.distinct(Card.set_code)).label("sets_started")
-    ).join(
-        InventoryItem, InventoryItem.card_id == Card.id
-    ).where(InventoryItem.user_id == user_id)
+    # Set completion from the user's owned bitmap over the set membership index
+    index = await get_set_index(db)
+    bitmap = await load_owned_bitmap(db, index, user_id)
+    set_progress = index.progress(bitmap)
+    sets_started = len(set_progress)
+    sets_completed = sum(1 for p in set_progress if p.owned >= p.total)
 
-    sets_result = await db.execute(sets_query)
-    sets_started = sets_result.scalar() or 0
-
-    # Find sets that are 100% complete
-    # For each set user has cards from, check if they own all cards in that set
-    completed_sets_query = """
-        WITH user_set_counts AS (
-            SELECT c.set_code,
-                   COUNT(DISTINCT c.id) as owned_count
-            FROM inventory_items ii
-            JOIN cards c ON ii.card_id = c.id
-            WHERE ii.user_id = :user_id
-            GROUP BY c.set_code
-        ),
-        set_totals AS (
-            SELECT set_code, COUNT(*) as total_count
-            FROM cards
-            GROUP BY set_code
-        )
-        SELECT COUNT(*) as completed
-        FROM user_set_counts usc
-        JOIN set_totals st ON usc.set_code = st.set_code
-        WHERE usc.owned_count >= st.total_count
-    """
-    from sqlalchemy import text
-    completed_result = await db.execute(text(completed_sets_query), {"user_id": user_id})
-    sets_completed = completed_result.scalar() or 0
-
-    # Find top set by completion percentage
-    top_set_query = """
-        WITH user_set_counts AS (
-            SELECT c.set_code,
-                   COUNT(DISTINCT c.id) as owned_count
-            FROM inventory_items ii
-            JOIN cards c ON ii.card_id = c.id
-            WHERE ii.user_id = :user_id
-            GROUP BY c.set_code
-        ),
-        set_totals AS (
-            SELECT set_code, COUNT(*) as total_count
-            FROM cards
-            GROUP BY set_code
-        )
-        SELECT usc.set_code,
-               ROUND((usc.owned_count::numeric / NULLIF(st.total_count, 0) * 100), 2) as completion
-        FROM user_set_counts usc
-        JOIN set_totals st ON usc.set_code = st.set_code
-        WHERE st.total_count > 0
-        ORDER BY completion DESC, usc.set_code
-        LIMIT 1
-    """
-    top_set_result = await db.execute(text(top_set_query), {"user_id": user_id})
-    top_set_row = top_set_result.first()
-
-    top_set_code = top_set_row.set_code if top_set_row else None
-    top_set_completion = Decimal(str(top_set_row.completion)) if top_set_row else None
+    top_sets = index.top_sets(bitmap, limit=1)
+    top_set_code = top_sets[0].set_code if top_sets else None
+    top_set_completion = top_sets[0].completion if top_sets else None
 
     # Get or create the CollectionStats record
     stats_query = select(CollectionStats).where(CollectionStats.user_id == user_id)
@@ -233,6 +185,28 @@ async def refresh_collection_stats(
     }
 
 
+async def _set_details(db: AsyncSession, set_codes: list[str]) -> dict[str, MTGSet]:
+    """MTGSet rows for set codes, keyed by the (case-insensitive) code given."""
+    if not set_codes:
+        return {}
+    result = await db.execute(
+        select(MTGSet).where(func.upper(MTGSet.code).in_([c.upper() for c in set_codes]))
+    )
+    by_code = {s.code.upper(): s for s in result.scalars().all()}
+    return {c: by_code[c.upper()] for c in set_codes if c.upper() in by_code}
+
+
+def _set_completion(progress: SetProgress, mtg_set: Optional[MTGSet]) -> SetCompletion:
+    return SetCompletion(
+        set_code=progress.set_code,
+        set_name=mtg_set.name if mtg_set else progress.set_code,  # Fallback to code if name not found
+        total_cards=progress.total,
+        owned_cards=progress.owned,
+        completion_percentage=progress.completion,
+        icon_svg_uri=mtg_set.icon_svg_uri if mtg_set else None,
+    )
+
+
 @router.get("/sets", response_model=SetCompletionList)
 async def get_set_completion(
     current_user: CurrentUser,
@@ -246,70 +220,74 @@ async def get_set_completion(
 
     Returns a list of sets the user has cards from, with completion percentages.
     """
-    from sqlalchemy import text
-
-    # Build the query with dynamic ordering
-    order_clause = "completion DESC, s.name" if sort_by == "completion" else "s.name"
-
-    query = text(f"""
-        WITH user_set_counts AS (
-            SELECT c.set_code,
-                   COUNT(DISTINCT c.id) as owned_count
-            FROM inventory_items ii
-            JOIN cards c ON ii.card_id = c.id
-            WHERE ii.user_id = :user_id
-            GROUP BY c.set_code
-        ),
-        set_totals AS (
-            SELECT set_code, COUNT(*) as total_count
-            FROM cards
-            GROUP BY set_code
-        )
-        SELECT s.code as set_code,
-               s.name as set_name,
-               st.total_count as total_cards,
-               usc.owned_count as owned_cards,
-               ROUND((usc.owned_count::numeric / NULLIF(st.total_count, 0) * 100), 2) as completion,
-               s.icon_svg_uri
-        FROM user_set_counts usc
-        JOIN set_totals st ON usc.set_code = st.set_code
-        LEFT JOIN mtg_sets s ON UPPER(usc.set_code) = UPPER(s.code)
-        WHERE st.total_count > 0
-        ORDER BY {order_clause}
-        LIMIT :limit OFFSET :offset
-    """)
+    index = await get_set_index(db)
+    bitmap = await load_owned_bitmap(db, index, current_user.id)
+    set_progress = index.progress(bitmap)
+    sets = await _set_details(db, [p.set_code for p in set_progress])
 
-    result = await db.execute(
-        query,
-        {"user_id": current_user.id, "limit": limit, "offset": offset}
-    )
-    rows = result.all()
-
-    # Get total count
-    count_query = text("""
-        SELECT COUNT(DISTINCT c.set_code)
-        FROM inventory_items ii
-        JOIN cards c ON ii.card_id = c.id
-        WHERE ii.user_id = :user_id
-    """)
-    count_result = await db.execute(count_query, {"user_id": current_user.id})
-    total_sets = count_result.scalar() or 0
+    def name(progress: SetProgress) -> str:
+        mtg_set = sets.get(progress.set_code)
+        return mtg_set.name if mtg_set else progress.set_code
+
+    if sort_by == "completion":
+        set_progress.sort(key=lambda p: (-p.owned / p.total, name(p)))
+    else:
+        set_progress.sort(key=name)
 
     items = [
-        SetCompletion(
-            set_code=row.set_code,
-            set_name=row.set_name or row.set_code,  # Fallback to code if name not found
-            total_cards=row.total_cards,
-            owned_cards=row.owned_cards,
-            completion_percentage=Decimal(str(row.completion)) if row.completion else Decimal("0.00"),
-            icon_svg_uri=row.icon_svg_uri,
-        )
-        for row in rows
+        _set_completion(progress, sets.get(progress.set_code))
+        for progress in set_progress[offset:offset + limit]
     ]
 
     return SetCompletionList(
         items=items,
-        total_sets=total_sets,
+        total_sets=len(set_progress),
+    )
+
+
+@router.get("/sets/{set_code}/missing", response_model=MissingCardList)
+async def get_missing_cards(
+    set_code: str,
+    current_user: CurrentUser,
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+) -> MissingCardList:
+    """
+    Get the cards of a set missing from the current user's collection.
+
+    Cards are listed in collector number order.
+    """
+    index = await get_set_index(db)
+    bitmap = await load_owned_bitmap(db, index, current_user.id)
+    code = index.resolve_set_code(set_code)
+    if code is None:
+        raise HTTPException(status_code=404, detail="Set not found")
+
+    progress = index.set_progress(bitmap, code)
+    missing_ids = index.missing(bitmap, code)
+    page_ids = [int(card_id) for card_id in missing_ids[offset:offset + limit]]
+
+    cards = {}
+    if page_ids:
+        result = await db.execute(select(Card).where(Card.id.in_(page_ids)))
+        cards = {card.id: card for card in result.scalars().all()}
+    sets = await _set_details(db, [code])
+
+    return MissingCardList(
+        set_completion=_set_completion(progress, sets.get(code)),
+        items=[
+            MissingCard(
+                card_id=card.id,
+                name=card.name,
+                collector_number=card.collector_number,
+                rarity=card.rarity,
+                image_url_small=card.image_url_small,
+            )
+            for card_id in page_ids
+            if (card := cards.get(card_id)) is not None
+        ],
+        total_missing=len(missing_ids),
     )
 
 
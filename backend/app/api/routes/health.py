@@ -13,10 +13,15 @@ from pydantic import BaseModel
 from sqlalchemy import text, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.data_freshness import (
+    PRICE_SNAPSHOTS_WATERMARK,
+    get_cards_count,
+    get_watermark_time,
+    is_data_fresh,
+)
 from app.db.session import get_db
 from app.api.deps import get_redis
 from app.models.user import User
-from app.models.card import Card
 from app.models.trading_post import TradingPost
 
 router = APIRouter()
@@ -24,6 +29,9 @@ router = APIRouter()
 # Track application startup time for uptime calculation
 _startup_time = time.time()
 
+# Price data older than this marks the service degraded
+PRICE_DATA_STALE_HOURS = 6
+
 
 # -----------------------------------------------------------------------------
 # Response Models for Detailed Health Check
@@ -95,6 +103,36 @@ async def _check_redis(redis) -> DependencyHealth:
         )
 
 
+async def _check_price_data(db: AsyncSession) -> DependencyHealth:
+    """Check price data freshness from the ingestion watermark."""
+    start = time.time()
+    try:
+        latest = await get_watermark_time(db, PRICE_SNAPSHOTS_WATERMARK)
+        latency = (time.time() - start) * 1000
+        # A new deployment with no ingestion yet is not considered stale
+        if latest is None:
+            return DependencyHealth(
+                name="price_data",
+                status="healthy",
+                latency_ms=round(latency, 2),
+                message="No price data ingested yet",
+            )
+        fresh = is_data_fresh(latest, PRICE_DATA_STALE_HOURS)
+        return DependencyHealth(
+            name="price_data",
+            status="healthy" if fresh else "degraded",
+            latency_ms=round(latency, 2),
+            message=None if fresh else f"Latest price data: {latest.isoformat()}",
+        )
+    except Exception as e:
+        return DependencyHealth(
+            name="price_data",
+            status="unhealthy",
+            latency_ms=-1,
+            message=str(e),
+        )
+
+
 class SiteStats(BaseModel):
     """Public site statistics for the landing page."""
     seekers: int  # User count (fantasy term)
@@ -120,10 +158,7 @@ async def get_site_stats(db: AsyncSession = Depends(get_db)):
     seeker_count = user_result.scalar() or 0
 
     # Count cards in the database (Vault)
-    card_result = await db.execute(
-        select(func.count(Card.id))
-    )
-    card_count = card_result.scalar() or 0
+    card_count = await get_cards_count(db)
 
     # Count verified Trading Posts
     trading_post_result = await db.execute(
@@ -148,7 +183,8 @@ async def detailed_health_check(
     """
     Detailed health check for monitoring dashboards.
 
-    Checks all dependencies (database, Redis) in parallel and returns:
+    Checks all dependencies (database, Redis) in parallel, then price
+    data freshness from the ingestion watermark, and returns:
     - Overall status: healthy, degraded, or unhealthy
     - Per-dependency latency metrics
     - Application uptime
@@ -165,7 +201,8 @@ async def detailed_health_check(
         _check_redis(redis),
     )
 
-    dependencies = [db_health, redis_health]
+    # Shares the database session, so it cannot run in the gather above
+    dependencies = [db_health, redis_health, await _check_price_data(db)]
 
     # Determine overall status (worst status wins)
     if any(d.status == "unhealthy" for d in dependencies):
@@ -13,7 +13,7 @@ from typing import Optional, List, Dict, Any
 
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select, func, and_, case
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import OperationalError, TimeoutError as SQLTimeoutError, DBAPIError
@@ -23,7 +23,7 @@ from app.core.constants import MAX_SEARCH_LENGTH, MAX_IDS_PER_REQUEST
 from app.core.config import settings
 
 from app.api.deps import CurrentUser
-from app.db.session import get_db
+from app.db.session import get_db, get_replica_db
 from app.models import Card, InventoryItem, InventoryRecommendation, MetricsCardsDaily, PriceSnapshot
 from app.api.utils import interpolate_missing_points
 from pydantic import BaseModel, Field
@@ -44,22 +44,16 @@ from app.schemas.inventory import (
     InventoryTopMoversResponse,
     InventorySummaryResponse,
 )
+from app.services.inventory_export import EXPORT_FORMATS, stream_inventory_export
+from app.services.inventory_index import (
+    RANGE_BUCKETS as INDEX_RANGE_BUCKETS,
+    bucket_minutes_for_span,
+    compute_inventory_index,
+    load_inventory_index,
+)
 from app.services.pricing.valuation import InventoryValuator
 
 
-def map_condition_to_cardtrader(condition: str) -> str:
-    """Map our condition values to CardTrader format."""
-    condition_map = {
-        "MINT": "Near Mint",
-        "NEAR_MINT": "Near Mint",
-        "LIGHTLY_PLAYED": "Lightly Played",
-        "MODERATELY_PLAYED": "Moderately Played",
-        "HEAVILY_PLAYED": "Heavily Played",
-        "DAMAGED": "Damaged",
-    }
-    return condition_map.get(condition, "Near Mint")
-
-
 # Note: interpolate_missing_points has been moved to app.api.utils.interpolation
 
 
@@ -524,7 +518,7 @@ async def get_inventory(
 @router.get("/analytics", response_model=InventoryAnalytics)
 async def get_inventory_analytics(
     current_user: CurrentUser,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_replica_db),
 ):
     """
     Get comprehensive analytics for the current user's inventory.
@@ -839,297 +833,94 @@ async def get_inventory_market_index(
         description="USD-only mode; EUR charts are no longer supported",
     ),
     is_foil: Optional[str] = Query(None, description="Filter by foil pricing. 'true' uses price_foil, 'false' excludes foil prices, None uses regular prices."),
+    start_date: Optional[datetime] = Query(None, description="Custom range start (overrides range)"),
+    end_date: Optional[datetime] = Query(None, description="Custom range end (defaults to now)"),
     db: AsyncSession = Depends(get_db),
 ):
+    """
+    Get market index data for the current user's inventory items.
+
+    Standard ranges are served from the precomputed per-user series
+    maintained by the pricing refresh tasks; custom ranges (start_date /
+    end_date) are computed from price snapshots on the fly.
+
+    Args:
+        range: Time range (7d, 30d, 90d, 1y)
+        currency: USD only
+        separate_currencies: Disabled; present for backward compatibility only
+        start_date: Custom range start
+        end_date: Custom range end
+    """
     if separate_currencies:
         raise HTTPException(
             status_code=400,
             detail="Only USD currency is supported for inventory charts.",
         )
-    currency = "USD"
     # Convert string query parameter to boolean
     is_foil_bool: Optional[bool] = None
     if is_foil is not None:
         is_foil_bool = is_foil.lower() in ('true', '1', 'yes')
-    """
-    Get market index data for the current user's inventory items.
-    
-    Calculates a weighted index based on the user's inventory items' price history.
-    
-    Args:
-        range: Time range (7d, 30d, 90d, 1y)
-        currency: USD only
-        separate_currencies: Disabled; present for backward compatibility only
-    """
+
     # Determine date range and bucket size
     now = datetime.now(timezone.utc)
-    if range == "7d":
-        start_date = now - timedelta(days=7)
-        bucket_minutes = 30
-    elif range == "30d":
-        start_date = now - timedelta(days=30)
-        bucket_minutes = 60
-    elif range == "90d":
-        start_date = now - timedelta(days=90)
-        bucket_minutes = 240
-    else:  # 1y
-        start_date = now - timedelta(days=365)
-        bucket_minutes = 1440
-    
-    end_date = now
-    
-    try:
-        # Get user's inventory items with their card IDs
-        inventory_query = select(InventoryItem.card_id, InventoryItem.quantity).where(
-            InventoryItem.user_id == current_user.id
-        )
-        inventory_result = await db.execute(inventory_query)
-        inventory_items = inventory_result.all()
-        
-        if not inventory_items:
-            # Return empty data if no inventory
-            return {
-                "range": range,
-                "currency": "USD",
-                "points": [],
-                "isMockData": False,
-            }
-        
-        # Get unique card IDs and create a quantity map
-        card_ids = [item.card_id for item in inventory_items]
-        quantity_map = {item.card_id: item.quantity for item in inventory_items}
-        
-        # Get time-bucketed average prices from price snapshots for inventory cards
-        bucket_seconds = bucket_minutes * 60
-        bucket_expr = func.to_timestamp(
-            func.floor(func.extract('epoch', PriceSnapshot.time) / bucket_seconds) * bucket_seconds
-        )
-        
-        # Determine which price field to use based on foil filter
-        if is_foil_bool is True:
-            # Use foil prices only
-            price_field = PriceSnapshot.price_market
-            price_condition = PriceSnapshot.price_market.isnot(None)
-        elif is_foil_bool is False:
-            # Exclude foil prices (only non-foil)
-            price_field = PriceSnapshot.price
-            price_condition = PriceSnapshot.price_market.is_(None)
-        else:
-            # Default: use regular prices
-            price_field = PriceSnapshot.price
-            price_condition = PriceSnapshot.price.isnot(None)
-        
-        # Build query conditions
-        query_conditions = [
-            PriceSnapshot.time >= start_date,
-            PriceSnapshot.card_id.in_(card_ids),
-            price_condition,
-            price_field > 0,
-            PriceSnapshot.currency == "USD",
-        ]
-        
-        query = select(
-            bucket_expr.label("bucket_time"),
-            PriceSnapshot.card_id,
-            func.avg(price_field).label("avg_price"),
-        ).where(
-            and_(*query_conditions)
-        )
-        
-        query = query.group_by(
-            bucket_expr,
-            PriceSnapshot.card_id
-        ).order_by(
-            bucket_expr
-        )
-        
-        result = await asyncio.wait_for(
-            db.execute(query),
-            timeout=settings.db_query_timeout
-        )
-        rows = result.all()
+    if start_date is not None:
+        if start_date.tzinfo is None:
+            start_date = start_date.replace(tzinfo=timezone.utc)
+        end_date = end_date or now
+        if end_date.tzinfo is None:
+            end_date = end_date.replace(tzinfo=timezone.utc)
+        if start_date >= end_date:
+            raise HTTPException(status_code=400, detail="start_date must be before end_date")
+        range = "custom"
+        bucket_minutes = bucket_minutes_for_span(end_date - start_date)
+    else:
+        days, bucket_minutes = INDEX_RANGE_BUCKETS[range]
+        start_date = now - timedelta(days=days)
+        end_date = now
+
+    empty_response = {
+        "range": range,
+        "currency": "USD",
+        "points": [],
+        "isMockData": False,
+    }
 
-        # Log diagnostic info
-        logger.info(
-            "Inventory market index query results",
-            range=range,
-            currency="USD",
-            card_ids_count=len(card_ids),
-            rows_returned=len(rows),
-            start_date=start_date.isoformat(),
-            end_date=end_date.isoformat(),
-        )
-        
-        # Group by time bucket and calculate weighted average
-        bucket_data = {}
-        for row in rows:
-            bucket_time = row.bucket_time
-            if isinstance(bucket_time, datetime):
-                timestamp_str = bucket_time.isoformat()
-            else:
-                timestamp_str = str(bucket_time)
-            
-            if timestamp_str not in bucket_data:
-                bucket_data[timestamp_str] = {"total_value": 0.0, "total_quantity": 0}
-            
-            quantity = quantity_map.get(row.card_id, 1)
-            value = float(row.avg_price) * quantity
-            bucket_data[timestamp_str]["total_value"] += value
-            bucket_data[timestamp_str]["total_quantity"] += quantity
-        
-        # Convert to points and normalize to base 100 using improved base point calculation
-        points = []
-        
-        # Calculate weighted averages for all buckets first
-        weighted_averages = []
-        for timestamp_str in sorted(bucket_data.keys()):
-            data = bucket_data[timestamp_str]
-            if data["total_quantity"] > 0:
-                avg_value = data["total_value"] / data["total_quantity"]
-                weighted_averages.append((timestamp_str, avg_value))
-        
-        if not weighted_averages:
-            # No data available
-            return {
-                "range": range,
-                "currency": "USD",
-                "points": [],
-                "isMockData": False,
-            }
-        
-        # For inventory index, use the first point as base value for consistency
-        # Inventory weighted averages can vary dramatically if composition changes,
-        # so using a fixed reference point (first point) is more reliable
-        base_value = weighted_averages[0][1] if weighted_averages else 100.0
-        
-        # Validate base value is reasonable
-        if not base_value or base_value <= 0:
-            logger.warning(
-                "Base value is invalid in inventory index, using fallback",
-                range=range,
-                currency=currency,
-                base_value=base_value
+    try:
+        series = None
+        if range != "custom":
+            series = await asyncio.wait_for(
+                load_inventory_index(db, current_user.id, range, is_foil_bool, now),
+                timeout=settings.db_query_timeout,
             )
-            base_value = 100.0  # Fallback to prevent division by zero
-        
-        # Calculate all index values and check for outliers before adding to points
-        # This helps identify if there are data quality issues
-        max_reasonable_index = 1000.0  # Cap at 1000% (10x) to prevent extreme values
-        min_reasonable_index = 0.1  # Cap at 0.1% (100x decrease) to prevent extreme values
-        
-        for timestamp_str, avg_value in weighted_averages:
-            # Normalize to base 100
-            if base_value > 0:
-                index_value = (avg_value / base_value) * 100.0
-            else:
-                index_value = 100.0
-            
-            # Validate index value is within reasonable bounds
-            if index_value > max_reasonable_index or index_value < min_reasonable_index:
-                logger.warning(
-                    "Suspicious index value detected in inventory index, capping to reasonable range",
-                    value=index_value,
-                    avg_value=avg_value,
-                    base_value=base_value,
-                    timestamp=timestamp_str,
-                    range=range,
-                    currency=currency
-                )
-                # Cap the value instead of skipping it
-                index_value = max(min_reasonable_index, min(max_reasonable_index, index_value))
-            
-            points.append({
-                "timestamp": timestamp_str,
-                "indexValue": round(index_value, 2),
-            })
-        
-        if not points:
-            # Log diagnostic info when no data found
-            total_snapshots = await db.scalar(
-                select(func.count(PriceSnapshot.time))
-            ) or 0
-            
-            # Check for snapshots with proper conditions
-            recent_snapshot_conditions = [
-                PriceSnapshot.time >= start_date,
-            ]
-            if card_ids:
-                recent_snapshot_conditions.append(PriceSnapshot.card_id.in_(card_ids))
-            if currency:
-                recent_snapshot_conditions.append(PriceSnapshot.currency == currency)
-            
-            recent_snapshots = await db.scalar(
-                select(func.count(PriceSnapshot.time)).where(
-                    and_(*recent_snapshot_conditions) if recent_snapshot_conditions else True
-                )
-            ) or 0
-            
-            # Also check snapshots for these cards regardless of date
-            all_card_snapshots = await db.scalar(
-                select(func.count(PriceSnapshot.time)).where(
-                    PriceSnapshot.card_id.in_(card_ids) if card_ids else True
-                )
-            ) or 0
-            
-            logger.warning(
+        if series is None:
+            # Custom range, or nothing precomputed for this user yet
+            series = await asyncio.wait_for(
+                compute_inventory_index(
+                    db, current_user.id, start_date, end_date, bucket_minutes, is_foil_bool
+                ),
+                timeout=settings.db_query_timeout,
+            )
+
+        if not series.points:
+            logger.info(
                 "No inventory market index data found",
                 range=range,
-                currency="USD",
                 is_foil=is_foil_bool,
-                inventory_card_count=len(card_ids) if card_ids else 0,
-                total_snapshots_in_db=total_snapshots,
-                recent_snapshots_in_range=recent_snapshots,
-                all_card_snapshots=all_card_snapshots,
                 start_date=start_date.isoformat(),
                 end_date=end_date.isoformat(),
-                card_ids_sample=card_ids[:5] if card_ids else [],
             )
-            
-            # Return empty data if no points
-            return {
-                "range": range,
-                "currency": "USD",
-                "points": [],
-                "isMockData": False,
-            }
-        
+            return empty_response
+
         # Apply interpolation to fill gaps
-        points = interpolate_missing_points(points, start_date, end_date, bucket_minutes)
-        
-        # Calculate data freshness - find the most recent snapshot timestamp for inventory cards
-        # Determine which price field to use based on foil filter
-        if is_foil_bool is True:
-            freshness_price_field = PriceSnapshot.price_market
-            freshness_price_condition = PriceSnapshot.price_market.isnot(None)
-        elif is_foil_bool is False:
-            freshness_price_field = PriceSnapshot.price
-            freshness_price_condition = PriceSnapshot.price_market.is_(None)
-        else:
-            freshness_price_field = PriceSnapshot.price
-            freshness_price_condition = PriceSnapshot.price.isnot(None)
-        
-        latest_snapshot_conditions = [
-            PriceSnapshot.time >= start_date,
-            PriceSnapshot.card_id.in_(card_ids),
-            freshness_price_condition,
-            freshness_price_field > 0,
-        ]
-        if currency:
-            latest_snapshot_conditions.append(PriceSnapshot.currency == currency)
-        
-        latest_snapshot_query = select(
-            func.max(PriceSnapshot.time)
-        ).where(
-            and_(*latest_snapshot_conditions)
-        )
-        latest_snapshot_time = await db.scalar(latest_snapshot_query)
-        
+        points = interpolate_missing_points(series.points, start_date, end_date, bucket_minutes)
+
         # Calculate freshness in minutes
+        latest_snapshot_time = series.latest_snapshot_at
         data_freshness_minutes = None
         if latest_snapshot_time:
             age_delta = now - latest_snapshot_time
             data_freshness_minutes = int(age_delta.total_seconds() / 60)
-        
+
         return {
             "range": range,
             "currency": "USD",
@@ -1138,7 +929,7 @@ async def get_inventory_market_index(
             "data_freshness_minutes": data_freshness_minutes,
             "latest_snapshot_time": latest_snapshot_time.isoformat() if latest_snapshot_time else None,
         }
-        
+
     except (asyncio.TimeoutError, OperationalError, SQLTimeoutError, DBAPIError) as e:
         logger.warning(
             "Database error fetching inventory market index",
@@ -1147,12 +938,7 @@ async def get_inventory_market_index(
             range=range,
         )
         # Return empty data on database errors (handled gracefully)
-        return {
-            "range": range,
-            "currency": "USD",
-            "points": [],
-            "isMockData": False,
-        }
+        return empty_response
     except Exception as e:
         logger.error("Unexpected error fetching inventory market index", error=str(e), error_type=type(e).__name__, range=range)
         # For unexpected errors, re-raise to get proper HTTP error response
@@ -1466,103 +1252,31 @@ async def get_inventory_top_movers(
 async def export_inventory(
     current_user: CurrentUser,
     format: str = Query("csv", regex="^(csv|txt|cardtrader)$"),
-    db: AsyncSession = Depends(get_db),
+    gzip: bool = Query(False, description="Gzip-compress the export"),
 ):
     """
     Export user's inventory to CSV, plain text, or CardTrader format.
-    
+
+    The export is streamed from a server-side cursor in chunks, so memory
+    stays flat and the first bytes arrive immediately regardless of
+    collection size.
+
     Args:
         format: Export format - 'csv', 'txt', or 'cardtrader'
+        gzip: Return a .gz file instead of plain text
     """
-    query = select(InventoryItem, Card).join(
-        Card, InventoryItem.card_id == Card.id
-    ).where(InventoryItem.user_id == current_user.id).order_by(Card.name)
-    
-    result = await db.execute(query)
-    items = result.all()
-    
-    if format == "cardtrader":
-        # CardTrader format: CSV with specific columns
-        # Required: name, expansion_code (minimum)
-        # Optional: quantity, language, condition, price_cents, foil
-        output = io.StringIO()
-        writer = csv.writer(output, quoting=csv.QUOTE_MINIMAL)
-        
-        # Header row with column names (CardTrader compatible)
-        writer.writerow([
-            "name",
-            "expansion_code",
-            "quantity",
-            "language",
-            "condition",
-            "foil",
-            "price_cents"
-        ])
-        
-        for item, card in items:
-            # Map condition to CardTrader format
-            cardtrader_condition = map_condition_to_cardtrader(item.condition)
-            
-            # Use current_value if available, otherwise acquisition_price, convert to cents
-            price_value = None
-            if item.current_value:
-                price_value = int(float(item.current_value) * 100)
-            elif item.acquisition_price:
-                price_value = int(float(item.acquisition_price) * 100)
-            
-            # Write the row
-            writer.writerow([
-                card.name,
-                card.set_code,
-                item.quantity,
-                item.language or "English",
-                cardtrader_condition,
-                "true" if item.is_foil else "false",
-                price_value if price_value else "",
-            ])
-        
-        return Response(
-            content=output.getvalue(),
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=inventory_cardtrader.csv"}
-        )
-    elif format == "csv":
-        output = io.StringIO()
-        # Use quoting to handle special characters in card names
-        writer = csv.writer(output, quoting=csv.QUOTE_MINIMAL)
-        writer.writerow([
-            "Card Name", "Set", "Quantity", "Condition", "Foil", 
-            "Language", "Acquisition Price", "Current Value", "Profit/Loss"
-        ])
-        for item, card in items:
-            writer.writerow([
-                card.name, 
-                card.set_code, 
-                item.quantity, 
-                item.condition,
-                "Yes" if item.is_foil else "No", 
-                item.language or "",
-                item.acquisition_price if item.acquisition_price else "",
-                item.current_value if item.current_value else "",
-                item.profit_loss if item.profit_loss else ""
-            ])
-        return Response(
-            content=output.getvalue(),
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=inventory.csv"}
-        )
-    else:  # txt
-        lines = []
-        for item, card in items:
-            foil_text = " FOIL" if item.is_foil else ""
-            lines.append(
-                f"{item.quantity}x {card.name} [{card.set_code}]{foil_text} {item.condition}"
-            )
-        return Response(
-            content="\n".join(lines),
-            media_type="text/plain",
-            headers={"Content-Disposition": "attachment; filename=inventory.txt"}
-        )
+    export_format = EXPORT_FORMATS[format]
+    filename = export_format.filename
+    media_type = export_format.media_type
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        stream_inventory_export(current_user.id, format, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
 
 
 @router.get("/{item_id}", response_model=InventoryItemResponse)
@@ -13,8 +13,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import OperationalError, TimeoutError as SQLTimeoutError
 
 from app.api.deps import Cache
+from app.api.utils.http_cache import cache_response
 from app.core.config import settings
-from app.db.session import get_db
+from app.core.data_freshness import METRICS_WATERMARK, PRICE_SNAPSHOTS_WATERMARK
+from app.db.session import get_db, get_replica_db
 from app.models import (
     Card,
     MetricsCardsDaily,
@@ -33,6 +35,9 @@ from app.api.utils import (
 router = APIRouter()
 logger = structlog.get_logger()
 
+# Public market responses are reused until new prices or metrics land
+MARKET_DATA = (PRICE_SNAPSHOTS_WATERMARK, METRICS_WATERMARK)
+
 # Query timeout in seconds (from centralized config)
 QUERY_TIMEOUT = settings.db_query_timeout
 
@@ -179,8 +184,9 @@ async def get_market_diagnostics(
 
 
 @router.get("/overview")
+@cache_response(*MARKET_DATA)
 async def get_market_overview(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_replica_db),
     cache: Cache = None,
 ):
     """
@@ -458,6 +464,7 @@ async def _get_currency_index(
 
 
 @router.get("/index")
+@cache_response(*MARKET_DATA)
 async def get_market_index(
     range: str = Query("7d", regex="^(7d|30d|90d|1y)$"),
     currency: str = Query("USD", regex="^USD$", description="Only USD is supported"),
@@ -466,7 +473,7 @@ async def get_market_index(
         description="USD-only mode; EUR charts are no longer supported",
     ),
     is_foil: Optional[str] = Query(None, description="Filter by foil pricing. 'true' uses price_foil, 'false' excludes foil prices, None uses regular prices."),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_replica_db),
 ):
     """
     Get market index data for charting using time-bucketed price snapshots.
@@ -856,10 +863,11 @@ MAX_CANDIDATE_POOL = 10000
 
 
 @router.get("/top-movers")
+@cache_response(*MARKET_DATA)
 async def get_top_movers(
     window: str = Query("24h", regex="^(24h|7d)$"),
     limit: int = Query(10, ge=1, le=MAX_TOP_MOVERS_LIMIT, description="Number of results per category (max 50)"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_replica_db),
 ):
     """
     Get top gaining and losing cards.
@@ -1073,9 +1081,10 @@ async def get_top_movers(
 
 
 @router.get("/volume-by-format")
+@cache_response(*MARKET_DATA)
 async def get_volume_by_format(
     days: int = Query(30, ge=7, le=365),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_replica_db),
 ):
     """
     Get trading volume grouped by format over time using time-bucketed price snapshots.
@@ -1209,9 +1218,10 @@ async def get_volume_by_format(
 
 
 @router.get("/color-distribution")
+@cache_response(*MARKET_DATA)
 async def get_color_distribution(
     window: str = Query("7d", regex="^(7d|30d)$"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_replica_db),
 ):
     """
     Get color distribution based on cards in our database.
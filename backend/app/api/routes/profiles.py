@@ -3,7 +3,7 @@ Profile API endpoints.
 """
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import Response
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -20,13 +20,22 @@ from app.schemas.profile import (
     SignatureCardResponse,
 )
 from app.core.hashids import encode_id, decode_id
-from app.services.profile_card_generator import ProfileCardGenerator
+from app.services.profile_card_generator import ProfileCardFields, ProfileCardGenerator
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
 # Cooldown period for card_type changes (30 days)
 CARD_TYPE_CHANGE_COOLDOWN_DAYS = 30
 
+# Profile card PNGs: public cards may be cached by browsers/CDNs for an hour
+# (then revalidated by ETag); the owner's card always revalidates so edits
+# show up immediately.
+PUBLIC_CARD_CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
+OWN_CARD_CACHE_CONTROL = "private, no-cache"
+
+# Shared so fonts and frame backgrounds are built once per process
+_card_generator = ProfileCardGenerator()
+
 
 def _build_signature_card_response(card: Card | None) -> SignatureCardResponse | None:
     """Build SignatureCardResponse from Card model."""
@@ -186,6 +195,7 @@ async def update_my_profile(
 
 @router.get("/me/card.png")
 async def get_my_profile_card(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -194,48 +204,77 @@ async def get_my_profile_card(
 
     Returns the image directly with Content-Type: image/png.
     The card displays user information in a trading card format.
+    Supports conditional GET via ETag / If-None-Match.
+    """
+    return await _profile_card_response(request, db, current_user, OWN_CARD_CACHE_CONTROL)
+
+
+async def _get_trade_count(db: AsyncSession, user_id: int) -> int:
+    """Count cards available for trade for a user."""
+    result = await db.scalar(
+        select(func.count())
+        .select_from(InventoryItem)
+        .where(InventoryItem.user_id == user_id)
+        .where(InventoryItem.available_for_trade == True)
+    )
+    return result or 0
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against an ETag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+async def _profile_card_response(
+    request: Request,
+    db: AsyncSession,
+    user: User,
+    cache_control: str,
+) -> Response:
+    """
+    Serve a user's profile card PNG.
+
+    The ETag is the content hash of the fields drawn on the card, so a
+    matching If-None-Match gets a 304 without touching the image, and the
+    card is only re-rendered after one of those fields changes.
     """
     # Get cards for trade count
-    trade_count = await _get_trade_count(db, current_user.id)
+    trade_count = await _get_trade_count(db, user.id)
 
     # Get signature card name if set
     signature_card_name = None
-    if current_user.signature_card:
-        signature_card_name = current_user.signature_card.name
+    if user.signature_card:
+        signature_card_name = user.signature_card.name
 
     # Format member since date
-    member_since = current_user.created_at.strftime("%b %Y") if current_user.created_at else None
+    member_since = user.created_at.strftime("%b %Y") if user.created_at else None
 
-    generator = ProfileCardGenerator()
-    png_bytes = await generator.generate(
-        display_name=current_user.display_name,
-        username=current_user.username,
-        frame_tier=current_user.active_frame_tier or "bronze",
-        tagline=current_user.tagline,
-        card_type=current_user.card_type,
+    fields = ProfileCardFields(
+        display_name=user.display_name,
+        username=user.username,
+        frame_tier=user.active_frame_tier or "bronze",
+        tagline=user.tagline,
+        card_type=user.card_type,
         cards_for_trade=trade_count,
         signature_card_name=signature_card_name,
         member_since=member_since,
     )
+    etag = f'"{fields.content_hash}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Content-Disposition": f'inline; filename="{user.username}-card.png"',
+    }
 
-    return Response(
-        content=png_bytes,
-        media_type="image/png",
-        headers={
-            "Content-Disposition": f'inline; filename="{current_user.username}-card.png"'
-        },
-    )
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
 
-
-async def _get_trade_count(db: AsyncSession, user_id: int) -> int:
-    """Count cards available for trade for a user."""
-    result = await db.scalar(
-        select(func.count())
-        .select_from(InventoryItem)
-        .where(InventoryItem.user_id == user_id)
-        .where(InventoryItem.available_for_trade == True)
-    )
-    return result or 0
+    png_bytes = await _card_generator.get_or_render(user.id, fields)
+    return Response(content=png_bytes, media_type="image/png", headers=headers)
 
 
 def _build_public_profile_response(
@@ -273,6 +312,7 @@ def _build_public_profile_response(
 @router.get("/public/{hashid}/card.png")
 async def get_public_profile_card(
     hashid: str,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -280,6 +320,7 @@ async def get_public_profile_card(
 
     Returns the image directly with Content-Type: image/png.
     Anyone can access this endpoint with a valid hashid.
+    Supports conditional GET via ETag / If-None-Match.
     """
     user_id = decode_id(hashid)
     if user_id is None:
@@ -291,36 +332,7 @@ async def get_public_profile_card(
     if not user or not user.is_active:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Get cards for trade count
-    trade_count = await _get_trade_count(db, user.id)
-
-    # Get signature card name if set
-    signature_card_name = None
-    if user.signature_card:
-        signature_card_name = user.signature_card.name
-
-    # Format member since date
-    member_since = user.created_at.strftime("%b %Y") if user.created_at else None
-
-    generator = ProfileCardGenerator()
-    png_bytes = await generator.generate(
-        display_name=user.display_name,
-        username=user.username,
-        frame_tier=user.active_frame_tier or "bronze",
-        tagline=user.tagline,
-        card_type=user.card_type,
-        cards_for_trade=trade_count,
-        signature_card_name=signature_card_name,
-        member_since=member_since,
-    )
-
-    return Response(
-        content=png_bytes,
-        media_type="image/png",
-        headers={
-            "Content-Disposition": f'inline; filename="{user.username}-card.png"'
-        },
-    )
+    return await _profile_card_response(request, db, user, PUBLIC_CARD_CACHE_CONTROL)
 
 
 @router.get("/public/{hashid}", response_model=PublicProfileResponse)
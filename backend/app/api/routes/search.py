@@ -22,7 +22,9 @@ from app.schemas.search import (
 from app.services.search import (
     SemanticSearchService,
     AutocompleteService,
-    apply_card_filters,
+    build_search_query,
+    count_results,
+    order_by_relevance,
 )
 
 router = APIRouter()
@@ -66,10 +68,13 @@ async def search_cards(
     """
     Search for cards using semantic similarity or text matching.
 
-    Semantic mode uses AI embeddings to find cards by meaning.
-    Text mode uses traditional ILIKE matching on card name.
+    Semantic mode uses AI embeddings to find cards by meaning, with
+    attribute filters applied before similarity scoring.
+    Text mode uses ranked trigram and full-text matching on name, type
+    line and oracle text.
     """
     offset = (page - 1) * page_size
+    total_is_estimate = False
 
     # Parse color filter
     color_list = colors.split(",") if colors else None
@@ -86,25 +91,19 @@ async def search_cards(
     # Wildcard '*' means "browse all" - always use text mode for proper pagination
     if q == "*":
         mode = "text"
-        q = ""  # Empty string for ILIKE will match all
+        q = ""  # Empty query matches all cards
 
     if mode == "semantic":
         service = get_semantic_service()
-        # Get more results than needed for filtering
-        raw_results = await service.search(
+        # Filters narrow the candidates before scoring, so pages are full
+        paginated, total = await service.search_page(
             db=db,
             query=q,
-            limit=page_size * 3,  # Get extra for filtering
-            offset=0,
+            limit=page_size,
+            offset=offset,
+            filters=filters,
         )
 
-        # Apply filters
-        filtered = apply_card_filters(raw_results, **{k: v for k, v in filters.items() if v})
-
-        # Apply pagination to filtered results
-        paginated = filtered[offset:offset + page_size]
-        total = len(filtered)
-
         results = [
             SearchResult(
                 id=r["card_id"],
@@ -118,10 +117,6 @@ async def search_cards(
             for r in paginated
         ]
     else:
-        # Text search fallback
-        from sqlalchemy import select, func
-        from app.services.search.filters import build_filter_query
-
         # Validate search length
         if len(q) > MAX_SEARCH_LENGTH:
             raise HTTPException(
@@ -129,18 +124,14 @@ async def search_cards(
                 detail=f"Search query too long. Maximum {MAX_SEARCH_LENGTH} characters.",
             )
 
-        # Escape SQL wildcard characters in user input to prevent wildcard abuse
-        q_escaped = q.replace("%", r"\%").replace("_", r"\_")
-
-        query = select(Card).where(Card.name.ilike(f"%{q_escaped}%", escape="\\"))
-        query = build_filter_query(query, filters)
+        # Ranked text search with every filter in SQL
+        query = build_search_query(q, filters)
 
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await db.scalar(count_query) or 0
+        # Planner estimate for broad queries (e.g. browsing with '*')
+        total, total_is_estimate = await count_results(db, query)
 
         # Apply pagination
-        query = query.order_by(Card.name).offset(offset).limit(page_size)
+        query = order_by_relevance(query, q).offset(offset).limit(page_size)
         result = await db.execute(query)
         cards = result.scalars().all()
 
@@ -164,6 +155,7 @@ async def search_cards(
         has_more=(page * page_size) < total,
         query=q,
         search_type=mode,
+        total_is_estimate=total_is_estimate,
     )
 
 
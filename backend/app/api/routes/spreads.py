@@ -13,8 +13,9 @@ from sqlalchemy import select, text, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import OperationalError, TimeoutError as SQLTimeoutError, DBAPIError
 
-from app.db.session import get_db
+from app.db.session import get_replica_db
 from app.models import Card, PriceSnapshot, Marketplace, BuylistSnapshot
+from app.services.pricing.spread_engine import get_spread_matrix
 
 router = APIRouter(prefix="/spreads", tags=["spreads"])
 logger = structlog.get_logger(__name__)
@@ -67,7 +68,7 @@ async def get_best_buylist_opportunities(
     min_spread_pct: float = Query(default=10.0, description="Minimum spread percentage"),
     min_price: float = Query(default=1.0, description="Minimum retail price to consider"),
     vendor: Optional[str] = Query(None, description="Filter by vendor (cardkingdom, etc.)"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_replica_db),
 ):
     """
     Find cards with the best buylist-to-retail spreads.
@@ -192,7 +193,7 @@ async def get_best_selling_opportunities(
     limit: int = Query(default=20, le=100),
     max_spread_pct: float = Query(default=50.0, description="Maximum spread percentage (lower = better for selling)"),
     min_buylist: float = Query(default=1.0, description="Minimum buylist price"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_replica_db),
 ):
     """
     Find cards where buylist prices are closest to retail (best for selling).
@@ -303,104 +304,51 @@ async def get_arbitrage_opportunities(
     limit: int = Query(default=20, le=100),
     min_profit_pct: float = Query(default=15.0, description="Minimum profit percentage"),
     min_profit: float = Query(default=1.0, description="Minimum absolute profit in USD"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_replica_db),
 ):
     """
     Find cross-marketplace arbitrage opportunities.
 
     Returns cards where the price difference between marketplaces
     is large enough to potentially profit from buying low and selling high.
+    Each card's best pair comes from the shared spread matrix of latest
+    near-mint USD prices (see app.services.pricing.spread_engine).
 
     Note: Does not account for fees, shipping, or transaction costs.
     """
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=48)
-
-    # Get latest prices grouped by card and marketplace
-    latest_prices_subq = (
-        select(
-            PriceSnapshot.card_id,
-            PriceSnapshot.marketplace_id,
-            func.max(PriceSnapshot.time).label("latest_time"),
-        )
-        .where(PriceSnapshot.time >= cutoff)
-        .group_by(PriceSnapshot.card_id, PriceSnapshot.marketplace_id)
-        .subquery()
+    matrix = await get_spread_matrix(db, "USD")
+    spreads = matrix.opportunities(
+        min_profit=min_profit,
+        min_profit_pct=min_profit_pct / 100,
+        limit=limit,
     )
 
-    # Get full price data for latest snapshots
-    prices_query = (
-        select(
-            Card.id.label("card_id"),
-            Card.name.label("card_name"),
-            Card.set_code,
-            Card.image_url_small.label("image_url"),
-            PriceSnapshot.marketplace_id,
-            Marketplace.name.label("marketplace_name"),
-            PriceSnapshot.price,
+    cards = {}
+    if spreads:
+        cards_result = await db.execute(
+            select(Card.id, Card.name, Card.set_code, Card.image_url_small)
+            .where(Card.id.in_([s.card_id for s in spreads]))
         )
-        .join(latest_prices_subq, Card.id == latest_prices_subq.c.card_id)
-        .join(
-            PriceSnapshot,
-            (PriceSnapshot.card_id == latest_prices_subq.c.card_id) &
-            (PriceSnapshot.marketplace_id == latest_prices_subq.c.marketplace_id) &
-            (PriceSnapshot.time == latest_prices_subq.c.latest_time)
+        cards = {row.id: row for row in cards_result.all()}
+    marketplaces_result = await db.execute(select(Marketplace.id, Marketplace.name))
+    marketplaces = {row.id: row.name for row in marketplaces_result.all()}
+
+    opportunities = [
+        ArbitrageOpportunity(
+            card_id=spread.card_id,
+            card_name=card.name,
+            set_code=card.set_code,
+            image_url=card.image_url_small,
+            buy_marketplace=marketplaces.get(spread.buy_marketplace_id, "Unknown"),
+            buy_price=spread.buy_price,
+            sell_marketplace=marketplaces.get(spread.sell_marketplace_id, "Unknown"),
+            sell_price=spread.sell_price,
+            profit=spread.profit,
+            profit_pct=spread.profit_pct * 100,
         )
-        .join(Marketplace, PriceSnapshot.marketplace_id == Marketplace.id)
-        .where(PriceSnapshot.price > 0)
-    )
-
-    result = await db.execute(prices_query)
-    rows = result.all()
-
-    # Group prices by card
-    card_prices: dict[int, list] = {}
-    for row in rows:
-        if row.card_id not in card_prices:
-            card_prices[row.card_id] = []
-        card_prices[row.card_id].append({
-            "card_name": row.card_name,
-            "set_code": row.set_code,
-            "image_url": row.image_url,
-            "marketplace_id": row.marketplace_id,
-            "marketplace_name": row.marketplace_name,
-            "price": float(row.price),
-        })
-
-    # Find arbitrage opportunities
-    opportunities = []
-    for card_id, prices in card_prices.items():
-        if len(prices) < 2:
-            continue
-
-        # Find min and max prices
-        min_price_data = min(prices, key=lambda x: x["price"])
-        max_price_data = max(prices, key=lambda x: x["price"])
-
-        if min_price_data["marketplace_id"] == max_price_data["marketplace_id"]:
-            continue
-
-        profit = max_price_data["price"] - min_price_data["price"]
-        profit_pct = (profit / min_price_data["price"]) * 100
-
-        if profit < min_profit or profit_pct < min_profit_pct:
-            continue
-
-        opportunities.append(ArbitrageOpportunity(
-            card_id=card_id,
-            card_name=min_price_data["card_name"],
-            set_code=min_price_data["set_code"],
-            image_url=min_price_data["image_url"],
-            buy_marketplace=min_price_data["marketplace_name"],
-            buy_price=min_price_data["price"],
-            sell_marketplace=max_price_data["marketplace_name"],
-            sell_price=max_price_data["price"],
-            profit=profit,
-            profit_pct=profit_pct,
-        ))
-
-    # Sort by profit (highest first)
-    opportunities.sort(key=lambda x: x.profit, reverse=True)
-    opportunities = opportunities[:limit]
+        for spread in spreads
+        if (card := cards.get(spread.card_id)) is not None
+    ]
 
     return ArbitrageOpportunitiesResponse(
         opportunities=opportunities,
@@ -410,7 +358,7 @@ async def get_arbitrage_opportunities(
 
 @router.get("/market-summary")
 async def get_spread_market_summary(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_replica_db),
 ):
     """
     Get summary statistics for spread analysis.
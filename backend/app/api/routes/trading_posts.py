@@ -10,11 +10,12 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import get_current_user
+from app.api.utils.pagination import decode_cursor, encode_cursor
 from app.db.session import get_db
 from app.models.trading_post import (
     TradingPost,
@@ -23,12 +24,14 @@ from app.models.trading_post import (
     TradeQuoteSubmission,
 )
 from app.models.user import User
+from app.services.geocoding import geocode_postal_code
 from app.schemas.trading_post import (
     TradingPostCreate,
     TradingPostUpdate,
     TradingPostResponse,
     TradingPostPublic,
     TradingPostListResponse,
+    TradingPostRadiusResponse,
     EventCreate,
     EventUpdate,
     EventResponse,
@@ -84,6 +87,8 @@ async def register_trading_post(
         email_verified_at=datetime.now(timezone.utc),
     )
 
+    _apply_geocode(trading_post)
+
     db.add(trading_post)
     await db.commit()
     await db.refresh(trading_post)
@@ -134,6 +139,9 @@ async def update_my_trading_post(
     for field, value in update_data.items():
         setattr(trading_post, field, value)
 
+    if "postal_code" in update_data or "country" in update_data:
+        _apply_geocode(trading_post)
+
     trading_post.updated_at = datetime.now(timezone.utc)
 
     await db.commit()
@@ -192,6 +200,98 @@ async def get_nearby_trading_posts(
     )
 
 
+@router.get("/nearby/radius", response_model=TradingPostRadiusResponse)
+async def get_trading_posts_within_radius(
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Latitude of the search origin"),
+    lng: Optional[float] = Query(None, ge=-180, le=180, description="Longitude of the search origin"),
+    postal_code: Optional[str] = Query(None, max_length=20, description="Postal code to search around (if lat/lng not given)"),
+    country: str = Query("US", max_length=50),
+    radius_km: float = Query(50, gt=0, le=500, description="Search radius in kilometers"),
+    verified_only: bool = Query(True, description="Only show email-verified stores"),
+    cursor: Optional[str] = Query(None, description="Cursor from previous page"),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Find Trading Posts within a radius of a point, nearest first.
+
+    The origin is either an explicit lat/lng or a geocoded postal code.
+    Uses the earthdistance GiST index on store coordinates for the radius
+    filter and keyset pagination on (distance, id), so pages stay indexed
+    regardless of how many stores are registered.
+    """
+    if lat is None or lng is None:
+        coords = geocode_postal_code(postal_code, country) if postal_code else None
+        if coords is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Provide lat and lng, or a known postal code",
+            )
+        lat, lng = coords
+
+    radius_m = radius_km * 1000
+    origin = func.ll_to_earth(lat, lng)
+    location = func.ll_to_earth(TradingPost.latitude, TradingPost.longitude)
+    distance = func.earth_distance(origin, location)
+
+    query = (
+        select(TradingPost, distance.label("distance_m"))
+        .where(TradingPost.latitude.isnot(None))
+        .where(TradingPost.longitude.isnot(None))
+        # earth_box is a bounding cube - uses the index but over-selects at the corners
+        .where(func.earth_box(origin, radius_m).op("@>")(location))
+        .where(distance <= radius_m)
+    )
+
+    if verified_only:
+        query = query.where(TradingPost.email_verified_at.isnot(None))
+
+    if cursor:
+        cursor_data = decode_cursor(cursor)
+        try:
+            cursor_distance = float(cursor_data["v"])
+            cursor_id = int(cursor_data["id"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(
+            or_(
+                distance > cursor_distance,
+                and_(
+                    distance == cursor_distance,
+                    TradingPost.id > cursor_id,
+                ),
+            )
+        )
+
+    query = query.order_by(distance.asc(), TradingPost.id.asc()).limit(limit + 1)
+
+    result = await db.execute(query)
+    rows = result.all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        last_post, last_distance = rows[-1]
+        next_cursor = encode_cursor({"v": last_distance, "id": last_post.id})
+
+    items = []
+    for tp, distance_m in rows:
+        item = _to_public(tp)
+        item.distance_km = round(distance_m / 1000, 2)
+        items.append(item)
+
+    return TradingPostRadiusResponse(
+        items=items,
+        latitude=lat,
+        longitude=lng,
+        radius_km=radius_km,
+        next_cursor=next_cursor,
+        has_more=has_more,
+    )
+
+
 @router.get("/{trading_post_id}", response_model=TradingPostPublic)
 async def get_trading_post(
     trading_post_id: int,
@@ -705,6 +805,8 @@ def _to_response(tp: TradingPost) -> TradingPostResponse:
         state=tp.state,
         country=tp.country,
         postal_code=tp.postal_code,
+        latitude=tp.latitude,
+        longitude=tp.longitude,
         phone=tp.phone,
         website=tp.website,
         hours=tp.hours,
@@ -720,6 +822,12 @@ def _to_response(tp: TradingPost) -> TradingPostResponse:
     )
 
 
+def _apply_geocode(tp: TradingPost) -> None:
+    """Set store coordinates from its postal code (cleared if unknown)."""
+    coords = geocode_postal_code(tp.postal_code, tp.country)
+    tp.latitude, tp.longitude = coords if coords else (None, None)
+
+
 def _to_public(tp: TradingPost) -> TradingPostPublic:
     """Convert TradingPost model to public schema."""
     return TradingPostPublic(
@@ -11,7 +11,7 @@ from sqlalchemy import select, func, and_, case
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.api.deps import CurrentUser
+from app.api.deps import CurrentUser, get_redis
 from app.db.session import get_db
 from app.models import Card, WantListItem, PriceSnapshot
 from app.schemas.want_list import (
@@ -25,11 +25,25 @@ from app.schemas.want_list import (
     WantListItemWithIntelligence,
     WantListIntelligenceResponse,
 )
+from app.services.want_list_alerts import remove_want_list_item, sync_want_list_item
 
 router = APIRouter()
 logger = structlog.get_logger()
 
 
+async def _update_alert_index(item: WantListItem, removed: bool = False) -> None:
+    """Mirror an item change into the write-time alert index (best effort)."""
+    try:
+        redis = await get_redis()
+        if removed:
+            await remove_want_list_item(redis, item)
+        else:
+            await sync_want_list_item(redis, item)
+    except Exception as e:
+        # The periodic want list check rebuilds the index
+        logger.warning("Failed to update want list alert index", item_id=item.id, error=str(e))
+
+
 def _build_item_response(item: WantListItem, current_price: Optional[float] = None) -> WantListItemResponse:
     """Build a WantListItemResponse from a WantListItem model."""
     card_summary = CardSummary(
@@ -259,6 +273,7 @@ async def create_want_list_item(
     db.add(want_item)
     await db.commit()
     await db.refresh(want_item)
+    await _update_alert_index(want_item)
 
     # Load the card relationship for response
     await db.refresh(want_item, ["card"])
@@ -349,6 +364,7 @@ async def update_want_list_item(
 
     await db.commit()
     await db.refresh(item)
+    await _update_alert_index(item)
 
     current_price = await _get_current_price(db, item.card_id)
 
@@ -389,6 +405,7 @@ async def delete_want_list_item(
 
     await db.delete(item)
     await db.commit()
+    await _update_alert_index(item, removed=True)
 
     logger.info(
         "Want list item deleted",
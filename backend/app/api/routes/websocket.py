@@ -11,8 +11,12 @@ for receiving real-time updates on:
 
 Architecture:
 - Clients connect and subscribe to specific channels
-- Redis Pub/Sub bridges messages from Celery workers to WebSocket clients
+- Redis Pub/Sub bridges messages from Celery workers to WebSocket clients;
+  each worker subscribes only to channels its own clients are on
 - JWT authentication for protected channels (inventory, recommendations)
+- Messages are serialized once per broadcast and queued per connection;
+  slow consumers drop old messages and are disconnected if they fall too
+  far behind (see app.services.websocket_fanout)
 """
 import asyncio
 import json
@@ -26,6 +30,12 @@ import structlog
 
 from app.core.config import settings
 from app.models.user import User
+from app.services.websocket_bridge import ChannelBridge
+from app.services.websocket_fanout import (
+    COALESCED_MESSAGE_TYPES,
+    ClientSender,
+    MessageCoalescer,
+)
 
 logger = structlog.get_logger()
 
@@ -38,8 +48,11 @@ class ConnectionManager:
 
     Features:
     - Connection tracking per channel
-    - Redis Pub/Sub integration for cross-worker messaging
+    - Redis Pub/Sub integration for cross-worker messaging, subscribed
+      per channel as local interest changes
     - Automatic cleanup on disconnect
+    - Per-connection send queues with slow-consumer isolation
+    - Coalescing of card update bursts per channel
     """
 
     def __init__(self):
@@ -49,9 +62,15 @@ class ConnectionManager:
         self.subscriptions: dict[WebSocket, set[str]] = defaultdict(set)
         # Map of connection -> user (for authenticated connections)
         self.authenticated: dict[WebSocket, User] = {}
+        # Map of connection -> send queue and writer task
+        self.senders: dict[WebSocket, ClientSender] = {}
+        # Merges bursts of coalescable updates from Redis per channel
+        self._coalescer = MessageCoalescer(self.broadcast)
         # Redis client for pub/sub
         self._redis: Redis | None = None
-        # Background task for Redis subscription
+        # Redis subscriptions for channels with local subscribers
+        self._bridge = ChannelBridge(self.get_redis, self.has_subscribers, self.dispatch)
+        # Background task reading from the bridge
         self._redis_task: asyncio.Task | None = None
         # Lock for thread-safe operations
         self._lock = asyncio.Lock()
@@ -76,8 +95,12 @@ class ConnectionManager:
         """
         await websocket.accept()
 
+        sender = ClientSender(websocket, on_close=self.disconnect)
+        sender.start()
+
         async with self._lock:
             self.subscriptions[websocket] = set()
+            self.senders[websocket] = sender
             if user:
                 self.authenticated[websocket] = user
 
@@ -94,6 +117,12 @@ class ConnectionManager:
         Cleans up all subscriptions and channel memberships.
         """
         async with self._lock:
+            sender = self.senders.pop(websocket, None)
+            if sender is None:
+                # Already cleaned up (e.g. dropped as a slow consumer)
+                return
+            sender.stop()
+
             # Get all channels this connection was subscribed to
             channels = self.subscriptions.pop(websocket, set())
 
@@ -113,6 +142,9 @@ class ConnectionManager:
             channels=list(channels),
         )
 
+        for channel in channels:
+            await self._bridge.sync(channel)
+
     async def subscribe(
         self,
         websocket: WebSocket,
@@ -150,6 +182,8 @@ class ConnectionManager:
             self.channels[channel].add(websocket)
             self.subscriptions[websocket].add(channel)
 
+        await self._bridge.sync(channel)
+
         logger.debug("WebSocket subscribed", channel=channel)
 
         # Send confirmation
@@ -181,6 +215,8 @@ class ConnectionManager:
             if not self.channels[channel]:
                 del self.channels[channel]
 
+        await self._bridge.sync(channel)
+
         logger.debug("WebSocket unsubscribed", channel=channel)
 
         # Send confirmation
@@ -198,38 +234,54 @@ class ConnectionManager:
         """
         Broadcast a message to all subscribers of a channel.
 
+        The message is serialized once and queued for every subscriber;
+        delivery happens concurrently in each connection's writer task.
+
         Args:
             channel: Channel name
             message: Message to broadcast
 
         Returns:
-            Number of connections that received the message
+            Number of connections the message was queued for
         """
-        connections = self.channels.get(channel, set()).copy()
+        connections = self.channels.get(channel)
         if not connections:
             return 0
 
         # Add metadata
         message["channel"] = channel
         message["timestamp"] = datetime.utcnow().isoformat()
+        text = json.dumps(message)
 
-        # Send to all connections
         sent = 0
-        for websocket in connections:
-            try:
-                await self._send(websocket, message)
+        for websocket in list(connections):
+            sender = self.senders.get(websocket)
+            if sender is not None and sender.enqueue(text):
                 sent += 1
-            except Exception as e:
-                logger.warning("Failed to send to WebSocket", error=str(e))
 
         return sent
 
+    async def dispatch(
+        self,
+        channel: str,
+        message: dict[str, Any],
+    ) -> None:
+        """Broadcast a message, coalescing bursts of card updates."""
+        if message.get("type") in COALESCED_MESSAGE_TYPES:
+            self._coalescer.add(channel, message)
+        else:
+            await self.broadcast(channel, message)
+
     async def _send(
         self,
         websocket: WebSocket,
         message: dict[str, Any],
     ) -> None:
-        """Send a message to a WebSocket connection."""
+        """Send a message to a WebSocket connection (via its send queue)."""
+        sender = self.senders.get(websocket)
+        if sender is not None:
+            sender.enqueue(json.dumps(message))
+            return
         try:
             await websocket.send_json(message)
         except Exception as e:
@@ -248,41 +300,21 @@ class ConnectionManager:
             "timestamp": datetime.utcnow().isoformat(),
         })
 
+    def has_subscribers(self, channel: str) -> bool:
+        """Whether any local connection is subscribed to a channel."""
+        return bool(self.channels.get(channel))
+
     async def start_redis_listener(self) -> None:
         """
         Start the Redis Pub/Sub listener.
 
-        Listens for messages on channel:* patterns and broadcasts
-        them to connected WebSocket clients.
+        Reads messages for the channels this worker's clients are
+        subscribed to and broadcasts them to those clients.
         """
         if self._redis_task is not None:
             return
 
-        async def listener():
-            redis = await self.get_redis()
-            pubsub = redis.pubsub()
-
-            # Subscribe to all channel:* patterns
-            await pubsub.psubscribe("channel:*")
-
-            logger.info("Redis Pub/Sub listener started")
-
-            try:
-                async for message in pubsub.listen():
-                    if message["type"] == "pmessage":
-                        channel = message["channel"]
-                        try:
-                            data = json.loads(message["data"])
-                            await self.broadcast(channel, data)
-                        except json.JSONDecodeError:
-                            logger.warning("Invalid JSON from Redis", channel=channel)
-            except asyncio.CancelledError:
-                logger.info("Redis Pub/Sub listener cancelled")
-            finally:
-                await pubsub.punsubscribe("channel:*")
-                await pubsub.close()
-
-        self._redis_task = asyncio.create_task(listener())
+        self._redis_task = asyncio.create_task(self._bridge.run())
 
     async def stop_redis_listener(self) -> None:
         """Stop the Redis Pub/Sub listener."""
@@ -293,10 +325,14 @@ class ConnectionManager:
             except asyncio.CancelledError:
                 pass
             self._redis_task = None
+        await self._bridge.close()
 
     async def close(self) -> None:
         """Close all connections and cleanup resources."""
         await self.stop_redis_listener()
+        self._coalescer.cancel()
+        for sender in self.senders.values():
+            sender.stop()
         if self._redis:
             await self._redis.close()
             self._redis = None
@@ -2,6 +2,7 @@
 Shared utility functions for API routes.
 """
 from app.api.utils.interpolation import interpolate_missing_points
+from app.api.utils.downsampling import lttb_indices
 from app.api.utils.error_handling import (
     handle_database_query,
     is_database_connection_error,
@@ -33,6 +34,7 @@ from app.api.utils.pagination import (
 
 __all__ = [
     "interpolate_missing_points",
+    "lttb_indices",
     "handle_database_query",
     "is_database_connection_error",
     "get_empty_market_overview_response",
@@ -0,0 +1,51 @@
+"""
+Time-series downsampling utilities for chart endpoints.
+"""
+from typing import Sequence
+
+import numpy as np
+
+
+def lttb_indices(x: Sequence[float], y: Sequence[float], threshold: int) -> np.ndarray:
+    """
+    Pick the points to keep with Largest-Triangle-Three-Buckets.
+
+    LTTB keeps the first and last points and, for each of threshold - 2
+    equal-width buckets in between, the point forming the largest
+    triangle with the previously kept point and the average of the next
+    bucket. Peaks and troughs survive, so a downsampled chart keeps its
+    visual shape.
+
+    Args:
+        x: Monotonically increasing x values (e.g. epoch seconds)
+        y: Values at each x
+        threshold: Number of points to keep
+
+    Returns:
+        Sorted indices of the points to keep. All indices are returned
+        when there are no more points than the threshold.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    xs = np.asarray(x, dtype=np.float64)
+    ys = np.asarray(y, dtype=np.float64)
+    # Bucket edges for the n - 2 interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xs[next_start:next_end].mean()
+        avg_y = ys[next_start:next_end].mean()
+
+        bx, by = xs[start:end], ys[start:end]
+        area = np.abs((xs[a] - avg_x) * (by - ys[a]) - (xs[a] - bx) * (avg_y - ys[a]))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+
+    return kept
@@ -0,0 +1,133 @@
+"""
+Response caching policy for public, data-driven endpoints.
+
+Routes opt in with @cache_response, naming the data watermarks their
+output depends on (see app.core.data_freshness). HttpCacheMiddleware
+then caches their 200 responses in Redis keyed by route, normalized
+query parameters and the current watermark version, so entries are
+replaced as soon as an ingestion or analytics job finishes instead of
+waiting for a TTL. Responses carry a strong ETag (hash of the body) and
+a public Cache-Control header, so browsers and nginx can revalidate
+with If-None-Match and get a 304.
+"""
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, TypeVar
+from urllib.parse import parse_qsl, urlencode
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+F = TypeVar("F", bound=Callable)
+
+# Attribute set on endpoint functions by cache_response
+POLICY_ATTR = "__http_cache__"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How a route's responses are cached."""
+
+    watermarks: tuple[str, ...]
+    max_age: int
+
+    @property
+    def cache_control(self) -> str:
+        return f"public, max-age={self.max_age}, stale-while-revalidate={self.max_age * 5}"
+
+
+def cache_response(*watermarks: str, max_age: Optional[int] = None) -> Callable[[F], F]:
+    """
+    Mark a GET route as cacheable until one of its watermarks moves.
+
+    Only use on routes whose response does not depend on the user.
+
+    Args:
+        *watermarks: Datasets the response is computed from
+        max_age: Cache-Control max-age in seconds (default:
+            settings.http_cache_max_age)
+    """
+    policy = CachePolicy(tuple(watermarks), max_age or settings.http_cache_max_age)
+
+    def decorator(func: F) -> F:
+        setattr(func, POLICY_ATTR, policy)
+        return func
+
+    return decorator
+
+
+def get_cache_policy(endpoint: Callable) -> Optional[CachePolicy]:
+    """The cache policy declared on a route endpoint, if any."""
+    return getattr(endpoint, POLICY_ATTR, None)
+
+
+def normalize_query(query_string: bytes | str) -> str:
+    """Sort query parameters so equivalent URLs share a cache entry."""
+    if isinstance(query_string, bytes):
+        query_string = query_string.decode("latin-1")
+    return urlencode(sorted(parse_qsl(query_string, keep_blank_values=True)))
+
+
+def cache_key(route_path: str, path: str, query_string: bytes | str, version: str) -> str:
+    """Redis key of a response: route template plus a digest of URL and data version."""
+    digest = hashlib.sha256(
+        f"{path}?{normalize_query(query_string)}|{version}".encode()
+    ).hexdigest()[:40]
+    return f"httpcache:{route_path}:{digest}"
+
+
+def strong_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, per RFC 9110)."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+# (checked_at, {watermark name: last run}) from the last watermark read
+_versions: Optional[tuple[float, Optional[dict[str, str]]]] = None
+
+
+async def _load_versions() -> dict[str, str]:
+    """Read watermark run times from the database reads are served from."""
+    from app.core.data_freshness import get_watermarks
+    from app.db.session import async_session_maker, replica_session_maker, use_replica
+
+    session_maker = replica_session_maker if await use_replica() else async_session_maker
+    async with session_maker() as db:
+        watermarks = await get_watermarks(db)
+    return {name: w.last_run_at.isoformat() for name, w in watermarks.items()}
+
+
+async def data_version(policy: CachePolicy) -> Optional[str]:
+    """
+    Current version of the data behind a policy.
+
+    Watermarks are re-read at most every
+    settings.http_cache_version_interval seconds. Returns None when they
+    cannot be read, in which case responses are not cached.
+    """
+    global _versions
+
+    now = time.monotonic()
+    if _versions is None or now - _versions[0] >= settings.http_cache_version_interval:
+        try:
+            versions = await _load_versions()
+        except Exception as e:
+            logger.warning("HTTP cache version lookup failed", error=str(e))
+            versions = None
+        _versions = (now, versions)
+
+    versions = _versions[1]
+    if versions is None:
+        return None
+    return "|".join(f"{name}={versions.get(name)}" for name in policy.watermarks)
@@ -3,6 +3,9 @@ Circuit breaker pattern for external service calls.
 
 Prevents cascading failures by failing fast when a service
 is unhealthy, with automatic recovery attempts.
+
+Shared breakers keep their state in Redis so every worker process sees
+the same open/closed state for a provider.
 """
 import time
 from dataclasses import dataclass, field
@@ -10,9 +13,62 @@ from enum import Enum
 from typing import Optional
 
 import structlog
+from redis.exceptions import RedisError
+
+from app.core.provider_limiter import get_shared_redis
 
 logger = structlog.get_logger()
 
+# Shared breaker state expires after this long without requests
+SHARED_STATE_TTL_SECONDS = 3600
+
+# Move an open breaker to half-open once the recovery timeout has passed.
+#
+# KEYS[1]  breaker hash
+# ARGV[1]  now (seconds)
+# ARGV[2]  recovery timeout (seconds)
+ENTER_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'state', 'last_failure_time')
+if state[1] == 'open' then
+    local last = tonumber(state[2])
+    if last == nil or tonumber(ARGV[1]) - last >= tonumber(ARGV[2]) then
+        redis.call('HSET', KEYS[1], 'state', 'half_open', 'success_count', 0)
+    end
+end
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# Record a request outcome with the same transitions as
+# CircuitBreaker._record_failure / _record_success.
+#
+# KEYS[1]  breaker hash
+# ARGV[1]  'failure' or 'success'
+# ARGV[2]  now (seconds)
+# ARGV[3]  failure threshold
+# ARGV[4]  half-open successes needed to close
+# ARGV[5]  state TTL (seconds)
+RECORD_SCRIPT = """
+local state = redis.call('HGET', KEYS[1], 'state') or 'closed'
+if ARGV[1] == 'failure' then
+    local failures = redis.call('HINCRBY', KEYS[1], 'failure_count', 1)
+    redis.call('HSET', KEYS[1], 'last_failure_time', ARGV[2])
+    if state == 'half_open' or failures >= tonumber(ARGV[3]) then
+        state = 'open'
+    end
+elseif state == 'half_open' then
+    local successes = redis.call('HINCRBY', KEYS[1], 'success_count', 1)
+    if successes >= tonumber(ARGV[4]) then
+        state = 'closed'
+        redis.call('HSET', KEYS[1], 'failure_count', 0)
+    end
+else
+    redis.call('HSET', KEYS[1], 'failure_count', 0)
+end
+redis.call('HSET', KEYS[1], 'state', state)
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return redis.call('HGETALL', KEYS[1])
+"""
+
 
 class CircuitState(Enum):
     CLOSED = "closed"      # Normal operation
@@ -35,11 +91,17 @@ class CircuitBreaker:
 
         async with breaker:
             result = await external_api_call()
+
+    With shared=True the state lives in Redis and is updated atomically,
+    so failures seen by any worker count toward opening the circuit for
+    all of them. If Redis is unavailable the breaker falls back to its
+    local state.
     """
     name: str
     failure_threshold: int = 5       # Failures before opening
     recovery_timeout: float = 30.0   # Seconds before trying half-open
     half_open_requests: int = 3      # Successful requests to close
+    shared: bool = False             # Keep state in Redis across processes
 
     # State
     state: CircuitState = field(default=CircuitState.CLOSED)
@@ -48,6 +110,8 @@ class CircuitBreaker:
     last_failure_time: Optional[float] = field(default=None)
 
     async def __aenter__(self):
+        if self.shared:
+            await self._sync_shared(ENTER_SCRIPT, time.time(), self.recovery_timeout)
         if self.state == CircuitState.OPEN:
             if self._should_attempt_recovery():
                 self.state = CircuitState.HALF_OPEN
@@ -61,12 +125,56 @@ class CircuitBreaker:
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if exc_type is not None:
+        outcome = "failure" if exc_type is not None else "success"
+        if self.shared:
+            previous = self.state
+            recorded = await self._sync_shared(
+                RECORD_SCRIPT,
+                outcome,
+                time.time(),
+                self.failure_threshold,
+                self.half_open_requests,
+                SHARED_STATE_TTL_SECONDS,
+            )
+            if recorded:
+                if self.state != previous:
+                    logger.warning(
+                        f"Circuit {self.name} changed state",
+                        previous=previous.value,
+                        state=self.state.value,
+                        failure_count=self.failure_count,
+                    )
+                return False
+        if outcome == "failure":
             self._record_failure()
         else:
             self._record_success()
         return False  # Don't suppress exceptions
 
+    async def _sync_shared(self, script: str, *args) -> bool:
+        """Run a state script against Redis and mirror the result locally."""
+        try:
+            redis = get_shared_redis()
+            values = await redis.register_script(script)(keys=[f"circuit:{self.name}"], args=list(args))
+        except RedisError as e:
+            logger.debug(f"Circuit {self.name} using local state", error=str(e))
+            return False
+
+        shared = dict(zip(values[::2], values[1::2]))
+        if not shared:
+            # No shared state yet (or it expired): start closed
+            self.state = CircuitState.CLOSED
+            self.failure_count = 0
+            self.success_count = 0
+            self.last_failure_time = None
+            return True
+        self.state = CircuitState(shared.get("state", CircuitState.CLOSED.value))
+        self.failure_count = int(shared.get("failure_count", 0))
+        self.success_count = int(shared.get("success_count", 0))
+        last_failure = shared.get("last_failure_time")
+        self.last_failure_time = float(last_failure) if last_failure else None
+        return True
+
     def _should_attempt_recovery(self) -> bool:
         if self.last_failure_time is None:
             return True
@@ -61,7 +61,9 @@ class Settings(BaseSettings):
     postgres_password: str = ""  # Required - set via POSTGRES_PASSWORD env var
     postgres_db: str = "mtg_market_intel"
     database_url: str | None = None
-    database_replica_url: str | None = None  # Read replica for Discord bot (optional)
+    database_replica_url: str | None = None  # Read replica for read-only routes (optional)
+    database_replica_max_lag: float = 30.0  # Seconds behind primary before reads fall back to it
+    database_replica_lag_check_interval: float = 5.0  # Seconds a replica lag reading is reused
     
     # Redis
     redis_host: str = "redis"
@@ -127,6 +129,36 @@ class Settings(BaseSettings):
     celery_task_timeout: int = 300
     # Celery worker pool timeout - for DB connections in workers
     celery_pool_timeout: int = 30
+
+    # Query instrumentation (see app.core.query_budget)
+    # The same normalized statement run more than this many times in one
+    # request or task is reported as a repeated (N+1) pattern
+    query_repeat_threshold: int = 10
+    # Default maximum queries per request/task (None = no budget)
+    query_budget_default: int | None = None
+    # Per-scope budgets as JSON, keyed by "METHOD /route/{template}" or
+    # "task:<task name>", e.g. {"GET /api/cards/{card_id}": 8}
+    query_budgets: dict[str, int] = {}
+    # Raise QueryBudgetExceeded instead of only logging (set in CI)
+    query_budget_enforce: bool = False
+
+    # HTTP response cache for public market endpoints (see app.api.utils.http_cache)
+    http_cache_enabled: bool = True
+    # Cache-Control max-age for cacheable responses (browsers and nginx)
+    http_cache_max_age: int = 60
+    # How long a cached response is kept in Redis (entries are also
+    # replaced whenever their data watermarks move)
+    http_cache_ttl: int = 900
+    # Seconds a data watermark reading is reused before re-checking
+    http_cache_version_interval: float = 5.0
+
+    # Set completion index (see app.services.set_completion)
+    # Seconds between checks for catalog changes that rebuild the index
+    set_index_check_interval: float = 60.0
+
+    # Cross-marketplace spread matrix (see app.services.pricing.spread_engine)
+    # Seconds between checks for new price snapshots that reload the matrix
+    spread_matrix_check_interval: float = 30.0
     
     @field_validator("cors_origins", mode="before")
     @classmethod
@@ -5,8 +5,10 @@ This module provides standardized enums for card conditions and languages,
 along with normalization functions to map external data sources to our
 internal representation.
 """
+import ast
+import json
 from enum import Enum
-from typing import Optional
+from typing import Any, Optional
 
 
 # =============================================================================
@@ -260,3 +262,123 @@ def get_currency_for_marketplace(marketplace_name: str) -> str:
         Currency code (USD, EUR, etc.)
     """
     return MARKETPLACE_CURRENCIES.get(marketplace_name.lower(), "USD")
+
+
+# =============================================================================
+# Card Search Attributes
+# =============================================================================
+
+# Bit per color in cards.color_mask (WUBRG order)
+COLOR_BITS: dict[str, int] = {"W": 1, "U": 2, "B": 4, "R": 8, "G": 16}
+
+# Bit positions in cards.legal_formats. Append only: positions are stored.
+SEARCH_FORMATS: tuple[str, ...] = (
+    "standard",
+    "future",
+    "historic",
+    "timeless",
+    "gladiator",
+    "pioneer",
+    "explorer",
+    "modern",
+    "legacy",
+    "pauper",
+    "vintage",
+    "penny",
+    "commander",
+    "oathbreaker",
+    "standardbrawl",
+    "brawl",
+    "alchemy",
+    "paupercommander",
+    "duel",
+    "oldschool",
+    "premodern",
+    "predh",
+)
+
+
+def _parse_card_attribute(value: Any, default: Any) -> Any:
+    """
+    Parse a card attribute stored as a JSON string.
+
+    Some ingestion paths store Python reprs (str(list)) instead of JSON,
+    so those are accepted too.
+    """
+    if value is None or value == "":
+        return default
+    if not isinstance(value, str):
+        return value
+    try:
+        return json.loads(value)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return default
+
+
+def color_mask(colors: Any) -> int:
+    """
+    Bitmask of a card's colors.
+
+    Examples:
+        >>> color_mask('["U", "R"]')
+        10
+        >>> color_mask(None)
+        0
+    """
+    parsed = _parse_card_attribute(colors, [])
+    if not isinstance(parsed, (list, tuple)):
+        return 0
+    mask = 0
+    for color in parsed:
+        mask |= COLOR_BITS.get(str(color).upper(), 0)
+    return mask
+
+
+def format_bit(format_name: str) -> Optional[int]:
+    """Bit of a format in cards.legal_formats, or None if not tracked."""
+    try:
+        return 1 << SEARCH_FORMATS.index(format_name.lower().strip())
+    except ValueError:
+        return None
+
+
+def legal_format_bits(legalities: Any) -> int:
+    """Bitset of the formats a card is legal in."""
+    parsed = _parse_card_attribute(legalities, {})
+    if not isinstance(parsed, dict):
+        return 0
+    bits = 0
+    for index, format_name in enumerate(SEARCH_FORMATS):
+        if parsed.get(format_name) == "legal":
+            bits |= 1 << index
+    return bits
+
+
+def normalize_keywords(keywords: Any) -> list[str]:
+    """Lowercased, de-duplicated keyword list for array containment filters."""
+    parsed = _parse_card_attribute(keywords, [])
+    if not isinstance(parsed, (list, tuple)):
+        return []
+    return sorted({str(keyword).lower() for keyword in parsed if keyword})
+
+
+def card_search_fields(
+    colors: Any = None,
+    legalities: Any = None,
+    keywords: Any = None,
+) -> dict[str, Any]:
+    """
+    Normalized search columns derived from a card's JSON attributes.
+
+    Card writers merge this into the row so filters can run against
+    indexed columns instead of parsing JSON per card.
+    """
+    return {
+        "color_mask": color_mask(colors),
+        "legal_formats": legal_format_bits(legalities),
+        "keyword_list": normalize_keywords(keywords),
+    }
@@ -3,15 +3,25 @@ Data freshness checking utilities.
 
 Used to determine if data needs to be refreshed on startup,
 avoiding unnecessary task execution when recent data exists.
+
+Checks are cheap enough to run on every startup and health probe:
+- Latest timestamps come from the data_watermarks row each ingestion or
+  analytics job upserts when it finishes, falling back to MAX() only
+  when no watermark exists yet.
+- Table counts use TimescaleDB's approximate_row_count (planner
+  statistics), with an exact COUNT only for small tables where the
+  estimate may be missing.
 """
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 import structlog
-from sqlalchemy import select, func
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import PriceSnapshot, MetricsCardsDaily, Recommendation
+from app.models import DataWatermark, PriceSnapshot, MetricsCardsDaily, Recommendation
 from app.models.card import Card
 from app.models.mtg_set import MTGSet
 from app.models.tournament import Tournament
@@ -26,8 +36,110 @@ ANALYTICS_FRESHNESS_HOURS = 2  # Analytics considered fresh if < 2 hours old
 RECOMMENDATIONS_FRESHNESS_HOURS = 6  # Recommendations considered fresh if < 6 hours old
 
 
+# Watermark names, one per dataset
+PRICE_SNAPSHOTS_WATERMARK = "price_snapshots"
+METRICS_WATERMARK = "metrics_cards_daily"
+RECOMMENDATIONS_WATERMARK = "recommendations"
+CATALOG_WATERMARK = "cards"
+
+# Approximate counts below this are replaced by an exact COUNT, since
+# statistics for small or never-analyzed tables are unreliable
+EXACT_COUNT_THRESHOLD = 100_000
+
+
+async def record_watermark(
+    db: AsyncSession,
+    name: str,
+    rows_written: int,
+    latest_data_at: Optional[datetime] = None,
+    job: Optional[str] = None,
+) -> None:
+    """
+    Record that a job finished writing a dataset.
+
+    Upserts the dataset's watermark; latest_data_at never moves
+    backwards. The caller commits.
+
+    Args:
+        db: Database session
+        name: Dataset name (e.g. PRICE_SNAPSHOTS_WATERMARK)
+        rows_written: Rows written by this run
+        latest_data_at: Newest data timestamp written (default: now,
+            or unchanged when no rows were written)
+        job: Name of the job that wrote the data
+    """
+    now = datetime.now(timezone.utc)
+    if latest_data_at is None and rows_written:
+        latest_data_at = now
+    stmt = pg_insert(DataWatermark).values(
+        name=name,
+        last_run_at=now,
+        latest_data_at=latest_data_at,
+        rows_written=rows_written,
+        last_job=job,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataWatermark.name],
+        set_={
+            "last_run_at": stmt.excluded.last_run_at,
+            "latest_data_at": func.greatest(
+                DataWatermark.latest_data_at, stmt.excluded.latest_data_at
+            ),
+            "rows_written": stmt.excluded.rows_written,
+            "last_job": stmt.excluded.last_job,
+            "updated_at": now,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def get_watermarks(db: AsyncSession) -> dict[str, DataWatermark]:
+    """Get all dataset watermarks by name."""
+    result = await db.execute(select(DataWatermark))
+    return {w.name: w for w in result.scalars().all()}
+
+
+async def get_watermark_time(db: AsyncSession, name: str) -> Optional[datetime]:
+    """Get the newest data timestamp recorded for a dataset."""
+    return await db.scalar(
+        select(DataWatermark.latest_data_at).where(DataWatermark.name == name)
+    )
+
+
+async def approximate_row_count(db: AsyncSession, model) -> int:
+    """
+    Estimate a table's row count from planner statistics.
+
+    Uses TimescaleDB's approximate_row_count, which also covers the
+    chunks of hypertables. Falls back to an exact COUNT when the
+    estimate is small or unavailable.
+
+    Args:
+        db: Database session
+        model: Mapped model class whose table to count
+    """
+    estimate = -1
+    try:
+        async with db.begin_nested():
+            estimate = await db.scalar(
+                text("SELECT approximate_row_count(CAST(:table AS regclass))"),
+                {"table": model.__tablename__},
+            )
+    except DBAPIError as e:
+        logger.debug("Approximate row count unavailable", table=model.__tablename__, error=str(e))
+
+    if estimate is not None and estimate >= EXACT_COUNT_THRESHOLD:
+        return int(estimate)
+
+    result = await db.scalar(select(func.count()).select_from(model))
+    return result or 0
+
+
 async def get_latest_price_snapshot_time(db: AsyncSession) -> Optional[datetime]:
     """Get the timestamp of the most recent price snapshot."""
+    watermark = await get_watermark_time(db, PRICE_SNAPSHOTS_WATERMARK)
+    if watermark:
+        return watermark
     result = await db.scalar(
         select(func.max(PriceSnapshot.time))
     )
@@ -36,6 +148,9 @@ async def get_latest_price_snapshot_time(db: AsyncSession) -> Optional[datetime]
 
 async def get_latest_metrics_date(db: AsyncSession) -> Optional[datetime]:
     """Get the date of the most recent metrics entry."""
+    watermark = await get_watermark_time(db, METRICS_WATERMARK)
+    if watermark:
+        return watermark
     result = await db.scalar(
         select(func.max(MetricsCardsDaily.date))
     )
@@ -47,6 +162,9 @@ async def get_latest_metrics_date(db: AsyncSession) -> Optional[datetime]:
 
 async def get_latest_recommendation_time(db: AsyncSession) -> Optional[datetime]:
     """Get the created_at timestamp of the most recent active recommendation."""
+    watermark = await get_watermark_time(db, RECOMMENDATIONS_WATERMARK)
+    if watermark:
+        return watermark
     result = await db.scalar(
         select(func.max(Recommendation.created_at)).where(
             Recommendation.is_active == True
@@ -56,19 +174,13 @@ async def get_latest_recommendation_time(db: AsyncSession) -> Optional[datetime]
 
 
 async def get_price_snapshot_count(db: AsyncSession) -> int:
-    """Get total count of price snapshots."""
-    result = await db.scalar(
-        select(func.count(PriceSnapshot.time))
-    )
-    return result or 0
+    """Get approximate count of price snapshots."""
+    return await approximate_row_count(db, PriceSnapshot)
 
 
 async def get_metrics_count(db: AsyncSession) -> int:
-    """Get total count of metrics entries."""
-    result = await db.scalar(
-        select(func.count(MetricsCardsDaily.id))
-    )
-    return result or 0
+    """Get approximate count of metrics entries."""
+    return await approximate_row_count(db, MetricsCardsDaily)
 
 
 async def get_recommendations_count(db: AsyncSession) -> int:
@@ -262,27 +374,23 @@ MIN_EMBEDDINGS_COVERAGE = 0.50  # 50% of cards should have embeddings
 
 
 async def get_cards_count(db: AsyncSession) -> int:
-    """Get total count of cards in the catalog."""
-    result = await db.scalar(select(func.count(Card.id)))
-    return result or 0
+    """Get approximate count of cards in the catalog."""
+    return await approximate_row_count(db, Card)
 
 
 async def get_sets_count(db: AsyncSession) -> int:
-    """Get total count of MTG sets."""
-    result = await db.scalar(select(func.count(MTGSet.id)))
-    return result or 0
+    """Get approximate count of MTG sets."""
+    return await approximate_row_count(db, MTGSet)
 
 
 async def get_embeddings_count(db: AsyncSession) -> int:
-    """Get total count of card embeddings."""
-    result = await db.scalar(select(func.count(CardFeatureVector.card_id)))
-    return result or 0
+    """Get approximate count of card embeddings."""
+    return await approximate_row_count(db, CardFeatureVector)
 
 
 async def get_tournaments_count(db: AsyncSession) -> int:
-    """Get total count of tournaments."""
-    result = await db.scalar(select(func.count(Tournament.id)))
-    return result or 0
+    """Get approximate count of tournaments."""
+    return await approximate_row_count(db, Tournament)
 
 
 async def should_run_full_card_import(db: AsyncSession) -> bool:
@@ -0,0 +1,287 @@
+"""
+Cluster-wide rate limiting for external data providers.
+
+Every Celery worker and API process that calls a provider draws from a
+single Redis token bucket for that provider. N workers together stay
+under the provider's limit instead of each pacing itself as if it were
+alone.
+
+The bucket's refill rate adapts AIMD-style:
+- Each successful response adds a small fixed step, up to the
+  configured ceiling.
+- A 429 halves the rate and pauses every caller for the Retry-After
+  period.
+The rate therefore settles just under the provider's real limit,
+however many workers are running.
+
+If Redis is unavailable, callers fall back to pacing locally at the
+last known rate.
+"""
+import asyncio
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+import structlog
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# Multiplicative decrease applied on a 429
+DECREASE_FACTOR = 0.5
+
+# Concurrent 429s from many workers count as one congestion signal
+DECREASE_INTERVAL_MS = 1000
+
+# Pause applied on a 429 without a usable Retry-After header
+DEFAULT_COOLDOWN_SECONDS = 1.0
+
+# Longest Retry-After honoured
+MAX_COOLDOWN_SECONDS = 60.0
+
+# Idle buckets expire and restart at the configured rate
+STATE_TTL_MS = 3_600_000
+
+# Take a token from the shared bucket.
+#
+# KEYS[1]  bucket hash (tokens, ts, rate)
+# KEYS[2]  cooldown key, set while a Retry-After pause is in effect
+# ARGV[1]  initial rate (tokens/second) when the bucket does not exist
+# ARGV[2]  burst (bucket capacity)
+# ARGV[3]  state TTL (ms)
+#
+# Uses the Redis server clock so all workers share one timeline.
+# Returns {wait_ms, rate}; wait_ms is 0 when a token was taken.
+ACQUIRE_SCRIPT = """
+local cooldown = redis.call('PTTL', KEYS[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'rate')
+local rate = tonumber(state[3]) or tonumber(ARGV[1])
+if cooldown > 0 then
+    return {cooldown, tostring(rate)}
+end
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local burst = tonumber(ARGV[2])
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / 1000)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now, 'rate', tostring(rate))
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return {wait, tostring(rate)}
+"""
+
+# Adjust the shared rate from a response.
+#
+# KEYS[1]  bucket hash
+# KEYS[2]  cooldown key
+# ARGV[1]  'increase' or 'decrease'
+# ARGV[2]  initial rate
+# ARGV[3]  minimum rate
+# ARGV[4]  maximum rate
+# ARGV[5]  additive increase step
+# ARGV[6]  multiplicative decrease factor
+# ARGV[7]  cooldown (ms), for 'decrease'
+# ARGV[8]  minimum interval between decreases (ms)
+# ARGV[9]  state TTL (ms)
+#
+# Returns the new rate.
+ADJUST_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'rate', 'decreased_at')
+local rate = tonumber(state[1]) or tonumber(ARGV[2])
+
+if ARGV[1] == 'decrease' then
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+    local cooldown = tonumber(ARGV[7])
+    if cooldown > 0 then
+        redis.call('SET', KEYS[2], 1, 'PX', cooldown)
+    end
+    local decreased_at = tonumber(state[2]) or 0
+    if now - decreased_at >= tonumber(ARGV[8]) then
+        rate = math.max(tonumber(ARGV[3]), rate * tonumber(ARGV[6]))
+        redis.call('HSET', KEYS[1], 'decreased_at', now, 'tokens', 0, 'ts', now)
+    end
+else
+    rate = math.min(tonumber(ARGV[4]), rate + tonumber(ARGV[5]))
+end
+
+redis.call('HSET', KEYS[1], 'rate', tostring(rate))
+redis.call('PEXPIRE', KEYS[1], ARGV[9])
+return tostring(rate)
+"""
+
+# One client per event loop: Celery tasks run each task in a fresh loop
+# (see app.tasks.utils.run_async) and asyncio connections cannot cross loops
+_redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Redis]" = weakref.WeakKeyDictionary()
+
+
+def get_shared_redis() -> Redis:
+    """Get the Redis client for shared provider state on the running loop."""
+    loop = asyncio.get_running_loop()
+    client = _redis_clients.get(loop)
+    if client is None:
+        client = Redis.from_url(settings.redis_url, decode_responses=True)
+        _redis_clients[loop] = client
+    return client
+
+
+async def close_shared_redis() -> None:
+    """Close the running loop's shared Redis client. Call before the loop ends."""
+    client = _redis_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_COOLDOWN_SECONDS)
+
+
+class ProviderRateLimiter:
+    """
+    Shared, adaptive token bucket for one provider.
+
+    Usage:
+        limiter = get_provider_limiter("scryfall", rate=10)
+
+        await limiter.acquire()
+        response = await client.get(url)
+        await limiter.observe(response)
+
+    Or attach limiter.observe as an httpx response event hook.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        *,
+        burst: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        increase_step: Optional[float] = None,
+    ):
+        """
+        Args:
+            name: Provider name, used in Redis keys
+            rate: Starting rate in requests per second
+            burst: Bucket capacity (default: one second of requests)
+            min_rate: Floor for the adaptive rate (default: rate / 20)
+            max_rate: Ceiling for the adaptive rate (default: rate)
+            increase_step: Rate added per successful response
+                (default: max_rate / 100)
+        """
+        self.name = name
+        self.initial_rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.min_rate = min_rate if min_rate is not None else rate / 20
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.increase_step = increase_step if increase_step is not None else self.max_rate / 100
+        self.rate = rate
+        self._bucket_key = f"provider_limit:{name}"
+        self._cooldown_key = f"provider_limit:{name}:cooldown"
+        self._next_local_slot = 0.0
+
+    async def acquire(self) -> None:
+        """Wait until a request to the provider is allowed."""
+        while True:
+            try:
+                redis = get_shared_redis()
+                wait_ms, rate = await redis.register_script(ACQUIRE_SCRIPT)(
+                    keys=[self._bucket_key, self._cooldown_key],
+                    args=[self.initial_rate, self.burst, STATE_TTL_MS],
+                )
+            except RedisError as e:
+                logger.warning("Provider rate limiter unavailable, pacing locally", provider=self.name, error=str(e))
+                await self._acquire_local()
+                return
+            self.rate = float(rate)
+            if int(wait_ms) <= 0:
+                return
+            await asyncio.sleep(int(wait_ms) / 1000)
+
+    async def _acquire_local(self) -> None:
+        # Reserve the next free slot before sleeping so concurrent callers
+        # in this process queue up behind each other
+        now = time.monotonic()
+        slot = max(now, self._next_local_slot)
+        self._next_local_slot = slot + 1 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def observe(self, response: httpx.Response) -> None:
+        """Feed a provider response back into the adaptive rate."""
+        if response.status_code == 429:
+            await self.record_throttled(parse_retry_after(response.headers.get("Retry-After")))
+        elif response.status_code < 500:
+            await self.record_success()
+
+    async def record_success(self) -> None:
+        """Additively increase the shared rate after a successful response."""
+        if self.rate >= self.max_rate:
+            return
+        await self._adjust("increase", 0)
+
+    async def record_throttled(self, retry_after: Optional[float] = None) -> None:
+        """Halve the shared rate and pause all callers after a 429."""
+        cooldown = retry_after if retry_after is not None else DEFAULT_COOLDOWN_SECONDS
+        logger.warning("Provider throttled request", provider=self.name, rate=self.rate, cooldown_seconds=cooldown)
+        await self._adjust("decrease", int(cooldown * 1000))
+
+    async def _adjust(self, direction: str, cooldown_ms: int) -> None:
+        try:
+            redis = get_shared_redis()
+            rate = await redis.register_script(ADJUST_SCRIPT)(
+                keys=[self._bucket_key, self._cooldown_key],
+                args=[
+                    direction, self.initial_rate, self.min_rate, self.max_rate,
+                    self.increase_step, DECREASE_FACTOR, cooldown_ms,
+                    DECREASE_INTERVAL_MS, STATE_TTL_MS,
+                ],
+            )
+            self.rate = float(rate)
+        except RedisError as e:
+            logger.debug("Could not update shared provider rate", provider=self.name, error=str(e))
+            if direction == "decrease":
+                self.rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+
+# Limiters by provider name
+_limiters: dict[str, ProviderRateLimiter] = {}
+
+
+def get_provider_limiter(name: str, rate: float, **kwargs) -> ProviderRateLimiter:
+    """Get or create the shared rate limiter for a provider."""
+    if name not in _limiters:
+        _limiters[name] = ProviderRateLimiter(name, rate, **kwargs)
+    return _limiters[name]
+
+
+def clear_provider_limiters() -> None:
+    """Clear the limiter registry. Useful for testing."""
+    _limiters.clear()
@@ -0,0 +1,236 @@
+"""
+Per-request and per-task database query instrumentation.
+
+Listeners on each SQLAlchemy engine attribute every statement to the API
+request or Celery task running it (through a context variable) and
+record:
+- query count, total database time and rows returned
+- repeated statements: the same normalized SQL run more than
+  settings.query_repeat_threshold times in one scope, the usual sign of
+  an N+1 loop
+
+When a scope ends its stats are logged, exported as Prometheus metrics
+(if prometheus_client is installed) and checked against its query
+budget. With settings.query_budget_enforce (for CI), going over budget
+raises QueryBudgetExceeded so the offending test fails.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterator, Optional
+
+import structlog
+from sqlalchemy import event
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+logger = structlog.get_logger()
+
+try:
+    from prometheus_client import Counter as PromCounter, Histogram
+except ImportError:
+    PromCounter = Histogram = None
+
+METRICS_ENABLED = Histogram is not None
+
+if METRICS_ENABLED:
+    QUERY_COUNT = Histogram(
+        "db_queries_per_scope", "Database queries per request or task",
+        ["kind", "scope"], buckets=(1, 2, 5, 10, 20, 50, 100, 250, 1000, 5000),
+    )
+    QUERY_TIME = Histogram(
+        "db_time_seconds_per_scope", "Database time per request or task",
+        ["kind", "scope"], buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30, 120),
+    )
+    QUERY_ROWS = Histogram(
+        "db_rows_per_scope", "Rows returned per request or task",
+        ["kind", "scope"], buckets=(1, 10, 100, 1000, 10_000, 100_000, 1_000_000),
+    )
+    REPEATED_STATEMENTS = PromCounter(
+        "db_repeated_statements_total", "Statements repeated past the N+1 threshold",
+        ["kind", "scope"],
+    )
+    BUDGET_EXCEEDED = PromCounter(
+        "db_query_budget_exceeded_total", "Requests or tasks over their query budget",
+        ["kind", "scope"],
+    )
+
+# Scope for requests that did not match a route (keeps metric labels bounded)
+UNMATCHED_SCOPE = "unmatched"
+
+_NORMALIZE_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),  # string literals
+    (re.compile(r"\$\d+|%\(\w+\)s|(?<![:\w]):\w+|\b\d+(?:\.\d+)?\b"), "?"),  # parameters, numbers
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),  # IN lists of any length
+    (re.compile(r"\s+"), " "),
+)
+
+
+def normalize_statement(statement: str) -> str:
+    """Reduce SQL to its shape so repeats with different values match."""
+    for pattern, replacement in _NORMALIZE_PATTERNS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request or task ran more queries than its budget allows."""
+
+
+@dataclass
+class QueryStats:
+    """Database usage of one request or task."""
+
+    scope: str
+    kind: str = "request"
+    count: int = 0
+    db_time: float = 0.0
+    rows: int = 0
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float, rows: int) -> None:
+        self.count += 1
+        self.db_time += duration
+        self.rows += rows
+        self.statements[normalize_statement(statement)] += 1
+
+    def repeated(self, threshold: Optional[int] = None) -> dict[str, int]:
+        """Statements run more than threshold times (N+1 candidates)."""
+        threshold = settings.query_repeat_threshold if threshold is None else threshold
+        return {sql: n for sql, n in self.statements.most_common() if n > threshold}
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats of the request or task running in this context, if tracked."""
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("query_start")
+    if stats is None or not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    # rowcount is -1 for SELECTs; the asyncpg and aiosqlite adapters
+    # buffer fetched rows on the cursor instead
+    rows = cursor.rowcount
+    if rows is None or rows < 0:
+        rows = len(getattr(cursor, "_rows", None) or ())
+    stats.record(statement, duration, rows)
+
+
+def instrument_engine(engine) -> None:
+    """Attach query tracking to an engine (sync or async). Idempotent."""
+    target = getattr(engine, "sync_engine", engine)
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+def begin_query_scope(scope: str, kind: str = "request") -> Token:
+    """Start attributing queries in this context to a new scope."""
+    return _current.set(QueryStats(scope=scope, kind=kind))
+
+
+def end_query_scope(token: Token, check_budget: bool = True) -> Optional[QueryStats]:
+    """Stop tracking, then report the scope's stats and check its budget."""
+    stats = _current.get()
+    _current.reset(token)
+    if stats is not None:
+        report_query_stats(stats, check_budget=check_budget)
+    return stats
+
+
+@contextmanager
+def track_queries(scope: str, kind: str = "request") -> Iterator[QueryStats]:
+    """
+    Track the queries run inside the block.
+
+    The scope name may be changed on the yielded stats before the block
+    ends (e.g. once the matched route is known). The budget is only
+    checked when the block completes without an exception.
+    """
+    token = begin_query_scope(scope, kind)
+    try:
+        yield _current.get()
+    except BaseException:
+        end_query_scope(token, check_budget=False)
+        raise
+    end_query_scope(token)
+
+
+def query_budget(scope: str) -> Optional[int]:
+    """Maximum queries allowed for a scope (None = unlimited)."""
+    return settings.query_budgets.get(scope, settings.query_budget_default)
+
+
+def report_query_stats(stats: QueryStats, check_budget: bool = True) -> None:
+    """Log and export a scope's stats, enforcing its budget if configured."""
+    repeated = stats.repeated()
+    budget = query_budget(stats.scope)
+    over_budget = budget is not None and stats.count > budget
+
+    if METRICS_ENABLED:
+        labels = (stats.kind, stats.scope)
+        QUERY_COUNT.labels(*labels).observe(stats.count)
+        QUERY_TIME.labels(*labels).observe(stats.db_time)
+        QUERY_ROWS.labels(*labels).observe(stats.rows)
+        if repeated:
+            REPEATED_STATEMENTS.labels(*labels).inc(len(repeated))
+        if over_budget:
+            BUDGET_EXCEEDED.labels(*labels).inc()
+
+    log = logger.warning if repeated or over_budget else logger.debug
+    log(
+        "Database usage",
+        scope=stats.scope,
+        scope_kind=stats.kind,
+        db_queries=stats.count,
+        db_time_ms=round(stats.db_time * 1000, 2),
+        db_rows=stats.rows,
+        db_query_budget=budget,
+        db_repeated_statements={sql[:200]: n for sql, n in repeated.items()} or None,
+    )
+
+    if over_budget and check_budget and settings.query_budget_enforce:
+        raise QueryBudgetExceeded(
+            f"{stats.scope} ran {stats.count} queries (budget {budget})"
+        )
+
+
+def route_scope(scope: dict) -> str:
+    """Budget/metric scope for an ASGI request: method plus route template."""
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if not path:
+        return UNMATCHED_SCOPE
+    return f"{scope['method']} {path}"
+
+
+def setup_metrics(app: "FastAPI") -> None:
+    """
+    Expose Prometheus metrics at /metrics.
+
+    Gracefully degrades if prometheus_client is not installed.
+    """
+    if not METRICS_ENABLED:
+        logger.info("Prometheus metrics disabled (prometheus_client not installed)")
+        return
+
+    from prometheus_client import make_asgi_app
+
+    app.mount("/metrics", make_asgi_app())
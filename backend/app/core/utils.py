@@ -1,7 +1,9 @@
 """
 Shared utility functions for the application.
 """
+import asyncio
 import json
+import weakref
 from typing import Any
 
 
@@ -25,3 +27,32 @@ def parse_setting_value(value: str, value_type: str) -> Any:
     elif value_type == "boolean":
         return value.lower() == "true"
     return value
+
+
+class LoopLocalLock:
+    """
+    An asyncio.Lock per running event loop, usable as a module-level lock.
+
+    A plain asyncio.Lock binds to the loop it is first contended on, and
+    Celery tasks each run in a fresh loop (see app.tasks.utils.run_async),
+    so a module-level lock would raise RuntimeError in later tasks.
+    """
+
+    def __init__(self) -> None:
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get(self) -> asyncio.Lock:
+        """The lock for the running loop."""
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+        return lock
+
+    async def __aenter__(self) -> None:
+        await self.get().acquire()
+
+    async def __aexit__(self, *exc) -> None:
+        self.get().release()
@@ -2,13 +2,23 @@
 Database session management.
 
 Provides async session factory and dependency injection for FastAPI.
+
+Routes declare their intent through the session dependency they use:
+get_db for anything that writes, get_replica_db for read-only routes.
+Read-only routes are served by the read replica (when configured and
+not lagging) and their sessions refuse to flush.
 """
+import asyncio
+import time
 from collections.abc import AsyncGenerator
+from typing import Optional
 
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
 
 # async_sessionmaker was added in SQLAlchemy 1.4+
 # Check if it's available, provide helpful error if not
@@ -24,6 +34,8 @@ except ImportError as e:
     ) from e
 
 from app.core.config import settings
+from app.core.query_budget import instrument_engine
+from app.core.utils import LoopLocalLock
 
 
 # Create async engine with improved connection pool settings
@@ -47,6 +59,7 @@ engine = create_async_engine(
 )
 # Note: statement_timeout is set via connect_args.server_settings above
 # No need for a connection event listener since asyncpg doesn't support sync cursor context managers
+instrument_engine(engine)
 
 # Create async session factory
 async_session_maker = async_sessionmaker(
@@ -57,7 +70,7 @@ async_session_maker = async_sessionmaker(
     autoflush=False,
 )
 
-# Read replica (if configured) - used for heavy read queries (e.g., Discord bot)
+# Read replica (if configured) - used for read-only routes (dashboards, charts, Discord bot)
 replica_engine = None
 replica_session_maker = None
 
@@ -79,6 +92,7 @@ if settings.database_replica_url:
             "command_timeout": settings.db_query_timeout,
         },
     )
+    instrument_engine(replica_engine)
     replica_session_maker = async_sessionmaker(
         replica_engine,
         class_=AsyncSession,
@@ -128,24 +142,106 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+# Seconds the replica is behind; 0 when it is caught up or is not in
+# recovery, NULL when it has not replayed anything yet
+# A replica that has replayed everything it received is only caught up
+# while its WAL receiver is streaming; after a disconnect replay catches
+# up with the last received WAL, so fall back to the age of the last
+# replayed transaction. (Roles without pg_read_all_stats see a NULL
+# status, which also falls back.)
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+             AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming')
+            THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+# Upper bound on the lag check, so a dead replica does not stall requests
+REPLICA_LAG_TIMEOUT = 1.0
+
+# (checked_at, lag) from the last replica lag check
+_replica_lag: Optional[tuple[float, Optional[float]]] = None
+# Serializes lag checks, so an expired reading is refreshed by one request
+_replica_lag_lock = LoopLocalLock()
+
+
+async def get_replica_lag() -> Optional[float]:
+    """
+    Seconds the read replica is behind the primary.
+
+    Returns None if no replica is configured, or if the lag is unknown
+    (replica unreachable or not replaying yet). Readings are reused for
+    settings.database_replica_lag_check_interval seconds, so routing a
+    request rarely costs a query.
+    """
+    global _replica_lag
+
+    if replica_engine is None:
+        return None
+
+    def cached() -> bool:
+        return (
+            _replica_lag is not None
+            and time.monotonic() - _replica_lag[0] < settings.database_replica_lag_check_interval
+        )
+
+    if cached():
+        return _replica_lag[1]
+
+    async with _replica_lag_lock:
+        if cached():
+            return _replica_lag[1]
+        try:
+            async with replica_engine.connect() as conn:
+                lag = await asyncio.wait_for(conn.scalar(REPLICA_LAG_SQL), REPLICA_LAG_TIMEOUT)
+            lag = float(lag) if lag is not None else None
+        except Exception as e:
+            import structlog
+            structlog.get_logger().warning("Replica lag check failed", error=str(e))
+            lag = None
+        _replica_lag = (time.monotonic(), lag)
+    return lag
+
+
+async def use_replica() -> bool:
+    """Whether reads should go to the replica right now."""
+    lag = await get_replica_lag()
+    return lag is not None and lag <= settings.database_replica_max_lag
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_read_only_flush(session, flush_context, instances):
+    if session.info.get("read_only"):
+        raise RuntimeError(
+            "Read-only session cannot write; use get_db for routes that modify data"
+        )
+
+
 async def get_replica_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency that provides a read replica database session.
+    Dependency that provides a read-only database session.
 
-    Falls back to primary if no replica is configured.
-    Use this for read-only operations that can tolerate slight replication lag
-    (e.g., Discord bot queries, analytics dashboards).
+    Served by the read replica when one is configured and is at most
+    settings.database_replica_max_lag seconds behind; otherwise falls
+    back to the primary. Use this for read-only routes that can tolerate
+    slight replication lag (e.g., dashboards, price charts, Discord bot
+    queries), so they do not compete with ingestion writes.
 
-    IMPORTANT: This should only be used for READ operations.
+    IMPORTANT: This should only be used for READ operations. Flushing
+    the session raises.
     """
     import structlog
     logger = structlog.get_logger()
 
-    # Use replica if configured, otherwise fall back to primary
-    session_maker = replica_session_maker if replica_session_maker else async_session_maker
-    target_engine = replica_engine if replica_engine else engine
+    using_replica = await use_replica()
+    session_maker = replica_session_maker if using_replica else async_session_maker
+    target_engine = replica_engine if using_replica else engine
 
     async with session_maker() as session:
+        session.info["read_only"] = True
         try:
             yield session
         except Exception as e:
@@ -156,7 +252,7 @@ async def get_replica_db() -> AsyncGenerator[AsyncSession, None]:
                     "pool_checked_in": target_engine.pool.checkedin(),
                     "pool_checked_out": target_engine.pool.checkedout(),
                     "pool_overflow": target_engine.pool.overflow(),
-                    "using_replica": replica_session_maker is not None,
+                    "using_replica": using_replica,
                 }
             except Exception:
                 pool_info = {"pool_info": "unavailable"}
@@ -167,4 +263,3 @@ async def get_replica_db() -> AsyncGenerator[AsyncSession, None]:
                 **pool_info
             )
             raise
-
@@ -1,7 +1,15 @@
 """Middleware package for the application."""
 
+from app.middleware.edge import EdgeMiddleware
 from app.middleware.enumeration_protection import EnumerationProtectionMiddleware
+from app.middleware.http_cache import HttpCacheMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
 from app.middleware.request_id import RequestIdMiddleware
 
-__all__ = ["EnumerationProtectionMiddleware", "RateLimitMiddleware", "RequestIdMiddleware"]
+__all__ = [
+    "EdgeMiddleware",
+    "EnumerationProtectionMiddleware",
+    "HttpCacheMiddleware",
+    "RateLimitMiddleware",
+    "RequestIdMiddleware",
+]
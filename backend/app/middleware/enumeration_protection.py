@@ -7,16 +7,21 @@ exponential backoff for suspicious patterns.
 ID enumeration attacks probe for valid resource IDs by observing
 404 responses. By tracking 404 patterns per client and blocking
 after a threshold, we can detect and mitigate these attacks.
+
+Tracking is kept in a bounded in-process LRU and, when Redis is
+configured, mirrored to Redis (counters and blocks expire on their own)
+so a block applies across all API workers.
 """
 import time
-from collections import defaultdict
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Callable, Optional
+from typing import Optional
 
+import redis.asyncio as redis
 import structlog
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response, JSONResponse
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = structlog.get_logger()
 
@@ -24,6 +29,42 @@ logger = structlog.get_logger()
 MAX_NOT_FOUND_PER_WINDOW = 10  # Max 404s before rate limiting
 WINDOW_SECONDS = 60  # Window for tracking
 BLOCK_SECONDS = 300  # Block duration after threshold (5 minutes)
+MAX_TRACKED_CLIENTS = 10_000  # Upper bound on in-process access patterns
+
+# KEYS[1] 404 counter, KEYS[2] block key
+# ARGV[1] window seconds, ARGV[2] threshold, ARGV[3] block seconds
+# Returns 1 if the client is now blocked
+RECORD_NOT_FOUND_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+if count >= tonumber(ARGV[2]) then
+    redis.call('SET', KEYS[2], 1, 'EX', ARGV[3])
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+return 0
+"""
+
+
+def block_key(client_key: str) -> str:
+    """Redis key marking a blocked client."""
+    return f"enum:block:{client_key}"
+
+
+def not_found_key(client_key: str) -> str:
+    """Redis key counting a client's 404s in the current window."""
+    return f"enum:404:{client_key}"
+
+
+def blocked_response() -> JSONResponse:
+    """Response sent to clients blocked for enumeration."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many failed requests. Please try again later."},
+        headers={"Retry-After": str(BLOCK_SECONDS)},
+    )
 
 
 @dataclass
@@ -60,7 +101,7 @@ class AccessPattern:
         return False
 
 
-class EnumerationProtectionMiddleware(BaseHTTPMiddleware):
+class EnumerationProtectionMiddleware:
     """
     Middleware to detect and block ID enumeration attacks.
 
@@ -68,10 +109,17 @@ class EnumerationProtectionMiddleware(BaseHTTPMiddleware):
     This helps protect against attackers probing for valid resource IDs.
     """
 
-    def __init__(self, app, redis_client=None):
-        super().__init__(app)
-        self._patterns: dict[str, AccessPattern] = defaultdict(AccessPattern)
+    def __init__(
+        self,
+        app: ASGIApp,
+        redis_client: Optional[redis.Redis] = None,
+        max_tracked_clients: int = MAX_TRACKED_CLIENTS,
+    ):
+        self.app = app
+        self._patterns: OrderedDict[str, AccessPattern] = OrderedDict()
+        self._max_tracked_clients = max_tracked_clients
         self._redis = redis_client  # Optional Redis for distributed tracking
+        self._record_script = None
 
     def _get_client_key(self, request: Request) -> str:
         """Get unique key for client (user_id or IP)."""
@@ -93,36 +141,82 @@ class EnumerationProtectionMiddleware(BaseHTTPMiddleware):
         segments = path.split("/")
         return any(seg.isdigit() for seg in segments)
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Process request with enumeration protection."""
-        client_key = self._get_client_key(request)
-        pattern = self._patterns[client_key]
+    def _get_pattern(self, client_key: str) -> AccessPattern:
+        """Get (or start) a client's pattern, evicting the least recent beyond the bound."""
+        pattern = self._patterns.pop(client_key, None)
+        if pattern is None:
+            pattern = AccessPattern()
+        self._patterns[client_key] = pattern
+        if len(self._patterns) > self._max_tracked_clients:
+            self._patterns.popitem(last=False)
+        return pattern
+
+    def is_blocked_locally(self, client_key: str) -> bool:
+        """Check the in-process block state (no I/O)."""
+        pattern = self._patterns.get(client_key)
+        return pattern is not None and pattern.is_blocked()
+
+    async def is_blocked(self, client_key: str, redis_client: Optional[redis.Redis] = None) -> bool:
+        """Check whether a client is blocked on this worker or cluster-wide."""
+        if self.is_blocked_locally(client_key):
+            return True
+        r = redis_client or self._redis
+        if r is None:
+            return False
+        try:
+            return bool(await r.exists(block_key(client_key)))
+        except redis.RedisError as e:
+            # The rate limiter already fails closed; don't take the site down twice
+            logger.warning("Enumeration tracking unavailable", error=str(e))
+            return False
 
-        # Check if blocked
-        if pattern.is_blocked():
+    async def record_not_found(self, client_key: str, redis_client: Optional[redis.Redis] = None) -> None:
+        """Record a 404 on an ID-based path for a client."""
+        pattern = self._get_pattern(client_key)
+        if pattern.record_not_found():
             logger.warning(
-                "Blocked potential enumeration attack",
+                "Enumeration threshold exceeded",
                 client_key=client_key,
-                blocked_until=pattern.blocked_until,
+                count=pattern.not_found_count,
             )
-            return JSONResponse(
-                status_code=429,
-                content={"detail": "Too many failed requests. Please try again later."},
-                headers={"Retry-After": str(BLOCK_SECONDS)},
+
+        r = redis_client or self._redis
+        if r is None:
+            return
+        try:
+            if self._record_script is None:
+                self._record_script = r.register_script(RECORD_NOT_FOUND_SCRIPT)
+            await self._record_script(
+                keys=[not_found_key(client_key), block_key(client_key)],
+                args=[WINDOW_SECONDS, MAX_NOT_FOUND_PER_WINDOW, BLOCK_SECONDS],
+                client=r,
             )
+        except redis.RedisError as e:
+            logger.warning("Enumeration tracking unavailable", error=str(e))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client_key = self._get_client_key(Request(scope))
+
+        # Check if blocked
+        if await self.is_blocked(client_key):
+            logger.warning("Blocked potential enumeration attack", client_key=client_key)
+            await blocked_response()(scope, receive, send)
+            return
+
+        status_code = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-        response = await call_next(request)
+        await self.app(scope, receive, send_wrapper)
 
         # Track 404s on resource endpoints with numeric IDs
-        if response.status_code == 404:
-            path = request.url.path
-            if self._is_id_based_path(path):
-                should_block = pattern.record_not_found()
-                if should_block:
-                    logger.warning(
-                        "Enumeration threshold exceeded",
-                        client_key=client_key,
-                        count=pattern.not_found_count,
-                    )
-
-        return response
+        if status_code == 404 and self._is_id_based_path(scope["path"]):
+            await self.record_not_found(client_key)
@@ -0,0 +1,158 @@
+"""
+Response cache for routes marked with @cache_response.
+
+A pure-ASGI layer inside the edge middleware. For GET requests to a
+cacheable route it:
+
+1. Looks up the response for (route, normalized query, data version)
+   in Redis and serves it without calling the route (X-Cache: HIT)
+2. Otherwise runs the route and stores a 200 response (X-Cache: MISS)
+3. Answers a matching If-None-Match with 304 Not Modified either way
+
+Every cacheable response gets a strong ETag and a public Cache-Control
+header (see app.api.utils.http_cache). If the watermarks or Redis are
+unavailable the route is served normally.
+"""
+from typing import Optional
+
+import structlog
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.utils.http_cache import (
+    CachePolicy,
+    cache_key,
+    data_version,
+    etag_matches,
+    get_cache_policy,
+    strong_etag,
+)
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+
+class HttpCacheMiddleware:
+    """Serve cached responses for routes declaring a CachePolicy."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._routes: Optional[list[tuple[object, CachePolicy]]] = None
+
+    def _cacheable_routes(self, scope: Scope) -> list[tuple[object, CachePolicy]]:
+        if self._routes is None:
+            routes = getattr(scope.get("app"), "routes", [])
+            self._routes = [
+                (route, policy) for route in routes
+                if (policy := get_cache_policy(getattr(route, "endpoint", None))) is not None
+            ]
+        return self._routes
+
+    def _match(self, scope: Scope) -> Optional[tuple[object, CachePolicy]]:
+        for route, policy in self._cacheable_routes(scope):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route, policy
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET" or not settings.http_cache_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        matched = self._match(scope)
+        version = await data_version(matched[1]) if matched else None
+        if version is None:
+            await self.app(scope, receive, send)
+            return
+
+        route, policy = matched
+        key = cache_key(route.path, scope["path"], scope.get("query_string", b""), version)
+        if_none_match = Headers(scope=scope).get("if-none-match")
+
+        from app.api.deps import get_redis
+
+        redis = None
+        try:
+            redis = await get_redis()
+            entry = await redis.hgetall(key)
+        except (RedisError, OSError) as e:
+            logger.debug("HTTP cache read failed", key=key, error=str(e))
+            entry = None
+
+        if entry:
+            await self._send_cached(
+                send, policy, entry["etag"], entry["content_type"],
+                entry["body"].encode(), if_none_match, hit=True,
+            )
+            return
+
+        start: Optional[Message] = None
+        chunks: list[bytes] = []
+
+        async def capture(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        body = b"".join(chunks)
+
+        if start is None or start["status"] != 200:
+            if start is not None:
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+            return
+
+        etag = strong_etag(body)
+        content_type = Headers(raw=start["headers"]).get("content-type", "application/json")
+        if redis is not None:
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.hset(key, mapping={
+                        "etag": etag,
+                        "content_type": content_type,
+                        "body": body.decode(),
+                    })
+                    pipe.expire(key, settings.http_cache_ttl)
+                    await pipe.execute()
+            except (RedisError, OSError, UnicodeDecodeError) as e:
+                logger.debug("HTTP cache write failed", key=key, error=str(e))
+
+        headers = MutableHeaders(raw=list(start["headers"]))
+        await self._send_cached(
+            send, policy, etag, content_type, body, if_none_match, hit=False, headers=headers,
+        )
+
+    async def _send_cached(
+        self,
+        send: Send,
+        policy: CachePolicy,
+        etag: str,
+        content_type: str,
+        body: bytes,
+        if_none_match: Optional[str],
+        hit: bool,
+        headers: Optional[MutableHeaders] = None,
+    ) -> None:
+        headers = headers if headers is not None else MutableHeaders()
+        headers["ETag"] = etag
+        headers["Cache-Control"] = policy.cache_control
+        headers["X-Cache"] = "HIT" if hit else "MISS"
+
+        if etag_matches(if_none_match, etag):
+            for name in ("content-length", "content-type"):
+                if name in headers:
+                    del headers[name]
+            await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers["Content-Type"] = content_type
+        headers["Content-Length"] = str(len(body))
+        await send({"type": "http.response.start", "status": 200, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
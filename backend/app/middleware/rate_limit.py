@@ -1,30 +1,150 @@
-"""Rate limiting middleware using Redis."""
+"""Rate limiting middleware using Redis.
+
+Pure ASGI implementation (no BaseHTTPMiddleware task/stream wrapping):
+
+1. A local token bucket per client rejects obvious floods in-process,
+   without a Redis round trip.
+2. A Lua script applies a sliding-window counter in Redis in a single
+   EVALSHA round trip, so limits hold across all API workers.
+"""
 import time
-from typing import Callable
+from collections import OrderedDict
+from typing import Optional
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response, JSONResponse
 import redis.asyncio as redis
+import structlog
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.core.config import settings
+from app.middleware.enumeration_protection import blocked_response
+
+logger = structlog.get_logger()
+
+# Paths that bypass rate limiting entirely (load balancer health checks)
+EXEMPT_PATHS = frozenset({"/health", "/api/health"})
+
+WINDOW_SECONDS = 60
+
+# Upper bound on clients tracked by the local token buckets
+MAX_LOCAL_BUCKETS = 10_000
+
+# Sliding-window counter: weight the previous fixed window by how much of it
+# still overlaps the sliding window, add the current window, and only count
+# the request if it is allowed.
+#
+# KEYS[1]  current window counter
+# KEYS[2]  previous window counter
+# KEYS[3]  (optional) enumeration block key - checked in the same round trip
+# ARGV[1]  limit
+# ARGV[2]  window length (ms)
+# ARGV[3]  elapsed time in current window (ms)
+#
+# Returns {allowed, estimated_count, block_ttl_ms}
+SLIDING_WINDOW_SCRIPT = """
+if KEYS[3] then
+    local block_ttl = redis.call('PTTL', KEYS[3])
+    if block_ttl > 0 then
+        return {0, 0, block_ttl}
+    end
+end
+
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local weight = (window - elapsed) / window
+local estimated = math.floor(previous * weight) + current
+
+if estimated >= limit then
+    return {0, estimated, 0}
+end
+
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('PEXPIRE', KEYS[1], window * 2)
+end
+return {1, estimated + 1, 0}
+"""
+
+
+class LocalTokenBucket:
+    """
+    In-process token buckets keyed by client.
+
+    Used as a pre-check only: a client that has exhausted its per-worker
+    budget has certainly exhausted the cluster-wide budget too, so it can be
+    rejected without asking Redis. Buckets are LRU-bounded.
+    """
+
+    def __init__(self, capacity: int, per_seconds: float = WINDOW_SECONDS, max_keys: int = MAX_LOCAL_BUCKETS):
+        self.capacity = float(capacity)
+        self.rate = capacity / per_seconds
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def consume(self, key: str, now: Optional[float] = None) -> bool:
+        """Take one token for key. Returns False if the bucket is empty."""
+        now = time.monotonic() if now is None else now
+        tokens, last = self._buckets.pop(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - last) * self.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed
+
+    def __len__(self) -> int:
+        return len(self._buckets)
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+def get_client_ip(scope: Scope) -> str:
+    """Client IP from X-Forwarded-For (first hop) or the socket peer."""
+    for name, value in scope.get("headers", ()):
+        if name == b"x-forwarded-for":
+            return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def is_auth_path(path: str) -> bool:
+    """Sensitive auth endpoints (login, register, oauth) get stricter limits.
+
+    /auth/me is excluded - it is called frequently for session checks.
+    """
+    return ("/auth/" in path or "/login" in path) and "/auth/me" not in path
+
+
+def _too_many_requests() -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests. Please try again later."},
+        headers={"Retry-After": str(WINDOW_SECONDS)},
+    )
+
+
+class RateLimitMiddleware:
     """Rate limit requests by IP address."""
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         redis_url: str = None,
         requests_per_minute: int = 60,
         auth_requests_per_minute: int = 5,
     ):
-        super().__init__(app)
+        self.app = app
         self.redis_url = redis_url or settings.redis_url
         self.requests_per_minute = requests_per_minute
         self.auth_requests_per_minute = auth_requests_per_minute
         self._redis: redis.Redis | None = None
+        self._script = None
+        self._local = LocalTokenBucket(requests_per_minute)
+        self._local_auth = LocalTokenBucket(auth_requests_per_minute)
 
     async def get_redis(self) -> redis.Redis:
         """Get or create Redis connection."""
@@ -32,54 +152,55 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             self._redis = redis.from_url(self.redis_url)
         return self._redis
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Process request with rate limiting."""
-        # Skip rate limiting for health checks
-        if request.url.path in ["/health", "/api/health"]:
-            return await call_next(request)
+    async def check(self, scope: Scope, block_key: Optional[str] = None) -> Optional[JSONResponse]:
+        """
+        Apply rate limiting to a request.
 
-        # Handle X-Forwarded-For for proxy detection
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            client_ip = forwarded.split(",")[0].strip()
-        else:
-            client_ip = request.client.host if request.client else "unknown"
-
-        # Use stricter limits for sensitive auth endpoints (login, register, oauth)
-        # Exclude /auth/me which is called frequently for session checks
-        path = request.url.path
-        is_auth_endpoint = (
-            ("/auth/" in path or "/login" in path)
-            and "/auth/me" not in path  # /auth/me is not a login attempt
-        )
-        limit = self.auth_requests_per_minute if is_auth_endpoint else self.requests_per_minute
-
-        # Create rate limit key
-        window = int(time.time() // 60)  # 1-minute window
-        key = f"rate_limit:{client_ip}:{window}"
+        Args:
+            scope: ASGI HTTP scope
+            block_key: Optional Redis key of an enumeration block to check
+                in the same round trip (see EnumerationProtectionMiddleware)
+
+        Returns:
+            An error response to send instead of the app, or None to proceed.
+        """
+        path = scope["path"]
+        if path in EXEMPT_PATHS:
+            return None
+
+        client_ip = get_client_ip(scope)
+        is_auth_endpoint = is_auth_path(path)
         if is_auth_endpoint:
-            key = f"rate_limit:auth:{client_ip}:{window}"
+            limit = self.auth_requests_per_minute
+            key_prefix = f"rate_limit:auth:{client_ip}"
+            local = self._local_auth
+        else:
+            limit = self.requests_per_minute
+            key_prefix = f"rate_limit:{client_ip}"
+            local = self._local
+
+        if not local.consume(client_ip):
+            return _too_many_requests()
+
+        now_ms = int(time.time() * 1000)
+        window_ms = WINDOW_SECONDS * 1000
+        window = now_ms // window_ms
+        keys = [f"{key_prefix}:{window}", f"{key_prefix}:{window - 1}"]
+        if block_key:
+            keys.append(block_key)
 
         try:
             r = await self.get_redis()
-            # Use pipelining to avoid race condition between INCR and EXPIRE
-            pipe = r.pipeline()
-            pipe.incr(key)
-            pipe.expire(key, 60)
-            results = await pipe.execute()
-            current = results[0]
-
-            if current > limit:
-                return JSONResponse(
-                    status_code=429,
-                    content={"detail": "Too many requests. Please try again later."},
-                    headers={"Retry-After": "60"},
-                )
+            if self._script is None:
+                self._script = r.register_script(SLIDING_WINDOW_SCRIPT)
+            allowed, _, block_ttl_ms = await self._script(
+                keys=keys,
+                args=[limit, window_ms, now_ms % window_ms],
+                client=r,
+            )
         except redis.RedisError as e:
             # SECURITY: Fail closed - deny request if rate limiting unavailable
             # This prevents attackers from bypassing rate limits by taking down Redis
-            import structlog
-            logger = structlog.get_logger()
             logger.error("Rate limiting unavailable - denying request", error=str(e))
             return JSONResponse(
                 status_code=503,
@@ -87,5 +208,19 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 headers={"Retry-After": "30"},
             )
 
-        response = await call_next(request)
-        return response
+        if int(block_ttl_ms) > 0:
+            return blocked_response()
+        if not int(allowed):
+            return _too_many_requests()
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response = await self.check(scope)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
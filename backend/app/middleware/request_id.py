@@ -1,14 +1,33 @@
 """Request ID middleware for distributed tracing."""
 import uuid
-from typing import Callable
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
 import structlog
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
-class RequestIdMiddleware(BaseHTTPMiddleware):
+def get_request_id(scope: Scope) -> str:
+    """Use the X-Request-ID header if provided by client/proxy, otherwise generate one."""
+    for name, value in scope.get("headers", ()):
+        if name == b"x-request-id":
+            return value.decode("latin-1")
+    return str(uuid.uuid4())
+
+
+def bind_request_id(scope: Scope) -> str:
+    """Bind a request ID to structlog context and request state."""
+    request_id = get_request_id(scope)
+
+    # Bind to structlog context for automatic inclusion in all log messages
+    structlog.contextvars.clear_contextvars()
+    structlog.contextvars.bind_contextvars(request_id=request_id)
+
+    # Store in request state for access in routes (request.state.request_id)
+    scope.setdefault("state", {})["request_id"] = request_id
+    return request_id
+
+
+class RequestIdMiddleware:
     """Add unique request ID to each request for tracing.
 
     This middleware:
@@ -18,20 +37,20 @@ class RequestIdMiddleware(BaseHTTPMiddleware):
     4. Returns the request ID in response headers for client correlation
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Use X-Request-ID header if provided, otherwise generate
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
-
-        # Bind to structlog context for automatic inclusion in all log messages
-        structlog.contextvars.clear_contextvars()
-        structlog.contextvars.bind_contextvars(request_id=request_id)
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        # Store in request state for access in routes
-        request.state.request_id = request_id
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        response = await call_next(request)
+        request_id = bind_request_id(scope)
 
-        # Add to response headers for client correlation
-        response.headers["X-Request-ID"] = request_id
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add to response headers for client correlation
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_wrapper)
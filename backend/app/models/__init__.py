@@ -33,6 +33,8 @@ from app.models.collection_stats import CollectionStats
 from app.models.user_milestone import UserMilestone, MilestoneType
 from app.models.import_job import ImportJob, ImportPlatform, ImportStatus
 from app.models.portfolio_snapshot import PortfolioSnapshot
+from app.models.inventory_index import InventoryIndexDay, InventoryIndexDirtyUser
+from app.models.data_watermark import DataWatermark
 from app.models.saved_search import SavedSearch, SearchAlertFrequency
 from app.models.connection import (
     ConnectionRequest,
@@ -121,6 +123,9 @@ __all__ = [
     "ImportPlatform",
     "ImportStatus",
     "PortfolioSnapshot",
+    "InventoryIndexDay",
+    "InventoryIndexDirtyUser",
+    "DataWatermark",
     "SavedSearch",
     "SearchAlertFrequency",
     "NewsArticle",
@@ -4,7 +4,8 @@ Card model representing MTG cards from canonical sources.
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Boolean, DateTime, Float, Index, Integer, String, Text, func
+from sqlalchemy import Boolean, DateTime, Float, Index, Integer, SmallInteger, String, Text, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -68,6 +69,12 @@ class Card(Base):
     reserved_list: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     meta_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
+    # Normalized search filters, derived from colors/legalities/keywords
+    # (see app.core.constants.card_search_fields)
+    color_mask: Mapped[int] = mapped_column(SmallInteger, default=0, server_default="0", nullable=False)
+    legal_formats: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    keyword_list: Mapped[Optional[list[str]]] = mapped_column(ARRAY(String(64)), nullable=True)
+
     # Media
     image_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     image_url_small: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
@@ -120,6 +127,17 @@ class Card(Base):
     __table_args__ = (
         Index("ix_cards_name_set", "name", "set_code"),
         Index("ix_cards_set_collector", "set_code", "collector_number"),
+        # Search indexes; the full-text expression index lives in migration 20260119_004.
+        # color_mask and legal_formats are unselective recheck filters and stay unindexed.
+        Index(
+            "ix_cards_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_cards_type_line_trgm", "type_line",
+            postgresql_using="gin", postgresql_ops={"type_line": "gin_trgm_ops"},
+        ),
+        Index("ix_cards_keyword_list", "keyword_list", postgresql_using="gin"),
     )
     
     def __repr__(self) -> str:
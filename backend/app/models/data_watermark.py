@@ -0,0 +1,40 @@
+"""Per-dataset watermarks maintained by ingestion and analytics jobs."""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DataWatermark(Base):
+    """
+    Last run of the jobs that write a dataset.
+
+    One row per dataset (price_snapshots, metrics_cards_daily, ...),
+    upserted by each job when it finishes, so freshness checks read a
+    handful of rows instead of scanning the tables themselves (see
+    app.core.data_freshness).
+    """
+
+    __tablename__ = "data_watermarks"
+
+    name: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    # When a job last finished writing this dataset
+    last_run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Newest data timestamp written so far (never moves backwards)
+    latest_data_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Rows written by the last run
+    rows_written: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    last_job: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+
+    __table_args__ = (
+        Index("ix_data_watermarks_name", "name", unique=True),
+    )
+
+    def __repr__(self) -> str:
+        return f"<DataWatermark {self.name} latest={self.latest_data_at}>"
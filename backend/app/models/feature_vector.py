@@ -76,6 +76,10 @@ class CardFeatureVector(FeatureVectorBase):
         String, default="all-MiniLM-L6-v2", nullable=False
     )
 
+    # Hash of the card content the vector was built from (see
+    # VectorizationService.card_content_hash); unchanged cards are skipped
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
     # Relationships
     card: Mapped["Card"] = relationship("Card", overlaps="feature_vector")
 
@@ -0,0 +1,110 @@
+"""Precomputed inventory index series (one row per user per day)."""
+from datetime import date, datetime
+from itertools import chain
+from typing import Optional
+
+from sqlalchemy import BigInteger, Date, DateTime, ForeignKey, Index, LargeBinary, event, func, inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from app.db.base import Base
+from app.models.inventory import InventoryItem
+
+
+class InventoryIndexDay(Base):
+    """
+    One day of a user's quantity-weighted inventory price series.
+
+    Values are packed float32 arrays (see app.services.inventory_index):
+    - daily: (3 price modes, [weighted value, quantity])
+    - intraday: (48 half-hour + 24 hourly + 6 four-hour buckets, 3 price modes,
+      [weighted value, quantity]), kept only for recent days and NULL once
+      past the intraday retention window
+
+    Storing weighted value and quantity (rather than an index value) lets
+    days be joined with on-the-fly sums and normalized to any range start.
+    """
+
+    __tablename__ = "inventory_index_days"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+
+    daily: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    intraday: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+
+    # Most recent price snapshot that contributed to this day
+    latest_snapshot_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    # Fingerprint of the (card, quantity) inventory the day was weighted with
+    inventory_hash: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+
+    __table_args__ = (
+        Index("ix_inventory_index_days_user_day", "user_id", "day", unique=True),
+    )
+
+    def __repr__(self) -> str:
+        return f"<InventoryIndexDay user={self.user_id} day={self.day}>"
+
+
+class InventoryIndexDirtyUser(Base):
+    """
+    A user whose inventory changed since their index series was computed.
+
+    Rows are written on every flush that adds, removes or re-weights an
+    inventory item, and consumed by app.services.inventory_index, which
+    restates only these users' stored days.
+    """
+
+    __tablename__ = "inventory_index_dirty_users"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+    # Wall-clock time of the latest change; a restate only clears the
+    # marker if no newer change arrived while it ran
+    marked_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.clock_timestamp(),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return f"<InventoryIndexDirtyUser user={self.user_id}>"
+
+
+# Inventory columns the index weights depend on
+_WEIGHT_ATTRIBUTES = ("user_id", "card_id", "quantity")
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_inventory_index_dirty(session, flush_context):
+    """Record the owners of inventory items changed by this flush."""
+    user_ids = set()
+    for item in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(item, InventoryItem):
+            continue
+        state = inspect(item)
+        if item in session.dirty:
+            histories = [state.attrs[name].history for name in _WEIGHT_ATTRIBUTES]
+            if not any(history.has_changes() for history in histories):
+                continue
+            # Items moved between users re-weight the previous owner too
+            user_ids.update(histories[0].deleted or ())
+        user_ids.add(state.dict.get("user_id"))
+    user_ids.discard(None)
+    if not user_ids:
+        return
+
+    stmt = insert(InventoryIndexDirtyUser).values([{"user_id": user_id} for user_id in sorted(user_ids)])
+    session.connection().execute(stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"marked_at": func.clock_timestamp(), "updated_at": func.now()},
+    ))
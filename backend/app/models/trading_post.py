@@ -13,6 +13,7 @@ from typing import TYPE_CHECKING, List, Optional
 
 from sqlalchemy import (
     DateTime,
+    Float,
     ForeignKey,
     Integer,
     JSON,
@@ -80,6 +81,9 @@ class TradingPost(Base):
     state: Mapped[Optional[str]] = mapped_column(String(50), nullable=True, index=True)
     country: Mapped[str] = mapped_column(String(50), default="US", nullable=False)
     postal_code: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    # Geocoded from postal_code; indexed via ll_to_earth() GiST index (see migration)
+    latitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    longitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     # Contact
     phone: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
@@ -228,77 +228,6 @@ class MarketRepository:
 
         return [dict(row._mapping) for row in result]
 
-    async def get_spread_opportunities(
-        self,
-        currency: str = "USD",
-        min_spread_pct: float = 0.15,
-        limit: int = 20,
-    ) -> list[dict[str, Any]]:
-        """
-        Find arbitrage opportunities based on price spreads between marketplaces.
-
-        Args:
-            currency: Currency to filter by
-            min_spread_pct: Minimum spread percentage (0.15 = 15%)
-            limit: Maximum number of results
-
-        Returns:
-            List of arbitrage opportunities
-        """
-        query = text("""
-            WITH recent_prices AS (
-                SELECT DISTINCT ON (card_id, marketplace_id)
-                    card_id,
-                    marketplace_id,
-                    price,
-                    time
-                FROM price_snapshots
-                WHERE currency = :currency
-                  AND time >= NOW() - INTERVAL '1 hour'
-                  AND price > 0
-                ORDER BY card_id, marketplace_id, time DESC
-            ),
-            spreads AS (
-                SELECT
-                    rp1.card_id,
-                    rp1.marketplace_id as buy_marketplace_id,
-                    rp2.marketplace_id as sell_marketplace_id,
-                    rp1.price as buy_price,
-                    rp2.price as sell_price,
-                    rp2.price - rp1.price as spread,
-                    (rp2.price - rp1.price) / rp1.price as spread_pct
-                FROM recent_prices rp1
-                JOIN recent_prices rp2 ON rp1.card_id = rp2.card_id
-                    AND rp1.marketplace_id != rp2.marketplace_id
-                    AND rp2.price > rp1.price
-            )
-            SELECT
-                s.card_id,
-                c.name as card_name,
-                c.set_code,
-                m1.name as buy_marketplace,
-                m2.name as sell_marketplace,
-                s.buy_price,
-                s.sell_price,
-                s.spread,
-                s.spread_pct
-            FROM spreads s
-            JOIN cards c ON c.id = s.card_id
-            JOIN marketplaces m1 ON m1.id = s.buy_marketplace_id
-            JOIN marketplaces m2 ON m2.id = s.sell_marketplace_id
-            WHERE s.spread_pct >= :min_spread_pct
-            ORDER BY s.spread_pct DESC
-            LIMIT :limit
-        """)
-
-        result = await self.db.execute(query, {
-            "currency": currency,
-            "min_spread_pct": min_spread_pct,
-            "limit": limit,
-        })
-
-        return [dict(row._mapping) for row in result]
-
     async def get_volume_by_format(
         self,
         currency: str = "USD",
@@ -5,10 +5,12 @@ This repository handles all price-related database operations,
 including inserting new snapshots and querying historical data
 from both the hypertable and continuous aggregates.
 """
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
+import structlog
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.constants import (
@@ -17,6 +19,16 @@ from app.core.constants import (
     PERIOD_INTERVALS,
 )
 
+# Longest range served from card_prices_hourly; longer ranges (including
+# the endpoint's 30-day default, which has always returned one point per
+# day) use the card_prices_daily rollup
+HOURLY_HISTORY_MAX_DAYS = 7
+
+# Continuous aggregates the card history endpoint reads
+CARD_PRICE_AGGREGATES = ("card_prices_hourly", "card_prices_daily")
+
+logger = structlog.get_logger()
+
 
 class PriceRepository:
     """
@@ -240,6 +252,183 @@ class PriceRepository:
         result = await self.db.execute(query, params)
         return [dict(row._mapping) for row in result]
 
+    async def get_card_history_series(
+        self,
+        card_id: int,
+        since: datetime,
+        *,
+        condition: CardCondition | None = None,
+        is_foil: bool | None = None,
+        has_market_price: bool | None = None,
+        currency: str = "USD",
+        marketplace_id: int | None = None,
+        exclude_marketplaces: tuple[str, ...] = ("mtgo",),
+        now: datetime | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Get bucketed per-marketplace price history for a card chart.
+
+        Ranges up to HOURLY_HISTORY_MAX_DAYS read card_prices_hourly,
+        longer ranges read card_prices_daily. Buckets newer than the
+        aggregate refresh lag are computed from price_snapshots, like
+        MarketRepository.get_market_index, so the newest data is always
+        included while the cost of a request stays bounded by the number
+        of buckets rather than the number of snapshots.
+
+        Args:
+            card_id: Card to get history for
+            since: Start of the range (timezone-aware)
+            condition: Filter by condition
+            is_foil: Filter by foil status
+            has_market_price: Only buckets whose variant has (True) or has
+                no (False) market price; legacy ingestion stores foil prices
+                there. This is decided per aggregated variant and bucket,
+                not per snapshot: one snapshot with a market price makes
+                the bucket count as having one (for both the aggregate
+                and the real-time tail)
+            currency: Currency to filter by
+            marketplace_id: Filter by marketplace
+            exclude_marketplaces: Marketplace slugs to leave out
+            now: Current time, for tests
+
+        Returns:
+            Rows with time, bucket_interval, marketplace_id,
+            marketplace_name, marketplace_slug, currency, avg_price,
+            avg_market_price, min_price, max_price and total_listings,
+            ordered by time
+        """
+        now = now or datetime.now(timezone.utc)
+        if now - since <= timedelta(days=HOURLY_HISTORY_MAX_DAYS):
+            table, bucket, lag = "card_prices_hourly", timedelta(hours=1), timedelta(hours=2)
+        else:
+            table, bucket, lag = "card_prices_daily", timedelta(days=1), timedelta(days=2)
+
+        # Align the cutoff to a bucket boundary so no bucket is split
+        # between the aggregate and the real-time tail
+        epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+        lag_cutoff = now - lag
+        lag_cutoff -= (lag_cutoff - epoch) % bucket
+
+        conditions = ["{t}.card_id = :card_id", "{t}.currency = :currency"]
+        params: dict[str, Any] = {
+            "card_id": card_id,
+            "currency": currency,
+            "since": since,
+            "lag_cutoff": lag_cutoff,
+            "bucket": bucket,
+        }
+        if condition:
+            conditions.append("{t}.condition = :condition")
+            params["condition"] = condition.value
+        if is_foil is not None:
+            conditions.append("{t}.is_foil = :is_foil")
+            params["is_foil"] = is_foil
+        if marketplace_id:
+            conditions.append("{t}.marketplace_id = :marketplace_id")
+            params["marketplace_id"] = marketplace_id
+
+        # Applied to per-variant bucket rows, so the aggregate and the
+        # real-time tail filter the same way
+        bucket_conditions = []
+        if has_market_price is True:
+            bucket_conditions.append("h.avg_market_price IS NOT NULL")
+        elif has_market_price is False:
+            bucket_conditions.append("h.avg_market_price IS NULL")
+        for i, slug in enumerate(exclude_marketplaces):
+            bucket_conditions.append(f"m.slug != :exclude_{i}")
+            params[f"exclude_{i}"] = slug
+
+        def where(alias: str, extra: list[str]) -> str:
+            return " AND ".join([c.format(t=alias) for c in conditions] + extra)
+
+        # Combines per-variant bucket rows (h) across the variants the
+        # filters leave open
+        combine = """
+            SELECT
+                h.bucket AS time,
+                h.marketplace_id,
+                m.name AS marketplace_name,
+                m.slug AS marketplace_slug,
+                MAX(h.currency) AS currency,
+                AVG(h.avg_price) AS avg_price,
+                AVG(h.avg_market_price) AS avg_market_price,
+                MIN(h.min_price) AS min_price,
+                MAX(h.max_price) AS max_price,
+                SUM(h.total_listings) AS total_listings
+            FROM {source} h
+            JOIN marketplaces m ON m.id = h.marketplace_id
+            WHERE {where}
+            GROUP BY h.bucket, h.marketplace_id, m.name, m.slug
+            ORDER BY h.bucket
+        """
+
+        # Query 1: materialized buckets (before lag cutoff)
+        aggregate_query = text(combine.format(
+            source=table,
+            where=where("h", bucket_conditions + ["h.bucket >= :since", "h.bucket < :lag_cutoff"]),
+        ))
+
+        # Query 2: real-time tail from the hypertable (after lag cutoff),
+        # bucketed per variant like the aggregates
+        realtime_query = text(combine.format(
+            source=f"""(
+                SELECT
+                    time_bucket(:bucket, s.time) AS bucket,
+                    s.marketplace_id,
+                    s.currency,
+                    AVG(s.price) AS avg_price,
+                    AVG(s.price_market) AS avg_market_price,
+                    MIN(s.price_low) AS min_price,
+                    MAX(s.price_high) AS max_price,
+                    SUM(s.num_listings) AS total_listings
+                FROM price_snapshots s
+                WHERE {where("s", ["s.time >= GREATEST(:since, :lag_cutoff)", "s.price > 0"])}
+                GROUP BY 1, s.marketplace_id, s.condition, s.is_foil, s.language, s.currency
+            )""",
+            where=" AND ".join(bucket_conditions) or "TRUE",
+        ))
+
+        rows = []
+        for query in (aggregate_query, realtime_query):
+            result = await self.db.execute(query, params)
+            rows.extend({**row._mapping, "bucket_interval": bucket} for row in result)
+        return rows
+
+    async def refresh_card_price_aggregates(
+        self,
+        start: datetime,
+        end: datetime | None = None,
+    ) -> None:
+        """
+        Materialize the card price aggregates over a time range.
+
+        The refresh policies only cover the last few buckets, so jobs
+        that write older snapshots (historical imports) call this for the
+        range they wrote. Runs on its own autocommit connection, since
+        refresh_continuous_aggregate cannot run inside a transaction;
+        failures are logged and the policies catch up on recent buckets.
+
+        Args:
+            start: Oldest snapshot time written
+            end: Newest snapshot time written (default: now)
+        """
+        end = end or datetime.now(timezone.utc)
+        async with self.db.bind.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            for view in CARD_PRICE_AGGREGATES:
+                try:
+                    await connection.execute(
+                        text(
+                            f"CALL refresh_continuous_aggregate('{view}', "
+                            "CAST(:start AS timestamptz), CAST(:end AS timestamptz))"
+                        ),
+                        {"start": start, "end": end},
+                    )
+                except DBAPIError as e:
+                    logger.warning(
+                        "Continuous aggregate refresh failed", view=view, error=str(e)
+                    )
+
     async def get_latest_price(
         self,
         card_id: int,
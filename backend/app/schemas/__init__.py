@@ -62,6 +62,8 @@ from app.schemas.collection import (
     CollectionStatsResponse,
     SetCompletion,
     SetCompletionList,
+    MissingCard,
+    MissingCardList,
     MilestoneResponse,
     MilestoneList,
 )
@@ -172,6 +174,8 @@ __all__ = [
     "CollectionStatsResponse",
     "SetCompletion",
     "SetCompletionList",
+    "MissingCard",
+    "MissingCardList",
     "MilestoneResponse",
     "MilestoneList",
     # TypedDict schemas - Market
@@ -79,6 +79,7 @@ class CardSearchResponse(BaseModel):
     page: int = 1
     page_size: int = 20
     has_more: bool = False
+    total_is_estimate: bool = False  # Planner estimate for broad queries
 
 
 class CardCursorSearchResponse(BaseModel):
@@ -102,6 +103,10 @@ class CardCursorSearchResponse(BaseModel):
         default=None,
         description="Total matching count. Only included if include_count=true (adds query overhead)"
     )
+    total_is_estimate: bool = Field(
+        default=False,
+        description="True if total_count is a planner estimate (broad queries)"
+    )
 
 
 class PricePoint(BaseModel):
@@ -194,6 +199,7 @@ class CardDetailResponse(BaseModel):
     active_recommendations: list["RecommendationSummary"] = []
     refresh_requested: bool = False
     refresh_reason: Optional[str] = None
+    refresh_job_id: Optional[str] = Field(default=None, description="Background refresh job; completion is pushed on the card:{id} WebSocket channel")
     has_price_data: bool = Field(default=False, description="True if current_prices contains real price data")
 
 
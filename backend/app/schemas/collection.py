@@ -41,6 +41,22 @@ class SetCompletionList(BaseModel):
     total_sets: int
 
 
+class MissingCard(BaseModel):
+    """A card of a set the user does not own."""
+    card_id: int
+    name: str
+    collector_number: str
+    rarity: Optional[str] = None
+    image_url_small: Optional[str] = None
+
+
+class MissingCardList(BaseModel):
+    """Cards missing from a set, in collector number order."""
+    set_completion: SetCompletion
+    items: list[MissingCard]
+    total_missing: int
+
+
 class MilestoneResponse(BaseModel):
     """Achieved milestone response."""
     id: int
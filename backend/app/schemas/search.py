@@ -34,6 +34,7 @@ class SearchResponse(BaseModel):
     has_more: bool
     query: str
     search_type: str = "semantic"  # "semantic" or "text"
+    total_is_estimate: bool = False  # Planner estimate for broad text queries
 
 
 class AutocompleteSuggestion(BaseModel):
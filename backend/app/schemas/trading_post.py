@@ -97,6 +97,8 @@ class TradingPostResponse(BaseModel):
     state: Optional[str] = None
     country: str
     postal_code: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     phone: Optional[str] = None
     website: Optional[str] = None
     hours: Optional[dict] = None
@@ -129,6 +131,7 @@ class TradingPostPublic(BaseModel):
     services: Optional[list[str]] = None
     logo_url: Optional[str] = None
     is_verified: bool = False
+    distance_km: Optional[float] = None  # Only set by radius searches
 
     class Config:
         from_attributes = True
@@ -142,6 +145,16 @@ class TradingPostListResponse(BaseModel):
     page_size: int
 
 
+class TradingPostRadiusResponse(BaseModel):
+    """Trading posts within a radius, nearest first (keyset paginated)."""
+    items: list[TradingPostPublic]
+    latitude: float
+    longitude: float
+    radius_km: float
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+
 # ============ Event Schemas ============
 
 class EventCreate(BaseModel):
@@ -1,18 +1,33 @@
 """
 Export vectorized training data for ML models.
 
-This script exports pre-vectorized feature vectors and labels
-ready for immediate use in training pipelines.
+This script exports pre-vectorized feature vectors and price series as
+columnar shards ready for immediate use in training pipelines.
+
+The export is a streaming, set-based pipeline:
+1. Cards with feature vectors are read in keyset batches (card_id > last).
+2. One grouped query per batch keeps cards with enough snapshots.
+3. Their snapshots are streamed in large partitions and converted to
+   NumPy column arrays.
+4. Rows are written as NPZ (or Parquet) shards of at most shard_rows rows;
+   each shard carries the feature vectors of the cards it references.
+5. manifest.json lists the shards, columns, vocabularies and feature layout.
+
+Memory is bounded by the shard size, not by the catalog or history length.
+
+Usage:
+    python -m app.scripts.export_training_data [output_dir] [min_snapshots] [npz|parquet]
 """
 import asyncio
 import json
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
 import numpy as np
 import structlog
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -21,7 +36,6 @@ from sqlalchemy.ext.asyncio import (
 
 from app.core.config import settings
 from app.models import (
-    Card,
     CardFeatureVector,
     PriceSnapshot,
     Marketplace,
@@ -29,27 +43,234 @@ from app.models import (
 
 logger = structlog.get_logger()
 
+MANIFEST_VERSION = 2
+
+CARD_BATCH_SIZE = 2000
+SNAPSHOT_FETCH_ROWS = 50_000
+SHARD_ROWS = 1_000_000
+HISTORY_DAYS = 730
+
+# Snapshot columns in each shard (besides card_row), with their dtypes.
+# Missing prices are NaN, missing counts are 0.
+SNAPSHOT_COLUMNS: dict[str, str] = {
+    "card_id": "int32",
+    "time": "int64",  # Unix seconds, UTC
+    "marketplace_id": "int16",
+    "condition": "int8",  # code, see manifest vocabularies
+    "is_foil": "bool",
+    "language": "int8",  # code
+    "currency": "int8",  # code
+    "source": "int8",  # code
+    "price": "float32",
+    "price_market": "float32",
+    "price_low": "float32",
+    "price_high": "float32",
+    "price_mid": "float32",
+    "num_listings": "int32",
+    "total_quantity": "int32",
+}
+CATEGORICAL_COLUMNS = ("condition", "language", "currency", "source")
+
+# Per-snapshot features appended to the card vector by snapshot_features()
+SNAPSHOT_FEATURES = (
+    "time",
+    "price",
+    "price_market",
+    "price_low",
+    "price_high",
+    "price_mid",
+    "num_listings",
+    "total_quantity",
+    "marketplace_id",
+)
+
+
+def encode_categorical(values, vocabulary: dict[str, int]) -> np.ndarray:
+    """Map strings to int codes, growing the vocabulary as needed."""
+    return np.fromiter(
+        (vocabulary.setdefault(v, len(vocabulary)) for v in values),
+        dtype=np.int8,
+        count=len(values),
+    )
+
+
+def rows_to_columns(
+    rows: list[tuple],
+    vocabularies: dict[str, dict[str, int]],
+) -> dict[str, np.ndarray]:
+    """Convert snapshot rows (SNAPSHOT_COLUMNS order) into typed column arrays."""
+    raw = dict(zip(SNAPSHOT_COLUMNS, zip(*rows)))
+    columns: dict[str, np.ndarray] = {}
+    for name, dtype in SNAPSHOT_COLUMNS.items():
+        values = raw[name]
+        if name in CATEGORICAL_COLUMNS:
+            columns[name] = encode_categorical(values, vocabularies[name])
+        elif dtype.startswith("float"):
+            # None -> NaN
+            columns[name] = np.array(values, dtype=np.float64).astype(dtype)
+        elif name in ("time", "num_listings", "total_quantity"):
+            # Epoch seconds arrive as Decimal; missing counts become 0
+            columns[name] = np.nan_to_num(np.array(values, dtype=np.float64)).astype(dtype)
+        else:
+            columns[name] = np.array(values).astype(dtype)
+    return columns
+
+
+def snapshot_features(card_vectors: np.ndarray, columns: dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Build per-snapshot model inputs for a shard.
+
+    Each row is the card's feature vector followed by SNAPSHOT_FEATURES,
+    with missing values as 0.
+    """
+    extra = np.column_stack([columns[name].astype(np.float32) for name in SNAPSHOT_FEATURES])
+    return np.hstack([card_vectors[columns["card_row"]], np.nan_to_num(extra)])
+
+
+class ShardWriter:
+    """Buffer column arrays and write them out as fixed-size shards."""
+
+    def __init__(
+        self,
+        output_dir: Path,
+        card_vectors: dict[int, np.ndarray],
+        feature_dim: int,
+        shard_rows: int = SHARD_ROWS,
+        file_format: str = "npz",
+        include_labels: bool = True,
+    ):
+        if file_format not in ("npz", "parquet"):
+            raise ValueError(f"Unsupported format: {file_format}")
+        self.output_dir = output_dir
+        self.card_vectors = card_vectors
+        self.feature_dim = feature_dim
+        self.shard_rows = shard_rows
+        self.file_format = file_format
+        self.include_labels = include_labels
+        self.shards: list[dict[str, Any]] = []
+        self._buffer: list[dict[str, np.ndarray]] = []
+        self._buffered_rows = 0
+
+    def add(self, columns: dict[str, np.ndarray]) -> None:
+        self._buffer.append(columns)
+        self._buffered_rows += len(columns["card_id"])
+        while self._buffered_rows >= self.shard_rows:
+            self._write(self._take(self.shard_rows))
+
+    def close(self) -> None:
+        if self._buffered_rows:
+            self._write(self._take(self._buffered_rows))
+
+    def prune_vectors(self) -> None:
+        """Drop feature vectors of cards that no buffered row references."""
+        buffered = {
+            int(card_id)
+            for part in self._buffer
+            for card_id in np.unique(part["card_id"])
+        }
+        for card_id in set(self.card_vectors) - buffered:
+            del self.card_vectors[card_id]
+
+    def _take(self, n: int) -> dict[str, np.ndarray]:
+        """Remove the first n buffered rows as one set of columns."""
+        merged = {
+            name: np.concatenate([part[name] for part in self._buffer])
+            for name in SNAPSHOT_COLUMNS
+        }
+        taken = {name: values[:n] for name, values in merged.items()}
+        rest = {name: values[n:] for name, values in merged.items()}
+        self._buffered_rows -= n
+        self._buffer = [rest] if self._buffered_rows else []
+        return taken
+
+    def _write(self, columns: dict[str, np.ndarray]) -> None:
+        card_ids, card_row = np.unique(columns["card_id"], return_inverse=True)
+        vectors = np.vstack([self.card_vectors[int(card_id)] for card_id in card_ids])
+        columns = {**columns, "card_row": card_row.astype(np.int32)}
+
+        name = f"shard-{len(self.shards):05d}"
+        if self.file_format == "npz":
+            files = [f"{name}.npz"]
+            arrays = {**columns, "card_ids": card_ids, "card_vectors": vectors}
+            if self.include_labels:
+                arrays["labels"] = columns["price"]
+            np.savez(self.output_dir / files[0], **arrays)
+        else:
+            files = self._write_parquet(name, columns, card_ids, vectors)
+
+        self.shards.append({
+            "files": files,
+            "rows": int(len(card_row)),
+            "cards": int(len(card_ids)),
+        })
+        logger.info("Wrote training shard", shard=name, rows=len(card_row), cards=len(card_ids))
+
+    def _write_parquet(
+        self,
+        name: str,
+        columns: dict[str, np.ndarray],
+        card_ids: np.ndarray,
+        vectors: np.ndarray,
+    ) -> list[str]:
+        # pyarrow is only needed for Parquet output
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.table(columns), self.output_dir / f"{name}.parquet")
+        cards = pa.table({
+            "card_id": card_ids,
+            "vector": pa.FixedSizeListArray.from_arrays(
+                pa.array(vectors.ravel()), self.feature_dim
+            ),
+        })
+        pq.write_table(cards, self.output_dir / f"{name}-cards.parquet")
+        return [f"{name}.parquet", f"{name}-cards.parquet"]
+
+
+async def _card_vector_batches(db: AsyncSession, batch_size: int):
+    """Yield lists of (card_id, feature_vector) in card_id keyset order."""
+    last_id = 0
+    while True:
+        result = await db.execute(
+            select(CardFeatureVector.card_id, CardFeatureVector.feature_vector)
+            .where(CardFeatureVector.card_id > last_id)
+            .order_by(CardFeatureVector.card_id)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].card_id
+
 
 async def export_training_data(
     output_dir: Path,
     min_snapshots_per_card: int = 5,
     include_labels: bool = True,
     include_historical_prices: bool = True,
+    history_days: int = HISTORY_DAYS,
+    shard_rows: int = SHARD_ROWS,
+    file_format: str = "npz",
 ) -> dict[str, Any]:
     """
-    Export vectorized training data from Scryfall and MTGJSON price snapshots.
-    
+    Export vectorized training data from price snapshots.
+
     Args:
         output_dir: Directory to save exported data.
         min_snapshots_per_card: Minimum price snapshots per card to include.
         include_labels: Whether to include price labels for supervised learning.
         include_historical_prices: Whether to include MTGJSON historical price data.
-        
+        history_days: Days of price history to export.
+        shard_rows: Maximum snapshot rows per shard.
+        file_format: "npz" or "parquet" (requires pyarrow).
+
     Returns:
         Export statistics.
     """
     output_dir.mkdir(parents=True, exist_ok=True)
-    
+    since = datetime.now(timezone.utc) - timedelta(days=history_days)
+
     # Create database session
     engine = create_async_engine(
         settings.database_url_computed,
@@ -57,265 +278,142 @@ async def export_training_data(
         pool_pre_ping=True,
     )
     session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    
+
     try:
         async with session_maker() as db:
-            # Get all cards with feature vectors
-            cards_query = select(Card).join(CardFeatureVector).distinct()
-            result = await db.execute(cards_query)
-            cards = result.scalars().all()
-            
-            logger.info("Found cards with vectors", count=len(cards))
-            
-            # Collect training data from price snapshots
-            card_vectors = []
-            snapshot_vectors = []
-            labels = []
-            metadata = []
-            
-            for card in cards:
-                # Get card vector
-                card_vector_query = select(CardFeatureVector).where(
-                    CardFeatureVector.card_id == card.id
+            result = await db.execute(select(Marketplace.id, Marketplace.slug))
+            marketplaces = {row.id: row.slug for row in result}
+
+            # Most common vector length; vectors of another length are skipped
+            result = await db.execute(
+                select(CardFeatureVector.feature_dim, func.count())
+                .group_by(CardFeatureVector.feature_dim)
+            )
+            dims = Counter({row[0]: row[1] for row in result})
+            if not dims:
+                logger.warning("No card feature vectors found")
+                return {"samples": 0, "output_dir": str(output_dir)}
+            feature_dim = dims.most_common(1)[0][0]
+
+            vocabularies: dict[str, dict[str, int]] = {name: {} for name in CATEGORICAL_COLUMNS}
+            card_vectors: dict[int, np.ndarray] = {}
+            writer = ShardWriter(
+                output_dir, card_vectors, feature_dim, shard_rows, file_format, include_labels
+            )
+            stats = {"cards": 0, "samples": 0, "skipped_dim": 0}
+
+            snapshot_filters = [PriceSnapshot.price > 0, PriceSnapshot.time >= since]
+            if not include_historical_prices:
+                snapshot_filters.append(PriceSnapshot.source != "mtgjson")
+
+            async for batch in _card_vector_batches(db, CARD_BATCH_SIZE):
+                vectors = {}
+                for card_id, blob in batch:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    if len(vector) == feature_dim:
+                        vectors[card_id] = vector
+                    else:
+                        stats["skipped_dim"] += 1
+
+                # Cards with enough history, in one grouped query
+                result = await db.execute(
+                    select(PriceSnapshot.card_id)
+                    .where(PriceSnapshot.card_id.in_(list(vectors)), *snapshot_filters)
+                    .group_by(PriceSnapshot.card_id)
+                    .having(func.count() >= min_snapshots_per_card)
                 )
-                card_vector_result = await db.execute(card_vector_query)
-                card_vector_obj = card_vector_result.scalar_one_or_none()
-                
-                if not card_vector_obj:
+                eligible = sorted(row[0] for row in result)
+                if not eligible:
                     continue
-                
-                card_vec = card_vector_obj.get_vector()
-                
-                # Get price snapshots for this card (from Scryfall and MTGJSON)
-                snapshots_query = select(PriceSnapshot).where(
-                    PriceSnapshot.card_id == card.id,
-                    PriceSnapshot.price > 0
-                ).order_by(PriceSnapshot.time.desc())
-                snapshots_result = await db.execute(snapshots_query)
-                card_snapshots = snapshots_result.scalars().all()
-                
-                if len(card_snapshots) < min_snapshots_per_card:
-                    continue
-                
-                # Use price snapshots as training examples
-                # For each snapshot, combine card vector with snapshot metadata
-                for snapshot in card_snapshots:
-                    # Get marketplace info
-                    marketplace_query = select(Marketplace).where(Marketplace.id == snapshot.marketplace_id)
-                    marketplace_result = await db.execute(marketplace_query)
-                    marketplace = marketplace_result.scalar_one_or_none()
-                    
-                    # Create snapshot feature vector by combining card vector with snapshot features
-                    # Features: card vector + timestamp features + marketplace features
-                    # Note: PriceSnapshot uses composite PK (time, card_id, marketplace_id, condition, is_foil, language)
-                    # and doesn't have avg_price, median_price, or id columns
-                    snapshot_features = np.concatenate([
-                        card_vec,
-                        np.array([
-                            snapshot.time.timestamp() if snapshot.time else 0,
-                            float(snapshot.price) if snapshot.price else 0,
-                            float(snapshot.price_market) if snapshot.price_market else 0,
-                            float(snapshot.price_low) if snapshot.price_low else 0,
-                            float(snapshot.price_high) if snapshot.price_high else 0,
-                            float(snapshot.price_mid) if snapshot.price_mid else 0,  # Use price_mid instead of avg_price
-                            float(snapshot.price) if snapshot.price else 0,  # Use price instead of median_price
-                            int(snapshot.num_listings) if snapshot.num_listings else 0,
-                            int(snapshot.total_quantity) if snapshot.total_quantity else 0,
-                            snapshot.marketplace_id or 0,
-                        ])
-                    ])
-                    
-                    card_vectors.append(card_vec)
-                    snapshot_vectors.append(snapshot_features)
-                    
-                    if include_labels:
-                        # Use future price as label (if available)
-                        # For now, use current price as label
-                        labels.append(float(snapshot.price) if snapshot.price else 0.0)
-                    
-                    # Composite key for PriceSnapshot: (time, card_id, marketplace_id, condition, is_foil, language)
-                    metadata.append({
-                        "card_id": card.id,
-                        "card_name": card.name,
-                        "set_code": card.set_code,
-                        "snapshot_key": {
-                            "time": snapshot.time.isoformat() if snapshot.time else None,
-                            "card_id": snapshot.card_id,
-                            "marketplace_id": snapshot.marketplace_id,
-                            "condition": snapshot.condition,
-                            "is_foil": snapshot.is_foil,
-                            "language": snapshot.language,
-                        },
-                        "price": float(snapshot.price) if snapshot.price else 0.0,
-                        "price_foil": float(snapshot.price_market) if snapshot.price_market else None,
-                        "marketplace_id": snapshot.marketplace_id,
-                        "marketplace_slug": marketplace.slug if marketplace else None,
-                        "snapshot_time": snapshot.time.isoformat() if snapshot.time else None,
-                        "currency": snapshot.currency,
-                        "condition": snapshot.condition,
-                        "is_foil": snapshot.is_foil,
-                        "language": snapshot.language,
-                    })
-            
-            # Convert to numpy arrays
-            card_vectors_array = np.array(card_vectors)
-            snapshot_vectors_array = np.array(snapshot_vectors) if snapshot_vectors else None
-            labels_array = np.array(labels) if labels else None
-            
-            # Save data
-            np.save(output_dir / "card_vectors.npy", card_vectors_array)
-            if snapshot_vectors_array is not None:
-                np.save(output_dir / "snapshot_vectors.npy", snapshot_vectors_array)
-            
-            if labels_array is not None:
-                np.save(output_dir / "labels.npy", labels_array)
-            
-            # Save metadata
-            with open(output_dir / "metadata.json", "w") as f:
-                json.dump(metadata, f, indent=2, default=str)
-            
-            # Export historical price data from MTGJSON if requested
-            historical_prices_data = None
-            if include_historical_prices:
-                historical_prices_data = await _export_historical_prices(db, output_dir)
-            
-            # Save feature info
-            feature_info = {
-                "card_feature_dim": len(card_vectors[0]) if card_vectors else 0,
-                "snapshot_feature_dim": len(snapshot_vectors[0]) if snapshot_vectors else 0,
-                "total_samples": len(card_vectors),
-                "exported_at": datetime.utcnow().isoformat(),
+                # Vectors are only kept for cards that may appear in a shard
+                for card_id in eligible:
+                    card_vectors[card_id] = vectors[card_id]
+                stats["cards"] += len(eligible)
+
+                snapshots = (
+                    select(
+                        PriceSnapshot.card_id,
+                        func.extract("epoch", PriceSnapshot.time),
+                        PriceSnapshot.marketplace_id,
+                        PriceSnapshot.condition,
+                        PriceSnapshot.is_foil,
+                        PriceSnapshot.language,
+                        PriceSnapshot.currency,
+                        PriceSnapshot.source,
+                        PriceSnapshot.price,
+                        PriceSnapshot.price_market,
+                        PriceSnapshot.price_low,
+                        PriceSnapshot.price_high,
+                        PriceSnapshot.price_mid,
+                        PriceSnapshot.num_listings,
+                        PriceSnapshot.total_quantity,
+                    )
+                    .where(PriceSnapshot.card_id.in_(eligible), *snapshot_filters)
+                    .order_by(PriceSnapshot.card_id, PriceSnapshot.time)
+                    .execution_options(yield_per=SNAPSHOT_FETCH_ROWS)
+                )
+                stream = await db.stream(snapshots)
+                async for partition in stream.partitions():
+                    columns = rows_to_columns(partition, vocabularies)
+                    writer.add(columns)
+                    stats["samples"] += len(partition)
+
+                # Shards already written no longer need their cards' vectors
+                writer.prune_vectors()
+
+            writer.close()
+
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "exported_at": datetime.now(timezone.utc).isoformat(),
+                "format": file_format,
+                "history_since": since.isoformat(),
+                "min_snapshots_per_card": min_snapshots_per_card,
                 "includes_historical_prices": include_historical_prices,
+                "card_feature_dim": feature_dim,
+                "snapshot_feature_dim": feature_dim + len(SNAPSHOT_FEATURES),
+                "snapshot_features": list(SNAPSHOT_FEATURES),
+                "columns": {**SNAPSHOT_COLUMNS, "card_row": "int32"},
+                "label": "price" if include_labels else None,
+                "vocabularies": {
+                    name: sorted(vocab, key=vocab.get) for name, vocab in vocabularies.items()
+                },
+                "marketplaces": {str(k): v for k, v in marketplaces.items()},
+                "total_cards": stats["cards"],
+                "total_samples": stats["samples"],
+                "shards": writer.shards,
             }
-            
-            if historical_prices_data:
-                feature_info["historical_prices"] = {
-                    "total_snapshots": historical_prices_data["total_snapshots"],
-                    "cards_with_history": historical_prices_data["cards_with_history"],
-                }
-            
-            with open(output_dir / "feature_info.json", "w") as f:
-                json.dump(feature_info, f, indent=2)
-            
+            with open(output_dir / "manifest.json", "w") as f:
+                json.dump(manifest, f, indent=2)
+
             logger.info(
                 "Training data exported",
                 output_dir=str(output_dir),
-                samples=len(card_vectors),
-                card_dim=feature_info["card_feature_dim"],
-                snapshot_dim=feature_info["snapshot_feature_dim"],
-                historical_prices=historical_prices_data["total_snapshots"] if historical_prices_data else 0,
+                samples=stats["samples"],
+                cards=stats["cards"],
+                shards=len(writer.shards),
+                skipped_dim=stats["skipped_dim"],
             )
-            
+
             return {
-                "samples": len(card_vectors),
-                "card_feature_dim": feature_info["card_feature_dim"],
-                "snapshot_feature_dim": feature_info["snapshot_feature_dim"],
+                "samples": stats["samples"],
+                "cards": stats["cards"],
+                "shards": len(writer.shards),
+                "card_feature_dim": feature_dim,
+                "snapshot_feature_dim": manifest["snapshot_feature_dim"],
                 "output_dir": str(output_dir),
-                "historical_prices": historical_prices_data,
             }
-            
+
     finally:
         await engine.dispose()
 
 
-async def _export_historical_prices(
-    db: AsyncSession,
-    output_dir: Path,
-) -> dict[str, Any]:
-    """
-    Export historical price data from MTGJSON for training.
-    
-    This provides price trend data that can be used for time-series models
-    or as additional features for price prediction.
-    
-    Args:
-        db: Database session.
-        output_dir: Directory to save exported data.
-        
-    Returns:
-        Export statistics.
-    """
-    # Get MTGJSON marketplace
-    mtgjson_query = select(Marketplace).where(Marketplace.slug == "mtgjson")
-    result = await db.execute(mtgjson_query)
-    mtgjson_marketplace = result.scalar_one_or_none()
-    
-    if not mtgjson_marketplace:
-        logger.warning("MTGJSON marketplace not found - skipping historical price export")
-        return {"total_snapshots": 0, "cards_with_history": 0}
-    
-    # Get all price snapshots from MTGJSON
-    snapshots_query = (
-        select(PriceSnapshot, Card)
-        .join(Card, PriceSnapshot.card_id == Card.id)
-        .where(PriceSnapshot.marketplace_id == mtgjson_marketplace.id)
-        .order_by(Card.id, PriceSnapshot.time)
-    )
-    result = await db.execute(snapshots_query)
-    snapshots = result.all()
-    
-    if not snapshots:
-        logger.info("No MTGJSON historical price data found")
-        return {"total_snapshots": 0, "cards_with_history": 0}
-    
-    # Organize by card
-    price_history = {}
-    for snapshot, card in snapshots:
-        if card.id not in price_history:
-            price_history[card.id] = {
-                "card_id": card.id,
-                "card_name": card.name,
-                "set_code": card.set_code,
-                "prices": [],
-            }
-        
-        price_history[card.id]["prices"].append({
-            "snapshot_time": snapshot.time.isoformat(),
-            "price": float(snapshot.price),
-            "currency": snapshot.currency,
-            "price_foil": float(snapshot.price_market) if snapshot.price_market else None,
-        })
-    
-    # Save as JSON
-    history_file = output_dir / "historical_prices.json"
-    with open(history_file, "w") as f:
-        json.dump(list(price_history.values()), f, indent=2, default=str)
-    
-    # Also create a time-series format (card_id -> list of prices over time)
-    time_series_data = {}
-    for card_id, data in price_history.items():
-        time_series_data[card_id] = {
-            "timestamps": [p["snapshot_time"] for p in data["prices"]],
-            "prices": [p["price"] for p in data["prices"]],
-            "prices_foil": [p["price_foil"] for p in data["prices"] if p["price_foil"] is not None],
-        }
-    
-    time_series_file = output_dir / "historical_prices_timeseries.json"
-    with open(time_series_file, "w") as f:
-        json.dump(time_series_data, f, indent=2, default=str)
-    
-    logger.info(
-        "Historical price data exported",
-        total_snapshots=len(snapshots),
-        cards_with_history=len(price_history),
-    )
-    
-    return {
-        "total_snapshots": len(snapshots),
-        "cards_with_history": len(price_history),
-        "files": [
-            str(history_file),
-            str(time_series_file),
-        ],
-    }
-
-
 if __name__ == "__main__":
     import sys
-    
+
     output_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/training")
     min_listings = int(sys.argv[2]) if len(sys.argv) > 2 else 5
-    
-    result = asyncio.run(export_training_data(output_path, min_listings))
-    print(json.dumps(result, indent=2))
+    export_format = sys.argv[3] if len(sys.argv) > 3 else "npz"
 
+    result = asyncio.run(export_training_data(output_path, min_listings, file_format=export_format))
+    print(json.dumps(result, indent=2))
@@ -4,21 +4,30 @@ Generate synthetic multi-day price history for demo/testing.
 This utility is useful after importing the full Scryfall catalog so the UI
 has historical price data (including Card Kingdom) to render metrics and
 charts without waiting for real marketplace ingestion to run for weeks.
+
+The generator is deterministic: each card's random walk is seeded from
+(seed, card_id), so the same arguments always produce the same history
+regardless of which other cards are included. The benchmark suite in
+tests/performance builds its synthetic market from it.
 """
 import argparse
 import asyncio
 import random
 import sys
 from datetime import datetime, timedelta, timezone
+from decimal import Decimal
 from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence
 
 from sqlalchemy import delete, select
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from app.core.constants import CardCondition, CardLanguage
 from app.db.session import async_session_maker
 from app.models.card import Card
 from app.models.marketplace import Marketplace
 from app.models.price_snapshot import PriceSnapshot
+from app.services.ingestion.bulk_ops import batch_upsert_snapshots
 
 
 RARITY_PRICE_RANGES = {
@@ -28,6 +37,69 @@ RARITY_PRICE_RANGES = {
     "mythic": (3.0, 75.0),
 }
 
+# Foil premium for rares and mythics, which get a foil series as well
+FOIL_MULTIPLIER = 1.35
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(str(round(value, 2)))
+
+
+def synthesize_price_history(
+    cards: Sequence[tuple[int, Optional[str]]],
+    marketplaces: Sequence[tuple[int, str]],
+    days: int,
+    seed: int = 0,
+    end: Optional[datetime] = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield daily price snapshot rows as a per-card random walk.
+
+    Args:
+        cards: (card_id, rarity) pairs
+        marketplaces: (marketplace_id, currency) pairs
+        days: Days of history before end (days + 1 points per series)
+        seed: Random seed; each card is seeded from (seed, card_id)
+        end: Time of the newest snapshot (default: now, to the second)
+
+    Yields:
+        Snapshot dicts accepted by batch_upsert_snapshots
+    """
+    end = end or datetime.now(timezone.utc).replace(microsecond=0)
+
+    for card_id, rarity in cards:
+        rng = random.Random(seed * 1_000_003 + card_id)
+        base_price = rng.uniform(*RARITY_PRICE_RANGES.get(rarity or "", (0.25, 8.0)))
+        foils = (False, True) if rarity in {"rare", "mythic"} else (False,)
+
+        for marketplace_id, currency in marketplaces:
+            price = base_price * rng.uniform(0.9, 1.1)
+
+            for day in range(days, -1, -1):
+                price = max(0.05, price * (1 + rng.uniform(-0.04, 0.04)))
+                num_listings = rng.randint(5, 60)
+                total_quantity = rng.randint(10, 250)
+
+                for is_foil in foils:
+                    value = price * FOIL_MULTIPLIER if is_foil else price
+                    yield {
+                        "time": end - timedelta(days=day),
+                        "card_id": card_id,
+                        "marketplace_id": marketplace_id,
+                        "condition": CardCondition.NEAR_MINT.value,
+                        "is_foil": is_foil,
+                        "language": CardLanguage.ENGLISH.value,
+                        "price": _money(value),
+                        "price_low": _money(value * 0.92),
+                        "price_mid": _money(value),
+                        "price_high": _money(value * 1.08),
+                        "price_market": _money(value),
+                        "currency": currency,
+                        "num_listings": num_listings,
+                        "total_quantity": total_quantity,
+                        "source": "synthetic",
+                    }
+
 
 async def generate_history(
     card_limit: int,
@@ -37,32 +109,29 @@ async def generate_history(
     seed: int | None,
 ) -> dict[str, int]:
     """Generate synthetic history for the requested subset."""
-    if seed is not None:
-        random.seed(seed)
-    
     async with async_session_maker() as session:
-        card_query = select(Card).order_by(Card.id)
+        card_query = select(Card.id, Card.rarity).order_by(Card.id)
         if card_limit:
             card_query = card_query.limit(card_limit)
-        cards = (await session.execute(card_query)).scalars().all()
-        
+        cards = [(row.id, row.rarity) for row in await session.execute(card_query)]
+
         if not cards:
             return {"cards": 0, "snapshots": 0}
-        
+
         marketplace_query = select(Marketplace).where(Marketplace.is_enabled == True)
         if marketplaces:
             marketplace_query = marketplace_query.where(Marketplace.slug.in_(marketplaces))
         marketplace_rows = (await session.execute(marketplace_query)).scalars().all()
-        
+
         if not marketplace_rows:
             return {"cards": len(cards), "snapshots": 0}
-        
-        card_ids = [c.id for c in cards]
+
+        card_ids = [card_id for card_id, _ in cards]
         marketplace_ids = [m.id for m in marketplace_rows]
-        
+
         now = datetime.now(tz=timezone.utc)
         horizon = now - timedelta(days=days + 1)
-        
+
         if purge_existing:
             await session.execute(
                 delete(PriceSnapshot)
@@ -71,44 +140,26 @@ async def generate_history(
                 .where(PriceSnapshot.time >= horizon)
             )
             await session.commit()
-        
+
+        snapshots = synthesize_price_history(
+            cards,
+            [(m.id, m.default_currency) for m in marketplace_rows],
+            days,
+            seed=seed or 0,
+            end=now,
+        )
         snapshots_created = 0
-        for card in cards:
-            rarity_range = RARITY_PRICE_RANGES.get(card.rarity or "", (0.25, 8.0))
-            base_price = random.uniform(*rarity_range)
-            
-            for marketplace in marketplace_rows:
-                price = base_price * random.uniform(0.9, 1.1)
-                
-                for day in range(days, -1, -1):
-                    snapshot_time = now - timedelta(days=day)
-                    delta = random.uniform(-0.04, 0.04)
-                    price = max(0.05, price * (1 + delta))
-                    min_price = round(price * 0.92, 2)
-                    max_price = round(price * 1.08, 2)
-                    avg_price = round(price, 2)
-                    
-                    snapshot = PriceSnapshot(
-                        card_id=card.id,
-                        marketplace_id=marketplace.id,
-                        snapshot_time=snapshot_time,
-                        price=avg_price,
-                        currency=marketplace.default_currency,
-                        min_price=min_price,
-                        max_price=max_price,
-                        avg_price=avg_price,
-                        median_price=avg_price,
-                        price_foil=avg_price * 1.35 if card.rarity in {"rare", "mythic"} else None,
-                        num_listings=random.randint(5, 60),
-                        total_quantity=random.randint(10, 250),
-                    )
-                    session.add(snapshot)
-                    snapshots_created += 1
-                    
-                    if snapshots_created % 2000 == 0:
-                        await session.flush()
-        
-        await session.commit()
+        batch: list[dict[str, Any]] = []
+        for snapshot in snapshots:
+            batch.append(snapshot)
+            if len(batch) >= 2000:
+                stats = await batch_upsert_snapshots(session, batch, evaluate_alerts=False)
+                snapshots_created += stats["inserted"]
+                batch = []
+        if batch:
+            stats = await batch_upsert_snapshots(session, batch, evaluate_alerts=False)
+            snapshots_created += stats["inserted"]
+
         return {
             "cards": len(cards),
             "marketplaces": len(marketplace_rows),
@@ -146,7 +197,7 @@ async def main():
         help="Random seed for reproducible results",
     )
     args = parser.parse_args()
-    
+
     results = await generate_history(
         card_limit=max(args.card_limit, 1),
         days=max(args.days, 1),
@@ -154,7 +205,7 @@ async def main():
         purge_existing=not args.no_purge,
         seed=args.seed,
     )
-    
+
     print(
         f"Generated {results.get('snapshots', 0):,} snapshots "
         f"for {results.get('cards', 0)} cards across "
@@ -164,4 +215,3 @@ async def main():
 
 if __name__ == "__main__":
     asyncio.run(main())
-
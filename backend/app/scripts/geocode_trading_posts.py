@@ -0,0 +1,63 @@
+"""
+Geocode existing Trading Posts.
+
+Fills in latitude/longitude from the bundled postal-code table for stores
+that have a postal code but no coordinates yet (e.g. stores created
+before the geolocation migration). New and edited stores are geocoded
+when they are saved.
+
+Usage:
+    python -m app.scripts.geocode_trading_posts [--dry-run]
+"""
+import argparse
+import asyncio
+import sys
+
+import structlog
+from sqlalchemy import select
+
+sys.path.insert(0, "/app")
+
+from app.db.session import async_session_maker
+from app.models.trading_post import TradingPost
+from app.services.geocoding import geocode_postal_code
+
+logger = structlog.get_logger()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Geocode Trading Posts without coordinates")
+    parser.add_argument("--dry-run", action="store_true", help="Report without saving")
+    args = parser.parse_args()
+
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(TradingPost).where(
+                TradingPost.postal_code.isnot(None),
+                TradingPost.latitude.is_(None),
+            )
+        )
+        trading_posts = result.scalars().all()
+
+        geocoded = 0
+        for tp in trading_posts:
+            coords = geocode_postal_code(tp.postal_code, tp.country)
+            if coords:
+                tp.latitude, tp.longitude = coords
+                geocoded += 1
+
+        if args.dry_run:
+            await db.rollback()
+        else:
+            await db.commit()
+
+        logger.info(
+            "Trading post geocoding completed",
+            candidates=len(trading_posts),
+            geocoded=geocoded,
+            dry_run=args.dry_run,
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
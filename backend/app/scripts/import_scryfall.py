@@ -31,10 +31,16 @@ from sqlalchemy.dialects.postgresql import insert as pg_insert
 # Setup path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from app.core.constants import card_search_fields
+from app.core.data_freshness import (
+    CATALOG_WATERMARK,
+    PRICE_SNAPSHOTS_WATERMARK,
+    record_watermark,
+)
 from app.db.session import async_session_maker
 from app.models.card import Card
 from app.models.marketplace import Marketplace
-from app.models.price_snapshot import PriceSnapshot
+from app.services.ingestion.bulk_ops import copy_snapshots, prepare_copy_record
 
 logger = structlog.get_logger()
 
@@ -145,6 +151,7 @@ def parse_card_data(card: dict) -> dict:
         "reserved_list": card.get("reserved", False),
         "keywords": json.dumps(keywords) if keywords else None,
         "flavor_text": card.get("flavor_text"),
+        **card_search_fields(colors, legalities, keywords),
     }
 
 
@@ -294,6 +301,9 @@ async def process_batch(
                 "reserved_list": stmt.excluded.reserved_list,
                 "keywords": stmt.excluded.keywords,
                 "flavor_text": stmt.excluded.flavor_text,
+                "color_mask": stmt.excluded.color_mask,
+                "legal_formats": stmt.excluded.legal_formats,
+                "keyword_list": stmt.excluded.keyword_list,
                 "updated_at": func.now(),
             },
         )
@@ -313,24 +323,21 @@ async def process_batch(
         for pr in price_records:
             card_id = card_id_map.get(pr["scryfall_id"])
             if card_id:
-                snapshot_records.append({
-                    "time": now,
-                    "card_id": card_id,
-                    "marketplace_id": pr["marketplace_id"],
-                    "condition": "NEAR_MINT",
-                    "is_foil": pr.get("is_foil", False),
-                    "language": "English",
-                    "price": pr["price"],
-                    "currency": pr["currency"],
-                    "source": "bulk",
-                })
+                snapshot_records.append(prepare_copy_record(
+                    card_id=card_id,
+                    marketplace_id=pr["marketplace_id"],
+                    price=pr["price"],
+                    time=now,
+                    is_foil=pr.get("is_foil", False),
+                    currency=pr["currency"],
+                    source="bulk",
+                ))
         
         if snapshot_records:
-            # Use on_conflict_do_nothing for the composite primary key
-            stmt = pg_insert(PriceSnapshot).values(snapshot_records)
-            stmt = stmt.on_conflict_do_nothing()
-            await session.execute(stmt)
-            stats["prices_added"] += len(snapshot_records)
+            # Keep existing snapshots on (time, card, marketplace, ...) conflicts
+            stats["prices_added"] += await copy_snapshots(
+                session, snapshot_records, update_existing=False, job="import_scryfall"
+            )
     
     await session.commit()
 
@@ -388,6 +395,16 @@ async def import_cards(
                     end="",
                     flush=True,
                 )
+
+        # Rebuilds set membership indexes (app.services.set_completion)
+        await record_watermark(
+            session, CATALOG_WATERMARK, stats["cards_processed"], job="import_scryfall"
+        )
+        if stats["prices_added"]:
+            await record_watermark(
+                session, PRICE_SNAPSHOTS_WATERMARK, stats["prices_added"], job="import_scryfall"
+            )
+        await session.commit()
     
     if stats["cards_processed"]:
         print(
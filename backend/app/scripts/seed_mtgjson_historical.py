@@ -23,16 +23,18 @@ from pathlib import Path
 
 import structlog
 from sqlalchemy import select, and_
-from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 # Setup path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from app.core.data_freshness import PRICE_SNAPSHOTS_WATERMARK, record_watermark
 from app.db.session import async_session_maker
 from app.models.card import Card
 from app.models.marketplace import Marketplace
 from app.models.price_snapshot import PriceSnapshot
+from app.repositories.price_repo import PriceRepository
 from app.services.ingestion import get_adapter
+from app.services.ingestion.bulk_ops import copy_snapshots, prepare_copy_record
 
 logger = structlog.get_logger()
 
@@ -111,6 +113,7 @@ async def seed_mtgjson_historical(
         "errors": 0,
         "start_time": datetime.now(timezone.utc),
     }
+    latest_snapshot_at = None
     
     async with async_session_maker() as db:
         # Get MTGJSON adapter (will cache data in memory after first load)
@@ -134,6 +137,8 @@ async def seed_mtgjson_historical(
             # Process cards in batches
             for batch_start in range(0, len(all_cards), batch_size):
                 batch = all_cards[batch_start : batch_start + batch_size]
+                # Snapshot records for the whole batch, written with one COPY
+                pending = []
                 
                 for card in batch:
                     try:
@@ -164,7 +169,7 @@ async def seed_mtgjson_historical(
                                 )
                             continue
                         
-                        # Collect snapshot records for bulk insert
+                        # Collect snapshot records for the batch COPY
                         snapshot_records = []
 
                         # Map currency to marketplace
@@ -190,44 +195,33 @@ async def seed_mtgjson_historical(
                                 continue
 
                             # Add normal (non-foil) price record
-                            snapshot_records.append({
-                                "time": price_data.snapshot_time,
-                                "card_id": card.id,
-                                "marketplace_id": marketplace.id,
-                                "condition": "NEAR_MINT",
-                                "is_foil": False,
-                                "language": "English",
-                                "price": float(price_data.price),
-                                "currency": price_data.currency,
-                                "source": "mtgjson",
-                            })
+                            snapshot_records.append(prepare_copy_record(
+                                card_id=card.id,
+                                marketplace_id=marketplace.id,
+                                price=price_data.price,
+                                time=price_data.snapshot_time,
+                                currency=price_data.currency,
+                                source="mtgjson",
+                            ))
 
                             # Add foil price as separate record if available
                             if price_data.price_foil and price_data.price_foil > 0:
-                                snapshot_records.append({
-                                    "time": price_data.snapshot_time,
-                                    "card_id": card.id,
-                                    "marketplace_id": marketplace.id,
-                                    "condition": "NEAR_MINT",
-                                    "is_foil": True,
-                                    "language": "English",
-                                    "price": float(price_data.price_foil),
-                                    "currency": price_data.currency,
-                                    "source": "mtgjson",
-                                })
-
-                        # Bulk insert with ON CONFLICT DO NOTHING
-                        if snapshot_records:
-                            stmt = pg_insert(PriceSnapshot).values(snapshot_records)
-                            stmt = stmt.on_conflict_do_nothing()
-                            await db.execute(stmt)
-                            stats["snapshots_created"] += len(snapshot_records)
+                                snapshot_records.append(prepare_copy_record(
+                                    card_id=card.id,
+                                    marketplace_id=marketplace.id,
+                                    price=price_data.price_foil,
+                                    time=price_data.snapshot_time,
+                                    is_foil=True,
+                                    currency=price_data.currency,
+                                    source="mtgjson",
+                                ))
 
+                        pending.extend(snapshot_records)
+                        stats["snapshots_created"] += len(snapshot_records)
                         stats["cards_processed"] += 1
                         
                         # Progress logging
                         if stats["cards_processed"] % 100 == 0:
-                            await db.flush()
                             logger.info(
                                 "Progress",
                                 processed=stats["cards_processed"],
@@ -244,8 +238,14 @@ async def seed_mtgjson_historical(
                         )
                         continue
                 
-                # Flush batch
-                await db.flush()
+                # COPY the batch, keeping existing snapshots on conflict
+                if pending:
+                    await copy_snapshots(
+                        db, pending, update_existing=False, job="seed_mtgjson_historical"
+                    )
+                    latest = max(r.time for r in pending)
+                    if latest_snapshot_at is None or latest > latest_snapshot_at:
+                        latest_snapshot_at = latest
                 logger.info(
                     "Batch complete",
                     batch_start=batch_start,
@@ -255,7 +255,18 @@ async def seed_mtgjson_historical(
                 )
             
             # Final commit
+            if stats["snapshots_created"]:
+                await record_watermark(
+                    db, PRICE_SNAPSHOTS_WATERMARK, stats["snapshots_created"],
+                    latest_data_at=latest_snapshot_at, job="seed_mtgjson_historical",
+                )
             await db.commit()
+
+            # Materialize the imported range for the card history charts
+            if stats["snapshots_created"]:
+                await PriceRepository(db).refresh_card_price_aggregates(
+                    stats["start_time"] - timedelta(days=days + 1)
+                )
             
             stats["end_time"] = datetime.now(timezone.utc)
             stats["duration_seconds"] = (
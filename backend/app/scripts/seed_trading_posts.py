@@ -22,6 +22,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import async_session_maker
 from app.models.user import User
 from app.models.trading_post import TradingPost, TradingPostEvent, EventType
+from app.services.geocoding import geocode_postal_code
 
 logger = structlog.get_logger()
 
@@ -419,6 +420,8 @@ async def seed_trading_posts(db: AsyncSession, users: list[User]) -> list[Tradin
             continue
 
         now = datetime.utcnow()
+        country = "US" if tp_data["state"] != "ON" else "CA"
+        coords = geocode_postal_code(tp_data["postal_code"], country) or (None, None)
         trading_post = TradingPost(
             user_id=user.id,
             store_name=tp_data["store_name"],
@@ -426,8 +429,10 @@ async def seed_trading_posts(db: AsyncSession, users: list[User]) -> list[Tradin
             address=tp_data["address"],
             city=tp_data["city"],
             state=tp_data["state"],
-            country="US" if tp_data["state"] != "ON" else "CA",
+            country=country,
             postal_code=tp_data["postal_code"],
+            latitude=coords[0],
+            longitude=coords[1],
             phone=tp_data["phone"],
             website=tp_data["website"],
             hours=tp_data["hours"],
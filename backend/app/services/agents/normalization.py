@@ -5,6 +5,7 @@ import structlog
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.constants import card_search_fields
 from app.models import Card, Marketplace
 from app.services.ingestion import ScryfallAdapter, CardListing, CardPrice
 
@@ -131,6 +132,11 @@ class NormalizationService:
             power=scryfall_data.get("power"),
             toughness=scryfall_data.get("toughness"),
             legalities=scryfall_data.get("legalities"),
+            **card_search_fields(
+                scryfall_data.get("colors"),
+                scryfall_data.get("legalities"),
+                scryfall_data.get("keywords"),
+            ),
             image_url=scryfall_data.get("image_url"),
             image_url_small=scryfall_data.get("image_url_small"),
             image_url_large=scryfall_data.get("image_url_large"),
@@ -0,0 +1,151 @@
+"""
+Single-flight on-demand card refresh.
+
+A refresh request takes a per-card Redis lock holding a job id. The first
+request starts the refresh in the background and returns immediately;
+concurrent requests (from any API process) attach to the in-flight job by
+reading its id from the lock. When the refresh finishes, its status is
+published on the card's WebSocket channel (channel:card:{id}).
+
+Cards whose latest snapshot is newer than the freshness threshold are not
+refreshed at all unless forced.
+"""
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+import structlog
+from redis.asyncio import Redis
+
+logger = structlog.get_logger()
+
+# Full refreshes take 30-60s; the lock outlives them so a crashed process
+# cannot block refreshes for longer than this
+REFRESH_LOCK_TTL_SECONDS = 300
+
+# Snapshots newer than this are fresh enough to skip a refresh (same window
+# as the fast-mode check in the card refresh endpoint)
+REFRESH_FRESHNESS = timedelta(hours=24)
+
+# Delete the lock only if it still holds our job id
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Strong references to running refreshes (the event loop only keeps weak ones)
+_running: set[asyncio.Task] = set()
+
+
+@dataclass
+class RefreshJob:
+    """Outcome of a refresh request."""
+
+    card_id: int
+    status: str  # "started", "in_progress" or "fresh"
+    job_id: Optional[str] = None
+
+    @property
+    def requested(self) -> bool:
+        return self.status != "fresh"
+
+
+def refresh_lock_key(card_id: int) -> str:
+    return f"card_refresh:{card_id}"
+
+
+def is_fresh(
+    last_updated: Optional[datetime],
+    freshness: timedelta = REFRESH_FRESHNESS,
+    now: Optional[datetime] = None,
+) -> bool:
+    """Whether the latest snapshot is recent enough to skip a refresh."""
+    if last_updated is None:
+        return False
+    if last_updated.tzinfo is None:
+        last_updated = last_updated.replace(tzinfo=timezone.utc)
+    return (now or datetime.now(timezone.utc)) - last_updated < freshness
+
+
+class CardRefreshService:
+    """Start or join a background refresh for a card."""
+
+    def __init__(
+        self,
+        redis: Redis,
+        refresh: Callable[[int, bool], Awaitable[None]],
+        freshness: timedelta = REFRESH_FRESHNESS,
+    ):
+        """
+        Args:
+            redis: Redis client for the lock and completion messages
+            refresh: Coroutine function (card_id, force) doing the refresh;
+                it must manage its own database session
+            freshness: Snapshot age below which refreshes are skipped
+        """
+        self.redis = redis
+        self.refresh = refresh
+        self.freshness = freshness
+
+    async def request(
+        self,
+        card_id: int,
+        last_updated: Optional[datetime] = None,
+        force: bool = False,
+    ) -> RefreshJob:
+        """
+        Request a refresh of a card.
+
+        Args:
+            card_id: Card to refresh
+            last_updated: Time of the card's latest price snapshot
+            force: Refresh even if data is fresh
+
+        Returns:
+            RefreshJob with status "fresh" (nothing to do), "started" (this
+            call started the refresh) or "in_progress" (joined a running one)
+        """
+        if not force and is_fresh(last_updated, self.freshness):
+            return RefreshJob(card_id=card_id, status="fresh")
+
+        job_id = uuid.uuid4().hex
+        key = refresh_lock_key(card_id)
+        if not await self.redis.set(key, job_id, nx=True, ex=REFRESH_LOCK_TTL_SECONDS):
+            running_id = await self.redis.get(key)
+            if running_id is not None:
+                return RefreshJob(card_id=card_id, status="in_progress", job_id=running_id)
+            # Lock released between SET and GET; the refresh just finished
+            return RefreshJob(card_id=card_id, status="fresh")
+
+        task = asyncio.create_task(self._run(card_id, job_id, force))
+        _running.add(task)
+        task.add_done_callback(_running.discard)
+        return RefreshJob(card_id=card_id, status="started", job_id=job_id)
+
+    async def _run(self, card_id: int, job_id: str, force: bool) -> None:
+        """Run the refresh, publish its outcome and release the lock."""
+        status = "completed"
+        try:
+            await self.refresh(card_id, force)
+        except Exception as e:
+            status = "failed"
+            logger.error("Card refresh failed", card_id=card_id, job_id=job_id, error=str(e))
+        finally:
+            try:
+                await self.redis.eval(_RELEASE_LOCK_SCRIPT, 1, refresh_lock_key(card_id), job_id)
+                await self.redis.publish(
+                    f"channel:card:{card_id}",
+                    json.dumps({
+                        "type": "card_refresh",
+                        "card_id": card_id,
+                        "job_id": job_id,
+                        "status": status,
+                    }),
+                )
+            except Exception as e:
+                logger.warning("Failed to finish card refresh", card_id=card_id, error=str(e))
@@ -0,0 +1,76 @@
+"""
+Offline postal-code geocoding.
+
+Resolves store postal codes to coordinates using a bundled lookup table
+(app/data/us_postal_codes.csv.gz) so Trading Posts can be located without
+calling an external geocoding API.
+
+The table is loaded lazily on first use and kept in memory for the
+lifetime of the process (~42k rows, a few MB).
+"""
+import csv
+import gzip
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+POSTAL_CODE_TABLE = Path(__file__).resolve().parent.parent / "data" / "us_postal_codes.csv.gz"
+
+# Countries covered by the bundled table
+SUPPORTED_COUNTRIES = {"US", "USA", "UNITED STATES"}
+
+_US_ZIP_RE = re.compile(r"^\s*(\d{5})(?:[-\s]?\d{4})?\s*$")
+
+
+@lru_cache(maxsize=1)
+def _load_postal_codes() -> dict[str, tuple[float, float]]:
+    """Load the bundled postal-code table into memory."""
+    table: dict[str, tuple[float, float]] = {}
+    try:
+        with gzip.open(POSTAL_CODE_TABLE, "rt", newline="") as f:
+            for row in csv.DictReader(f):
+                table[row["postal_code"]] = (float(row["latitude"]), float(row["longitude"]))
+    except FileNotFoundError:
+        logger.warning("Postal code table not found", path=str(POSTAL_CODE_TABLE))
+    return table
+
+
+def normalize_postal_code(postal_code: Optional[str], country: Optional[str] = "US") -> Optional[str]:
+    """
+    Normalize a postal code to the key format used by the lookup table.
+
+    Accepts ZIP and ZIP+4 forms ("02139", "02139-4307"). Returns None for
+    unsupported countries or malformed codes.
+    """
+    if not postal_code:
+        return None
+    if country and country.strip().upper() not in SUPPORTED_COUNTRIES:
+        return None
+    match = _US_ZIP_RE.match(postal_code)
+    return match.group(1) if match else None
+
+
+def geocode_postal_code(
+    postal_code: Optional[str],
+    country: Optional[str] = "US",
+) -> Optional[tuple[float, float]]:
+    """
+    Resolve a postal code to (latitude, longitude).
+
+    Args:
+        postal_code: Postal code as entered by the user
+        country: Country code of the address (only US is bundled)
+
+    Returns:
+        (latitude, longitude) tuple, or None if the code is unknown
+    """
+    key = normalize_postal_code(postal_code, country)
+    if key is None:
+        return None
+    return _load_postal_codes().get(key)
+
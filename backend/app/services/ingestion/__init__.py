@@ -23,8 +23,11 @@ from app.services.ingestion.bulk_ops import (
     get_recent_snapshot_times,
     batch_upsert_snapshots,
     batch_upsert_snapshots_safe,
+    copy_snapshots,
     bulk_copy_snapshots,
     prepare_copy_record,
+    to_copy_record,
+    SnapshotRecord,
 )
 
 __all__ = [
@@ -48,7 +51,10 @@ __all__ = [
     "get_recent_snapshot_times",
     "batch_upsert_snapshots",
     "batch_upsert_snapshots_safe",
+    "copy_snapshots",
     "bulk_copy_snapshots",
     "prepare_copy_record",
+    "to_copy_record",
+    "SnapshotRecord",
 ]
 
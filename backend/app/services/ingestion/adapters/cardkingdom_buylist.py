@@ -6,7 +6,6 @@ Note: Card Kingdom doesn't have a public API for buylist, so we scrape their HTM
 
 Respect rate limits: 2 second delay between requests.
 """
-import asyncio
 import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
@@ -17,6 +16,7 @@ import structlog
 from bs4 import BeautifulSoup
 
 from app.core.config import settings
+from app.core.provider_limiter import get_provider_limiter
 
 logger = structlog.get_logger()
 
@@ -57,12 +57,13 @@ class CardKingdomBuylistAdapter:
 
     def __init__(self):
         self._client: httpx.AsyncClient | None = None
-        self._last_request_time: datetime | None = None
+        self._limiter = get_provider_limiter("cardkingdom_buylist", rate=1 / self.RATE_LIMIT_SECONDS)
 
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create HTTP client."""
         if self._client is None or self._client.is_closed:
             self._client = httpx.AsyncClient(
+                event_hooks={"response": [self._limiter.observe]},
                 timeout=httpx.Timeout(float(settings.external_api_timeout)),
                 headers={
                     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -74,12 +75,8 @@ class CardKingdomBuylistAdapter:
         return self._client
 
     async def _rate_limit(self) -> None:
-        """Enforce rate limiting."""
-        if self._last_request_time is not None:
-            elapsed = (datetime.now(timezone.utc) - self._last_request_time).total_seconds()
-            if elapsed < self.RATE_LIMIT_SECONDS:
-                await asyncio.sleep(self.RATE_LIMIT_SECONDS - elapsed)
-        self._last_request_time = datetime.now(timezone.utc)
+        """Wait for a token from the provider's cluster-wide rate limiter."""
+        await self._limiter.acquire()
 
     async def get_buylist_prices(
         self,
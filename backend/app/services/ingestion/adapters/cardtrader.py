@@ -4,7 +4,6 @@ CardTrader API adapter for marketplace price data.
 CardTrader provides marketplace data in multiple currencies (USD, EUR) with marketplace listings.
 API Documentation: https://www.cardtrader.com/docs/api/full/reference
 """
-import asyncio
 from datetime import datetime, timezone
 from typing import Any
 
@@ -12,6 +11,7 @@ import httpx
 import structlog
 
 from app.core.config import settings
+from app.core.provider_limiter import get_provider_limiter
 from app.services.ingestion.base import (
     AdapterConfig,
     CardListing,
@@ -52,8 +52,7 @@ class CardTraderAdapter(MarketplaceAdapter):
         if not self.config.api_key:
             logger.warning("CardTrader API token not configured - adapter will not be able to fetch data")
         self._client: httpx.AsyncClient | None = None
-        self._request_count = 0
-        self._window_start = datetime.now(timezone.utc)
+        self._limiter = get_provider_limiter("cardtrader", rate=1 / self.config.rate_limit_seconds)
         # Cache expansions to avoid fetching on every card lookup
         self._expansions_cache: dict[str, int] | None = None
         self._expansions_cache_time: datetime | None = None
@@ -74,6 +73,7 @@ class CardTraderAdapter(MarketplaceAdapter):
                 headers["Authorization"] = f"Bearer {self.config.api_key}"
             
             self._client = httpx.AsyncClient(
+                event_hooks={"response": [self._limiter.observe]},
                 base_url=self.config.base_url,
                 timeout=httpx.Timeout(self.config.timeout_seconds),
                 headers=headers,
@@ -82,35 +82,9 @@ class CardTraderAdapter(MarketplaceAdapter):
         return self._client
     
     async def _rate_limit(self) -> None:
-        """Enforce rate limiting (200 requests per 10 seconds per API documentation)."""
-        now = datetime.now(timezone.utc)
-        elapsed = (now - self._window_start).total_seconds()
-
-        # Reset window if 10 seconds has passed
-        if elapsed >= self.RATE_LIMIT_WINDOW:
-            self._request_count = 0
-            self._window_start = now
-            elapsed = 0
+        """Wait for a token from the provider's cluster-wide rate limiter."""
+        await self._limiter.acquire()
 
-        # If we've hit the limit, wait until window resets
-        if self._request_count >= self.RATE_LIMIT_REQUESTS:
-            wait_time = self.RATE_LIMIT_WINDOW - elapsed
-            if wait_time > 0:
-                logger.debug("CardTrader rate limit reached, waiting", wait_seconds=wait_time)
-                await asyncio.sleep(wait_time)
-                self._request_count = 0
-                self._window_start = datetime.now(timezone.utc)
-        
-        self._request_count += 1
-        
-        # Also enforce per-request rate limit (200/10 = 0.05s between requests)
-        if self._last_request_time is not None:
-            elapsed_since_last = (now - self._last_request_time).total_seconds()
-            if elapsed_since_last < self.config.rate_limit_seconds:
-                await asyncio.sleep(self.config.rate_limit_seconds - elapsed_since_last)
-        
-        self._last_request_time = datetime.now(timezone.utc)
-    
     async def _get_expansions_cached(self) -> list[dict[str, Any]]:
         """
         Get expansions list with caching.
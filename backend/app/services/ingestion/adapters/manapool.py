@@ -13,6 +13,7 @@ import httpx
 import structlog
 
 from app.core.config import settings
+from app.core.provider_limiter import get_provider_limiter
 from app.services.ingestion.base import (
     AdapterConfig,
     CardListing,
@@ -55,8 +56,7 @@ class ManapoolAdapter(MarketplaceAdapter):
             logger.warning("Manapool API token not configured - adapter will not be able to fetch data")
 
         self._client: httpx.AsyncClient | None = None
-        self._request_count = 0
-        self._window_start = datetime.now(timezone.utc)
+        self._limiter = get_provider_limiter("manapool", rate=1 / self.config.rate_limit_seconds)
 
     @property
     def marketplace_name(self) -> str:
@@ -79,6 +79,7 @@ class ManapoolAdapter(MarketplaceAdapter):
                 headers["X-ManaPool-Access-Token"] = self.config.api_key
 
             self._client = httpx.AsyncClient(
+                event_hooks={"response": [self._limiter.observe]},
                 base_url=self.config.base_url,
                 timeout=httpx.Timeout(self.config.timeout_seconds),
                 headers=headers,
@@ -87,34 +88,8 @@ class ManapoolAdapter(MarketplaceAdapter):
         return self._client
 
     async def _rate_limit(self) -> None:
-        """Enforce rate limiting."""
-        now = datetime.now(timezone.utc)
-        elapsed = (now - self._window_start).total_seconds()
-
-        # Reset window if time has passed
-        if elapsed >= self.RATE_LIMIT_WINDOW:
-            self._request_count = 0
-            self._window_start = now
-            elapsed = 0
-
-        # If we've hit the limit, wait until window resets
-        if self._request_count >= self.RATE_LIMIT_REQUESTS:
-            wait_time = self.RATE_LIMIT_WINDOW - elapsed
-            if wait_time > 0:
-                logger.debug("Manapool rate limit reached, waiting", wait_seconds=wait_time)
-                await asyncio.sleep(wait_time)
-                self._request_count = 0
-                self._window_start = datetime.now(timezone.utc)
-
-        self._request_count += 1
-
-        # Also enforce per-request rate limit
-        if self._last_request_time is not None:
-            elapsed_since_last = (now - self._last_request_time).total_seconds()
-            if elapsed_since_last < self.config.rate_limit_seconds:
-                await asyncio.sleep(self.config.rate_limit_seconds - elapsed_since_last)
-
-        self._last_request_time = datetime.now(timezone.utc)
+        """Wait for a token from the provider's cluster-wide rate limiter."""
+        await self._limiter.acquire()
 
     async def _make_request(
         self,
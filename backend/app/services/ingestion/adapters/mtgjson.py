@@ -4,7 +4,6 @@ MTGJSON adapter for historical price data and card information.
 MTGJSON provides aggregated historical price data and comprehensive card data.
 This adapter supplements our scrapers by providing historical price trends.
 """
-import asyncio
 import gzip
 import json
 from datetime import datetime, timedelta, timezone
@@ -14,6 +13,7 @@ from typing import Any
 import httpx
 import structlog
 
+from app.core.provider_limiter import get_provider_limiter
 from app.services.ingestion.base import (
     AdapterConfig,
     CardListing,
@@ -45,6 +45,7 @@ class MTGJSONAdapter(MarketplaceAdapter):
             )
         super().__init__(config)
         self._client: httpx.AsyncClient | None = None
+        self._limiter = get_provider_limiter("mtgjson", rate=1 / self.config.rate_limit_seconds)
         self._cache_dir = Path("data/mtgjson_cache")
         self._cache_dir.mkdir(parents=True, exist_ok=True)
         self._cached_data: dict | None = None  # Cache loaded AllPrintings JSON data in memory
@@ -62,6 +63,7 @@ class MTGJSONAdapter(MarketplaceAdapter):
         """Get or create HTTP client."""
         if self._client is None or self._client.is_closed:
             self._client = httpx.AsyncClient(
+                event_hooks={"response": [self._limiter.observe]},
                 base_url=self.config.base_url,
                 timeout=httpx.Timeout(60.0),  # Longer timeout for large downloads
                 headers={"User-Agent": self.config.user_agent},
@@ -70,13 +72,9 @@ class MTGJSONAdapter(MarketplaceAdapter):
         return self._client
     
     async def _rate_limit(self) -> None:
-        """Enforce rate limiting."""
-        if self._last_request_time is not None:
-            elapsed = (datetime.now(timezone.utc) - self._last_request_time).total_seconds()
-            if elapsed < self.config.rate_limit_seconds:
-                await asyncio.sleep(self.config.rate_limit_seconds - elapsed)
-        self._last_request_time = datetime.now(timezone.utc)
-    
+        """Wait for a token from the provider's cluster-wide rate limiter."""
+        await self._limiter.acquire()
+
     async def _download_file(self, url: str, cache_file: Path) -> dict | None:
         """
         Download and cache a file from MTGJSON.
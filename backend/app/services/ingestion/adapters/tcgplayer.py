@@ -13,6 +13,7 @@ import httpx
 import structlog
 
 from app.core.config import settings
+from app.core.provider_limiter import get_provider_limiter
 from app.core.circuit_breaker import CircuitOpenError, get_circuit_breaker
 from app.services.ingestion.base import (
     AdapterConfig,
@@ -59,10 +60,9 @@ class TCGPlayerAdapter(MarketplaceAdapter):
             logger.warning("TCGPlayer API credentials not configured - adapter will not be able to fetch data")
 
         self._client: httpx.AsyncClient | None = None
+        self._limiter = get_provider_limiter("tcgplayer", rate=1 / self.config.rate_limit_seconds)
         self._auth_token: str | None = None
         self._token_expires_at: datetime | None = None
-        self._request_count = 0
-        self._window_start = datetime.now(timezone.utc)
 
         # Circuit breaker for external API resilience
         self._circuit = get_circuit_breaker(
@@ -70,6 +70,7 @@ class TCGPlayerAdapter(MarketplaceAdapter):
             failure_threshold=5,
             recovery_timeout=60.0,  # 1 minute before retry
             half_open_requests=2,
+            shared=True,  # One breaker state across all workers
         )
     
     @property
@@ -89,6 +90,7 @@ class TCGPlayerAdapter(MarketplaceAdapter):
             }
             
             self._client = httpx.AsyncClient(
+                event_hooks={"response": [self._limiter.observe]},
                 base_url=self.config.base_url,
                 timeout=httpx.Timeout(self.config.timeout_seconds),
                 headers=headers,
@@ -154,35 +156,9 @@ class TCGPlayerAdapter(MarketplaceAdapter):
             return None
     
     async def _rate_limit(self) -> None:
-        """Enforce rate limiting (100 requests per minute)."""
-        now = datetime.now(timezone.utc)
-        elapsed = (now - self._window_start).total_seconds()
+        """Wait for a token from the provider's cluster-wide rate limiter."""
+        await self._limiter.acquire()
 
-        # Reset window if 60 seconds has passed
-        if elapsed >= self.RATE_LIMIT_WINDOW:
-            self._request_count = 0
-            self._window_start = now
-            elapsed = 0
-
-        # If we've hit the limit, wait until window resets
-        if self._request_count >= self.RATE_LIMIT_REQUESTS:
-            wait_time = self.RATE_LIMIT_WINDOW - elapsed
-            if wait_time > 0:
-                logger.debug("TCGPlayer rate limit reached, waiting", wait_seconds=wait_time)
-                await asyncio.sleep(wait_time)
-                self._request_count = 0
-                self._window_start = datetime.now(timezone.utc)
-
-        self._request_count += 1
-
-        # Also enforce per-request rate limit
-        if self._last_request_time is not None:
-            elapsed_since_last = (now - self._last_request_time).total_seconds()
-            if elapsed_since_last < self.config.rate_limit_seconds:
-                await asyncio.sleep(self.config.rate_limit_seconds - elapsed_since_last)
-
-        self._last_request_time = datetime.now(timezone.utc)
-    
     async def _make_authenticated_request(
         self,
         method: str,
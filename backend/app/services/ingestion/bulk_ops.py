@@ -1,25 +1,46 @@
 """
 Bulk database operations for ingestion optimization.
 
-Provides efficient batch insert/upsert operations for price snapshots,
-including PostgreSQL COPY for bulk imports.
+Provides efficient batch upsert operations for price snapshots. Every
+snapshot write goes through PostgreSQL COPY into a staging table followed
+by a single INSERT ... SELECT ... ON CONFLICT merge.
 """
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any, Optional, Sequence
+from time import perf_counter
+from typing import Any, Iterable, NamedTuple, Optional, Sequence
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 import structlog
+from redis.asyncio import Redis
 
 from app.models.price_snapshot import PriceSnapshot
-from app.core.constants import CardCondition, CardLanguage
+from app.core.constants import CardCondition, CardLanguage, card_search_fields
+from app.core.data_freshness import PRICE_SNAPSHOTS_WATERMARK, record_watermark
 from app.db.transaction import savepoint
+from app.services.want_list_alerts import evaluate_want_list_alerts
 
 logger = structlog.get_logger()
 
+try:
+    from prometheus_client import Counter, Histogram
+except ImportError:
+    Counter = Histogram = None
+
+if Histogram is not None:
+    SNAPSHOT_ROWS_WRITTEN = Counter(
+        "price_snapshot_rows_written_total", "Price snapshot rows merged via COPY", ["job"],
+    )
+    SNAPSHOT_WRITE_SECONDS = Histogram(
+        "price_snapshot_write_seconds", "Time per COPY + merge batch", ["job"],
+        buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    )
+
+# Rows per COPY batch for session-based writes
+COPY_BATCH_ROWS = 10_000
+
 
 # Primary key columns for ON CONFLICT
 SNAPSHOT_PK_COLUMNS = [
@@ -75,46 +96,97 @@ async def get_recent_snapshot_times(
 
 async def batch_upsert_snapshots(
     db: AsyncSession,
-    snapshots: list[dict[str, Any]],
-    batch_size: int = 500,
+    snapshots: Iterable[Any],
+    batch_size: int = COPY_BATCH_ROWS,
+    redis: Optional[Redis] = None,
+    evaluate_alerts: bool = True,
+    source: str = 'api',
+    job: str = 'ingestion',
 ) -> dict[str, int]:
     """
     Upsert price snapshots in batches.
 
-    Uses PostgreSQL INSERT...ON CONFLICT DO UPDATE for efficient
-    upserts. Batches are committed together for efficiency.
+    Rows are COPYed through the session's connection and merged with
+    INSERT...SELECT...ON CONFLICT DO UPDATE (see bulk_copy_snapshots).
+    Batches are committed together with the price_snapshots watermark.
+    Written prices are then checked against want list targets so price
+    alerts fire immediately.
 
     Args:
         db: Database session
-        snapshots: List of snapshot dictionaries with keys matching model columns
-        batch_size: Number of records per batch (default 500)
+        snapshots: SnapshotRecord tuples (see prepare_copy_record), dicts
+            keyed by model column, or PriceData / CollectedPriceData objects
+        batch_size: Number of records per COPY batch
+        redis: Redis client for the want list alert index (optional)
+        evaluate_alerts: Check written prices against want list targets
+        source: Source for snapshots that do not carry one
+        job: Label for throughput logs and metrics
 
     Returns:
-        Dictionary with 'inserted' count and 'batches' count
+        Dictionary with 'inserted', 'batches' and 'alerts_created' counts
     """
-    if not snapshots:
-        return {"inserted": 0, "batches": 0}
+    stats = {"inserted": 0, "batches": 0, "alerts_created": 0}
+    records = [to_copy_record(s, source) for s in snapshots]
+    if not records:
+        return stats
 
-    stats = {"inserted": 0, "batches": 0}
+    started = perf_counter()
 
-    for i in range(0, len(snapshots), batch_size):
-        batch = snapshots[i:i + batch_size]
+    stats["inserted"] = await copy_snapshots(db, records, batch_size=batch_size, job=job)
+    stats["batches"] = (len(records) + batch_size - 1) // batch_size
 
-        # Ensure all required fields have defaults
-        prepared_batch = [_prepare_snapshot(s) for s in batch]
+    await record_watermark(
+        db, PRICE_SNAPSHOTS_WATERMARK, stats["inserted"],
+        latest_data_at=max(r.time for r in records), job=job,
+    )
+    await db.commit()
+    _log_throughput(job, stats["inserted"], perf_counter() - started)
+
+    if evaluate_alerts:
+        stats["alerts_created"] = await evaluate_want_list_alerts(db, records, redis=redis)
+        await db.commit()
+
+    return stats
+
+
+async def copy_snapshots(
+    db: AsyncSession,
+    records: Sequence[tuple],
+    batch_size: int = COPY_BATCH_ROWS,
+    update_existing: bool = True,
+    job: str = 'ingestion',
+) -> int:
+    """
+    COPY snapshot records through the session's connection without committing.
+
+    For tasks that commit on their own schedule (and record the watermark
+    themselves): the rows join the session's transaction and are committed
+    or rolled back with it.
+
+    Args:
+        db: Database session
+        records: SnapshotRecord tuples (see prepare_copy_record)
+        batch_size: Number of records per COPY batch
+        update_existing: Overwrite existing snapshots (see bulk_copy_snapshots)
+        job: Label for throughput logs and metrics
+
+    Returns:
+        Number of records written
+    """
+    if not records:
+        return 0
+
+    connection = await _driver_connection(db)
+    written = 0
+
+    for i in range(0, len(records), batch_size):
+        batch = records[i:i + batch_size]
 
         try:
-            stmt = pg_insert(PriceSnapshot).values(prepared_batch)
-            stmt = stmt.on_conflict_do_update(
-                index_elements=SNAPSHOT_PK_COLUMNS,
-                set_={
-                    col: getattr(stmt.excluded, col)
-                    for col in SNAPSHOT_UPDATE_COLUMNS
-                }
+            await bulk_copy_snapshots(
+                connection, batch, update_existing=update_existing, job=job
             )
-            await db.execute(stmt)
-            stats["inserted"] += len(batch)
-            stats["batches"] += 1
+            written += len(batch)
 
         except Exception as e:
             logger.error(
@@ -125,14 +197,15 @@ async def batch_upsert_snapshots(
             )
             raise
 
-    await db.commit()
-    return stats
+    return written
 
 
 async def batch_upsert_snapshots_safe(
     db: AsyncSession,
-    snapshots: list[dict[str, Any]],
-    batch_size: int = 500,
+    snapshots: Iterable[Any],
+    batch_size: int = COPY_BATCH_ROWS,
+    source: str = 'api',
+    job: str = 'ingestion',
 ) -> dict[str, int]:
     """
     Upsert price snapshots with per-batch error handling.
@@ -142,34 +215,29 @@ async def batch_upsert_snapshots_safe(
 
     Args:
         db: Database session
-        snapshots: List of snapshot dictionaries
+        snapshots: Snapshots in any form accepted by to_copy_record
         batch_size: Number of records per batch
+        source: Source for snapshots that do not carry one
+        job: Label for throughput logs and metrics
 
     Returns:
         Dictionary with 'inserted', 'errors', and 'batches' counts
     """
-    if not snapshots:
-        return {"inserted": 0, "errors": 0, "batches": 0}
-
     stats = {"inserted": 0, "errors": 0, "batches": 0}
+    records = [to_copy_record(s, source) for s in snapshots]
+    latest_committed = None
 
-    for i in range(0, len(snapshots), batch_size):
-        batch = snapshots[i:i + batch_size]
-        prepared_batch = [_prepare_snapshot(s) for s in batch]
+    for i in range(0, len(records), batch_size):
+        batch = records[i:i + batch_size]
 
         try:
-            stmt = pg_insert(PriceSnapshot).values(prepared_batch)
-            stmt = stmt.on_conflict_do_update(
-                index_elements=SNAPSHOT_PK_COLUMNS,
-                set_={
-                    col: getattr(stmt.excluded, col)
-                    for col in SNAPSHOT_UPDATE_COLUMNS
-                }
-            )
-            await db.execute(stmt)
+            await bulk_copy_snapshots(await _driver_connection(db), batch, job=job)
             await db.commit()
             stats["inserted"] += len(batch)
             stats["batches"] += 1
+            batch_latest = max(r.time for r in batch)
+            if latest_committed is None or batch_latest > latest_committed:
+                latest_committed = batch_latest
 
         except Exception as e:
             await db.rollback()
@@ -181,73 +249,102 @@ async def batch_upsert_snapshots_safe(
                 error=str(e),
             )
 
+    if stats["inserted"]:
+        await record_watermark(
+            db, PRICE_SNAPSHOTS_WATERMARK, stats["inserted"],
+            latest_data_at=latest_committed, job=job,
+        )
+        await db.commit()
+
     return stats
 
 
-def _prepare_snapshot(snapshot: dict[str, Any]) -> dict[str, Any]:
+async def _driver_connection(db: AsyncSession):
     """
-    Prepare a snapshot dictionary for insertion.
+    The asyncpg connection behind a session, inside the session's transaction.
 
-    Ensures required fields have defaults and types are correct.
+    The asyncpg driver begins a transaction lazily, on the first statement,
+    so one is started here. COPY run on the connection then nests into it as
+    a savepoint and commits or rolls back with the session.
     """
-    now = datetime.now(timezone.utc)
-
-    return {
-        'time': snapshot.get('time', now),
-        'card_id': snapshot['card_id'],
-        'marketplace_id': snapshot['marketplace_id'],
-        'condition': snapshot.get('condition', CardCondition.NEAR_MINT.value),
-        'is_foil': snapshot.get('is_foil', False),
-        'language': snapshot.get('language', CardLanguage.ENGLISH.value),
-        'price': Decimal(str(snapshot['price'])) if snapshot.get('price') is not None else Decimal('0'),
-        'price_low': _to_decimal(snapshot.get('price_low')),
-        'price_mid': _to_decimal(snapshot.get('price_mid')),
-        'price_high': _to_decimal(snapshot.get('price_high')),
-        'price_market': _to_decimal(snapshot.get('price_market')),
-        'currency': snapshot.get('currency', 'USD'),
-        'num_listings': snapshot.get('num_listings'),
-        'total_quantity': snapshot.get('total_quantity'),
-        'source': snapshot.get('source', 'api'),
-    }
+    connection = await db.connection()
+    await connection.execute(text("SELECT 1"))
+    raw = await connection.get_raw_connection()
+    return raw.driver_connection
 
 
 def _to_decimal(value: Any) -> Optional[Decimal]:
     """Convert a value to Decimal, returning None if invalid."""
     if value is None:
         return None
+    if isinstance(value, Decimal):
+        return value
     try:
         return Decimal(str(value))
-    except (ValueError, TypeError):
+    except (ValueError, TypeError, ArithmeticError):
         return None
 
 
+def _log_throughput(job: str, rows: int, seconds: float) -> None:
+    logger.info(
+        "Price snapshots written",
+        job=job,
+        rows=rows,
+        seconds=round(seconds, 3),
+        rows_per_second=round(rows / seconds) if seconds > 0 else None,
+    )
+
+
 # =============================================================================
 # PostgreSQL COPY Operations (for bulk imports)
 # =============================================================================
 
+class SnapshotRecord(NamedTuple):
+    """One price_snapshots row, in COPY column order."""
+
+    time: datetime
+    card_id: int
+    marketplace_id: int
+    condition: str
+    is_foil: bool
+    language: str
+    price: Decimal
+    price_low: Optional[Decimal]
+    price_mid: Optional[Decimal]
+    price_high: Optional[Decimal]
+    price_market: Optional[Decimal]
+    currency: str
+    num_listings: Optional[int]
+    total_quantity: Optional[int]
+    source: str
+
+
 # Columns for COPY operations (order matters!)
-COPY_COLUMNS = [
-    'time', 'card_id', 'marketplace_id', 'condition', 'is_foil', 'language',
-    'price', 'price_low', 'price_mid', 'price_high', 'price_market',
-    'currency', 'num_listings', 'total_quantity', 'source'
-]
+COPY_COLUMNS = list(SnapshotRecord._fields)
 
 
 async def bulk_copy_snapshots(
     connection,  # asyncpg connection
     records: Sequence[tuple],
     columns: list[str] | None = None,
+    update_existing: bool = True,
+    job: str = 'bulk_copy',
 ) -> int:
     """
     Use PostgreSQL COPY for high-speed bulk inserts.
 
-    COPY is 10-50x faster than batch INSERTs for large datasets.
-    Uses a staging table with upsert for handling duplicates.
+    COPY is 10-50x faster than batch INSERTs for large datasets. Rows
+    are streamed into a temporary (unlogged, session-private) staging
+    table and merged into price_snapshots with one upsert. If a key
+    appears more than once in a batch, the last row copied wins.
 
     Args:
         connection: asyncpg connection (not SQLAlchemy session)
         records: List of tuples matching column order
         columns: Column names (default: COPY_COLUMNS)
+        update_existing: Overwrite existing snapshots; False keeps them
+            (ON CONFLICT DO NOTHING), e.g. for historical backfills
+        job: Label for throughput metrics
 
     Returns:
         Number of records inserted/updated
@@ -258,47 +355,8 @@ async def bulk_copy_snapshots(
     if columns is None:
         columns = COPY_COLUMNS
 
-    # Create temp staging table
-    await connection.execute("""
-        CREATE TEMP TABLE IF NOT EXISTS snapshot_staging (
-            time TIMESTAMPTZ NOT NULL,
-            card_id INTEGER NOT NULL,
-            marketplace_id INTEGER NOT NULL,
-            condition card_condition NOT NULL,
-            is_foil BOOLEAN NOT NULL,
-            language card_language NOT NULL,
-            price NUMERIC(10,2) NOT NULL,
-            price_low NUMERIC(10,2),
-            price_mid NUMERIC(10,2),
-            price_high NUMERIC(10,2),
-            price_market NUMERIC(10,2),
-            currency VARCHAR(3) NOT NULL,
-            num_listings INTEGER,
-            total_quantity INTEGER,
-            source VARCHAR(20) NOT NULL
-        ) ON COMMIT DELETE ROWS
-    """)
-
-    # COPY into staging table
-    await connection.copy_records_to_table(
-        'snapshot_staging',
-        records=records,
-        columns=columns,
-    )
-
-    # Upsert from staging to main table
-    result = await connection.execute("""
-        INSERT INTO price_snapshots (
-            time, card_id, marketplace_id, condition, is_foil, language,
-            price, price_low, price_mid, price_high, price_market,
-            currency, num_listings, total_quantity, source
-        )
-        SELECT
-            time, card_id, marketplace_id, condition, is_foil, language,
-            price, price_low, price_mid, price_high, price_market,
-            currency, num_listings, total_quantity, source
-        FROM snapshot_staging
-        ON CONFLICT (time, card_id, marketplace_id, condition, is_foil, language)
+    if update_existing:
+        conflict_action = """
         DO UPDATE SET
             price = EXCLUDED.price,
             price_low = EXCLUDED.price_low,
@@ -308,7 +366,66 @@ async def bulk_copy_snapshots(
             num_listings = EXCLUDED.num_listings,
             total_quantity = EXCLUDED.total_quantity,
             source = EXCLUDED.source
-    """)
+        """
+    else:
+        conflict_action = "DO NOTHING"
+
+    started = perf_counter()
+
+    # COPY and upsert share a transaction, nested into a savepoint when the
+    # connection is already in one (as _driver_connection ensures)
+    async with connection.transaction():
+        # Create temp staging table
+        await connection.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS snapshot_staging (
+                time TIMESTAMPTZ NOT NULL,
+                card_id INTEGER NOT NULL,
+                marketplace_id INTEGER NOT NULL,
+                condition card_condition NOT NULL,
+                is_foil BOOLEAN NOT NULL,
+                language card_language NOT NULL,
+                price NUMERIC(10,2) NOT NULL,
+                price_low NUMERIC(10,2),
+                price_mid NUMERIC(10,2),
+                price_high NUMERIC(10,2),
+                price_market NUMERIC(10,2),
+                currency VARCHAR(3) NOT NULL,
+                num_listings INTEGER,
+                total_quantity INTEGER,
+                source VARCHAR(20) NOT NULL
+            ) ON COMMIT DELETE ROWS
+        """)
+
+        # COPY into staging table
+        await connection.copy_records_to_table(
+            'snapshot_staging',
+            records=records,
+            columns=columns,
+        )
+
+        # Upsert from staging to main table. DISTINCT ON drops duplicate
+        # keys, which ON CONFLICT DO UPDATE rejects within one statement.
+        result = await connection.execute(f"""
+            INSERT INTO price_snapshots (
+                time, card_id, marketplace_id, condition, is_foil, language,
+                price, price_low, price_mid, price_high, price_market,
+                currency, num_listings, total_quantity, source
+            )
+            SELECT DISTINCT ON (time, card_id, marketplace_id, condition, is_foil, language)
+                time, card_id, marketplace_id, condition, is_foil, language,
+                price, price_low, price_mid, price_high, price_market,
+                currency, num_listings, total_quantity, source
+            FROM snapshot_staging
+            ORDER BY time, card_id, marketplace_id, condition, is_foil, language, ctid DESC
+            ON CONFLICT (time, card_id, marketplace_id, condition, is_foil, language)
+            {conflict_action}
+        """)
+
+        # Inside a savepoint the rows would outlive this call until the
+        # outer commit and be merged again by the next batch
+        await connection.execute("TRUNCATE snapshot_staging")
+
+    elapsed = perf_counter() - started
 
     # Parse result like "INSERT 0 1234"
     try:
@@ -316,6 +433,17 @@ async def bulk_copy_snapshots(
     except (ValueError, IndexError, AttributeError):
         count = len(records)
 
+    if Histogram is not None:
+        SNAPSHOT_ROWS_WRITTEN.labels(job).inc(count)
+        SNAPSHOT_WRITE_SECONDS.labels(job).observe(elapsed)
+    logger.debug(
+        "Snapshot batch copied",
+        job=job,
+        rows=len(records),
+        written=count,
+        rows_per_second=round(len(records) / elapsed) if elapsed > 0 else None,
+    )
+
     return count
 
 
@@ -335,24 +463,25 @@ def prepare_copy_record(
     num_listings: int | None = None,
     total_quantity: int | None = None,
     source: str = 'bulk',
-) -> tuple:
+) -> SnapshotRecord:
     """
-    Prepare a tuple for bulk_copy_snapshots.
+    Prepare a record for bulk_copy_snapshots.
 
-    Returns a tuple in the correct order for COPY_COLUMNS.
+    Returns a SnapshotRecord (a tuple in COPY_COLUMNS order). Condition
+    and language may be given as enums or their values.
     """
-    return (
+    return SnapshotRecord(
         time or datetime.now(timezone.utc),
         card_id,
         marketplace_id,
-        condition or CardCondition.NEAR_MINT.value,
+        getattr(condition, 'value', condition) or CardCondition.NEAR_MINT.value,
         is_foil,
-        language or CardLanguage.ENGLISH.value,
-        Decimal(str(price)) if price is not None else Decimal('0'),
-        Decimal(str(price_low)) if price_low is not None else None,
-        Decimal(str(price_mid)) if price_mid is not None else None,
-        Decimal(str(price_high)) if price_high is not None else None,
-        Decimal(str(price_market)) if price_market is not None else None,
+        getattr(language, 'value', language) or CardLanguage.ENGLISH.value,
+        _to_decimal(price) or Decimal('0'),
+        _to_decimal(price_low),
+        _to_decimal(price_mid),
+        _to_decimal(price_high),
+        _to_decimal(price_market),
         currency,
         num_listings,
         total_quantity,
@@ -360,6 +489,45 @@ def prepare_copy_record(
     )
 
 
+def to_copy_record(snapshot: Any, source: str = 'api') -> SnapshotRecord:
+    """
+    Convert a snapshot to a COPY record.
+
+    Accepts tuples in COPY_COLUMNS order (e.g. from prepare_copy_record),
+    dicts keyed by model column, and objects with the same attribute
+    names (PriceData, CollectedPriceData). Missing fields get the model
+    defaults; source is used when the snapshot has none.
+    """
+    if isinstance(snapshot, SnapshotRecord):
+        return snapshot
+    if isinstance(snapshot, tuple):
+        return SnapshotRecord._make(snapshot)
+
+    if isinstance(snapshot, dict):
+        get = snapshot.get
+    else:
+        def get(name: str, default: Any = None) -> Any:
+            return getattr(snapshot, name, default)
+
+    return prepare_copy_record(
+        card_id=get('card_id'),
+        marketplace_id=get('marketplace_id'),
+        price=get('price'),
+        time=get('time'),
+        condition=get('condition'),
+        is_foil=get('is_foil', False),
+        language=get('language'),
+        price_low=get('price_low'),
+        price_mid=get('price_mid'),
+        price_high=get('price_high'),
+        price_market=get('price_market'),
+        currency=get('currency') or 'USD',
+        num_listings=get('num_listings'),
+        total_quantity=get('total_quantity'),
+        source=get('source') or source,
+    )
+
+
 # =============================================================================
 # Utility Functions
 # =============================================================================
@@ -477,6 +645,9 @@ async def ensure_card_exists(
                 cmc=card_data.get("cmc"),
                 color_identity=json.dumps(color_identity) if color_identity else None,
                 legalities=json.dumps(legalities) if legalities else None,
+                **card_search_fields(
+                    card_data.get("colors"), legalities, card_data.get("keywords")
+                ),
                 image_uris=json.dumps(image_uris) if image_uris else None,
                 image_uri=image_uris.get("normal") or image_uris.get("large"),
             )
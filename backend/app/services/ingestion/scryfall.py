@@ -12,6 +12,8 @@ import httpx
 import structlog
 
 from app.core.config import settings
+from app.core.provider_limiter import get_provider_limiter
+from app.core.constants import card_search_fields
 from app.services.ingestion.base import (
     AdapterConfig,
     CardListing,
@@ -41,6 +43,7 @@ class ScryfallAdapter(MarketplaceAdapter):
             )
         super().__init__(config)
         self._client: httpx.AsyncClient | None = None
+        self._limiter = get_provider_limiter("scryfall", rate=1 / self.config.rate_limit_seconds)
         # Semaphore to limit concurrent requests
         # With 75ms rate limit (13.3 req/sec), 5 concurrent = ~66 req/sec max theoretical
         # Keeping at 5 to stay well within Scryfall's 10 req/sec average recommendation
@@ -58,6 +61,7 @@ class ScryfallAdapter(MarketplaceAdapter):
         """Get or create HTTP client."""
         if self._client is None or self._client.is_closed:
             self._client = httpx.AsyncClient(
+                event_hooks={"response": [self._limiter.observe]},
                 base_url=self.config.base_url,
                 timeout=self.config.timeout_seconds,
                 headers={"User-Agent": self.config.user_agent},
@@ -65,14 +69,9 @@ class ScryfallAdapter(MarketplaceAdapter):
         return self._client
     
     async def _rate_limit(self) -> None:
-        """Enforce rate limiting between requests."""
-        if self._last_request_time is not None:
-            elapsed = (datetime.now(timezone.utc) - self._last_request_time).total_seconds()
-            if elapsed < self.config.rate_limit_seconds:
-                sleep_time = self.config.rate_limit_seconds - elapsed
-                await asyncio.sleep(sleep_time)
-        self._last_request_time = datetime.now(timezone.utc)
-    
+        """Wait for a token from the provider's cluster-wide rate limiter."""
+        await self._limiter.acquire()
+
     async def _request(
         self, 
         endpoint: str, 
@@ -474,6 +473,7 @@ class ScryfallAdapter(MarketplaceAdapter):
             "power": card.get("power"),
             "toughness": card.get("toughness"),
             "legalities": str(legalities) if legalities else None,
+            **card_search_fields(colors, legalities, card.get("keywords")),
             "image_url": image_uris.get("normal"),
             "image_url_small": image_uris.get("small"),
             "image_url_large": image_uris.get("large") or image_uris.get("png"),
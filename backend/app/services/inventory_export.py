@@ -0,0 +1,221 @@
+"""
+Streaming inventory export.
+
+Exports a user's inventory as CSV, plain text, or CardTrader CSV without
+materializing the collection in memory: rows are read through a
+server-side cursor (only the columns the formats need), formatted in
+chunks, and optionally gzip-compressed on the fly.
+"""
+import csv
+import io
+import zlib
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import async_session_maker
+from app.models import Card, InventoryItem
+
+# Rows fetched per server-side cursor batch and formatted per yielded chunk
+EXPORT_CHUNK_ROWS = 1000
+
+CARDTRADER_CONDITIONS = {
+    "MINT": "Near Mint",
+    "NEAR_MINT": "Near Mint",
+    "LIGHTLY_PLAYED": "Lightly Played",
+    "MODERATELY_PLAYED": "Moderately Played",
+    "HEAVILY_PLAYED": "Heavily Played",
+    "DAMAGED": "Damaged",
+}
+
+
+def map_condition_to_cardtrader(condition: str) -> str:
+    """Map our condition values to CardTrader format."""
+    return CARDTRADER_CONDITIONS.get(condition, "Near Mint")
+
+
+def _profit_loss(row: Any) -> Optional[float]:
+    """Same calculation as InventoryItem.profit_loss, on a column row."""
+    if row.acquisition_price and row.current_value:
+        return (float(row.current_value) - float(row.acquisition_price)) * row.quantity
+    return None
+
+
+def _csv_row(row: Any) -> list:
+    profit_loss = _profit_loss(row)
+    return [
+        row.name,
+        row.set_code,
+        row.quantity,
+        row.condition,
+        "Yes" if row.is_foil else "No",
+        row.language or "",
+        row.acquisition_price if row.acquisition_price else "",
+        row.current_value if row.current_value else "",
+        profit_loss if profit_loss else "",
+    ]
+
+
+def _cardtrader_row(row: Any) -> list:
+    # Use current_value if available, otherwise acquisition_price, convert to cents
+    price_value = None
+    if row.current_value:
+        price_value = int(float(row.current_value) * 100)
+    elif row.acquisition_price:
+        price_value = int(float(row.acquisition_price) * 100)
+
+    return [
+        row.name,
+        row.set_code,
+        row.quantity,
+        row.language or "English",
+        map_condition_to_cardtrader(row.condition),
+        "true" if row.is_foil else "false",
+        price_value if price_value else "",
+    ]
+
+
+def _txt_line(row: Any) -> str:
+    foil_text = " FOIL" if row.is_foil else ""
+    return f"{row.quantity}x {row.name} [{row.set_code}]{foil_text} {row.condition}"
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    """How one export format is written."""
+
+    media_type: str
+    filename: str
+    header: Optional[list[str]] = None
+    csv_row: Optional[Callable[[Any], list]] = None
+    text_line: Optional[Callable[[Any], str]] = None
+
+
+EXPORT_FORMATS: dict[str, ExportFormat] = {
+    "csv": ExportFormat(
+        media_type="text/csv",
+        filename="inventory.csv",
+        header=[
+            "Card Name", "Set", "Quantity", "Condition", "Foil",
+            "Language", "Acquisition Price", "Current Value", "Profit/Loss",
+        ],
+        csv_row=_csv_row,
+    ),
+    # CardTrader format: CSV with specific columns
+    # Required: name, expansion_code (minimum)
+    # Optional: quantity, language, condition, price_cents, foil
+    "cardtrader": ExportFormat(
+        media_type="text/csv",
+        filename="inventory_cardtrader.csv",
+        header=["name", "expansion_code", "quantity", "language", "condition", "foil", "price_cents"],
+        csv_row=_cardtrader_row,
+    ),
+    "txt": ExportFormat(
+        media_type="text/plain",
+        filename="inventory.txt",
+        text_line=_txt_line,
+    ),
+}
+
+
+def build_export_query(user_id: int):
+    """Select only the columns the export formats use, in export order."""
+    return (
+        select(
+            Card.name,
+            Card.set_code,
+            InventoryItem.quantity,
+            InventoryItem.condition,
+            InventoryItem.is_foil,
+            InventoryItem.language,
+            InventoryItem.acquisition_price,
+            InventoryItem.current_value,
+        )
+        .join(Card, InventoryItem.card_id == Card.id)
+        .where(InventoryItem.user_id == user_id)
+        .order_by(Card.name, InventoryItem.id)
+    )
+
+
+async def iter_export_chunks(
+    rows: AsyncIterator[Any],
+    export_format: ExportFormat,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Format rows into encoded chunks of at most chunk_rows rows each.
+
+    The header (if any) is yielded immediately so clients receive the first
+    bytes before the query has produced any rows.
+
+    Args:
+        rows: Async iterable of row objects with the export columns
+        export_format: Target format
+        chunk_rows: Rows formatted per yielded chunk
+        compress: Gzip the stream (a single gzip member across all chunks)
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_MINIMAL) if export_format.csv_row else None
+
+    def drain() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        if compressor is not None:
+            # Z_SYNC_FLUSH so every chunk is decodable as it arrives
+            data = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data
+
+    if writer is not None and export_format.header:
+        writer.writerow(export_format.header)
+        yield drain()
+
+    pending = 0
+    first_line = True
+
+    async for row in rows:
+        if writer is not None:
+            writer.writerow(export_format.csv_row(row))
+        else:
+            if not first_line:
+                buffer.write("\n")
+            buffer.write(export_format.text_line(row))
+            first_line = False
+        pending += 1
+        if pending >= chunk_rows:
+            yield drain()
+            pending = 0
+
+    tail = drain()
+    if compressor is not None:
+        tail += compressor.flush()
+    if tail:
+        yield tail
+
+
+async def stream_inventory_export(
+    user_id: int,
+    format: str,
+    compress: bool = False,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+    session_factory: Callable[[], AsyncSession] = async_session_maker,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a user's inventory export.
+
+    Opens its own session so the server-side cursor lives exactly as long
+    as the response body (request-scoped sessions are closed before a
+    StreamingResponse is iterated).
+    """
+    export_format = EXPORT_FORMATS[format]
+    query = build_export_query(user_id).execution_options(yield_per=chunk_rows)
+
+    async with session_factory() as session:
+        result = await session.stream(query)
+        async for chunk in iter_export_chunks(result, export_format, chunk_rows, compress):
+            yield chunk
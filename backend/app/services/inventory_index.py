@@ -0,0 +1,649 @@
+"""
+Precomputed per-user inventory index series.
+
+The inventory market index is the quantity-weighted average of each card's
+average price per time bucket, normalized to 100 at the first bucket.
+Rather than rebuilding it from raw price_snapshots on every chart load,
+the pricing refresh tasks maintain one InventoryIndexDay row per user per
+day holding, for each price mode, the weighted value and quantity of the
+whole day and of every intraday bucket at each standard range's bucket
+size. Standard chart ranges are read from those rows; custom ranges are
+computed on the fly and bucketed in NumPy.
+
+Inventory edits mark their owner in inventory_index_dirty_users (see
+app.models.inventory_index), and restate_dirty_users recomputes only those
+users' stored days with their current inventory. Each row also records a
+fingerprint of the inventory it was weighted with: until a user is
+restated, reads only use the newest run of days matching their current
+inventory and compute earlier days from raw snapshots, so edits never mix
+old and new weights in one series.
+"""
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+import structlog
+from sqlalchemy import and_, delete, func, select, true, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import InventoryIndexDay, InventoryIndexDirtyUser, InventoryItem, PriceSnapshot
+
+logger = structlog.get_logger()
+
+INTRADAY_BUCKET_MINUTES = 30
+BUCKETS_PER_DAY = 24 * 60 // INTRADAY_BUCKET_MINUTES
+INTRADAY_RETENTION_DAYS = 90
+
+# Days of history restated for a user whose inventory changed (the 1y range)
+INDEX_HISTORY_DAYS = 365
+
+# Users restated per restate_dirty_users call
+DIRTY_USERS_PER_RUN = 200
+
+# Inventory rows loaded and weighted per batch of users; only the per-card
+# price arrays are held for every user at once
+ROWS_PER_BATCH = 20_000
+
+# Index values are capped to this range (percent of the first point)
+MAX_INDEX_VALUE = 1000.0
+MIN_INDEX_VALUE = 0.1
+
+# Price modes, in the order they are packed. Matches the market-index
+# is_foil filter: None -> regular prices, True -> market (foil) prices,
+# False -> regular prices of snapshots without a market price.
+PRICE_MODES = 3
+
+# Standard chart ranges: range -> (days, bucket minutes)
+RANGE_BUCKETS = {
+    "7d": (7, 30),
+    "30d": (30, 60),
+    "90d": (90, 240),
+    "1y": (365, 1440),
+}
+
+# Intraday bucket sizes stored per day, finest first. Each card is averaged
+# over a whole bucket before weighting, so coarser buckets are stored
+# rather than summed from half-hours (which would weight a card by the
+# number of half-hours it was priced in).
+INTRADAY_GRAINS = sorted({minutes for _, minutes in RANGE_BUCKETS.values() if minutes < 1440})
+INTRADAY_OFFSETS = dict(zip(
+    INTRADAY_GRAINS,
+    np.cumsum([0] + [24 * 60 // minutes for minutes in INTRADAY_GRAINS]).tolist(),
+))
+INTRADAY_BUCKETS = sum(24 * 60 // minutes for minutes in INTRADAY_GRAINS)
+
+
+@dataclass
+class InventoryIndexSeries:
+    """Index points plus the newest snapshot that contributed to them."""
+
+    points: list[dict] = field(default_factory=list)
+    latest_snapshot_at: Optional[datetime] = None
+
+
+def price_mode(is_foil: Optional[bool]) -> int:
+    """Position of an is_foil filter value in the packed arrays."""
+    if is_foil is None:
+        return 0
+    return 1 if is_foil else 2
+
+
+def bucket_minutes_for_span(span: timedelta) -> int:
+    """Bucket size of the smallest standard range covering span."""
+    for days, bucket_minutes in RANGE_BUCKETS.values():
+        if span <= timedelta(days=days):
+            return bucket_minutes
+    return 1440
+
+
+def pack(array: np.ndarray) -> bytes:
+    """Serialize a series array to float32 bytes."""
+    return np.ascontiguousarray(array, dtype=np.float32).tobytes()
+
+
+def unpack_daily(data: bytes) -> np.ndarray:
+    """(PRICE_MODES, 2) array of [weighted value, quantity]."""
+    return np.frombuffer(data, dtype=np.float32).reshape(PRICE_MODES, 2)
+
+
+def unpack_intraday(data: bytes, bucket_minutes: int = INTRADAY_BUCKET_MINUTES) -> np.ndarray:
+    """(buckets per day, PRICE_MODES, 2) array of [weighted value, quantity]."""
+    start = INTRADAY_OFFSETS[bucket_minutes]
+    array = np.frombuffer(data, dtype=np.float32).reshape(INTRADAY_BUCKETS, PRICE_MODES, 2)
+    return array[start:start + 24 * 60 // bucket_minutes]
+
+
+def inventory_fingerprint(quantities: np.ndarray) -> int:
+    """Signed 64-bit hash of (card_id, quantity) rows sorted by card_id."""
+    digest = hashlib.blake2b(
+        np.ascontiguousarray(quantities, dtype=np.int64).tobytes(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def weighted_sums(
+    prices: np.ndarray,
+    quantities: np.ndarray,
+    segment_starts: np.ndarray,
+) -> np.ndarray:
+    """
+    Sum quantity-weighted prices per segment of consecutive rows.
+
+    Args:
+        prices: (rows, ...) average price per inventory row, NaN where unpriced
+        quantities: (rows,) quantity per row
+        segment_starts: Sorted row offsets where each segment (user) begins
+
+    Returns:
+        (segments, ..., 2) array of [sum(quantity * price), sum(quantity)],
+        counting only priced rows in both.
+    """
+    present = ~np.isnan(prices)
+    weights = quantities.reshape((-1,) + (1,) * (prices.ndim - 1)).astype(np.float64)
+    value = np.add.reduceat(np.where(present, prices, 0.0) * weights, segment_starts, axis=0)
+    quantity = np.add.reduceat(present * weights, segment_starts, axis=0)
+    return np.stack([value, quantity], axis=-1)
+
+
+def sum_by_bucket(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    quantities: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Total the weighted values and quantities of rows sharing a bucket.
+
+    Rows must hold each card at most once per bucket (its average over
+    the whole bucket), so every card counts by its quantity alone.
+    """
+    buckets, inverse = np.unique(timestamps, return_inverse=True)
+    return (
+        buckets,
+        np.bincount(inverse, weights=values, minlength=len(buckets)),
+        np.bincount(inverse, weights=quantities, minlength=len(buckets)),
+    )
+
+
+def build_index_points(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    quantities: np.ndarray,
+) -> list[dict]:
+    """
+    Turn bucket sums into chart points normalized to 100 at the first bucket.
+
+    Inventory weighted averages can vary dramatically if composition changes,
+    so the first point (not a median or mean) is the reference.
+    """
+    priced = quantities > 0
+    timestamps = timestamps[priced]
+    if not len(timestamps):
+        return []
+    averages = values[priced] / quantities[priced]
+
+    base_value = float(averages[0])
+    if not base_value > 0:
+        logger.warning("Base value is invalid in inventory index, using fallback", base_value=base_value)
+        base_value = 100.0
+
+    index = averages / base_value * 100.0
+    out_of_range = (index > MAX_INDEX_VALUE) | (index < MIN_INDEX_VALUE)
+    if out_of_range.any():
+        logger.warning(
+            "Suspicious index values detected in inventory index, capping to reasonable range",
+            count=int(out_of_range.sum()),
+            base_value=base_value,
+        )
+    index = np.round(np.clip(index, MIN_INDEX_VALUE, MAX_INDEX_VALUE), 2)
+
+    return [
+        {
+            "timestamp": datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(),
+            "indexValue": value,
+        }
+        for ts, value in zip(timestamps.astype(np.int64).tolist(), index.tolist())
+    ]
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _price_expressions(is_foil: Optional[bool]):
+    """(price field, row condition) for an is_foil filter value."""
+    if is_foil is True:
+        return PriceSnapshot.price_market, PriceSnapshot.price_market.isnot(None)
+    if is_foil is False:
+        return PriceSnapshot.price, PriceSnapshot.price_market.is_(None)
+    return PriceSnapshot.price, PriceSnapshot.price.isnot(None)
+
+
+def _epoch_bucket(bucket_seconds: int):
+    return func.floor(func.extract("epoch", PriceSnapshot.time) / bucket_seconds) * bucket_seconds
+
+
+def _user_batches(user_starts: np.ndarray, total_rows: int) -> Iterator[tuple[int, int]]:
+    """Split users (by first-row offsets) into ranges of about ROWS_PER_BATCH rows."""
+    first = 0
+    for i in range(1, len(user_starts)):
+        if user_starts[i] - user_starts[first] >= ROWS_PER_BATCH:
+            yield first, i
+            first = i
+    if len(user_starts):
+        yield first, len(user_starts)
+
+
+async def refresh_inventory_index_day(
+    db: AsyncSession,
+    day: date,
+    user_ids: Optional[Sequence[int]] = None,
+) -> int:
+    """
+    Recompute one day of the inventory index series.
+
+    Runs one aggregate query over that day's snapshots for inventory cards,
+    then loads users' inventories in batches of about ROWS_PER_BATCH rows
+    and weights per-card prices by their quantities in NumPy.
+
+    Args:
+        db: Database session
+        day: Day to recompute
+        user_ids: Only recompute these users (default: every user)
+
+    Returns:
+        Number of user rows written.
+    """
+    users = InventoryItem.user_id.in_(user_ids) if user_ids is not None else true()
+    day_start = _day_start(day)
+    price = PriceSnapshot.price
+    market = PriceSnapshot.price_market
+    regular = price > 0
+    foil = market > 0
+    nonfoil = and_(market.is_(None), price > 0)
+
+    query = (
+        select(
+            PriceSnapshot.card_id,
+            _epoch_bucket(INTRADAY_BUCKET_MINUTES * 60).label("bucket"),
+            func.sum(price).filter(regular).label("sum_regular"),
+            func.count(price).filter(regular).label("n_regular"),
+            func.sum(market).filter(foil).label("sum_foil"),
+            func.count(market).filter(foil).label("n_foil"),
+            func.sum(price).filter(nonfoil).label("sum_nonfoil"),
+            func.count(price).filter(nonfoil).label("n_nonfoil"),
+            func.max(PriceSnapshot.time).label("latest"),
+        )
+        .where(
+            PriceSnapshot.time >= day_start,
+            PriceSnapshot.time < day_start + timedelta(days=1),
+            PriceSnapshot.currency == "USD",
+            PriceSnapshot.card_id.in_(select(InventoryItem.card_id).where(users).distinct()),
+        )
+        .group_by(PriceSnapshot.card_id, "bucket")
+    )
+    rows = (await db.execute(query)).all()
+    written = await _write_index_day(db, day, rows, users) if rows else 0
+
+    # Users whose priced cards all left their inventory: drop their stale row.
+    # now() is the transaction start, so rows upserted above are kept.
+    stale = [InventoryIndexDay.day == day, InventoryIndexDay.updated_at < func.now()]
+    if user_ids is not None:
+        stale.append(InventoryIndexDay.user_id.in_(user_ids))
+    await db.execute(delete(InventoryIndexDay).where(*stale))
+    return written
+
+
+async def _write_index_day(db: AsyncSession, day: date, rows: list, users) -> int:
+    """Weight one day's per-card bucket sums by each user's inventory and upsert them."""
+    day_epoch = int(_day_start(day).timestamp())
+    bucket_seconds = INTRADAY_BUCKET_MINUTES * 60
+    row_cards = np.array([r.card_id for r in rows], dtype=np.int64)
+    row_buckets = (np.array([r.bucket for r in rows], dtype=np.int64) - day_epoch) // bucket_seconds
+    sums = np.nan_to_num(np.array(
+        [(r.sum_regular, r.sum_foil, r.sum_nonfoil) for r in rows], dtype=np.float64
+    ))
+    counts = np.array([(r.n_regular, r.n_foil, r.n_nonfoil) for r in rows], dtype=np.float64)
+    row_latest = np.array([r.latest.timestamp() for r in rows])
+
+    card_ids, card_pos = np.unique(row_cards, return_inverse=True)
+    shape = (len(card_ids), BUCKETS_PER_DAY, PRICE_MODES)
+    bucket_sums = np.zeros(shape)
+    bucket_counts = np.zeros(shape)
+    np.add.at(bucket_sums, (card_pos, row_buckets), sums)
+    np.add.at(bucket_counts, (card_pos, row_buckets), counts)
+    card_latest = np.zeros(len(card_ids))
+    np.maximum.at(card_latest, card_pos, row_latest)
+
+    # Per-card average price per bucket at every stored grain, and per day
+    grain_sums, grain_counts = [], []
+    for minutes in INTRADAY_GRAINS:
+        grain = (len(card_ids), 24 * 60 // minutes, minutes // INTRADAY_BUCKET_MINUTES, PRICE_MODES)
+        grain_sums.append(bucket_sums.reshape(grain).sum(axis=2))
+        grain_counts.append(bucket_counts.reshape(grain).sum(axis=2))
+    grain_sums = np.concatenate(grain_sums, axis=1)
+    grain_counts = np.concatenate(grain_counts, axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        intraday_prices = np.where(grain_counts > 0, grain_sums / grain_counts, np.nan)
+        day_counts = bucket_counts.sum(axis=1)
+        daily_prices = np.where(day_counts > 0, bucket_sums.sum(axis=1) / day_counts, np.nan)
+
+    # Distinct cards per user, to split users into batches of about
+    # ROWS_PER_BATCH inventory rows before loading any of them
+    user_counts = (await db.execute(
+        select(InventoryItem.user_id, func.count(InventoryItem.card_id.distinct()))
+        .where(users)
+        .group_by(InventoryItem.user_id)
+        .order_by(InventoryItem.user_id)
+    )).all()
+    if not user_counts:
+        return 0
+    user_ids = np.array([r[0] for r in user_counts], dtype=np.int64)
+    card_counts = np.array([r[1] for r in user_counts], dtype=np.int64)
+    user_starts = np.concatenate(([0], np.cumsum(card_counts)[:-1]))
+
+    keep_intraday = day >= datetime.now(timezone.utc).date() - timedelta(days=INTRADAY_RETENTION_DAYS)
+    written = 0
+
+    for first, last in _user_batches(user_starts, int(card_counts.sum())):
+        # These users' quantity per card, ordered by user and card
+        inventory_rows = (await db.execute(
+            select(InventoryItem.user_id, InventoryItem.card_id, func.sum(InventoryItem.quantity))
+            .where(InventoryItem.user_id.between(int(user_ids[first]), int(user_ids[last - 1])), users)
+            .group_by(InventoryItem.user_id, InventoryItem.card_id)
+            .order_by(InventoryItem.user_id, InventoryItem.card_id)
+        )).all()
+        if not inventory_rows:
+            continue
+        inventory = np.array(inventory_rows, dtype=np.int64)
+        owners, owner_starts = np.unique(inventory[:, 0], return_index=True)
+        fingerprints = dict(zip(
+            owners.tolist(),
+            map(inventory_fingerprint, np.split(inventory[:, 1:], owner_starts[1:])),
+        ))
+        pos = np.searchsorted(card_ids, inventory[:, 1])
+        priced = pos < len(card_ids)
+        priced[priced] = card_ids[pos[priced]] == inventory[priced, 1]
+        inventory, pos = inventory[priced], pos[priced]
+        if not len(inventory):
+            continue
+
+        batch_users, segments = np.unique(inventory[:, 0], return_index=True)
+        batch_qty = inventory[:, 2]
+        daily = weighted_sums(daily_prices[pos], batch_qty, segments)
+        intraday = weighted_sums(intraday_prices[pos], batch_qty, segments)
+        latest = np.maximum.reduceat(card_latest[pos], segments)
+
+        values = [
+            {
+                "user_id": int(user_id),
+                "day": day,
+                "daily": pack(daily[i]),
+                "intraday": pack(intraday[i]) if keep_intraday else None,
+                "latest_snapshot_at": datetime.fromtimestamp(latest[i], tz=timezone.utc),
+                "inventory_hash": fingerprints[int(user_id)],
+            }
+            for i, user_id in enumerate(batch_users)
+        ]
+        stmt = insert(InventoryIndexDay).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "day"],
+            set_={
+                "daily": stmt.excluded.daily,
+                "intraday": stmt.excluded.intraday,
+                "latest_snapshot_at": stmt.excluded.latest_snapshot_at,
+                "inventory_hash": stmt.excluded.inventory_hash,
+                "updated_at": func.now(),
+            },
+        )
+        await db.execute(stmt)
+        written += len(values)
+
+    return written
+
+
+async def restate_dirty_users(db: AsyncSession, limit: int = DIRTY_USERS_PER_RUN) -> int:
+    """
+    Recompute the stored history of users whose inventory changed.
+
+    Takes up to limit users from inventory_index_dirty_users, recomputes
+    their last INDEX_HISTORY_DAYS days (and only theirs) with their current
+    inventory, and clears their markers unless they changed again meanwhile.
+
+    Returns:
+        Number of users restated.
+    """
+    markers = (await db.execute(
+        select(InventoryIndexDirtyUser.user_id, InventoryIndexDirtyUser.marked_at)
+        .order_by(InventoryIndexDirtyUser.marked_at)
+        .limit(limit)
+    )).all()
+    if not markers:
+        return 0
+
+    user_ids = [m.user_id for m in markers]
+    today = datetime.now(timezone.utc).date()
+    written = 0
+    for offset in range(INDEX_HISTORY_DAYS, -1, -1):
+        written += await refresh_inventory_index_day(db, today - timedelta(days=offset), user_ids)
+
+    await db.execute(
+        delete(InventoryIndexDirtyUser).where(
+            tuple_(InventoryIndexDirtyUser.user_id, InventoryIndexDirtyUser.marked_at).in_(
+                [(m.user_id, m.marked_at) for m in markers]
+            )
+        )
+    )
+    await db.flush()
+    logger.info("Restated inventory index series", users=len(user_ids), rows_written=written)
+    return len(user_ids)
+
+
+async def refresh_inventory_index(
+    db: AsyncSession,
+    days: Optional[Iterable[date]] = None,
+) -> int:
+    """
+    Incrementally maintain the inventory index series.
+
+    Called by the pricing refresh tasks after new snapshots are written.
+    By default restates users whose inventory changed, recomputes
+    yesterday (to pick up late snapshots after midnight) and today for
+    everyone, then drops intraday buckets past retention.
+
+    Returns:
+        Number of user-day rows written for the given days.
+    """
+    today = datetime.now(timezone.utc).date()
+    if days is None:
+        await restate_dirty_users(db)
+        days = (today - timedelta(days=1), today)
+
+    written = 0
+    for day in days:
+        written += await refresh_inventory_index_day(db, day)
+
+    await db.execute(
+        update(InventoryIndexDay)
+        .where(
+            InventoryIndexDay.day < today - timedelta(days=INTRADAY_RETENTION_DAYS),
+            InventoryIndexDay.intraday.isnot(None),
+        )
+        .values(intraday=None)
+    )
+    await db.flush()
+    logger.debug("Refreshed inventory index series", rows_written=written)
+    return written
+
+
+async def _user_quantities(db: AsyncSession, user_id: int) -> list:
+    """A user's (card_id, quantity) rows, ordered by card_id."""
+    return (await db.execute(
+        select(InventoryItem.card_id, func.sum(InventoryItem.quantity))
+        .where(InventoryItem.user_id == user_id)
+        .group_by(InventoryItem.card_id)
+        .order_by(InventoryItem.card_id)
+    )).all()
+
+
+async def _snapshot_bucket_sums(
+    db: AsyncSession,
+    user_id: int,
+    quantity_rows: list,
+    start: datetime,
+    end: datetime,
+    bucket_minutes: int,
+    is_foil: Optional[bool],
+) -> Optional[tuple[np.ndarray, np.ndarray, np.ndarray, datetime]]:
+    """
+    Weighted bucket sums for a range from raw price snapshots.
+
+    Returns:
+        (bucket timestamps, weighted values, quantities, newest snapshot
+        time), or None if no snapshot in the range prices the inventory.
+    """
+    if not quantity_rows:
+        return None
+
+    price_field, price_condition = _price_expressions(is_foil)
+    bucket_seconds = bucket_minutes * 60
+    query = (
+        select(
+            _epoch_bucket(bucket_seconds).label("bucket"),
+            PriceSnapshot.card_id,
+            func.avg(price_field).label("avg_price"),
+            func.max(PriceSnapshot.time).label("latest"),
+        )
+        .where(
+            PriceSnapshot.time >= start,
+            PriceSnapshot.time <= end,
+            PriceSnapshot.card_id.in_(
+                select(InventoryItem.card_id).where(InventoryItem.user_id == user_id)
+            ),
+            price_condition,
+            price_field > 0,
+            PriceSnapshot.currency == "USD",
+        )
+        .group_by("bucket", PriceSnapshot.card_id)
+    )
+    rows = (await db.execute(query)).all()
+    if not rows:
+        return None
+
+    owned = np.array(quantity_rows, dtype=np.int64)
+    row_cards = np.array([r.card_id for r in rows], dtype=np.int64)
+    quantities = owned[np.searchsorted(owned[:, 0], row_cards), 1].astype(np.float64)
+    prices = np.array([r.avg_price for r in rows], dtype=np.float64)
+    timestamps = np.array([r.bucket for r in rows], dtype=np.int64)
+
+    timestamps, values, quantities = sum_by_bucket(timestamps, prices * quantities, quantities)
+    return timestamps, values, quantities, max(r.latest for r in rows)
+
+
+async def load_inventory_index(
+    db: AsyncSession,
+    user_id: int,
+    range: str,
+    is_foil: Optional[bool],
+    now: datetime,
+) -> Optional[InventoryIndexSeries]:
+    """
+    Read a standard range from the precomputed series.
+
+    Only the newest run of days weighted with the user's current inventory
+    is used; the range before it (days precomputed with an older inventory
+    that restate_dirty_users has not reached yet) is computed from raw
+    snapshots with the current inventory.
+
+    Returns:
+        The series, or None if no day of the range matches the current
+        inventory yet.
+    """
+    days, bucket_minutes = RANGE_BUCKETS[range]
+    start = now - timedelta(days=days)
+    intraday = bucket_minutes < 1440
+    column = InventoryIndexDay.intraday if intraday else InventoryIndexDay.daily
+
+    quantity_rows = await _user_quantities(db, user_id)
+    if not quantity_rows:
+        return None
+    fingerprint = inventory_fingerprint(np.array(quantity_rows, dtype=np.int64))
+
+    rows = (await db.execute(
+        select(
+            InventoryIndexDay.day,
+            column.label("data"),
+            InventoryIndexDay.latest_snapshot_at,
+            InventoryIndexDay.inventory_hash,
+        )
+        .where(
+            InventoryIndexDay.user_id == user_id,
+            InventoryIndexDay.day >= start.date(),
+            column.isnot(None),
+        )
+        .order_by(InventoryIndexDay.day)
+    )).all()
+    stale = [i for i, r in enumerate(rows) if r.inventory_hash != fingerprint]
+    rows = rows[stale[-1] + 1:] if stale else rows
+    if not rows:
+        return None
+
+    mode = price_mode(is_foil)
+    day_epochs = np.array([int(_day_start(r.day).timestamp()) for r in rows], dtype=np.int64)
+    step = bucket_minutes * 60
+    if intraday:
+        data = np.stack([unpack_intraday(r.data, bucket_minutes)[:, mode] for r in rows]).reshape(-1, 2)
+        timestamps = (day_epochs[:, None] + np.arange(86400 // step) * step).ravel()
+    else:
+        data = np.stack([unpack_daily(r.data)[mode] for r in rows])
+        timestamps = day_epochs
+
+    in_range = timestamps + step > start.timestamp()
+    data = data[in_range].astype(np.float64)
+    timestamps, values, quantities = timestamps[in_range], data[:, 0], data[:, 1]
+    latest_times = [r.latest_snapshot_at for r in rows if r.latest_snapshot_at]
+
+    # Fill the range before the first usable day from raw snapshots
+    first_epoch = int(day_epochs[0])
+    if first_epoch > start.timestamp():
+        head = await _snapshot_bucket_sums(
+            db, user_id, quantity_rows, start,
+            datetime.fromtimestamp(first_epoch, tz=timezone.utc), bucket_minutes, is_foil,
+        )
+        if head is not None:
+            head_timestamps, head_values, head_quantities, head_latest = head
+            before = head_timestamps < first_epoch
+            timestamps = np.concatenate((head_timestamps[before], timestamps))
+            values = np.concatenate((head_values[before], values))
+            quantities = np.concatenate((head_quantities[before], quantities))
+            latest_times.append(head_latest)
+
+    return InventoryIndexSeries(
+        points=build_index_points(timestamps, values, quantities),
+        latest_snapshot_at=max(latest_times) if latest_times else None,
+    )
+
+
+async def compute_inventory_index(
+    db: AsyncSession,
+    user_id: int,
+    start: datetime,
+    end: datetime,
+    bucket_minutes: int,
+    is_foil: Optional[bool],
+) -> InventoryIndexSeries:
+    """Compute a user's index for an arbitrary range from raw price snapshots."""
+    sums = await _snapshot_bucket_sums(
+        db, user_id, await _user_quantities(db, user_id), start, end, bucket_minutes, is_foil
+    )
+    if sums is None:
+        return InventoryIndexSeries()
+
+    timestamps, values, quantities, latest = sums
+    return InventoryIndexSeries(
+        points=build_index_points(timestamps, values, quantities),
+        latest_snapshot_at=latest,
+    )
@@ -3,21 +3,29 @@ Notification service for creating and managing notifications with deduplication.
 
 Provides functions for:
 - Creating notifications with automatic deduplication (24h window)
+- Bulk fan-out of many notifications with one dedup query and one insert
 - Price alert notifications when targets are hit
 - Milestone achievement notifications
 - Unread count and breakdown retrieval
 - Cleanup of expired notifications
 """
 import hashlib
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Optional
 
-from sqlalchemy import delete, func, select
+from redis.asyncio import Redis
+from sqlalchemy import String, any_, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 import structlog
 
+from app.core.config import settings
 from app.models.notification import Notification, NotificationPriority, NotificationType
+from app.services.notification_service import get_category_for_type, get_icon_for_type
 
 logger = structlog.get_logger()
 
@@ -136,6 +144,164 @@ async def create_notification(
     return notification
 
 
+@dataclass
+class NotificationDraft:
+    """One notification to create with create_notifications_bulk."""
+
+    user_id: int
+    type: NotificationType
+    title: str
+    message: str
+    priority: NotificationPriority = NotificationPriority.MEDIUM
+    card_id: Optional[int] = None
+    extra_data: Optional[dict] = None
+    expires_at: Optional[datetime] = None
+
+    @property
+    def dedup_hash(self) -> str:
+        return generate_dedup_hash(self.user_id, self.type.value, self.card_id, self.title)
+
+
+async def create_notifications_bulk(
+    db: AsyncSession,
+    drafts: Sequence[NotificationDraft],
+) -> list[dict[str, Any]]:
+    """
+    Create many notifications with deduplication in a few round trips.
+
+    Dedup hashes are computed in Python, duplicates within the batch are
+    dropped, existing hashes from the dedup window are filtered with one
+    query, and the survivors are written with one multi-row INSERT (batched
+    by SQLAlchemy). ON CONFLICT DO NOTHING covers older rows and concurrent
+    writers. The caller commits, then passes the result to
+    publish_notifications.
+
+    Args:
+        db: Async database session
+        drafts: Notifications to create
+
+    Returns:
+        Real-time payloads of the created notifications
+    """
+    by_hash: dict[str, NotificationDraft] = {}
+    for draft in drafts:
+        by_hash.setdefault(draft.dedup_hash, draft)
+    if not by_hash:
+        return []
+
+    dedup_cutoff = datetime.now(timezone.utc) - timedelta(hours=DEDUP_WINDOW_HOURS)
+    result = await db.execute(
+        select(Notification.dedup_hash).where(
+            Notification.dedup_hash == any_(literal(list(by_hash), ARRAY(String(64)))),
+            Notification.created_at >= dedup_cutoff,
+        )
+    )
+    for (existing_hash,) in result:
+        by_hash.pop(existing_hash, None)
+    if not by_hash:
+        return []
+
+    rows = [
+        {
+            "user_id": draft.user_id,
+            "type": draft.type.value,
+            "priority": draft.priority.value,
+            "title": draft.title,
+            "message": draft.message,
+            "card_id": draft.card_id,
+            "extra_data": draft.extra_data,
+            "expires_at": draft.expires_at,
+            "dedup_hash": dedup_hash,
+            "read": False,
+        }
+        for dedup_hash, draft in by_hash.items()
+    ]
+    stmt = (
+        pg_insert(Notification)
+        .on_conflict_do_nothing(index_elements=["dedup_hash"])
+        .returning(Notification.id, Notification.dedup_hash, Notification.created_at)
+    )
+    result = await db.execute(stmt, rows)
+
+    created = []
+    for row in result:
+        draft = by_hash[row.dedup_hash]
+        created.append(_realtime_payload(row.id, row.created_at, draft))
+
+    logger.info(
+        "Created notifications in bulk",
+        requested=len(drafts),
+        created=len(created),
+        duplicates=len(drafts) - len(created),
+    )
+    return created
+
+
+def _realtime_payload(notification_id: int, created_at: datetime, draft: NotificationDraft) -> dict[str, Any]:
+    """Notification dict in the shape NotificationService.send_realtime publishes."""
+    type_value = draft.type.value
+    extra = draft.extra_data or {}
+    return {
+        "user_id": draft.user_id,
+        "id": notification_id,
+        "type": type_value,
+        "category": get_category_for_type(type_value),
+        "title": draft.title,
+        "body": draft.message,
+        "icon": get_icon_for_type(type_value),
+        "action_url": extra.get("action_url"),
+        "metadata": {k: v for k, v in extra.items() if k not in ("action_url", "notification_type")},
+        "read_at": None,
+        "created_at": created_at.isoformat(),
+    }
+
+
+async def publish_notifications(
+    notifications: Sequence[dict[str, Any]],
+    redis: Optional[Redis] = None,
+) -> int:
+    """
+    Publish created notifications to their users' WebSocket channels.
+
+    Sends every message in one Redis pipeline. Delivery is best effort:
+    failures are logged, not raised, since the notifications are stored.
+
+    Args:
+        notifications: Payloads returned by create_notifications_bulk
+        redis: Redis client; a short-lived one is opened if omitted
+
+    Returns:
+        Number of messages published
+    """
+    if not notifications:
+        return 0
+
+    own_redis = redis is None
+    if own_redis:
+        redis = Redis.from_url(settings.redis_url, decode_responses=True)
+
+    try:
+        pipe = redis.pipeline(transaction=False)
+        for notification in notifications:
+            payload = {k: v for k, v in notification.items() if k != "user_id"}
+            pipe.publish(
+                f"channel:notifications:user:{notification['user_id']}",
+                json.dumps({
+                    "type": "notification",
+                    "notification_type": payload["type"],
+                    **payload,
+                }),
+            )
+        await pipe.execute()
+        return len(notifications)
+    except Exception as e:
+        logger.warning("Failed to publish notifications", count=len(notifications), error=str(e))
+        return 0
+    finally:
+        if own_redis:
+            await redis.aclose()
+
+
 async def create_price_alert(
     db: AsyncSession,
     user_id: int,
@@ -228,20 +394,18 @@ async def create_milestone_notification(
     )
 
 
-async def create_ban_change_notification(
-    db: AsyncSession,
+def ban_change_draft(
     user_id: int,
     card_id: int,
     card_name: str,
     format_name: str,
     old_status: str,
     new_status: str,
-) -> Optional[Notification]:
+) -> NotificationDraft:
     """
-    Create a ban/unban notification when a card's legality changes.
+    Build a ban/unban notification for a card's legality change.
 
     Args:
-        db: Async database session
         user_id: Target user's ID
         card_id: Card that changed
         card_name: Name of the card
@@ -250,7 +414,7 @@ async def create_ban_change_notification(
         new_status: New legality status
 
     Returns:
-        The created Notification object, or None if duplicate
+        Draft for create_notification or create_notifications_bulk
     """
     # Determine if this is a ban, unban, or restriction change
     if new_status == "banned":
@@ -279,8 +443,7 @@ async def create_ban_change_notification(
         "new_status": new_status,
     }
 
-    return await create_notification(
-        db=db,
+    return NotificationDraft(
         user_id=user_id,
         type=NotificationType.BAN_CHANGE,
         title=title,
@@ -291,6 +454,43 @@ async def create_ban_change_notification(
     )
 
 
+async def create_ban_change_notification(
+    db: AsyncSession,
+    user_id: int,
+    card_id: int,
+    card_name: str,
+    format_name: str,
+    old_status: str,
+    new_status: str,
+) -> Optional[Notification]:
+    """
+    Create a ban/unban notification when a card's legality changes.
+
+    Args:
+        db: Async database session
+        user_id: Target user's ID
+        card_id: Card that changed
+        card_name: Name of the card
+        format_name: Format where legality changed (e.g., "modern", "commander")
+        old_status: Previous legality status
+        new_status: New legality status
+
+    Returns:
+        The created Notification object, or None if duplicate
+    """
+    draft = ban_change_draft(user_id, card_id, card_name, format_name, old_status, new_status)
+    return await create_notification(
+        db=db,
+        user_id=draft.user_id,
+        type=draft.type,
+        title=draft.title,
+        message=draft.message,
+        priority=draft.priority,
+        card_id=draft.card_id,
+        extra_data=draft.extra_data,
+    )
+
+
 async def get_unread_count(
     db: AsyncSession,
     user_id: int,
@@ -2,10 +2,15 @@
 from .bulk_import import BulkPriceImporter
 from .valuation import InventoryValuator, ConditionMultiplier
 from .condition_pricing import ConditionPricer
+from .mtgjson_import import MTGJSONPriceImporter
+from .spread_engine import SpreadMatrix, get_spread_matrix
 
 __all__ = [
     "BulkPriceImporter",
     "InventoryValuator",
     "ConditionMultiplier",
     "ConditionPricer",
+    "MTGJSONPriceImporter",
+    "SpreadMatrix",
+    "get_spread_matrix",
 ]
@@ -11,13 +11,12 @@ import httpx
 import ijson
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert
 
 from app.models.card import Card
-from app.models.price_snapshot import PriceSnapshot
 from app.models.marketplace import Marketplace
 from app.core.config import settings
-from app.core.constants import CardCondition, CardLanguage
+from app.core.constants import CardCondition, CardLanguage, normalize_keywords
+from app.core.data_freshness import PRICE_SNAPSHOTS_WATERMARK, record_watermark
 
 logger = logging.getLogger(__name__)
 
@@ -164,6 +163,9 @@ class BulkPriceImporter:
                 await self._insert_snapshots(db, batch)
                 stats["snapshots_created"] += len(batch)
 
+            await record_watermark(
+                db, PRICE_SNAPSHOTS_WATERMARK, stats["snapshots_created"], job="scryfall_bulk_import"
+            )
             await db.commit()
 
         finally:
@@ -202,6 +204,7 @@ class BulkPriceImporter:
             .where(Card.scryfall_id == parsed["scryfall_id"])
             .values(
                 keywords=json.dumps(parsed.get("keywords", [])),
+                keyword_list=normalize_keywords(parsed.get("keywords")),
                 flavor_text=parsed.get("flavor_text"),
                 edhrec_rank=parsed.get("edhrec_rank"),
                 reserved_list=parsed.get("reserved", False),
@@ -277,7 +280,9 @@ class BulkPriceImporter:
         return snapshots
 
     async def _insert_snapshots(self, db: AsyncSession, snapshots: list[dict]) -> None:
-        """Bulk insert snapshots, joining on card_id."""
+        """COPY snapshots through the session's connection, joining on card_id."""
+        from app.services.ingestion.bulk_ops import copy_snapshots, prepare_copy_record
+
         if not snapshots:
             return
 
@@ -288,33 +293,22 @@ class BulkPriceImporter:
         )
         id_map = {row.scryfall_id: row.id for row in result}
 
-        # Build insert values
-        values = []
-        for s in snapshots:
-            card_id = id_map.get(s["scryfall_id"])
-            if card_id:
-                values.append({
-                    "card_id": card_id,
-                    "marketplace_id": s["marketplace_id"],
-                    "time": s["time"],
-                    "price": s["price"],
-                    "currency": s["currency"],
-                    "condition": s["condition"],
-                    "is_foil": s["is_foil"],
-                    "source": s["source"],
-                    "language": "English",
-                })
-
-        if values:
-            stmt = insert(PriceSnapshot).values(values)
-            stmt = stmt.on_conflict_do_update(
-                index_elements=["time", "card_id", "marketplace_id", "condition", "is_foil", "language"],
-                set_={
-                    "price": stmt.excluded.price,
-                    "source": stmt.excluded.source,
-                }
+        records = [
+            prepare_copy_record(
+                card_id=id_map[s["scryfall_id"]],
+                marketplace_id=s["marketplace_id"],
+                price=s["price"],
+                time=s["time"],
+                condition=s["condition"],
+                is_foil=s["is_foil"],
+                language=CardLanguage.ENGLISH.value,
+                currency=s["currency"],
+                source=s["source"],
             )
-            await db.execute(stmt)
+            for s in snapshots
+            if s["scryfall_id"] in id_map
+        ]
+        await copy_snapshots(db, records, job="scryfall_bulk_import")
 
     async def import_prices_with_copy(
         self,
@@ -389,7 +383,9 @@ class BulkPriceImporter:
 
                     if len(records) >= batch_size:
                         async with pool.acquire() as conn:
-                            count = await bulk_copy_snapshots(conn, records, COPY_COLUMNS)
+                            count = await bulk_copy_snapshots(
+                                conn, records, COPY_COLUMNS, job="scryfall_bulk_import"
+                            )
                             stats["snapshots_created"] += count
                             stats["batches"] += 1
                         records = []
@@ -404,10 +400,17 @@ class BulkPriceImporter:
             # Insert remaining records
             if records:
                 async with pool.acquire() as conn:
-                    count = await bulk_copy_snapshots(conn, records, COPY_COLUMNS)
+                    count = await bulk_copy_snapshots(
+                        conn, records, COPY_COLUMNS, job="scryfall_bulk_import"
+                    )
                     stats["snapshots_created"] += count
                     stats["batches"] += 1
 
+            await record_watermark(
+                db, PRICE_SNAPSHOTS_WATERMARK, stats["snapshots_created"], job="scryfall_bulk_import"
+            )
+            await db.commit()
+
         finally:
             tmp_path.unlink(missing_ok=True)
 
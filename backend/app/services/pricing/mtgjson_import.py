@@ -0,0 +1,325 @@
+"""
+Streaming MTGJSON historical price import.
+
+Reads AllPrices.json.gz with ijson instead of loading it into memory, maps
+MTGJSON uuids to card ids through one lookup built from
+AllIdentifiers.json.gz and our scryfall ids, and writes every point with
+COPY into a staging table followed by a single
+INSERT ... ON CONFLICT DO NOTHING per batch. A full backfill of the whole
+catalog is one pass over the file.
+"""
+import asyncio
+import gzip
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import httpx
+import ijson
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.constants import CardCondition, CardLanguage
+from app.core.data_freshness import PRICE_SNAPSHOTS_WATERMARK, record_watermark
+from app.models.card import Card
+from app.models.marketplace import Marketplace
+from app.repositories.price_repo import PriceRepository
+from app.services.ingestion.bulk_ops import (
+    COPY_COLUMNS,
+    bulk_copy_snapshots,
+    prepare_copy_record,
+)
+
+logger = structlog.get_logger()
+
+MTGJSON_DOWNLOAD_BASE = "https://mtgjson.com/api/v5"
+MTGJSON_CACHE_DIR = Path("data/mtgjson_cache")
+ALL_PRICES_FILE = "AllPrices.json.gz"
+ALL_IDENTIFIERS_FILE = "AllIdentifiers.json.gz"
+
+# AllPrices is rebuilt daily, identifiers only change with new sets
+ALL_PRICES_MAX_AGE = timedelta(days=1)
+ALL_IDENTIFIERS_MAX_AGE = timedelta(days=7)
+
+COPY_BATCH_ROWS = 50_000
+
+# MTGJSON paper price provider -> (marketplace slug, name, base url, currency)
+PRICE_PROVIDERS: dict[str, tuple[str, str, str, str]] = {
+    "tcgplayer": ("tcgplayer", "TCGPlayer", "https://www.tcgplayer.com", "USD"),
+    "cardmarket": ("cardmarket", "Cardmarket", "https://www.cardmarket.com", "EUR"),
+}
+
+
+async def download_mtgjson_file(
+    name: str,
+    max_age: timedelta,
+    cache_dir: Path = MTGJSON_CACHE_DIR,
+) -> Path:
+    """
+    Download an MTGJSON file to the disk cache, streaming to disk.
+
+    A cached copy younger than max_age is reused. The file is written to a
+    temporary name and renamed, so readers never see a partial download.
+    """
+    path = cache_dir / name
+    if path.exists():
+        modified = datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc)
+        if datetime.now(timezone.utc) - modified < max_age:
+            return path
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".part")
+    async with httpx.AsyncClient(
+        timeout=float(settings.bulk_operation_timeout), follow_redirects=True
+    ) as client:
+        async with client.stream("GET", f"{MTGJSON_DOWNLOAD_BASE}/{name}") as response:
+            response.raise_for_status()
+            with open(partial, "wb") as f:
+                async for chunk in response.aiter_bytes(chunk_size=1 << 16):
+                    f.write(chunk)
+    partial.replace(path)
+    return path
+
+
+def iter_scryfall_ids(path: Path) -> Iterator[tuple[str, str]]:
+    """Stream (mtgjson uuid, scryfall id) pairs from AllIdentifiers."""
+    with gzip.open(path, "rb") as f:
+        for prefix, event, value in ijson.parse(f):
+            if event == "string" and prefix.endswith(".identifiers.scryfallId"):
+                # prefix is "data.<uuid>.identifiers.scryfallId"
+                yield prefix.split(".", 2)[1], value
+
+
+def iter_price_points(
+    prices: dict[str, Any],
+    since: str,
+    providers: tuple[str, ...],
+) -> Iterator[tuple[str, bool, str, Decimal]]:
+    """
+    Yield (provider, is_foil, date, price) retail points from one AllPrices entry.
+
+    Dates are ISO strings, so the since cutoff is a string comparison.
+    """
+    paper = prices.get("paper") or {}
+    for provider in providers:
+        retail = (paper.get(provider) or {}).get("retail") or {}
+        for variant, is_foil in (("normal", False), ("foil", True)):
+            for day, price in (retail.get(variant) or {}).items():
+                if day >= since and price is not None and price > 0:
+                    yield provider, is_foil, day, price
+
+
+def iter_copy_batches(
+    path: Path,
+    uuid_to_card: dict[str, int],
+    marketplace_ids: dict[str, int],
+    since: date,
+    batch_rows: int = COPY_BATCH_ROWS,
+    stats: Optional[dict[str, int]] = None,
+) -> Iterator[list[tuple]]:
+    """
+    Stream AllPrices into lists of COPY records (COPY_COLUMNS order).
+
+    Only cards in uuid_to_card and providers in marketplace_ids are read.
+    Updates cards_matched, uuids_unmatched and points_read in stats as it
+    goes.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault("cards_matched", 0)
+    stats.setdefault("uuids_unmatched", 0)
+    stats.setdefault("points_read", 0)
+    providers = tuple(marketplace_ids)
+    since_str = since.isoformat()
+    times: dict[str, datetime] = {}
+    records: list[tuple] = []
+
+    with gzip.open(path, "rb") as f:
+        for uuid, prices in ijson.kvitems(f, "data"):
+            card_id = uuid_to_card.get(uuid)
+            if card_id is None:
+                stats["uuids_unmatched"] += 1
+                continue
+            stats["cards_matched"] += 1
+
+            for provider, is_foil, day, price in iter_price_points(prices, since_str, providers):
+                time = times.get(day)
+                if time is None:
+                    time = times[day] = datetime.fromisoformat(day).replace(tzinfo=timezone.utc)
+                currency = PRICE_PROVIDERS[provider][3]
+                records.append(prepare_copy_record(
+                    card_id=card_id,
+                    marketplace_id=marketplace_ids[provider],
+                    price=price,
+                    time=time,
+                    condition=CardCondition.NEAR_MINT.value,
+                    is_foil=is_foil,
+                    language=CardLanguage.ENGLISH.value,
+                    currency=currency,
+                    source="mtgjson",
+                ))
+                stats["points_read"] += 1
+
+            if len(records) >= batch_rows:
+                yield records
+                records = []
+
+    if records:
+        yield records
+
+
+class MTGJSONPriceImporter:
+    """Import MTGJSON price history for the whole catalog in one pass."""
+
+    def __init__(self, cache_dir: Path = MTGJSON_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    async def build_uuid_lookup(
+        self,
+        db: AsyncSession,
+        identifiers_path: Path,
+        card_ids: Optional[list[int]] = None,
+    ) -> dict[str, int]:
+        """Map MTGJSON uuids to card ids with one card query and one file pass."""
+        query = select(Card.id, Card.scryfall_id)
+        if card_ids:
+            query = query.where(Card.id.in_(card_ids))
+        result = await db.execute(query)
+        scryfall_to_card = {row.scryfall_id: row.id for row in result}
+
+        def build() -> dict[str, int]:
+            return {
+                uuid: scryfall_to_card[scryfall_id]
+                for uuid, scryfall_id in iter_scryfall_ids(identifiers_path)
+                if scryfall_id in scryfall_to_card
+            }
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, build)
+
+    async def _get_or_create_marketplace(self, db: AsyncSession, provider: str) -> Marketplace:
+        """Get or create the marketplace an MTGJSON price provider maps to."""
+        slug, name, base_url, currency = PRICE_PROVIDERS[provider]
+        result = await db.execute(select(Marketplace).where(Marketplace.slug == slug))
+        marketplace = result.scalar_one_or_none()
+
+        if not marketplace:
+            marketplace = Marketplace(
+                name=name,
+                slug=slug,
+                base_url=base_url,
+                api_url=None,
+                is_enabled=True,
+                supports_api=False,
+                default_currency=currency,
+                rate_limit_seconds=1.0,
+            )
+            db.add(marketplace)
+            await db.flush()
+
+        return marketplace
+
+    async def import_history(
+        self,
+        connection,  # asyncpg connection
+        db: AsyncSession,
+        days: int = 90,
+        card_ids: Optional[list[int]] = None,
+        providers: tuple[str, ...] = ("tcgplayer",),
+        progress_callback: Optional[Callable[[dict[str, int]], None]] = None,
+    ) -> dict[str, int]:
+        """
+        Import the last `days` of MTGJSON retail prices.
+
+        Existing snapshots are left untouched (ON CONFLICT DO NOTHING), so
+        live prices always win over the MTGJSON daily points.
+
+        Args:
+            connection: asyncpg connection used for COPY
+            db: SQLAlchemy session for marketplace/card lookups
+            days: Days of history to import
+            card_ids: Restrict the import to these cards (default: all)
+            providers: MTGJSON price providers to import (see PRICE_PROVIDERS)
+            progress_callback: Optional callback after each batch
+
+        Returns:
+            dict with counts: cards_mapped, cards_matched, uuids_unmatched,
+            points_read, snapshots_created, batches
+        """
+        prices_path = await download_mtgjson_file(
+            ALL_PRICES_FILE, ALL_PRICES_MAX_AGE, self.cache_dir
+        )
+        identifiers_path = await download_mtgjson_file(
+            ALL_IDENTIFIERS_FILE, ALL_IDENTIFIERS_MAX_AGE, self.cache_dir
+        )
+
+        marketplace_ids = {
+            provider: (await self._get_or_create_marketplace(db, provider)).id
+            for provider in providers
+        }
+        await db.commit()
+
+        uuid_to_card = await self.build_uuid_lookup(db, identifiers_path, card_ids)
+        stats = {
+            "cards_mapped": len(uuid_to_card),
+            "cards_matched": 0,
+            "uuids_unmatched": 0,
+            "points_read": 0,
+            "snapshots_created": 0,
+            "batches": 0,
+        }
+        if not uuid_to_card:
+            logger.warning("No MTGJSON uuids map to cards", card_ids=len(card_ids or []))
+            return stats
+
+        since = datetime.now(timezone.utc).date() - timedelta(days=days)
+        batches = iter_copy_batches(prices_path, uuid_to_card, marketplace_ids, since, stats=stats)
+
+        # Parsing runs in a worker thread (ijson is synchronous) one batch at
+        # a time, so memory stays bounded by COPY_BATCH_ROWS
+        loop = asyncio.get_running_loop()
+        latest = None
+        unmatched = 0
+        try:
+            while True:
+                records = await loop.run_in_executor(None, next, batches, None)
+                if records is None:
+                    break
+                created = await bulk_copy_snapshots(
+                    connection, records, COPY_COLUMNS, update_existing=False,
+                    job="mtgjson_import",
+                )
+                stats["snapshots_created"] += created
+                stats["batches"] += 1
+                logger.info(
+                    "MTGJSON batch imported",
+                    batch=stats["batches"],
+                    rows=len(records),
+                    created=created,
+                    skipped=len(records) - created,
+                    uuids_unmatched=stats["uuids_unmatched"] - unmatched,
+                    cards_matched=stats["cards_matched"],
+                )
+                unmatched = stats["uuids_unmatched"]
+                batch_latest = max(r[0] for r in records)
+                latest = batch_latest if latest is None else max(latest, batch_latest)
+                if progress_callback:
+                    progress_callback(stats)
+        finally:
+            batches.close()
+
+        await record_watermark(
+            db, PRICE_SNAPSHOTS_WATERMARK, stats["snapshots_created"],
+            latest_data_at=latest, job="mtgjson_import",
+        )
+        await db.commit()
+
+        # The aggregate policies only refresh recent buckets
+        if stats["snapshots_created"]:
+            await PriceRepository(db).refresh_card_price_aggregates(
+                datetime.combine(since, datetime.min.time(), tzinfo=timezone.utc)
+            )
+
+        return stats
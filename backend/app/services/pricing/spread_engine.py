@@ -0,0 +1,330 @@
+"""
+Cross-marketplace spread engine.
+
+Loads the latest price of every card on every marketplace into one dense
+card x marketplace matrix (NaN where a marketplace has no recent price)
+and finds each card's best buy/sell pair for all cards in one vectorized
+pass. Arbitrage signals, the spreads API and get_spread_opportunities
+all read from the same matrices, cached per process until new price
+snapshots land (the price_snapshots watermark moves).
+
+Prices are near-mint, non-foil, English snapshots from a recent window
+(SPREAD_WINDOW_HOURS unless a caller asks for another), so every
+marketplace is compared like for like.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from time import monotonic
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+import structlog
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.constants import CardCondition, CardLanguage
+from app.core.data_freshness import PRICE_SNAPSHOTS_WATERMARK, get_watermarks
+from app.core.utils import LoopLocalLock
+from app.models import PriceSnapshot
+
+logger = structlog.get_logger()
+
+SPREAD_WINDOW_HOURS = 48
+
+LOAD_BATCH_ROWS = 20_000
+
+
+class SpreadOpportunity(NamedTuple):
+    """Best buy/sell marketplace pair for one card."""
+
+    card_id: int
+    buy_marketplace_id: int
+    sell_marketplace_id: int
+    buy_price: float
+    sell_price: float
+    buy_listings: Optional[int]
+    sell_listings: Optional[int]
+    profit: float  # sell revenue minus buy cost, after fees
+    profit_pct: float  # profit / buy cost
+
+
+@dataclass
+class BestPairs:
+    """Per-card best pair arrays, aligned with SpreadMatrix.card_ids."""
+
+    buy: np.ndarray  # int64 (n,), marketplace column to buy from
+    sell: np.ndarray  # int64 (n,), marketplace column to sell on
+    profit: np.ndarray  # float64 (n,), NaN where fewer than two prices
+    profit_pct: np.ndarray  # float64 (n,)
+
+
+@dataclass
+class SpreadMatrix:
+    """Latest price of every card on every marketplace."""
+
+    card_ids: np.ndarray  # int64 (n,), sorted
+    marketplace_ids: np.ndarray  # int64 (m,), sorted
+    prices: np.ndarray  # float64 (n, m), NaN where missing
+    listings: np.ndarray  # int32 (n, m), -1 where unknown
+    version: Optional[tuple] = None
+    built_at: float = field(default_factory=monotonic)
+    _pairs: dict = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.card_ids)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable, version: Optional[tuple] = None) -> "SpreadMatrix":
+        """Build a matrix from rows of (card_id, marketplace_id, price, num_listings)."""
+        rows = list(rows)
+        cards = np.array([row.card_id for row in rows], dtype=np.int64)
+        markets = np.array([row.marketplace_id for row in rows], dtype=np.int64)
+        card_ids, card_rows = np.unique(cards, return_inverse=True)
+        marketplace_ids, market_cols = np.unique(markets, return_inverse=True)
+
+        prices = np.full((len(card_ids), len(marketplace_ids)), np.nan)
+        listings = np.full(prices.shape, -1, dtype=np.int32)
+        prices[card_rows, market_cols] = [float(row.price) for row in rows]
+        listings[card_rows, market_cols] = [
+            -1 if row.num_listings is None else row.num_listings for row in rows
+        ]
+
+        return cls(
+            card_ids=card_ids,
+            marketplace_ids=marketplace_ids,
+            prices=prices,
+            listings=listings,
+            version=version,
+        )
+
+    @classmethod
+    async def load(
+        cls,
+        db: AsyncSession,
+        currency: str = "USD",
+        window_hours: int = SPREAD_WINDOW_HOURS,
+        version: Optional[tuple] = None,
+    ) -> "SpreadMatrix":
+        """Load the latest price per (card, marketplace) within the window."""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=window_hours)
+        query = (
+            select(
+                PriceSnapshot.card_id,
+                PriceSnapshot.marketplace_id,
+                PriceSnapshot.price,
+                PriceSnapshot.num_listings,
+            )
+            .where(
+                PriceSnapshot.time >= cutoff,
+                PriceSnapshot.currency == currency,
+                PriceSnapshot.price > 0,
+                PriceSnapshot.is_foil == False,  # noqa: E712
+                PriceSnapshot.condition == CardCondition.NEAR_MINT.value,
+                PriceSnapshot.language == CardLanguage.ENGLISH.value,
+            )
+            .distinct(PriceSnapshot.card_id, PriceSnapshot.marketplace_id)
+            .order_by(
+                PriceSnapshot.card_id,
+                PriceSnapshot.marketplace_id,
+                PriceSnapshot.time.desc(),
+            )
+            .execution_options(yield_per=LOAD_BATCH_ROWS)
+        )
+        result = await db.stream(query)
+        rows = [row async for row in result]
+        return cls.from_rows(rows, version=version)
+
+    def best_pairs(self, fee_pct: float = 0.0, min_price: float = 0.0) -> BestPairs:
+        """
+        Most profitable buy/sell marketplace pair of every card.
+
+        Buying costs price * (1 + fee_pct) and selling returns
+        price * (1 - fee_pct). Profit separates into sell revenue minus
+        buy cost, so the best pair is the cheapest cost and the highest
+        revenue of each row; with non-negative fees a positive profit
+        always uses two different marketplaces. Prices below min_price
+        are ignored. Results are memoized per (fee_pct, min_price).
+        """
+        key = (fee_pct, min_price)
+        if key in self._pairs:
+            return self._pairs[key]
+
+        prices = np.where(self.prices >= min_price, self.prices, np.nan)
+        present = ~np.isnan(prices)
+        cost = np.where(present, prices * (1 + fee_pct), np.inf)
+        revenue = np.where(present, prices * (1 - fee_pct), -np.inf)
+
+        rows = np.arange(len(self))
+        buy = cost.argmin(axis=1) if prices.size else np.zeros(len(self), dtype=np.int64)
+        sell = revenue.argmax(axis=1) if prices.size else np.zeros(len(self), dtype=np.int64)
+        comparable = present.sum(axis=1) >= 2
+
+        profit = np.full(len(self), np.nan)
+        profit_pct = np.full(len(self), np.nan)
+        if comparable.any():
+            best_cost = cost[rows, buy]
+            profit[comparable] = (revenue[rows, sell] - best_cost)[comparable]
+            profit_pct[comparable] = profit[comparable] / best_cost[comparable]
+
+        pairs = BestPairs(buy=buy, sell=sell, profit=profit, profit_pct=profit_pct)
+        self._pairs[key] = pairs
+        return pairs
+
+    def opportunities(
+        self,
+        fee_pct: float = 0.0,
+        min_price: float = 0.0,
+        min_profit: float = 0.0,
+        min_profit_pct: float = 0.0,
+        order_by: str = "profit",
+        limit: Optional[int] = None,
+    ) -> list[SpreadOpportunity]:
+        """
+        Cards whose best pair clears the profit thresholds.
+
+        Args:
+            fee_pct: Estimated fees per side (0.10 = 10%)
+            min_price: Ignore prices below this
+            min_profit: Minimum profit after fees
+            min_profit_pct: Minimum profit as a fraction of buy cost
+            order_by: "profit" or "profit_pct", highest first (ties by card id)
+            limit: Maximum number of results
+        """
+        pairs = self.best_pairs(fee_pct, min_price)
+        with np.errstate(invalid="ignore"):
+            selected = np.flatnonzero(
+                (pairs.profit > 0)
+                & (pairs.profit >= min_profit)
+                & (pairs.profit_pct >= min_profit_pct)
+            )
+        score = pairs.profit_pct if order_by == "profit_pct" else pairs.profit
+        selected = selected[np.lexsort((self.card_ids[selected], -score[selected]))]
+        if limit is not None:
+            selected = selected[:limit]
+
+        opportunities = []
+        for row in selected:
+            buy, sell = pairs.buy[row], pairs.sell[row]
+            buy_listings, sell_listings = self.listings[row, buy], self.listings[row, sell]
+            opportunities.append(SpreadOpportunity(
+                card_id=int(self.card_ids[row]),
+                buy_marketplace_id=int(self.marketplace_ids[buy]),
+                sell_marketplace_id=int(self.marketplace_ids[sell]),
+                buy_price=float(self.prices[row, buy]),
+                sell_price=float(self.prices[row, sell]),
+                buy_listings=None if buy_listings < 0 else int(buy_listings),
+                sell_listings=None if sell_listings < 0 else int(sell_listings),
+                profit=float(pairs.profit[row]),
+                profit_pct=float(pairs.profit_pct[row]),
+            ))
+        return opportunities
+
+
+# Process-wide matrices by (currency, window hours), with the monotonic
+# time their version was last checked, and the lock serializing reloads
+_matrices: dict[tuple[str, int], tuple[float, SpreadMatrix]] = {}
+_matrix_lock = LoopLocalLock()
+
+
+async def price_version(db: AsyncSession) -> Optional[tuple]:
+    """Version of the price data: the price_snapshots watermark, if recorded."""
+    watermark = (await get_watermarks(db)).get(PRICE_SNAPSHOTS_WATERMARK)
+    if watermark is None:
+        return None
+    return (watermark.last_run_at, watermark.latest_data_at)
+
+
+async def get_spread_matrix(
+    db: AsyncSession,
+    currency: str = "USD",
+    window_hours: int = SPREAD_WINDOW_HOURS,
+) -> SpreadMatrix:
+    """
+    Return the cached spread matrix for a currency and window, reloading it after new prices.
+
+    The price watermark is re-read at most every
+    settings.spread_matrix_check_interval seconds. Without a watermark the
+    matrix is reloaded on every check.
+    """
+    key = (currency, window_hours)
+
+    def fresh() -> Optional[SpreadMatrix]:
+        cached = _matrices.get(key)
+        if cached is not None and monotonic() - cached[0] < settings.spread_matrix_check_interval:
+            return cached[1]
+        return None
+
+    if (matrix := fresh()) is not None:
+        return matrix
+
+    async with _matrix_lock:
+        if (matrix := fresh()) is not None:
+            return matrix
+        version = await price_version(db)
+        cached = _matrices.get(key)
+        matrix = cached[1] if cached is not None else None
+        if matrix is None or version is None or matrix.version != version:
+            matrix = await SpreadMatrix.load(db, currency, window_hours, version=version)
+            logger.info(
+                "Loaded spread matrix",
+                currency=currency,
+                window_hours=window_hours,
+                cards=len(matrix),
+                marketplaces=len(matrix.marketplace_ids),
+            )
+        _matrices[key] = (monotonic(), matrix)
+    return matrix
+
+
+async def get_spread_opportunities(
+    db: AsyncSession,
+    currency: str = "USD",
+    min_spread_pct: float = 0.15,
+    limit: int = 20,
+    window_hours: int = 1,
+) -> list[dict]:
+    """
+    Cards with the widest spreads between marketplaces, one best pair per card.
+
+    Args:
+        db: Database session
+        currency: Currency to filter by
+        min_spread_pct: Minimum spread percentage (0.15 = 15%)
+        limit: Maximum number of results
+        window_hours: Only prices from this many recent hours
+
+    Returns:
+        List of opportunities (card, marketplaces, prices, spread and
+        spread_pct), widest spread first
+    """
+    matrix = await get_spread_matrix(db, currency, window_hours)
+    opportunities = matrix.opportunities(
+        min_profit_pct=min_spread_pct, order_by="profit_pct", limit=limit,
+    )
+    if not opportunities:
+        return []
+
+    cards_result = await db.execute(
+        text("SELECT id, name, set_code FROM cards WHERE id = ANY(:ids)"),
+        {"ids": [o.card_id for o in opportunities]},
+    )
+    cards = {row.id: row for row in cards_result}
+    marketplaces_result = await db.execute(text("SELECT id, name FROM marketplaces"))
+    marketplaces = {row.id: row.name for row in marketplaces_result}
+
+    return [
+        {
+            "card_id": o.card_id,
+            "card_name": cards[o.card_id].name,
+            "set_code": cards[o.card_id].set_code,
+            "buy_marketplace": marketplaces.get(o.buy_marketplace_id),
+            "sell_marketplace": marketplaces.get(o.sell_marketplace_id),
+            "buy_price": o.buy_price,
+            "sell_price": o.sell_price,
+            "spread": o.sell_price - o.buy_price,
+            "spread_pct": o.profit_pct,
+        }
+        for o in opportunities
+        if o.card_id in cards
+    ]
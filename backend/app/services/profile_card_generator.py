@@ -2,8 +2,21 @@
 Profile Card PNG Generator Service.
 
 Generates trading card-style PNG images of user profiles for social sharing.
+
+Rendered cards are cached on disk under a content hash of the fields drawn on
+them, so a card is only re-rendered (in a worker thread) after one of those
+fields changes. Fonts and per-tier frame backgrounds are built once per
+process.
 """
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from functools import lru_cache
 from io import BytesIO
+from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont
 from typing import Optional
 
@@ -24,31 +37,77 @@ FRAME_ACCENT_COLORS = {
 }
 
 
+# Bump when the card layout changes so cached renders are invalidated
+RENDER_VERSION = 1
+
+PROFILE_CARD_CACHE_DIR = Path("data/profile_cards")
+
+
+@dataclass(frozen=True)
+class ProfileCardFields:
+    """Everything drawn on a profile card; the cache key is a hash of these."""
+
+    display_name: Optional[str]
+    username: str
+    frame_tier: str
+    tagline: Optional[str] = None
+    card_type: Optional[str] = None
+    cards_for_trade: int = 0
+    signature_card_name: Optional[str] = None
+    member_since: Optional[str] = None
+
+    @property
+    def content_hash(self) -> str:
+        payload = json.dumps([RENDER_VERSION, asdict(self)], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+@lru_cache(maxsize=1)
+def _load_fonts():
+    """Load fonts with fallback to default (once per process)."""
+    try:
+        title_font = ImageFont.truetype(
+            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24
+        )
+        body_font = ImageFont.truetype(
+            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 16
+        )
+        small_font = ImageFont.truetype(
+            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 12
+        )
+    except OSError:
+        # Fallback to default font
+        title_font = ImageFont.load_default()
+        body_font = ImageFont.load_default()
+        small_font = ImageFont.load_default()
+    return title_font, body_font, small_font
+
+
 class ProfileCardGenerator:
     """Generates PNG profile cards for social sharing."""
 
-    def __init__(self):
+    def __init__(self, cache_dir: Path = PROFILE_CARD_CACHE_DIR):
         self.width = 400
         self.height = 560
+        self.cache_dir = cache_dir
+        self._frame_bases: dict[str, Image.Image] = {}
 
     def _load_fonts(self):
         """Load fonts with fallback to default."""
-        try:
-            title_font = ImageFont.truetype(
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24
-            )
-            body_font = ImageFont.truetype(
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 16
-            )
-            small_font = ImageFont.truetype(
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 12
-            )
-        except OSError:
-            # Fallback to default font
-            title_font = ImageFont.load_default()
-            body_font = ImageFont.load_default()
-            small_font = ImageFont.load_default()
-        return title_font, body_font, small_font
+        return _load_fonts()
+
+    def _frame_base(self, frame_tier: str) -> Image.Image:
+        """Frame and avatar placeholder for a tier, drawn once and copied per card."""
+        if frame_tier not in FRAME_COLORS:
+            frame_tier = "bronze"
+        base = self._frame_bases.get(frame_tier)
+        if base is None:
+            base = Image.new("RGB", (self.width, self.height), "white")
+            draw = ImageDraw.Draw(base)
+            self._draw_frame(draw, frame_tier)
+            self._draw_avatar_placeholder(draw, frame_tier)
+            self._frame_bases[frame_tier] = base
+        return base
 
     def _draw_frame(self, draw: ImageDraw.Draw, frame_tier: str):
         """Draw the card frame with appropriate color."""
@@ -132,6 +191,50 @@ class ProfileCardGenerator:
             text = text[:-1]
         return text + "..."
 
+    def _cache_path(self, user_id: int, fields: ProfileCardFields) -> Path:
+        return self.cache_dir / f"{user_id}-{fields.content_hash}.png"
+
+    def _render_cached(self, user_id: int, fields: ProfileCardFields) -> bytes:
+        """Read a cached render, or render and store it, replacing older renders."""
+        path = self._cache_path(user_id, fields)
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            pass
+
+        png_bytes = self.render(**asdict(fields))
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(png_bytes)
+                written_at = os.fstat(f.fileno()).st_mtime_ns
+            os.replace(partial, path)
+        except BaseException:
+            Path(partial).unlink(missing_ok=True)
+            raise
+
+        # Only drop renders written before this one: a concurrent render that
+        # landed later is the newer card. Same-tick renders count as older
+        for stale in self.cache_dir.glob(f"{user_id}-*.png"):
+            if stale == path:
+                continue
+            try:
+                if stale.stat().st_mtime_ns <= written_at:
+                    stale.unlink(missing_ok=True)
+            except FileNotFoundError:
+                pass
+        return png_bytes
+
+    async def get_or_render(self, user_id: int, fields: ProfileCardFields) -> bytes:
+        """
+        Get a user's card PNG, rendering only when its content hash changed.
+
+        Disk reads and rendering run in a worker thread.
+        """
+        return await asyncio.to_thread(self._render_cached, user_id, fields)
+
     async def generate(
         self,
         display_name: str,
@@ -161,22 +264,40 @@ class ProfileCardGenerator:
         Returns:
             PNG image as bytes
         """
+        return await asyncio.to_thread(
+            self.render,
+            display_name=display_name,
+            username=username,
+            frame_tier=frame_tier,
+            tagline=tagline,
+            card_type=card_type,
+            cards_for_trade=cards_for_trade,
+            signature_card_name=signature_card_name,
+            member_since=member_since,
+        )
+
+    def render(
+        self,
+        display_name: Optional[str],
+        username: str,
+        frame_tier: str,
+        tagline: Optional[str] = None,
+        card_type: Optional[str] = None,
+        cards_for_trade: int = 0,
+        signature_card_name: Optional[str] = None,
+        member_since: Optional[str] = None,
+    ) -> bytes:
+        """Render a profile card PNG synchronously (CPU-bound, see generate)."""
         frame_color = FRAME_COLORS.get(frame_tier, FRAME_COLORS["bronze"])
         accent_color = FRAME_ACCENT_COLORS.get(frame_tier, FRAME_ACCENT_COLORS["bronze"])
 
-        # Create image
-        image = Image.new("RGB", (self.width, self.height), "white")
+        # Start from the pre-drawn frame and avatar placeholder
+        image = self._frame_base(frame_tier).copy()
         draw = ImageDraw.Draw(image)
 
         # Load fonts
         title_font, body_font, small_font = self._load_fonts()
 
-        # Draw frame
-        self._draw_frame(draw, frame_tier)
-
-        # Draw avatar placeholder
-        self._draw_avatar_placeholder(draw, frame_tier)
-
         # Draw display name/username at top
         name_text = display_name or username
         name_text = self._truncate_text(name_text, title_font, self.width - 60)
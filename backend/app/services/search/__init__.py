@@ -1,11 +1,16 @@
 """Search services for semantic and text-based card search."""
 from app.services.search.semantic import SemanticSearchService
 from app.services.search.autocomplete import AutocompleteService
-from app.services.search.filters import apply_card_filters, build_filter_query
+from app.services.search.filters import build_filter_query
+from app.services.search.vector_index import CardVectorIndex
+from app.services.search.query import build_search_query, count_results, order_by_relevance
 
 __all__ = [
     "SemanticSearchService",
     "AutocompleteService",
-    "apply_card_filters",
+    "CardVectorIndex",
     "build_filter_query",
+    "build_search_query",
+    "count_results",
+    "order_by_relevance",
 ]
@@ -0,0 +1,135 @@
+"""
+Ranked SQL card search.
+
+Builds card search queries that match on the trigram and full-text indexes
+(ix_cards_name_trgm, ix_cards_search_document) and rank results by exact
+name match, name prefix, trigram word similarity and full-text rank. All
+filters run in SQL via build_filter_query.
+
+Counts for broad queries come from the planner estimate instead of a
+COUNT(*) over every matching row.
+"""
+import json
+from typing import Optional
+
+import structlog
+from sqlalchemy import Select, case, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.transaction import savepoint
+from app.models import Card
+from app.services.search.filters import build_filter_query
+
+logger = structlog.get_logger()
+
+# Must match the ix_cards_search_document expression (migration 20260119_004).
+# Rendered inline, not as bind parameters, so the planner can use the index.
+CARD_SEARCH_DOCUMENT = literal_column(
+    "to_tsvector('english'::regconfig, "
+    "coalesce(cards.name, '') || ' ' || coalesce(cards.type_line, '') || ' ' || "
+    "coalesce(cards.oracle_text, ''))"
+)
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+# Below this planner estimate the exact count is cheap enough to run
+EXACT_COUNT_THRESHOLD = 1000
+
+
+def escape_like(q: str) -> str:
+    """Escape SQL wildcard characters in user input."""
+    return q.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_")
+
+
+def search_condition(q: str, full_text: bool = True):
+    """
+    Match condition for a search term.
+
+    Name substring (ILIKE) and fuzzy word match (%>) both use the name
+    trigram index; with full_text the term is also matched against name,
+    type line and oracle text through the tsvector index.
+    """
+    conditions = [
+        Card.name.ilike(f"%{escape_like(q)}%", escape="\\"),
+        Card.name.op("%>")(q),
+    ]
+    if full_text:
+        conditions.append(
+            CARD_SEARCH_DOCUMENT.op("@@")(func.websearch_to_tsquery(SEARCH_CONFIG, q))
+        )
+    return or_(*conditions)
+
+
+def search_rank(q: str, full_text: bool = True):
+    """Relevance score: exact name, then name prefix, then similarity."""
+    rank = case(
+        (func.lower(Card.name) == q.lower(), 2.0),
+        (Card.name.ilike(f"{escape_like(q)}%", escape="\\"), 1.0),
+        else_=0.0,
+    ) + func.word_similarity(q, Card.name)
+    if full_text:
+        rank = rank + func.ts_rank_cd(
+            CARD_SEARCH_DOCUMENT, func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        )
+    return rank
+
+
+def build_search_query(
+    q: str,
+    filters: Optional[dict] = None,
+    full_text: bool = True,
+) -> Select:
+    """
+    Filtered, unordered card search query.
+
+    An empty q matches every card, so the query can also back browsing.
+    """
+    query = select(Card)
+    if q:
+        query = query.where(search_condition(q, full_text))
+    return build_filter_query(query, filters or {})
+
+
+def order_by_relevance(query: Select, q: str, full_text: bool = True) -> Select:
+    """Order by relevance for q, falling back to name order when browsing."""
+    if not q:
+        return query.order_by(Card.name, Card.id)
+    return query.order_by(search_rank(q, full_text).desc(), Card.name, Card.id)
+
+
+async def estimate_count(db: AsyncSession, query: Select) -> int:
+    """Planner row estimate for a query, from EXPLAIN."""
+    conn = await db.connection()
+    compiled = query.compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    args = tuple(params[name] for name in compiled.positiontup or ())
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", args)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_results(
+    db: AsyncSession,
+    query: Select,
+    exact_threshold: int = EXACT_COUNT_THRESHOLD,
+) -> tuple[int, bool]:
+    """
+    Count matches, estimating for broad queries.
+
+    Returns:
+        Tuple of (count, is_estimate). Narrow queries, where the planner
+        expects fewer than exact_threshold rows, get an exact count.
+    """
+    conn = await db.connection()
+    if conn.dialect.name == "postgresql":
+        try:
+            async with savepoint(db, "search_count_estimate"):
+                estimate = await estimate_count(db, query)
+            if estimate >= exact_threshold:
+                return estimate, True
+        except Exception as e:
+            logger.warning("Search count estimate failed", error=str(e))
+
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    return total or 0, False
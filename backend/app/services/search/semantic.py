@@ -2,15 +2,19 @@
 Semantic search service using vector embeddings.
 
 Enables natural language search like "blue card draw" or "flying creatures".
-Uses sentence-transformers for query embedding and cosine similarity for matching.
+Uses sentence-transformers for query embedding and cosine similarity for matching,
+with attribute filters applied before scoring.
 """
+import asyncio
 from typing import Optional
+
 import numpy as np
 import structlog
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Card, CardFeatureVector
+from app.models import Card
+from app.services.search.vector_index import CardVectorIndex
 from app.services.vectorization.service import VectorizationService
 
 logger = structlog.get_logger()
@@ -20,14 +24,18 @@ class SemanticSearchService:
     """
     Service for semantic card search using vector embeddings.
 
-    Uses pre-computed card embeddings from card_feature_vectors table
-    and computes query embedding on-the-fly for similarity matching.
+    Uses pre-computed card embeddings from card_feature_vectors table,
+    held in memory as a CardVectorIndex, and computes the query embedding
+    on-the-fly for similarity matching.
     """
 
-    def __init__(self):
+    def __init__(self, index_ttl_seconds: float = 600):
         """Initialize the semantic search service."""
         self.vectorizer = VectorizationService()
         self.embedding_dim = 384  # all-MiniLM-L6-v2 dimension
+        self.index_ttl_seconds = index_ttl_seconds
+        self._index: Optional[CardVectorIndex] = None
+        self._index_lock = asyncio.Lock()
 
     def _compute_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
         """
@@ -49,57 +57,61 @@ class SemanticSearchService:
 
         return float(np.dot(vec1, vec2) / (norm1 * norm2))
 
-    async def search(
+    async def get_index(self, db: AsyncSession) -> CardVectorIndex:
+        """
+        Return the in-memory vector index, reloading it once it is stale.
+
+        New embeddings from refresh_embeddings become searchable within
+        index_ttl_seconds.
+        """
+        if self._index is None or self._index.is_stale(self.index_ttl_seconds):
+            async with self._index_lock:
+                if self._index is None or self._index.is_stale(self.index_ttl_seconds):
+                    self._index = await CardVectorIndex.load(db, self.embedding_dim)
+                    logger.info("Loaded card vector index", cards=len(self._index))
+        return self._index
+
+    async def search_page(
         self,
         db: AsyncSession,
         query: str,
         limit: int = 20,
         offset: int = 0,
         filters: Optional[dict] = None,
-    ) -> list[dict]:
+    ) -> tuple[list[dict], int]:
         """
-        Search for cards using semantic similarity.
+        Search for cards using semantic similarity with attribute pre-filters.
+
+        Filters are applied to the candidate set before scoring, so every
+        page is full and the total counts all matching cards.
 
         Args:
             db: Database session
             query: Natural language search query
             limit: Maximum results to return
             offset: Number of results to skip
-            filters: Optional attribute filters (colors, format, type, etc.)
+            filters: Optional attribute filters (colors, card_type, cmc_min,
+                cmc_max, format_legal, rarity)
 
         Returns:
-            List of card dicts with similarity scores
+            Tuple of (card dicts with similarity scores, total matches)
         """
-        # Get query embedding
-        query_embedding = self._get_query_embedding(query)
-
-        # Get all card vectors (in production, use approximate nearest neighbors)
-        vectors_query = select(CardFeatureVector)
-        result = await db.execute(vectors_query)
-        all_vectors = result.scalars().all()
-
-        if not all_vectors:
-            return []
+        index = await self.get_index(db)
+        if not len(index):
+            return [], 0
 
-        # Compute similarities
-        similarities = []
-        for card_vector in all_vectors:
-            vec = card_vector.get_vector()
-            # Only compare the text embedding portion (first 384 dims)
-            text_vec = vec[:self.embedding_dim]
-            similarity = self._compute_similarity(query_embedding, text_vec)
-            similarities.append((card_vector.card_id, similarity))
+        query_embedding = self._get_query_embedding(query).astype(np.float32)
+        card_ids, scores, total = index.search(query_embedding, limit, offset, filters)
+        if not len(card_ids):
+            return [], total
 
-        # Sort by similarity (highest first)
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        # Fetch card details in one query, keeping score order
+        result = await db.execute(select(Card).where(Card.id.in_(card_ids.tolist())))
+        cards = {card.id: card for card in result.scalars().all()}
 
-        # Apply offset and limit
-        top_results = similarities[offset:offset + limit]
-
-        # Fetch card details
         results = []
-        for card_id, score in top_results:
-            card = await db.get(Card, card_id)
+        for card_id, score in zip(card_ids.tolist(), scores.tolist()):
+            card = cards.get(card_id)
             if card:
                 results.append({
                     "card_id": card.id,
@@ -111,6 +123,30 @@ class SemanticSearchService:
                     "similarity_score": score,
                 })
 
+        return results, total
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        filters: Optional[dict] = None,
+    ) -> list[dict]:
+        """
+        Search for cards using semantic similarity.
+
+        Args:
+            db: Database session
+            query: Natural language search query
+            limit: Maximum results to return
+            offset: Number of results to skip
+            filters: Optional attribute filters (colors, format, type, etc.)
+
+        Returns:
+            List of card dicts with similarity scores
+        """
+        results, _ = await self.search_page(db, query, limit, offset, filters)
         return results
 
     def _get_query_embedding(self, query: str) -> np.ndarray:
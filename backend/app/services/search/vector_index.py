@@ -0,0 +1,187 @@
+"""
+In-memory card vector index with attribute pre-filtering.
+
+Holds every card's text embedding as one normalized float32 matrix next to
+per-card filter arrays (color bitmask, legality bitset, rarity code, CMC,
+type line). A filtered search first reduces the candidate set with
+vectorized mask operations and only then scores the survivors, so results
+are exact, pages are always full and totals are true.
+
+The filter arrays come from the normalized search columns on cards
+(color_mask, legal_formats), so they agree with SQL text search.
+"""
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import color_mask, format_bit
+from app.models import Card, CardFeatureVector
+
+RARITY_CODES: dict[str, int] = {
+    "common": 0,
+    "uncommon": 1,
+    "rare": 2,
+    "mythic": 3,
+    "special": 4,
+    "bonus": 5,
+}
+
+LOAD_BATCH_ROWS = 5000
+
+
+@dataclass
+class CardVectorIndex:
+    """Card embeddings plus the attribute arrays used to pre-filter them."""
+
+    card_ids: np.ndarray  # int64 (n,)
+    embeddings: np.ndarray  # float32 (n, dim), L2-normalized
+    color_masks: np.ndarray  # int16 (n,)
+    legal_formats: np.ndarray  # int64 (n,)
+    rarities: np.ndarray  # int8 (n,), -1 when unknown
+    cmc: np.ndarray  # float32 (n,), NaN when unknown
+    type_lines: np.ndarray  # str (n,), lowercased
+    built_at: float = field(default_factory=monotonic)
+
+    def __len__(self) -> int:
+        return len(self.card_ids)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable, dim: int) -> "CardVectorIndex":
+        """
+        Build an index from rows of (card_id, feature_vector, color_mask,
+        legal_formats, rarity, cmc, type_line).
+
+        Only the first dim values of each feature vector (the text
+        embedding) are kept.
+        """
+        card_ids, vectors, colors, formats, rarities, cmcs, types = [], [], [], [], [], [], []
+        for row in rows:
+            vector = np.frombuffer(row.feature_vector, dtype=np.float32)
+            if len(vector) < dim:
+                continue
+            card_ids.append(row.card_id)
+            vectors.append(vector[:dim])
+            colors.append(row.color_mask or 0)
+            formats.append(row.legal_formats or 0)
+            rarities.append(RARITY_CODES.get((row.rarity or "").lower(), -1))
+            cmcs.append(np.nan if row.cmc is None else row.cmc)
+            types.append((row.type_line or "").lower())
+
+        embeddings = np.vstack(vectors) if vectors else np.zeros((0, dim), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = np.divide(
+            embeddings, norms, out=np.zeros_like(embeddings), where=norms > 0
+        )
+
+        return cls(
+            card_ids=np.array(card_ids, dtype=np.int64),
+            embeddings=embeddings.astype(np.float32, copy=False),
+            color_masks=np.array(colors, dtype=np.int16),
+            legal_formats=np.array(formats, dtype=np.int64),
+            rarities=np.array(rarities, dtype=np.int8),
+            cmc=np.array(cmcs, dtype=np.float32),
+            type_lines=np.array(types, dtype=str),
+        )
+
+    @classmethod
+    async def load(cls, db: AsyncSession, dim: int) -> "CardVectorIndex":
+        """Load all card vectors with their filter attributes."""
+        query = (
+            select(
+                CardFeatureVector.card_id,
+                CardFeatureVector.feature_vector,
+                Card.color_mask,
+                Card.legal_formats,
+                Card.rarity,
+                Card.cmc,
+                Card.type_line,
+            )
+            .join(Card, Card.id == CardFeatureVector.card_id)
+            .execution_options(yield_per=LOAD_BATCH_ROWS)
+        )
+        result = await db.stream(query)
+        rows = [row async for row in result]
+        return cls.from_rows(rows, dim)
+
+    def filter_mask(self, filters: Optional[dict] = None) -> Optional[np.ndarray]:
+        """
+        Boolean candidate mask for attribute filters, or None if unfiltered.
+
+        Supports the /search filters: colors (any of), card_type (type line
+        contains), cmc_min, cmc_max, format_legal and rarity.
+        """
+        filters = {k: v for k, v in (filters or {}).items() if v is not None and v != ""}
+        if not filters:
+            return None
+
+        mask = np.ones(len(self), dtype=bool)
+
+        if filters.get("colors"):
+            mask &= (self.color_masks & color_mask(filters["colors"])) != 0
+
+        if filters.get("format_legal"):
+            bit = format_bit(filters["format_legal"])
+            if bit is None:
+                mask[:] = False
+            else:
+                mask &= (self.legal_formats & bit) != 0
+
+        if filters.get("rarity"):
+            code = RARITY_CODES.get(filters["rarity"].lower())
+            if code is None:
+                mask[:] = False
+            else:
+                mask &= self.rarities == code
+
+        # NaN comparisons are False, so cards without a CMC drop out of ranges
+        if "cmc_min" in filters:
+            mask &= self.cmc >= filters["cmc_min"]
+        if "cmc_max" in filters:
+            mask &= self.cmc <= filters["cmc_max"]
+
+        if filters.get("card_type") and mask.any():
+            candidates = np.flatnonzero(mask)
+            matches = np.char.find(self.type_lines[candidates], filters["card_type"].lower()) >= 0
+            mask[candidates[~matches]] = False
+
+        return mask
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        limit: int,
+        offset: int = 0,
+        filters: Optional[dict] = None,
+    ) -> tuple[np.ndarray, np.ndarray, int]:
+        """
+        Score filtered candidates and return one page.
+
+        Returns:
+            Tuple of (card_ids, scores, total) where total is the number of
+            cards passing the filters.
+        """
+        mask = self.filter_mask(filters)
+        if mask is None:
+            candidate_ids = self.card_ids
+            scores = self.embeddings @ query_embedding
+        else:
+            candidates = np.flatnonzero(mask)
+            candidate_ids = self.card_ids[candidates]
+            scores = self.embeddings[candidates] @ query_embedding
+
+        total = len(candidate_ids)
+        k = min(offset + limit, total)
+        if k <= offset:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32), total
+
+        # Partial sort: only the top k need ordering; ties break on card id
+        top = np.argpartition(-scores, k - 1)[:k] if k < total else np.arange(total)
+        order = top[np.lexsort((candidate_ids[top], -scores[top]))][offset:k]
+        return candidate_ids[order], scores[order], total
+
+    def is_stale(self, ttl_seconds: float) -> bool:
+        return monotonic() - self.built_at > ttl_seconds
@@ -0,0 +1,251 @@
+"""
+In-memory set completion from set membership bitmaps.
+
+Every card in the catalog gets a bit position; the cards of a set occupy
+one contiguous range of positions, in collector number order. A user's
+collection is then a packed bitmap over the same positions, built from
+the distinct card ids in their inventory (one index-only query, no join
+against cards). Owned counts for every set are a single reduceat over
+the bitmap, and a set's missing cards are the clear bits in its range,
+so completion percentages, top sets and missing-card lists are served
+on demand without touching the cards table.
+
+The membership index is rebuilt only when the catalog changes: when the
+catalog watermark moves (set sync, bulk card import) or new cards are
+inserted, checked at most every settings.set_index_check_interval
+seconds.
+"""
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal
+from time import monotonic
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+import structlog
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.data_freshness import CATALOG_WATERMARK, get_watermarks
+from app.core.utils import LoopLocalLock
+from app.models import Card, InventoryItem
+
+logger = structlog.get_logger()
+
+LOAD_BATCH_ROWS = 10_000
+
+_COLLECTOR_NUMBER = re.compile(r"(\d+)")
+
+
+class SetProgress(NamedTuple):
+    """Owned and total distinct cards of one set."""
+
+    set_code: str
+    owned: int
+    total: int
+
+    @property
+    def completion(self) -> Decimal:
+        """Completion percentage rounded to 2 places."""
+        if not self.total:
+            return Decimal("0.00")
+        return Decimal(str(round(self.owned / self.total * 100, 2)))
+
+
+def collector_sort_key(collector_number: Optional[str]) -> tuple[int, str]:
+    """Order collector numbers numerically, then by suffix ("12" < "12a" < "100")."""
+    number = collector_number or ""
+    match = _COLLECTOR_NUMBER.search(number)
+    return (int(match.group(1)) if match else 1 << 30, number)
+
+
+@dataclass
+class SetMembershipIndex:
+    """Bit positions of every card, grouped into one range per set."""
+
+    set_codes: np.ndarray  # str (s,), sorted
+    set_offsets: np.ndarray  # int64 (s + 1,), positions of set s are [offsets[s], offsets[s + 1])
+    card_ids: np.ndarray  # int64 (n,), card at each position
+    sorted_ids: np.ndarray  # int64 (n,), card_ids sorted for lookups
+    sorted_positions: np.ndarray  # int64 (n,), position of each sorted id
+    version: Optional[tuple] = None
+    built_at: float = field(default_factory=monotonic)
+
+    def __len__(self) -> int:
+        return len(self.card_ids)
+
+    @property
+    def set_sizes(self) -> np.ndarray:
+        return np.diff(self.set_offsets)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable, version: Optional[tuple] = None) -> "SetMembershipIndex":
+        """Build an index from rows of (id, set_code, collector_number)."""
+        ordered = sorted(
+            rows,
+            key=lambda row: (row.set_code, collector_sort_key(row.collector_number), row.id),
+        )
+        card_ids = np.array([row.id for row in ordered], dtype=np.int64)
+        codes = [row.set_code for row in ordered]
+
+        set_codes, starts = [], []
+        for position, code in enumerate(codes):
+            if not set_codes or set_codes[-1] != code:
+                set_codes.append(code)
+                starts.append(position)
+        starts.append(len(codes))
+
+        order = np.argsort(card_ids, kind="stable")
+        return cls(
+            set_codes=np.array(set_codes, dtype=str),
+            set_offsets=np.array(starts, dtype=np.int64),
+            card_ids=card_ids,
+            sorted_ids=card_ids[order],
+            sorted_positions=order.astype(np.int64),
+            version=version,
+        )
+
+    @classmethod
+    async def load(cls, db: AsyncSession, version: Optional[tuple] = None) -> "SetMembershipIndex":
+        """Load set membership for every card in the catalog."""
+        query = select(Card.id, Card.set_code, Card.collector_number).execution_options(
+            yield_per=LOAD_BATCH_ROWS
+        )
+        result = await db.stream(query)
+        rows = [row async for row in result]
+        return cls.from_rows(rows, version=version)
+
+    def positions(self, card_ids: Iterable[int]) -> np.ndarray:
+        """Bit positions of card ids, skipping ids not in the index."""
+        ids = np.fromiter(card_ids, dtype=np.int64)
+        if not len(ids) or not len(self):
+            return np.zeros(0, dtype=np.int64)
+        found = np.searchsorted(self.sorted_ids, ids)
+        found = np.minimum(found, len(self.sorted_ids) - 1)
+        known = self.sorted_ids[found] == ids
+        return self.sorted_positions[found[known]]
+
+    def owned_bitmap(self, card_ids: Iterable[int]) -> np.ndarray:
+        """Packed bitmap (uint8, little bit order) with the bits of the given cards set."""
+        bits = np.zeros(len(self), dtype=bool)
+        bits[self.positions(card_ids)] = True
+        return np.packbits(bits, bitorder="little")
+
+    def _bits(self, bitmap: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bitmap, count=len(self), bitorder="little").astype(bool)
+
+    def _set_slot(self, set_code: str) -> Optional[int]:
+        slot = int(np.searchsorted(self.set_codes, set_code))
+        if slot < len(self.set_codes) and self.set_codes[slot] == set_code:
+            return slot
+        return None
+
+    def resolve_set_code(self, set_code: str) -> Optional[str]:
+        """The indexed spelling of a set code, matched case-insensitively."""
+        if self._set_slot(set_code) is not None:
+            return set_code
+        folded = set_code.lower()
+        return next((str(code) for code in self.set_codes if code.lower() == folded), None)
+
+    def owned_counts(self, bitmap: np.ndarray) -> np.ndarray:
+        """(s,) number of owned cards in each set."""
+        if not len(self):
+            return np.zeros(0, dtype=np.int64)
+        return np.add.reduceat(self._bits(bitmap).astype(np.int64), self.set_offsets[:-1])
+
+    def progress(self, bitmap: np.ndarray) -> list[SetProgress]:
+        """Progress for every set the bitmap owns at least one card of."""
+        owned = self.owned_counts(bitmap)
+        sizes = self.set_sizes
+        return [
+            SetProgress(str(self.set_codes[slot]), int(owned[slot]), int(sizes[slot]))
+            for slot in np.flatnonzero(owned)
+        ]
+
+    def top_sets(self, bitmap: np.ndarray, limit: int = 1) -> list[SetProgress]:
+        """Started sets with the highest completion, ties by set code."""
+        owned = self.owned_counts(bitmap)
+        started = np.flatnonzero(owned)
+        if not len(started):
+            return []
+        ratios = owned[started] / self.set_sizes[started]
+        # set_codes is sorted, so a stable sort on -ratio keeps code order for ties
+        order = started[np.argsort(-ratios, kind="stable")][:limit]
+        sizes = self.set_sizes
+        return [
+            SetProgress(str(self.set_codes[slot]), int(owned[slot]), int(sizes[slot]))
+            for slot in order
+        ]
+
+    def missing(self, bitmap: np.ndarray, set_code: str) -> Optional[np.ndarray]:
+        """
+        Card ids of a set not set in the bitmap, in collector number order.
+
+        Returns None if the set is not in the index.
+        """
+        slot = self._set_slot(set_code)
+        if slot is None:
+            return None
+        start, end = self.set_offsets[slot], self.set_offsets[slot + 1]
+        return self.card_ids[start:end][~self._bits(bitmap)[start:end]]
+
+    def set_progress(self, bitmap: np.ndarray, set_code: str) -> Optional[SetProgress]:
+        """Progress for one set, or None if the set is not in the index."""
+        slot = self._set_slot(set_code)
+        if slot is None:
+            return None
+        start, end = self.set_offsets[slot], self.set_offsets[slot + 1]
+        owned = int(np.count_nonzero(self._bits(bitmap)[start:end]))
+        return SetProgress(set_code, owned, int(end - start))
+
+
+# Process-wide index, the monotonic time its version was last checked
+# and the lock serializing reloads
+_index: Optional[SetMembershipIndex] = None
+_checked_at: float = 0.0
+_index_lock = LoopLocalLock()
+
+
+async def catalog_version(db: AsyncSession) -> tuple:
+    """Version of the card catalog: newest card id and catalog watermark run."""
+    max_card_id = await db.scalar(select(func.max(Card.id)))
+    watermark = (await get_watermarks(db)).get(CATALOG_WATERMARK)
+    return (max_card_id, watermark.last_run_at if watermark else None)
+
+
+async def get_set_index(db: AsyncSession) -> SetMembershipIndex:
+    """
+    Return the process-wide membership index, rebuilding it after a catalog change.
+
+    The catalog version is re-read at most every
+    settings.set_index_check_interval seconds.
+    """
+    global _index, _checked_at
+
+    if _index is not None and monotonic() - _checked_at < settings.set_index_check_interval:
+        return _index
+
+    async with _index_lock:
+        if _index is not None and monotonic() - _checked_at < settings.set_index_check_interval:
+            return _index
+        version = await catalog_version(db)
+        if _index is None or _index.version != version:
+            _index = await SetMembershipIndex.load(db, version=version)
+            logger.info(
+                "Loaded set membership index",
+                cards=len(_index),
+                sets=len(_index.set_codes),
+            )
+        _checked_at = monotonic()
+    return _index
+
+
+async def load_owned_bitmap(
+    db: AsyncSession, index: SetMembershipIndex, user_id: int
+) -> np.ndarray:
+    """Packed owned-card bitmap of a user's inventory."""
+    result = await db.execute(
+        select(InventoryItem.card_id).where(InventoryItem.user_id == user_id).distinct()
+    )
+    return index.owned_bitmap(result.scalars())
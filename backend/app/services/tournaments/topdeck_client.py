@@ -70,6 +70,7 @@ class TopDeckClient:
             failure_threshold=5,
             recovery_timeout=60.0,  # 1 minute before retry
             half_open_requests=2,
+            shared=True,  # One breaker state across all workers
         )
 
         if not self.api_key:
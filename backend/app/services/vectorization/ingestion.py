@@ -4,10 +4,14 @@ Vectorization integration for ingestion pipeline.
 Provides functions to vectorize cards and store feature vectors in the database.
 Cards are vectorized using sentence-transformers for semantic similarity search.
 """
-from typing import Any
+import hashlib
+from collections import OrderedDict
+from typing import Any, Optional
 
+import numpy as np
 import structlog
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Card, CardFeatureVector
@@ -49,6 +53,7 @@ async def vectorize_card(
 
         # Vectorize
         feature_vector = vectorizer.vectorize_card(card_data)
+        content_hash = vectorizer.card_content_hash(card_data)
 
         # Check if vector already exists
         existing_query = select(CardFeatureVector).where(CardFeatureVector.card_id == card_id)
@@ -59,12 +64,14 @@ async def vectorize_card(
             # Update existing vector
             existing.set_vector(feature_vector)
             existing.model_version = vectorizer.embedding_model_name
+            existing.content_hash = content_hash
             return existing
         else:
             # Create new vector
             card_vector = CardFeatureVector(
                 card_id=card_id,
                 model_version=vectorizer.embedding_model_name,
+                content_hash=content_hash,
             )
             card_vector.set_vector(feature_vector)
             db.add(card_vector)
@@ -98,6 +105,7 @@ async def vectorize_card_by_attrs(
     try:
         # Vectorize
         feature_vector = vectorizer.vectorize_card(card_attrs)
+        content_hash = vectorizer.card_content_hash(card_attrs)
 
         # Check if vector already exists
         existing_query = select(CardFeatureVector).where(CardFeatureVector.card_id == card_id)
@@ -108,12 +116,14 @@ async def vectorize_card_by_attrs(
             # Update existing vector
             existing.set_vector(feature_vector)
             existing.model_version = vectorizer.embedding_model_name
+            existing.content_hash = content_hash
             return existing
         else:
             # Create new vector
             card_vector = CardFeatureVector(
                 card_id=card_id,
                 model_version=vectorizer.embedding_model_name,
+                content_hash=content_hash,
             )
             card_vector.set_vector(feature_vector)
             db.add(card_vector)
@@ -122,3 +132,109 @@ async def vectorize_card_by_attrs(
     except Exception as e:
         logger.warning("Failed to vectorize card by attributes", card_id=card_id, error=str(e))
         return None
+
+
+class EmbeddingCache:
+    """
+    LRU cache of text embeddings keyed by a hash of the embedded text.
+
+    Reprints share name, type line and oracle text, so most cards in a
+    refresh reuse an embedding computed for an earlier printing.
+    """
+
+    def __init__(self, max_entries: int = 50_000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        embedding = self._entries.get(key)
+        if embedding is not None:
+            self._entries.move_to_end(key)
+        return embedding
+
+    def put(self, key: str, embedding: np.ndarray) -> None:
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def vectorize_cards_batch(
+    cards: list[dict[str, Any]],
+    vectorizer: VectorizationService,
+    cache: EmbeddingCache,
+    encode_batch_size: int = 256,
+    pool: Optional[dict[str, Any]] = None,
+) -> tuple[list[np.ndarray], int]:
+    """
+    Vectorize many cards, embedding each distinct text only once.
+
+    Args:
+        cards: Card attribute dicts (as for VectorizationService.vectorize_card)
+        vectorizer: Vectorization service instance
+        cache: Embedding cache shared across batches
+        encode_batch_size: Texts per model forward pass
+        pool: Optional multi-process encode pool
+
+    Returns:
+        (feature vectors in card order, number of texts actually encoded)
+    """
+    texts = [vectorizer.card_text(card) for card in cards]
+    keys = [EmbeddingCache.key(text) for text in texts]
+
+    missing: dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in missing and cache.get(key) is None:
+            missing[key] = text
+
+    if missing:
+        embeddings = vectorizer.encode_texts(list(missing.values()), encode_batch_size, pool)
+        for key, embedding in zip(missing, embeddings):
+            cache.put(key, np.asarray(embedding, dtype=np.float32))
+
+    vectors = [
+        np.concatenate([cache.get(key), vectorizer.card_attribute_features(card)])
+        for key, card in zip(keys, cards)
+    ]
+    return vectors, len(missing)
+
+
+async def upsert_card_vectors(db: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    """
+    Insert or update CardFeatureVector rows in one statement.
+
+    Args:
+        db: Database session
+        rows: Dicts with card_id, feature_vector (ndarray), model_version, content_hash
+    """
+    if not rows:
+        return
+    values = [
+        {
+            "card_id": row["card_id"],
+            "feature_vector": row["feature_vector"].astype(np.float32).tobytes(),
+            "feature_dim": len(row["feature_vector"]),
+            "model_version": row["model_version"],
+            "content_hash": row["content_hash"],
+        }
+        for row in rows
+    ]
+    stmt = insert(CardFeatureVector).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["card_id"],
+        set_={
+            "feature_vector": stmt.excluded.feature_vector,
+            "feature_dim": stmt.excluded.feature_dim,
+            "model_version": stmt.excluded.model_version,
+            "content_hash": stmt.excluded.content_hash,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
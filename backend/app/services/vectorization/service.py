@@ -4,6 +4,7 @@ Feature vectorization service.
 Converts raw card and listing data into normalized feature vectors
 ready for machine learning models.
 """
+import hashlib
 import json
 from typing import Any
 
@@ -58,27 +59,9 @@ class VectorizationService:
             self._embedding_model = SentenceTransformer(self.embedding_model_name)
         return self._embedding_model
     
-    def vectorize_card(self, card_data: dict[str, Any]) -> np.ndarray:
-        """
-        Vectorize card data into a feature vector.
-        
-        Args:
-            card_data: Dictionary containing card fields:
-                - name: str
-                - type_line: str | None
-                - oracle_text: str | None
-                - rarity: str | None
-                - cmc: float | None
-                - colors: list[str] | None
-                - mana_cost: str | None
-                
-        Returns:
-            Combined feature vector as numpy array.
-        """
-        model = self._get_embedding_model()
-        
-        # 1. Text embeddings
-        # Combine card name, type line, and oracle text for embedding
+    @staticmethod
+    def card_text(card_data: dict[str, Any]) -> str:
+        """Text embedded for a card: name, type line and oracle text."""
         text_parts = []
         if card_data.get("name"):
             text_parts.append(card_data["name"])
@@ -87,11 +70,30 @@ class VectorizationService:
         if card_data.get("oracle_text"):
             text_parts.append(card_data["oracle_text"])
         
-        text = " ".join(text_parts) if text_parts else ""
-        text_embedding = model.encode(text, normalize_embeddings=True)
+        return " ".join(text_parts) if text_parts else ""
+    
+    def card_content_hash(self, card_data: dict[str, Any]) -> str:
+        """
+        Hash of everything a card vector is computed from.
         
-        # 2. Rarity one-hot encoding
-        rarity = card_data.get("rarity", "").lower()
+        Stored with the vector so unchanged cards can be skipped on refresh.
+        """
+        colors = card_data.get("colors") or []
+        if not isinstance(colors, str):
+            colors = json.dumps(colors)
+        content = "\x1f".join([
+            self.embedding_model_name,
+            self.card_text(card_data),
+            (card_data.get("rarity") or "").lower(),
+            str(card_data.get("cmc") or 0.0),
+            colors,
+        ])
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+    
+    def card_attribute_features(self, card_data: dict[str, Any]) -> np.ndarray:
+        """Non-text card features: rarity one-hot, normalized CMC, color one-hot."""
+        # Rarity one-hot encoding
+        rarity = (card_data.get("rarity") or "").lower()
         rarity_vector = np.zeros(self.rarity_dim)
         rarity_map = {
             "common": 0,
@@ -103,7 +105,7 @@ class VectorizationService:
         if rarity in rarity_map:
             rarity_vector[rarity_map[rarity]] = 1.0
         
-        # 3. Numerical features (normalized)
+        # Numerical features (normalized)
         cmc = card_data.get("cmc") or 0.0
         cmc_normalized = min(cmc / 10.0, 1.0)  # Normalize to 0-1 (assuming max CMC ~10)
         
@@ -120,15 +122,79 @@ class VectorizationService:
             if color in color_map:
                 color_vector[color_map[color]] = 1.0
         
-        # Combine all features
-        feature_vector = np.concatenate([
-            text_embedding,  # 384 dims
+        return np.concatenate([
             rarity_vector,   # 5 dims
             [cmc_normalized],  # 1 dim
             color_vector,    # 5 dims
         ])
+    
+    def vectorize_card(self, card_data: dict[str, Any]) -> np.ndarray:
+        """
+        Vectorize card data into a feature vector.
         
-        return feature_vector
+        Args:
+            card_data: Dictionary containing card fields:
+                - name: str
+                - type_line: str | None
+                - oracle_text: str | None
+                - rarity: str | None
+                - cmc: float | None
+                - colors: list[str] | None
+                - mana_cost: str | None
+                
+        Returns:
+            Combined feature vector as numpy array.
+        """
+        model = self._get_embedding_model()
+        
+        # Combine card name, type line, and oracle text for embedding
+        text_embedding = model.encode(self.card_text(card_data), normalize_embeddings=True)
+        
+        return np.concatenate([
+            text_embedding,  # 384 dims
+            self.card_attribute_features(card_data),  # 11 dims
+        ])
+    
+    def encode_texts(
+        self,
+        texts: list[str],
+        batch_size: int = 256,
+        pool: dict[str, Any] | None = None,
+    ) -> np.ndarray:
+        """
+        Embed many texts at once.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Texts per forward pass
+            pool: Optional pool from start_encode_pool for multi-process encoding
+            
+        Returns:
+            Array of shape (len(texts), text_embedding_dim), L2-normalized.
+        """
+        model = self._get_embedding_model()
+        if pool is not None:
+            return model.encode_multi_process(
+                texts, pool, batch_size=batch_size, normalize_embeddings=True
+            )
+        return model.encode(
+            texts, batch_size=batch_size, normalize_embeddings=True, show_progress_bar=False
+        )
+    
+    def start_encode_pool(self, processes: int) -> dict[str, Any]:
+        """
+        Start worker processes for CPU encoding with encode_texts.
+        
+        Must be called from a non-daemon process (not a prefork Celery child).
+        Stop it with stop_encode_pool.
+        """
+        model = self._get_embedding_model()
+        return model.start_multi_process_pool(target_devices=["cpu"] * processes)
+    
+    @staticmethod
+    def stop_encode_pool(pool: dict[str, Any]) -> None:
+        """Stop a pool started with start_encode_pool."""
+        SentenceTransformer.stop_multi_process_pool(pool)
     
     def vectorize_listing(self, listing_data: dict[str, Any], card_vector: np.ndarray | None = None) -> np.ndarray:
         """
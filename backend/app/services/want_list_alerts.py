@@ -0,0 +1,203 @@
+"""
+Event-driven want list price alerts.
+
+Active want list targets are indexed in Redis as one sorted set per card
+(member = want list item id, score = target price). When price snapshots
+are written, each written card's price is checked against its set with a
+single ZRANGEBYSCORE, so only items whose target was actually hit are
+loaded from the database and notified - within seconds of the write
+instead of on the next check_want_list_prices run.
+
+The index is kept in sync by the want list routes and fully rebuilt by the
+check_want_list_prices beat task, which also remains the fallback for any
+write path that does not evaluate alerts.
+"""
+from collections.abc import Iterable
+from decimal import Decimal
+from typing import Any, Optional
+
+import structlog
+from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.core.config import settings
+from app.db.transaction import savepoint
+from app.models import WantListItem
+from app.services.notifications import create_price_alert
+
+logger = structlog.get_logger()
+
+WANT_ALERT_KEY_PREFIX = "want_alerts:card:"
+# Set once the index has been built; until then price writes skip evaluation
+WANT_ALERT_READY_KEY = "want_alerts:ready"
+
+
+def card_key(card_id: int) -> str:
+    """Redis key of a card's target price set."""
+    return f"{WANT_ALERT_KEY_PREFIX}{card_id}"
+
+
+def _field(snapshot: Any, name: str, default: Any = None) -> Any:
+    if isinstance(snapshot, dict):
+        return snapshot.get(name, default)
+    return getattr(snapshot, name, default)
+
+
+def lowest_written_prices(snapshots: Iterable[Any]) -> dict[int, Decimal]:
+    """
+    Lowest non-foil USD price written per card.
+
+    Accepts snapshot dicts or objects with the same attribute names
+    (SnapshotRecord, CollectedPriceData).
+    """
+    lowest: dict[int, Decimal] = {}
+    for snapshot in snapshots:
+        price = _field(snapshot, "price")
+        if (
+            _field(snapshot, "is_foil", False)
+            or _field(snapshot, "currency", "USD") != "USD"
+            or not price
+            or price <= 0
+        ):
+            continue
+        price = Decimal(str(price))
+        card_id = _field(snapshot, "card_id")
+        if card_id not in lowest or price < lowest[card_id]:
+            lowest[card_id] = price
+    return lowest
+
+
+async def sync_want_list_item(redis: Redis, item: WantListItem) -> None:
+    """Add, move or remove one item's target in the index."""
+    if item.alert_enabled:
+        await redis.zadd(card_key(item.card_id), {str(item.id): float(item.target_price)})
+    else:
+        await redis.zrem(card_key(item.card_id), str(item.id))
+
+
+async def remove_want_list_item(redis: Redis, item: WantListItem) -> None:
+    """Drop a deleted item from the index."""
+    await redis.zrem(card_key(item.card_id), str(item.id))
+
+
+async def rebuild_want_list_index(db: AsyncSession, redis: Redis) -> int:
+    """
+    Rebuild the whole index from want_list_items.
+
+    Returns:
+        Number of indexed items.
+    """
+    result = await db.execute(
+        select(WantListItem.id, WantListItem.card_id, WantListItem.target_price)
+        .where(WantListItem.alert_enabled == True)  # noqa: E712
+    )
+    targets: dict[str, dict[str, float]] = {}
+    for row in result:
+        targets.setdefault(card_key(row.card_id), {})[str(row.id)] = float(row.target_price)
+
+    stale = [key async for key in redis.scan_iter(match=f"{WANT_ALERT_KEY_PREFIX}*", count=1000)]
+
+    pipe = redis.pipeline(transaction=True)
+    if stale:
+        pipe.delete(*stale)
+    for key, members in targets.items():
+        pipe.zadd(key, members)
+    pipe.set(WANT_ALERT_READY_KEY, 1)
+    await pipe.execute()
+
+    indexed = sum(len(members) for members in targets.values())
+    logger.debug("Rebuilt want list alert index", cards=len(targets), items=indexed)
+    return indexed
+
+
+async def match_targets(redis: Redis, prices: dict[int, Decimal]) -> list[int]:
+    """Want list item ids whose target is at or above the written price."""
+    if not prices:
+        return []
+    pipe = redis.pipeline(transaction=False)
+    for card_id, price in prices.items():
+        pipe.zrangebyscore(card_key(card_id), float(price), "+inf")
+    results = await pipe.execute()
+    return [int(member) for members in results for member in members]
+
+
+async def evaluate_want_list_alerts(
+    db: AsyncSession,
+    snapshots: Iterable[Any],
+    redis: Optional[Redis] = None,
+) -> int:
+    """
+    Notify users whose want list target was hit by just-written prices.
+
+    Never raises: alert evaluation must not fail a price write, and the
+    beat task catches anything missed here. The caller commits.
+
+    Args:
+        db: Session to create notifications in
+        snapshots: Written snapshots (dicts, SnapshotRecord or CollectedPriceData)
+        redis: Redis client; a short-lived one is opened if omitted
+
+    Returns:
+        Number of notifications created.
+    """
+    prices = lowest_written_prices(snapshots)
+    if not prices:
+        return 0
+
+    own_redis = redis is None
+    if own_redis:
+        redis = Redis.from_url(settings.redis_url, decode_responses=True)
+
+    try:
+        if not await redis.exists(WANT_ALERT_READY_KEY):
+            return 0
+        item_ids = await match_targets(redis, prices)
+        if not item_ids:
+            return 0
+
+        # Savepoint so a failure here cannot poison the caller's transaction
+        async with savepoint(db, "want_list_alerts"):
+            result = await db.execute(
+                select(WantListItem)
+                .options(joinedload(WantListItem.card))
+                .where(
+                    WantListItem.id.in_(item_ids),
+                    WantListItem.alert_enabled == True,  # noqa: E712
+                )
+            )
+            alerts_created = 0
+            for item in result.scalars().unique():
+                current_price = prices[item.card_id]
+                # Re-check against the database in case the index is stale
+                if current_price > item.target_price:
+                    continue
+                card_name = item.card.name if item.card else f"Card #{item.card_id}"
+                notification = await create_price_alert(
+                    db=db,
+                    user_id=item.user_id,
+                    card_id=item.card_id,
+                    card_name=card_name,
+                    current_price=current_price,
+                    target_price=item.target_price,
+                )
+                if notification:
+                    alerts_created += 1
+
+        if alerts_created:
+            logger.info(
+                "Created price alerts at write time",
+                cards_checked=len(prices),
+                targets_hit=len(item_ids),
+                alerts_created=alerts_created,
+            )
+        return alerts_created
+
+    except Exception as e:
+        logger.warning("Want list alert evaluation failed", error=str(e))
+        return 0
+
+    finally:
+        if own_redis:
+            await redis.aclose()
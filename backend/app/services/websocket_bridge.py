@@ -0,0 +1,123 @@
+"""
+Redis Pub/Sub bridge for WebSocket workers.
+
+Each API worker subscribes only to the Redis channels its own clients are
+subscribed to, instead of pattern-subscribing to channel:*. The bridge is
+told whenever a channel gains its first or loses its last local
+subscriber and issues SUBSCRIBE/UNSUBSCRIBE to match, so a worker's
+message-processing cost scales with its own subscriptions rather than
+with total traffic.
+
+redis-py re-subscribes to the current channel set after a reconnect.
+"""
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Optional
+
+import structlog
+from redis.asyncio import Redis
+from redis.asyncio.client import PubSub
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+logger = structlog.get_logger()
+
+# How long a read waits before re-checking for shutdown or an empty set
+READ_TIMEOUT_SECONDS = 1.0
+
+
+class ChannelBridge:
+    """Keep a worker's Redis subscriptions in sync with its local channels."""
+
+    def __init__(
+        self,
+        get_redis: Callable[[], Awaitable[Redis]],
+        has_subscribers: Callable[[str], bool],
+        on_message: Callable[[str, dict[str, Any]], Awaitable[Any]],
+    ):
+        """
+        Args:
+            get_redis: Coroutine function returning the Redis client
+            has_subscribers: Whether a channel has local subscribers
+            on_message: Coroutine called with (channel, decoded message)
+        """
+        self.get_redis = get_redis
+        self.has_subscribers = has_subscribers
+        self.on_message = on_message
+        self.subscribed: set[str] = set()
+        self._pubsub: Optional[PubSub] = None
+        self._lock = asyncio.Lock()
+        self._has_channels = asyncio.Event()
+
+    async def _get_pubsub(self) -> PubSub:
+        if self._pubsub is None:
+            redis = await self.get_redis()
+            self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        return self._pubsub
+
+    async def sync(self, channel: str) -> None:
+        """
+        Subscribe to or unsubscribe from a channel to match local interest.
+
+        Safe to call after any local subscribe/unsubscribe; the current
+        local state is re-checked under the bridge lock, so interleaved
+        calls for the same channel settle correctly.
+        """
+        async with self._lock:
+            wanted = self.has_subscribers(channel)
+            if wanted == (channel in self.subscribed):
+                return
+            pubsub = await self._get_pubsub()
+            if wanted:
+                await pubsub.subscribe(channel)
+                self.subscribed.add(channel)
+                self._has_channels.set()
+            else:
+                await pubsub.unsubscribe(channel)
+                self.subscribed.discard(channel)
+                if not self.subscribed:
+                    self._has_channels.clear()
+
+        logger.debug(
+            "Redis channel subscription changed",
+            channel=channel,
+            subscribed=wanted,
+            total=len(self.subscribed),
+        )
+
+    async def run(self) -> None:
+        """Read messages for subscribed channels until cancelled."""
+        logger.info("Redis Pub/Sub bridge started")
+        try:
+            while True:
+                # With no subscriptions there is nothing to read
+                await self._has_channels.wait()
+                pubsub = await self._get_pubsub()
+                try:
+                    message = await pubsub.get_message(timeout=READ_TIMEOUT_SECONDS)
+                except RedisConnectionError as e:
+                    logger.warning("Redis Pub/Sub connection lost", error=str(e))
+                    await asyncio.sleep(READ_TIMEOUT_SECONDS)
+                    continue
+                if message is None or message["type"] != "message":
+                    continue
+                channel = message["channel"]
+                try:
+                    data = json.loads(message["data"])
+                except json.JSONDecodeError:
+                    logger.warning("Invalid JSON from Redis", channel=channel)
+                    continue
+                await self.on_message(channel, data)
+        except asyncio.CancelledError:
+            logger.info("Redis Pub/Sub bridge cancelled")
+            raise
+
+    async def close(self) -> None:
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe()
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.debug("Error closing Redis Pub/Sub", error=str(e))
+            self._pubsub = None
+        self.subscribed.clear()
+        self._has_channels.clear()
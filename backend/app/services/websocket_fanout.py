@@ -0,0 +1,163 @@
+"""
+WebSocket fan-out primitives.
+
+Each connection gets a ClientSender: a bounded queue of pre-serialized
+messages drained by its own writer task. Broadcasting serializes a message
+once and only enqueues the text, so a slow client never stalls a channel
+and fan-out cost is one JSON encode plus O(subscribers) queue puts.
+
+Slow consumers are isolated: when a client's queue is full the oldest
+queued message is dropped (newest state matters most), and a client that
+keeps overflowing or blocks a single send past the timeout is disconnected.
+
+MessageCoalescer merges bursts of per-channel updates (e.g. card price
+ticks) arriving within a short window into one message.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+import structlog
+from fastapi import WebSocket
+
+logger = structlog.get_logger()
+
+SEND_QUEUE_SIZE = 256
+SEND_TIMEOUT_SECONDS = 5.0
+# Overflow drops in a row (no successful send in between) before disconnect
+MAX_CONSECUTIVE_DROPS = 64
+
+COALESCE_WINDOW_SECONDS = 0.25
+COALESCED_MESSAGE_TYPES = frozenset({"card_update"})
+
+# WebSocket close code 1013: Try Again Later
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class ClientSender:
+    """Bounded send queue and writer task for one WebSocket connection."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_close: Optional[Callable[[WebSocket], Awaitable[None]]] = None,
+        queue_size: int = SEND_QUEUE_SIZE,
+        send_timeout: float = SEND_TIMEOUT_SECONDS,
+        max_consecutive_drops: int = MAX_CONSECUTIVE_DROPS,
+    ):
+        self.websocket = websocket
+        self.on_close = on_close
+        self.send_timeout = send_timeout
+        self.max_consecutive_drops = max_consecutive_drops
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.closed = False
+        self._consecutive_drops = 0
+        self._task: Optional[asyncio.Task] = None
+        # Set once an overflow disconnect is scheduled; also keeps the
+        # task referenced until it finishes
+        self._abort_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._writer())
+
+    def enqueue(self, text: str) -> bool:
+        """
+        Queue a serialized message without waiting.
+
+        Returns:
+            False if the connection is closed or being disconnected
+        """
+        if self.closed or self._abort_task is not None:
+            return False
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        self.queue.get_nowait()
+        self.queue.put_nowait(text)
+        self.dropped += 1
+        self._consecutive_drops += 1
+        if self._consecutive_drops > self.max_consecutive_drops:
+            self._abort_task = asyncio.create_task(self._abort("queue_overflow"))
+        return True
+
+    async def _writer(self) -> None:
+        """Drain the queue into the socket, one message at a time."""
+        try:
+            while True:
+                text = await self.queue.get()
+                await asyncio.wait_for(self.websocket.send_text(text), self.send_timeout)
+                self._consecutive_drops = 0
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            await self._abort("send_timeout")
+        except Exception as e:
+            logger.debug("WebSocket send failed", error=str(e))
+            await self._abort(None)
+
+    async def _abort(self, reason: Optional[str]) -> None:
+        """Close a slow or broken connection and notify the owner."""
+        if self.closed:
+            return
+        self.stop()
+        if reason:
+            logger.warning("Disconnecting slow WebSocket consumer", reason=reason, dropped=self.dropped)
+            try:
+                await self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+            except Exception:
+                pass
+        if self.on_close:
+            await self.on_close(self.websocket)
+
+    def stop(self) -> None:
+        """Stop the writer; queued messages are discarded."""
+        self.closed = True
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._task = None
+
+
+class MessageCoalescer:
+    """
+    Merge bursts of updates per channel within a short window.
+
+    The first update for a channel starts the window; later updates are
+    merged into it (newer keys win) and one message is emitted when the
+    window closes.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str, dict[str, Any]], Awaitable[Any]],
+        window: float = COALESCE_WINDOW_SECONDS,
+    ):
+        self.emit = emit
+        self.window = window
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def add(self, channel: str, message: dict[str, Any]) -> None:
+        pending = self._pending.get(channel)
+        if pending is not None:
+            pending.update(message)
+            return
+        self._pending[channel] = dict(message)
+        self._tasks[channel] = asyncio.create_task(self._flush_later(channel))
+
+    async def _flush_later(self, channel: str) -> None:
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            self._tasks.pop(channel, None)
+            message = self._pending.pop(channel, None)
+        if message is not None:
+            await self.emit(channel, message)
+
+    def cancel(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._pending.clear()
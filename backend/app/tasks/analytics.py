@@ -12,6 +12,7 @@ import structlog
 from celery import shared_task
 from sqlalchemy import select
 
+from app.core.data_freshness import METRICS_WATERMARK, record_watermark
 from app.models import PriceSnapshot
 from app.services.agents.analytics import AnalyticsAgent
 from app.tasks.utils import create_task_session_maker, run_async, single_instance
@@ -52,6 +53,7 @@ async def _run_analytics_async(
                 target_date=target_date,
                 generate_insights=True,
             )
+            await _record_metrics_watermark(db, results, target_date, "run_analytics")
 
             logger.info("Analytics run completed", results=results)
             return results
@@ -59,6 +61,18 @@ async def _run_analytics_async(
         await engine.dispose()
 
 
+async def _record_metrics_watermark(db, results: dict, target_date: date | None, job: str) -> None:
+    """Advance the metrics watermark after an analytics run."""
+    # Backfills for past dates must not mark today's metrics as fresh
+    latest = None
+    if target_date is not None:
+        latest = datetime.combine(target_date, datetime.min.time(), tzinfo=timezone.utc)
+    await record_watermark(
+        db, METRICS_WATERMARK, results.get("cards_processed", 0), latest_data_at=latest, job=job
+    )
+    await db.commit()
+
+
 # =============================================================================
 # Market Analytics (for market page - independent of user inventories)
 # =============================================================================
@@ -133,6 +147,7 @@ async def _run_market_analytics_async(
             )
 
             results["analytics_type"] = "market"
+            await _record_metrics_watermark(db, results, target_date, "run_market_analytics")
             logger.info("Market analytics run completed", results=results)
             return results
 
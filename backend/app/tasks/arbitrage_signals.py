@@ -10,15 +10,17 @@ An arbitrage opportunity exists when:
 - There's sufficient supply on both ends
 """
 import json
-from datetime import date, timedelta
+from datetime import date
 from typing import Any
 
+import numpy as np
 import structlog
 from celery import shared_task
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, and_
 
 from app.db.session import async_session_maker
-from app.models import PriceSnapshot, Signal, Marketplace
+from app.models import Signal, Marketplace
+from app.services.pricing.spread_engine import get_spread_matrix
 from app.tasks.utils import run_async
 
 logger = structlog.get_logger()
@@ -61,72 +63,46 @@ async def _generate_arbitrage_signals_async() -> dict[str, Any]:
             result = await db.execute(marketplace_query)
             marketplaces = {m.id: m.name for m in result.scalars()}
 
-            # Get recent prices grouped by card and marketplace
-            today = date.today()
-            yesterday = today - timedelta(days=1)
+            # Best fee-adjusted buy/sell pair of every card in one pass
+            matrix = await get_spread_matrix(db, "USD")
+            pairs = matrix.best_pairs(ESTIMATED_FEE_PCT, MIN_CARD_PRICE)
+            stats["cards_analyzed"] = int(np.count_nonzero(~np.isnan(pairs.profit)))
 
-            # Get latest price per card per marketplace
-            subquery = (
-                select(
-                    PriceSnapshot.card_id,
-                    PriceSnapshot.marketplace_id,
-                    func.max(PriceSnapshot.time).label('latest_time')
-                )
-                .where(
-                    and_(
-                        func.date(PriceSnapshot.time) >= yesterday,
-                        PriceSnapshot.currency == "USD",
-                        PriceSnapshot.price >= MIN_CARD_PRICE,
-                    )
-                )
-                .group_by(PriceSnapshot.card_id, PriceSnapshot.marketplace_id)
-                .subquery()
+            opportunities = matrix.opportunities(
+                fee_pct=ESTIMATED_FEE_PCT,
+                min_price=MIN_CARD_PRICE,
+                min_profit=MIN_PROFIT_USD,
+                min_profit_pct=MIN_PRICE_DIFF_PCT,
             )
 
-            # Get actual prices at those times
-            prices_query = (
-                select(
-                    PriceSnapshot.card_id,
-                    PriceSnapshot.marketplace_id,
-                    PriceSnapshot.price,
-                    PriceSnapshot.num_listings,
-                )
-                .join(
-                    subquery,
-                    and_(
-                        PriceSnapshot.card_id == subquery.c.card_id,
-                        PriceSnapshot.marketplace_id == subquery.c.marketplace_id,
-                        PriceSnapshot.time == subquery.c.latest_time,
+            # Today's signals, to update rather than duplicate
+            existing: dict[int, Signal] = {}
+            if opportunities:
+                existing_result = await db.execute(
+                    select(Signal).where(
+                        and_(
+                            Signal.signal_type == "arbitrage",
+                            Signal.date == date.today(),
+                            Signal.card_id.in_([o.card_id for o in opportunities]),
+                        )
                     )
                 )
-            )
-
-            result = await db.execute(prices_query)
-            prices = result.all()
-
-            # Group prices by card
-            card_prices: dict[int, list] = {}
-            for row in prices:
-                if row.card_id not in card_prices:
-                    card_prices[row.card_id] = []
-                card_prices[row.card_id].append({
-                    'marketplace_id': row.marketplace_id,
-                    'price': float(row.price),
-                    'num_listings': row.num_listings or 1,
-                })
-
-            # Analyze cards with prices on multiple marketplaces
-            for card_id, price_list in card_prices.items():
-                if len(price_list) < 2:
-                    continue
-
-                stats["cards_analyzed"] += 1
-
-                # Find best arbitrage opportunity for this card
-                best_arb = await _find_best_arbitrage(price_list, marketplaces)
-
-                if best_arb:
-                    await _create_arbitrage_signal(db, card_id, best_arb, stats)
+                existing = {s.card_id: s for s in existing_result.scalars()}
+
+            for opportunity in opportunities:
+                arb = {
+                    'buy_marketplace': marketplaces.get(opportunity.buy_marketplace_id, 'Unknown'),
+                    'sell_marketplace': marketplaces.get(opportunity.sell_marketplace_id, 'Unknown'),
+                    'buy_price': opportunity.buy_price,
+                    'sell_price': opportunity.sell_price,
+                    'buy_listings': opportunity.buy_listings or 1,
+                    'sell_listings': opportunity.sell_listings or 1,
+                    'profit': opportunity.profit,
+                    'profit_pct': opportunity.profit_pct,
+                }
+                _create_arbitrage_signal(
+                    db, opportunity.card_id, arb, stats, existing.get(opportunity.card_id)
+                )
 
             await db.commit()
             logger.info("Arbitrage signals generated", **stats)
@@ -140,64 +116,14 @@ async def _generate_arbitrage_signals_async() -> dict[str, Any]:
     return stats
 
 
-async def _find_best_arbitrage(
-    price_list: list[dict],
-    marketplaces: dict[int, str],
-) -> dict | None:
-    """
-    Find the best arbitrage opportunity from a list of prices.
-
-    Returns details of the best opportunity or None if none exist.
-    """
-    best_profit = 0
-    best_opportunity = None
-
-    # Compare all pairs
-    for i, buy_option in enumerate(price_list):
-        for sell_option in price_list[i+1:]:
-            # Try both directions
-            for buy, sell in [(buy_option, sell_option), (sell_option, buy_option)]:
-                buy_price = buy['price']
-                sell_price = sell['price']
-
-                # Calculate net profit after fees
-                buy_cost = buy_price * (1 + ESTIMATED_FEE_PCT)
-                sell_revenue = sell_price * (1 - ESTIMATED_FEE_PCT)
-                profit = sell_revenue - buy_cost
-
-                # Check if meets thresholds
-                if profit < MIN_PROFIT_USD:
-                    continue
-
-                profit_pct = profit / buy_cost
-                if profit_pct < MIN_PRICE_DIFF_PCT:
-                    continue
-
-                if profit > best_profit:
-                    best_profit = profit
-                    best_opportunity = {
-                        'buy_marketplace_id': buy['marketplace_id'],
-                        'sell_marketplace_id': sell['marketplace_id'],
-                        'buy_marketplace': marketplaces.get(buy['marketplace_id'], 'Unknown'),
-                        'sell_marketplace': marketplaces.get(sell['marketplace_id'], 'Unknown'),
-                        'buy_price': buy_price,
-                        'sell_price': sell_price,
-                        'buy_listings': buy['num_listings'],
-                        'sell_listings': sell['num_listings'],
-                        'profit': profit,
-                        'profit_pct': profit_pct,
-                    }
-
-    return best_opportunity
-
-
-async def _create_arbitrage_signal(
+def _create_arbitrage_signal(
     db,
     card_id: int,
     arb: dict,
     stats: dict,
+    existing: Signal | None = None,
 ) -> Signal:
-    """Create or update an arbitrage signal for today."""
+    """Create an arbitrage signal for today, or update today's existing one."""
     today = date.today()
 
     # Track marketplace pair stats
@@ -212,17 +138,6 @@ async def _create_arbitrage_signal(
 
     confidence = min(0.95, 0.5 + arb['profit_pct'])
 
-    # Check for existing signal today
-    existing = await db.scalar(
-        select(Signal).where(
-            and_(
-                Signal.card_id == card_id,
-                Signal.signal_type == "arbitrage",
-                Signal.date == today
-            )
-        )
-    )
-
     details = {
         "buy_marketplace": arb['buy_marketplace'],
         "sell_marketplace": arb['sell_marketplace'],
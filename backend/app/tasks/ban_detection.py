@@ -5,6 +5,7 @@ Compares card legalities before and after sync to detect bans, unbans,
 and restriction changes. Notifies users who own affected cards.
 """
 import json
+from collections import defaultdict
 
 import structlog
 from sqlalchemy import select
@@ -13,7 +14,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import async_session_maker
 from app.models.card import Card
 from app.models.inventory import InventoryItem
-from app.services.notifications import create_ban_change_notification
+from app.services.notifications import (
+    ban_change_draft,
+    create_notifications_bulk,
+    publish_notifications,
+)
 from app.tasks.celery_app import celery_app
 
 logger = structlog.get_logger()
@@ -86,35 +91,42 @@ async def _notify_affected_users(
     """
     Notify users who own cards with legality changes.
 
+    Owners of every changed card are loaded in one query and all
+    notifications are created with one bulk insert, then published.
+
     Returns count of notifications sent.
     """
-    notification_count = 0
-
-    for change in changes:
-        # Find users who own this card
-        result = await db.execute(
-            select(InventoryItem.user_id).where(
-                InventoryItem.card_id == change["card_id"]
-            ).distinct()
+    if not changes:
+        return 0
+
+    card_ids = {change["card_id"] for change in changes}
+    result = await db.execute(
+        select(InventoryItem.card_id, InventoryItem.user_id)
+        .where(InventoryItem.card_id.in_(card_ids))
+        .distinct()
+    )
+    owners: dict[int, list[int]] = defaultdict(list)
+    for card_id, user_id in result.all():
+        owners[card_id].append(user_id)
+
+    drafts = [
+        ban_change_draft(
+            user_id=user_id,
+            card_id=change["card_id"],
+            card_name=change["card_name"],
+            format_name=change["format"],
+            old_status=change["old_status"],
+            new_status=change["new_status"],
         )
-        user_ids = [row[0] for row in result.all()]
-
-        for user_id in user_ids:
-            notification = await create_ban_change_notification(
-                db=db,
-                user_id=user_id,
-                card_id=change["card_id"],
-                card_name=change["card_name"],
-                format_name=change["format"],
-                old_status=change["old_status"],
-                new_status=change["new_status"],
-            )
-            if notification:
-                notification_count += 1
+        for change in changes
+        for user_id in owners.get(change["card_id"], [])
+    ]
 
-        await db.commit()
+    created = await create_notifications_bulk(db, drafts)
+    await db.commit()
+    await publish_notifications(created)
 
-    return notification_count
+    return len(created)
 
 
 @celery_app.task(name="detect_ban_changes")
@@ -103,6 +103,13 @@ celery_app.conf.update(
             "schedule": crontab(hour="*/6"),  # Every 6 hours
         },
 
+        # Inventory index rebuild: Restate the precomputed chart series every 15 minutes
+        # Recomputes only users whose inventory changed since their series was computed
+        "pricing-rebuild-inventory-index": {
+            "task": "app.tasks.pricing.rebuild_inventory_index",
+            "schedule": crontab(minute="*/15"),  # Every 15 minutes
+        },
+
         # Search embeddings refresh: Update card embeddings daily at 3 AM
         # Ensures similarity search remains accurate
         "search-refresh-embeddings": {
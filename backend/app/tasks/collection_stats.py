@@ -16,16 +16,15 @@ from sqlalchemy import func, select
 from sqlalchemy.orm import joinedload
 
 from app.models import (
-    Card,
     CollectionStats,
     InventoryItem,
     MilestoneType,
-    MTGSet,
     Notification,
     NotificationPriority,
     NotificationType,
     UserMilestone,
 )
+from app.services.set_completion import get_set_index, load_owned_bitmap
 from app.tasks.utils import create_task_session_maker, run_async
 
 logger = structlog.get_logger()
@@ -171,52 +170,18 @@ async def _calculate_user_stats(db, stats: CollectionStats) -> int:
     stats.total_value = Decimal(str(totals.total_value or 0))
     stats.unique_cards = totals.unique_cards or 0
 
-    # Calculate set completion stats
-    # Get all set codes with cards in user's inventory
-    set_counts_query = (
-        select(
-            Card.set_code,
-            func.count(func.distinct(InventoryItem.card_id)).label("owned_count")
-        )
-        .join(InventoryItem, InventoryItem.card_id == Card.id)
-        .where(InventoryItem.user_id == user_id)
-        .group_by(Card.set_code)
-    )
+    # Set completion from the user's owned bitmap over the set membership index
+    index = await get_set_index(db)
+    bitmap = await load_owned_bitmap(db, index, user_id)
+    set_progress = index.progress(bitmap)
 
-    set_counts_result = await db.execute(set_counts_query)
-    set_counts = set_counts_result.all()
-
-    # Get total cards per set from MTGSet table
-    set_codes = [sc.set_code for sc in set_counts]
-    if set_codes:
-        set_totals_query = select(MTGSet.code, MTGSet.card_count).where(
-            MTGSet.code.in_(set_codes)
-        )
-        set_totals_result = await db.execute(set_totals_query)
-        set_totals = {row.code: row.card_count for row in set_totals_result.all()}
-    else:
-        set_totals = {}
-
-    # Calculate completion percentages
-    set_completions = []
-    completed_sets = 0
-
-    for sc in set_counts:
-        total_in_set = set_totals.get(sc.set_code, 0)
-        if total_in_set > 0:
-            completion_pct = (sc.owned_count / total_in_set) * 100
-            set_completions.append((sc.set_code, completion_pct))
-            if completion_pct >= 100:
-                completed_sets += 1
-
-    stats.sets_started = len(set_counts)
-    stats.sets_completed = completed_sets
-
-    # Find top set
-    if set_completions:
-        top_set = max(set_completions, key=lambda x: x[1])
-        stats.top_set_code = top_set[0]
-        stats.top_set_completion = Decimal(str(round(top_set[1], 2)))
+    stats.sets_started = len(set_progress)
+    stats.sets_completed = sum(1 for p in set_progress if p.owned >= p.total)
+
+    top_sets = index.top_sets(bitmap, limit=1)
+    if top_sets:
+        stats.top_set_code = top_sets[0].set_code
+        stats.top_set_completion = top_sets[0].completion
     else:
         stats.top_set_code = None
         stats.top_set_completion = None
@@ -22,13 +22,33 @@ import ijson
 from app.models import Card, Marketplace, PriceSnapshot
 from app.core.config import settings
 from app.core.constants import CardCondition, CardLanguage
-from app.services.ingestion import ScryfallAdapter
+from app.core.data_freshness import PRICE_SNAPSHOTS_WATERMARK, record_watermark
+from app.services.ingestion import ScryfallAdapter, SnapshotRecord, copy_snapshots, prepare_copy_record
 from app.services.ingestion.adapters.mtgjson import MTGJSONAdapter
 from app.tasks.utils import create_task_session_maker, run_async
 
 logger = structlog.get_logger()
 
 
+async def _copy_pending(
+    db: AsyncSession,
+    pending: list[SnapshotRecord],
+    job: str,
+    copied_times: list[datetime],
+) -> None:
+    """
+    COPY buffered snapshot records into the session's transaction and empty the buffer.
+
+    The newest copied time is appended to copied_times, for the
+    price_snapshots watermark recorded before the final commit.
+    """
+    if not pending:
+        return
+    await copy_snapshots(db, pending, job=job)
+    copied_times.append(max(r.time for r in pending))
+    pending.clear()
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=300)
 def seed_comprehensive_price_data(self) -> dict[str, Any]:
     """
@@ -159,6 +179,8 @@ async def _download_scryfall_bulk_data_async() -> dict[str, Any]:
                 snapshots_created = 0
                 batch = []
                 batch_size = 1000
+                pending: list[SnapshotRecord] = []
+                copied_times: list[datetime] = []
                 
                 try:
                     with open(tmp_path, 'rb') as f:
@@ -180,7 +202,7 @@ async def _download_scryfall_bulk_data_async() -> dict[str, Any]:
                                 if len(batch) >= batch_size:
                                     for card_data_item in batch:
                                         try:
-                                            snapshots = await process_bulk_card(card_data_item, db, marketplaces)
+                                            snapshots = await process_bulk_card(card_data_item, db, marketplaces, pending)
                                             if snapshots > 0:
                                                 snapshots_created += snapshots
                                             processed += 1
@@ -191,6 +213,7 @@ async def _download_scryfall_bulk_data_async() -> dict[str, Any]:
                                             processed += 1
                                     
                                     # Commit batch
+                                    await _copy_pending(db, pending, "scryfall_bulk_download", copied_times)
                                     await db.commit()
                                     results["cards_processed"] = processed
                                     results["snapshots_created"] = snapshots_created
@@ -205,7 +228,7 @@ async def _download_scryfall_bulk_data_async() -> dict[str, Any]:
                         if batch:
                             for card_data_item in batch:
                                 try:
-                                    snapshots = await process_bulk_card(card_data_item, db, marketplaces)
+                                    snapshots = await process_bulk_card(card_data_item, db, marketplaces, pending)
                                     if snapshots > 0:
                                         snapshots_created += snapshots
                                     processed += 1
@@ -215,6 +238,7 @@ async def _download_scryfall_bulk_data_async() -> dict[str, Any]:
                                     logger.warning("Failed to process bulk card", error=str(e))
                                     processed += 1
                             
+                            await _copy_pending(db, pending, "scryfall_bulk_download", copied_times)
                             await db.commit()
                             results["cards_processed"] = processed
                             results["snapshots_created"] = snapshots_created
@@ -226,6 +250,13 @@ async def _download_scryfall_bulk_data_async() -> dict[str, Any]:
                     except Exception as e:
                         logger.warning("Failed to delete temp file", path=str(tmp_path), error=str(e))
                 
+                if copied_times:
+                    await record_watermark(
+                        db, PRICE_SNAPSHOTS_WATERMARK, snapshots_created,
+                        latest_data_at=max(copied_times), job="scryfall_bulk_download",
+                    )
+                    await db.commit()
+
                 logger.info("Completed bulk data processing", processed=processed, snapshots=snapshots_created)
         
     except Exception as e:
@@ -241,6 +272,7 @@ async def process_bulk_card(
     card_data: dict[str, Any],
     db: AsyncSession,
     marketplaces: dict[str, Marketplace],
+    pending: list[SnapshotRecord],
 ) -> int:
     """
     Extract prices from Scryfall bulk card data and create price snapshots.
@@ -249,6 +281,7 @@ async def process_bulk_card(
         card_data: Card data from Scryfall bulk file
         db: Database session
         marketplaces: Dictionary mapping price keys to Marketplace objects
+        pending: Buffer the new snapshot records are appended to (COPYed by the caller)
     
     Returns:
         Number of snapshots created
@@ -312,7 +345,7 @@ async def process_bulk_card(
                 price_foil_float = float(price_foil) if price_foil and float(price_foil) > 0 else None
 
                 # Create non-foil snapshot
-                snapshot = PriceSnapshot(
+                pending.append(prepare_copy_record(
                     time=snapshot_time,
                     card_id=card.id,
                     marketplace_id=marketplace.id,
@@ -322,8 +355,7 @@ async def process_bulk_card(
                     price=float(price_value),
                     currency=currency,
                     price_market=price_foil_float,
-                )
-                db.add(snapshot)
+                ))
                 snapshots_created += 1
 
     return snapshots_created
@@ -380,6 +412,8 @@ async def _seed_comprehensive_price_data_async() -> dict[str, Any]:
                 "cards_processed": 0,
                 "errors": [],
             }
+            pending: list[SnapshotRecord] = []
+            copied_times: list[datetime] = []
             
             # Helper to get or create marketplace (shared across phases)
             async def get_or_create_marketplace(slug: str, name: str, base_url: str, currency: str) -> Marketplace:
@@ -452,7 +486,7 @@ async def _seed_comprehensive_price_data_async() -> dict[str, Any]:
                             
                             if not recent_snapshot:
                                 # Create new price snapshot
-                                snapshot = PriceSnapshot(
+                                pending.append(prepare_copy_record(
                                     time=now,
                                     card_id=card.id,
                                     marketplace_id=marketplace.id,
@@ -462,15 +496,15 @@ async def _seed_comprehensive_price_data_async() -> dict[str, Any]:
                                     price=price_data.price,
                                     currency=price_data.currency,
                                     price_market=price_data.price_foil,
-                                )
-                                db.add(snapshot)
+                                    source="api",
+                                ))
                                 results["current_snapshots"] += 1
                         
                         results["cards_processed"] += 1
                         
                         # Flush periodically to avoid memory issues
                         if results["cards_processed"] % 100 == 0:
-                            await db.flush()
+                            await _copy_pending(db, pending, "seed_price_data", copied_times)
                             logger.debug(
                                 "Current price collection progress",
                                 processed=results["cards_processed"],
@@ -486,7 +520,7 @@ async def _seed_comprehensive_price_data_async() -> dict[str, Any]:
                         logger.warning("Failed to fetch Scryfall price", card_id=card.id, error=str(e))
                         continue
                 
-                await db.flush()
+                await _copy_pending(db, pending, "seed_price_data", copied_times)
                 logger.info("Phase 2 complete: Current prices collected", snapshots=results["current_snapshots"])
             
             finally:
@@ -545,7 +579,7 @@ async def _seed_comprehensive_price_data_async() -> dict[str, Any]:
                                     existing = existing_result.scalar_one_or_none()
                                     
                                     if not existing:
-                                        snapshot = PriceSnapshot(
+                                        pending.append(prepare_copy_record(
                                             time=price_data.snapshot_time,
                                             card_id=card.id,
                                             marketplace_id=marketplace.id,
@@ -555,13 +589,13 @@ async def _seed_comprehensive_price_data_async() -> dict[str, Any]:
                                             price=price_data.price,
                                             currency=price_data.currency,
                                             price_market=price_data.price_foil,
-                                        )
-                                        db.add(snapshot)
+                                            source="mtgjson",
+                                        ))
                                         results["historical_snapshots"] += 1
                             
                             # Flush periodically
                             if results["historical_snapshots"] % 100 == 0:
-                                await db.flush()
+                                await _copy_pending(db, pending, "seed_price_data", copied_times)
                                 logger.debug(
                                     "Historical price collection progress",
                                     processed=len(batch),
@@ -656,7 +690,7 @@ async def _seed_comprehensive_price_data_async() -> dict[str, Any]:
                             continue
                     
                     # Flush batch
-                    await db.flush()
+                    await _copy_pending(db, pending, "seed_price_data", copied_times)
                     logger.info(
                         "Historical batch complete",
                         batch_start=batch_start,
@@ -709,7 +743,7 @@ async def _seed_comprehensive_price_data_async() -> dict[str, Any]:
                                 
                                 if not recent_snapshot:
                                     # Create price snapshot
-                                    snapshot = PriceSnapshot(
+                                    pending.append(prepare_copy_record(
                                         time=now,
                                         card_id=card.id,
                                         marketplace_id=cardtrader_mp.id,
@@ -722,13 +756,13 @@ async def _seed_comprehensive_price_data_async() -> dict[str, Any]:
                                         price_high=price_data.price_high,
                                         price_market=price_data.price_foil,
                                         num_listings=price_data.num_listings,
-                                    )
-                                    db.add(snapshot)
+                                        source="api",
+                                    ))
                                     results["cardtrader_snapshots"] += 1
                                     
                                     # Flush periodically
                                     if results["cardtrader_snapshots"] % 100 == 0:
-                                        await db.flush()
+                                        await _copy_pending(db, pending, "seed_price_data", copied_times)
                         
                         except Exception as e:
                             error_msg = f"CardTrader card {card.id} ({card.name}): {str(e)}"
@@ -736,7 +770,7 @@ async def _seed_comprehensive_price_data_async() -> dict[str, Any]:
                             logger.warning("Failed to fetch CardTrader price", card_id=card.id, error=str(e))
                             continue
                     
-                    await db.flush()
+                    await _copy_pending(db, pending, "seed_price_data", copied_times)
                     logger.info("Phase 4 complete: CardTrader prices collected", snapshots=results["cardtrader_snapshots"])
                 
                 finally:
@@ -745,14 +779,20 @@ async def _seed_comprehensive_price_data_async() -> dict[str, Any]:
                 logger.info("Phase 4: Skipping CardTrader (API token not configured)")
             
             # Phase 5: Commit all changes
-            await db.commit()
-            
-            results["completed_at"] = datetime.now(timezone.utc).isoformat()
             results["total_snapshots"] = (
                 results["current_snapshots"] + 
                 results["historical_snapshots"] + 
                 results.get("cardtrader_snapshots", 0)
             )
+            await _copy_pending(db, pending, "seed_price_data", copied_times)
+            if copied_times:
+                await record_watermark(
+                    db, PRICE_SNAPSHOTS_WATERMARK, results["total_snapshots"],
+                    latest_data_at=max(copied_times), job="seed_price_data",
+                )
+            await db.commit()
+            
+            results["completed_at"] = datetime.now(timezone.utc).isoformat()
             
             logger.info(
                 "Comprehensive price data seeding completed",
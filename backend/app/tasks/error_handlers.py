@@ -10,6 +10,8 @@ from typing import Any
 import structlog
 from celery import Task
 
+from app.core.query_budget import track_queries
+
 logger = structlog.get_logger()
 
 # Redis key for dead letter queue
@@ -26,8 +28,17 @@ class TaskWithDLQ(Task):
         @celery_app.task(base=TaskWithDLQ, max_retries=3)
         def my_task():
             ...
+
+    Each run's database queries are attributed to the task and checked
+    against its query budget; with settings.query_budget_enforce, a run
+    over budget fails with QueryBudgetExceeded.
     """
 
+    def __call__(self, *args, **kwargs):
+        # run_async copies this context into the task's event loop
+        with track_queries(f"task:{self.name}", kind="task"):
+            return super().__call__(*args, **kwargs)
+
     def on_failure(self, exc, task_id, args, kwargs, einfo):
         """Called when task fails after all retries."""
         from app.core.config import settings
@@ -10,13 +10,18 @@ from typing import Any
 import structlog
 from celery import shared_task
 from sqlalchemy import select, and_, func
-from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.constants import CardCondition, CardLanguage
+from app.core.data_freshness import PRICE_SNAPSHOTS_WATERMARK, record_watermark
 from app.models import Card, Marketplace, PriceSnapshot, InventoryItem, CardFeatureVector
-from app.services.ingestion import ScryfallAdapter
+from app.services.ingestion import (
+    ScryfallAdapter,
+    SnapshotRecord,
+    copy_snapshots,
+    prepare_copy_record,
+)
 from app.services.agents.normalization import NormalizationService
 from app.services.vectorization import get_vectorization_service
 from app.services.vectorization.ingestion import vectorize_card
@@ -25,8 +30,7 @@ from app.tasks.utils import create_task_session_maker, run_async
 logger = structlog.get_logger()
 
 
-async def _upsert_price_snapshot(
-    db: AsyncSession,
+def _snapshot_record(
     card_id: int,
     marketplace_id: int,
     time: datetime,
@@ -42,73 +46,38 @@ async def _upsert_price_snapshot(
     num_listings: int | None = None,
     total_quantity: int | None = None,
     source: str = "api",
-) -> PriceSnapshot:
+) -> SnapshotRecord:
     """
-    Upsert a price snapshot using PostgreSQL ON CONFLICT.
-
-    This prevents race conditions where multiple tasks try to create the same snapshot.
-    The composite primary key is (time, card_id, marketplace_id, condition, is_foil, language).
+    Build a price snapshot record for the COPY writer.
 
-    Returns:
-        The created or updated PriceSnapshot.
+    Records are buffered and written with _copy_pending before each commit;
+    the merge upserts on the composite primary key (time, card_id,
+    marketplace_id, condition, is_foil, language), so concurrent tasks
+    writing the same snapshot do not conflict.
     """
-    # Use PostgreSQL INSERT ... ON CONFLICT DO UPDATE
-    values_dict = {
-        'time': time,
-        'card_id': card_id,
-        'marketplace_id': marketplace_id,
-        'condition': condition.value,
-        'is_foil': is_foil,
-        'language': language.value,
-        'price': price,
-        'currency': currency,
-        'price_low': price_low,
-        'price_mid': price_mid,
-        'price_high': price_high,
-        'price_market': price_market,
-        'num_listings': num_listings,
-        'total_quantity': total_quantity,
-        'source': source,
-    }
-
-    stmt = pg_insert(PriceSnapshot).values(**values_dict)
-
-    # On conflict with composite primary key, update the price fields
-    update_dict = {
-        'price': stmt.excluded.price,
-        'currency': stmt.excluded.currency,
-        'price_low': stmt.excluded.price_low,
-        'price_mid': stmt.excluded.price_mid,
-        'price_high': stmt.excluded.price_high,
-        'price_market': stmt.excluded.price_market,
-        'num_listings': stmt.excluded.num_listings,
-        'total_quantity': stmt.excluded.total_quantity,
-        'source': stmt.excluded.source,
-    }
-
-    # Use index_elements for composite primary key conflict
-    stmt = stmt.on_conflict_do_update(
-        index_elements=['time', 'card_id', 'marketplace_id', 'condition', 'is_foil', 'language'],
-        set_=update_dict
+    return prepare_copy_record(
+        card_id=card_id,
+        marketplace_id=marketplace_id,
+        price=price,
+        time=time,
+        condition=condition,
+        is_foil=is_foil,
+        language=language,
+        price_low=price_low,
+        price_mid=price_mid,
+        price_high=price_high,
+        price_market=price_market,
+        currency=currency,
+        num_listings=num_listings,
+        total_quantity=total_quantity,
+        source=source,
     )
 
-    await db.execute(stmt)
-    await db.flush()
 
-    # Fetch the snapshot to return it
-    result = await db.execute(
-        select(PriceSnapshot).where(
-            and_(
-                PriceSnapshot.time == time,
-                PriceSnapshot.card_id == card_id,
-                PriceSnapshot.marketplace_id == marketplace_id,
-                PriceSnapshot.condition == condition.value,
-                PriceSnapshot.is_foil == is_foil,
-                PriceSnapshot.language == language.value,
-            )
-        )
-    )
-    return result.scalar_one()
+async def _copy_pending(db: AsyncSession, pending: list[SnapshotRecord], job: str) -> None:
+    """COPY buffered snapshot records into the session's transaction and empty the buffer."""
+    await copy_snapshots(db, pending, job=job)
+    pending.clear()
 
 
 async def _backfill_historical_snapshots_for_charting(
@@ -366,6 +335,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                 "cards_processed": 0,
                 "errors": [],
             }
+            pending: list[SnapshotRecord] = []
             
             # Helper to get or create marketplace (shared across phases)
             async def get_or_create_marketplace(slug: str, name: str, base_url: str, currency: str) -> Marketplace:
@@ -455,29 +425,27 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                             # Use upsert to prevent race conditions
                             if not recent_snapshot:
                                 # Create non-foil price snapshot
-                                await _upsert_price_snapshot(
-                                    db=db,
+                                pending.append(_snapshot_record(
                                     card_id=card.id,
                                     marketplace_id=marketplace.id,
                                     time=now,
                                     price=price_data.price,
                                     currency=price_data.currency,
                                     is_foil=False,
-                                )
+                                ))
                                 results["scryfall_snapshots"] += 1
                                 results["total_snapshots"] += 1
 
                                 # Create separate foil price snapshot if foil price exists
                                 if price_data.price_foil and price_data.price_foil > 0:
-                                    await _upsert_price_snapshot(
-                                        db=db,
+                                    pending.append(_snapshot_record(
                                         card_id=card.id,
                                         marketplace_id=marketplace.id,
                                         time=now,
                                         price=price_data.price_foil,
                                         currency=price_data.currency,
                                         is_foil=True,
-                                    )
+                                    ))
                                     results["scryfall_snapshots"] += 1
                                     results["total_snapshots"] += 1
 
@@ -492,37 +460,35 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                                 # Create new snapshot if price changed by more than 2% (lower threshold for better charting)
                                 # Use upsert to prevent race conditions
                                 if price_change_pct > 2.0:
-                                    await _upsert_price_snapshot(
-                                        db=db,
+                                    pending.append(_snapshot_record(
                                         card_id=card.id,
                                         marketplace_id=marketplace.id,
                                         time=now,
                                         price=price_data.price,
                                         currency=price_data.currency,
                                         is_foil=False,
-                                    )
+                                    ))
                                     results["scryfall_snapshots"] += 1
                                     results["total_snapshots"] += 1
 
                                     # Create separate foil snapshot if foil price exists
                                     if price_data.price_foil and price_data.price_foil > 0:
-                                        await _upsert_price_snapshot(
-                                            db=db,
+                                        pending.append(_snapshot_record(
                                             card_id=card.id,
                                             marketplace_id=marketplace.id,
                                             time=now,
                                             price=price_data.price_foil,
                                             currency=price_data.currency,
                                             is_foil=True,
-                                        )
+                                        ))
                                         results["scryfall_snapshots"] += 1
                                         results["total_snapshots"] += 1
                         
                         results["cards_processed"] += 1
 
-                        # Flush periodically to avoid memory issues
+                        # Write buffered snapshots periodically to avoid memory issues
                         if results["cards_processed"] % 100 == 0:
-                            await db.flush()
+                            await _copy_pending(db, pending, "collect_price_data")
                             logger.debug(
                                 "Price collection progress",
                                 processed=results["cards_processed"],
@@ -537,6 +503,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
 
                 # Commit after Scryfall phase to release transaction
                 # This prevents holding the connection during subsequent API calls
+                await _copy_pending(db, pending, "collect_price_data")
                 await db.commit()
                 logger.info("Scryfall phase committed", snapshots=results["scryfall_snapshots"])
 
@@ -573,8 +540,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                                 # Use upsert to prevent race conditions
                                 if not recent_snapshot:
                                     # Create price snapshot using upsert
-                                    await _upsert_price_snapshot(
-                                        db=db,
+                                    pending.append(_snapshot_record(
                                         card_id=card.id,
                                         marketplace_id=cardtrader_mp.id,
                                         time=now,
@@ -584,7 +550,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                                         price_low=price_data.price_low,
                                         price_high=price_data.price_high,
                                         num_listings=price_data.num_listings,
-                                    )
+                                    ))
                                     results["cardtrader_snapshots"] += 1
                                     results["total_snapshots"] += 1
                                     
@@ -597,8 +563,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                                     price_change_pct = (price_diff / float(recent_snapshot.price) * 100) if recent_snapshot.price and float(recent_snapshot.price) > 0 else 0
                                     
                                     if price_change_pct > 2.0:
-                                        await _upsert_price_snapshot(
-                                            db=db,
+                                        pending.append(_snapshot_record(
                                             card_id=card.id,
                                             marketplace_id=cardtrader_mp.id,
                                             time=now,
@@ -608,13 +573,13 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                                             price_low=price_data.price_low,
                                             price_high=price_data.price_high,
                                             num_listings=price_data.num_listings,
-                                        )
+                                        ))
                                         results["cardtrader_snapshots"] += 1
                                         results["total_snapshots"] += 1
                                     
-                                    # Flush periodically
+                                    # Write buffered snapshots periodically
                                     if results["total_snapshots"] % 100 == 0:
-                                        await db.flush()
+                                        await _copy_pending(db, pending, "collect_price_data")
                         
                         except Exception as e:
                             # CardTrader errors are non-fatal (blueprint mapping may not exist)
@@ -633,6 +598,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                             continue
 
                     # Commit after CardTrader phase to release transaction
+                    await _copy_pending(db, pending, "collect_price_data")
                     await db.commit()
                     logger.info("CardTrader phase committed", snapshots=results.get("cardtrader_snapshots", 0))
                 else:
@@ -677,8 +643,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                                 recent_snapshot = recent_result.scalar_one_or_none()
                                 
                                 if not recent_snapshot:
-                                    await _upsert_price_snapshot(
-                                        db=db,
+                                    pending.append(_snapshot_record(
                                         card_id=card.id,
                                         marketplace_id=tcgplayer_mp.id,
                                         time=now,
@@ -688,7 +653,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                                         price_low=price_data.price_low,
                                         price_high=price_data.price_high,
                                         num_listings=price_data.num_listings,
-                                    )
+                                    ))
                                     results["tcgplayer_snapshots"] += 1
                                     results["total_snapshots"] += 1
                                 else:
@@ -696,8 +661,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                                     price_change_pct = (price_diff / float(recent_snapshot.price) * 100) if recent_snapshot.price and float(recent_snapshot.price) > 0 else 0
                                     
                                     if price_change_pct > 2.0:
-                                        await _upsert_price_snapshot(
-                                            db=db,
+                                        pending.append(_snapshot_record(
                                             card_id=card.id,
                                             marketplace_id=tcgplayer_mp.id,
                                             time=now,
@@ -707,7 +671,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                                             price_low=price_data.price_low,
                                             price_high=price_data.price_high,
                                             num_listings=price_data.num_listings,
-                                        )
+                                        ))
                                         results["tcgplayer_snapshots"] += 1
                                         results["total_snapshots"] += 1
                         
@@ -726,6 +690,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                     await tcgplayer.close()
 
                     # Commit after TCGPlayer phase to release transaction
+                    await _copy_pending(db, pending, "collect_price_data")
                     await db.commit()
                     logger.info("TCGPlayer phase committed", snapshots=results.get("tcgplayer_snapshots", 0))
                 else:
@@ -795,8 +760,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
 
                                 if not recent_snapshot:
                                     # Create new snapshot
-                                    await _upsert_price_snapshot(
-                                        db=db,
+                                    pending.append(_snapshot_record(
                                         card_id=card.id,
                                         marketplace_id=manapool_mp.id,
                                         time=now,
@@ -806,7 +770,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                                         price_high=price_high,
                                         price_market=price_foil,
                                         num_listings=price_item.get("available_quantity"),
-                                    )
+                                    ))
                                     manapool_snapshots += 1
                                     results["total_snapshots"] += 1
                                 else:
@@ -815,8 +779,7 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                                     price_change_pct = (price_diff / float(recent_snapshot.price) * 100) if recent_snapshot.price and float(recent_snapshot.price) > 0 else 0
 
                                     if price_change_pct > 2.0:
-                                        await _upsert_price_snapshot(
-                                            db=db,
+                                        pending.append(_snapshot_record(
                                             card_id=card.id,
                                             marketplace_id=manapool_mp.id,
                                             time=now,
@@ -826,13 +789,13 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                                             price_high=price_high,
                                             price_market=price_foil,
                                             num_listings=price_item.get("available_quantity"),
-                                        )
+                                        ))
                                         manapool_snapshots += 1
                                         results["total_snapshots"] += 1
 
-                                # Flush periodically
+                                # Write buffered snapshots periodically
                                 if manapool_snapshots % 500 == 0 and manapool_snapshots > 0:
-                                    await db.flush()
+                                    await _copy_pending(db, pending, "collect_price_data")
                                     logger.debug("Manapool progress", snapshots=manapool_snapshots)
 
                             except Exception:
@@ -850,6 +813,10 @@ async def _collect_price_data_async(batch_size: int = 500) -> dict[str, Any]:
                 else:
                     logger.info("Manapool API token not configured - skipping Manapool collection")
 
+                await _copy_pending(db, pending, "collect_price_data")
+                await record_watermark(
+                    db, PRICE_SNAPSHOTS_WATERMARK, results["total_snapshots"], job="collect_price_data"
+                )
                 await db.commit()
                 results["completed_at"] = datetime.now(timezone.utc).isoformat()
                 
@@ -1010,6 +977,7 @@ async def _collect_inventory_prices_async() -> dict[str, Any]:
                 "backfilled_snapshots": 0,
                 "errors": [],
             }
+            pending: list[SnapshotRecord] = []
             
             # Helper to get or create marketplace
             async def get_or_create_marketplace(slug: str, name: str, base_url: str, currency: str) -> Marketplace:
@@ -1096,15 +1064,14 @@ async def _collect_inventory_prices_async() -> dict[str, Any]:
                             
                             if not recent_snapshot:
                                 # Create new snapshot using upsert (prevents race conditions)
-                                await _upsert_price_snapshot(
-                                    db=db,
+                                pending.append(_snapshot_record(
                                     card_id=card.id,
                                     marketplace_id=marketplace.id,
                                     time=now,
                                     price=price_data.price,
                                     currency=price_data.currency,
                                     price_market=price_data.price_foil,  # Legacy: price_foil mapped to price_market
-                                )
+                                ))
                                 results["snapshots_created"] += 1
                                 
                                 # Note: Historical data should come from MTGJSON, not synthetic backfill
@@ -1112,15 +1079,14 @@ async def _collect_inventory_prices_async() -> dict[str, Any]:
                             else:
                                 # Always update inventory card prices (they change frequently)
                                 # Use upsert to update with new timestamp
-                                await _upsert_price_snapshot(
-                                    db=db,
+                                pending.append(_snapshot_record(
                                     card_id=card.id,
                                     marketplace_id=marketplace.id,
                                     time=now,
                                     price=price_data.price,
                                     currency=price_data.currency,
                                     price_market=price_data.price_foil,  # Legacy: price_foil mapped to price_market
-                                )
+                                ))
                                 results["snapshots_updated"] += 1
                         
                         # Collect prices from CardTrader (European market data) for inventory cards
@@ -1148,8 +1114,7 @@ async def _collect_inventory_prices_async() -> dict[str, Any]:
                                     
                                     if not recent_snapshot:
                                         # Create new snapshot using upsert (prevents race conditions)
-                                        await _upsert_price_snapshot(
-                                            db=db,
+                                        pending.append(_snapshot_record(
                                             card_id=card.id,
                                             marketplace_id=cardtrader_mp.id,
                                             time=now,
@@ -1159,7 +1124,7 @@ async def _collect_inventory_prices_async() -> dict[str, Any]:
                                             price_low=price_data.price_low,
                                             price_high=price_data.price_high,
                                             num_listings=price_data.num_listings,
-                                        )
+                                        ))
                                         results["snapshots_created"] += 1
                                         
                                         # Note: Historical data should come from MTGJSON, not synthetic backfill
@@ -1171,8 +1136,7 @@ async def _collect_inventory_prices_async() -> dict[str, Any]:
                                         price_change_pct = (price_diff / float(recent_snapshot.price) * 100) if recent_snapshot.price and float(recent_snapshot.price) > 0 else 0
                                         
                                         if price_change_pct > 2.0:
-                                            await _upsert_price_snapshot(
-                                                db=db,
+                                            pending.append(_snapshot_record(
                                                 card_id=card.id,
                                                 marketplace_id=cardtrader_mp.id,
                                                 time=now,
@@ -1182,7 +1146,7 @@ async def _collect_inventory_prices_async() -> dict[str, Any]:
                                                 price_low=price_data.price_low,
                                                 price_high=price_data.price_high,
                                                 num_listings=price_data.num_listings,
-                                            )
+                                            ))
                                             results["snapshots_updated"] += 1
                             
                             except Exception as e:
@@ -1196,6 +1160,7 @@ async def _collect_inventory_prices_async() -> dict[str, Any]:
                         logger.warning("Failed to collect price for inventory card", card_id=card.id, error=str(e))
                         continue
                 
+                await _copy_pending(db, pending, "collect_inventory_prices")
                 await db.commit()
                 results["completed_at"] = datetime.now(timezone.utc).isoformat()
                 
@@ -1320,6 +1285,7 @@ def import_mtgjson_historical_prices(
     self,
     card_ids: list[int] | None = None,
     days: int = 90,
+    streaming: bool = True,
 ) -> dict[str, Any]:
     """
     Import historical price data from MTGJSON.
@@ -1330,13 +1296,46 @@ def import_mtgjson_historical_prices(
     Args:
         card_ids: Optional list of card IDs to import. None = all cards.
         days: Number of days of history to import (max ~90 days).
+        streaming: Stream AllPrices and COPY every point for the whole
+            catalog. False uses the per-card adapter path, which is
+            limited to inventory cards plus up to 1000 others.
         
     Returns:
         Import results.
     """
+    if streaming:
+        return run_async(_import_mtgjson_all_prices_async(card_ids, days))
     return run_async(_import_mtgjson_historical_prices_async(card_ids, days))
 
 
+async def _import_mtgjson_all_prices_async(
+    card_ids: list[int] | None,
+    days: int,
+) -> dict[str, Any]:
+    """Async implementation of the streaming MTGJSON price import."""
+    from app.services.pricing import MTGJSONPriceImporter
+
+    logger.info("Starting streaming MTGJSON price import", days=days)
+    started_at = datetime.now(timezone.utc)
+
+    session_maker, engine = create_task_session_maker()
+    try:
+        async with session_maker() as db, engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            stats = await MTGJSONPriceImporter().import_history(
+                raw.driver_connection, db, days=days, card_ids=card_ids
+            )
+
+        logger.info("Streaming MTGJSON price import completed", **stats)
+        return {
+            **stats,
+            "started_at": started_at.isoformat(),
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+        }
+    finally:
+        await engine.dispose()
+
+
 async def _import_mtgjson_historical_prices_async(
     card_ids: list[int] | None,
     days: int,
@@ -20,7 +20,6 @@ from redis.asyncio import Redis
 from sqlalchemy import select, func
 
 from app.core.config import settings
-from app.core.constants import CardCondition, CardLanguage
 from app.models import Card, Marketplace, InventoryItem
 from app.services.ingestion import ScryfallAdapter
 from app.services.ingestion.base import AdapterConfig
@@ -28,6 +27,7 @@ from app.services.ingestion.cache import SnapshotCache
 from app.services.ingestion.bulk_ops import (
     get_recent_snapshot_times,
     batch_upsert_snapshots,
+    prepare_copy_record,
 )
 from app.tasks.utils import create_task_session_maker, run_async, resilient_session
 
@@ -410,31 +410,27 @@ async def _collect_scryfall_async(card_ids: list[int]) -> dict[str, Any]:
                             continue
 
                         # Add non-foil snapshot
-                        snapshots_to_insert.append({
-                            "time": now,
-                            "card_id": card_id,
-                            "marketplace_id": mp_id,
-                            "condition": CardCondition.NEAR_MINT.value,
-                            "is_foil": False,
-                            "language": CardLanguage.ENGLISH.value,
-                            "price": price_data.price,
-                            "currency": price_data.currency,
-                            "source": "scryfall",
-                        })
+                        snapshots_to_insert.append(prepare_copy_record(
+                            time=now,
+                            card_id=card_id,
+                            marketplace_id=mp_id,
+                            is_foil=False,
+                            price=price_data.price,
+                            currency=price_data.currency,
+                            source="scryfall",
+                        ))
 
                         # Add foil snapshot if available
                         if price_data.price_foil and price_data.price_foil > 0:
-                            snapshots_to_insert.append({
-                                "time": now,
-                                "card_id": card_id,
-                                "marketplace_id": mp_id,
-                                "condition": CardCondition.NEAR_MINT.value,
-                                "is_foil": True,
-                                "language": CardLanguage.ENGLISH.value,
-                                "price": price_data.price_foil,
-                                "currency": price_data.currency,
-                                "source": "scryfall",
-                            })
+                            snapshots_to_insert.append(prepare_copy_record(
+                                time=now,
+                                card_id=card_id,
+                                marketplace_id=mp_id,
+                                is_foil=True,
+                                price=price_data.price_foil,
+                                currency=price_data.currency,
+                                source="scryfall",
+                            ))
 
                     updated_card_ids.append(card_id)
                     stats["cards_fetched"] += 1
@@ -445,7 +441,9 @@ async def _collect_scryfall_async(card_ids: list[int]) -> dict[str, Any]:
 
             # Batch upsert all snapshots
             if snapshots_to_insert:
-                insert_stats = await batch_upsert_snapshots(db, snapshots_to_insert)
+                insert_stats = await batch_upsert_snapshots(
+                    db, snapshots_to_insert, redis=redis, job="scryfall"
+                )
                 stats["snapshots_created"] = insert_stats["inserted"]
 
             # Update Redis cache for successfully updated cards
@@ -551,20 +549,18 @@ async def _collect_cardtrader_async(card_ids: list[int]) -> dict[str, Any]:
                     )
 
                     if price_data and price_data.price > 0:
-                        snapshots_to_insert.append({
-                            "time": now,
-                            "card_id": card_id,
-                            "marketplace_id": cardtrader_id,
-                            "condition": CardCondition.NEAR_MINT.value,
-                            "is_foil": False,
-                            "language": CardLanguage.ENGLISH.value,
-                            "price": price_data.price,
-                            "price_low": price_data.price_low,
-                            "price_high": price_data.price_high,
-                            "currency": price_data.currency,
-                            "num_listings": price_data.num_listings,
-                            "source": "cardtrader",
-                        })
+                        snapshots_to_insert.append(prepare_copy_record(
+                            time=now,
+                            card_id=card_id,
+                            marketplace_id=cardtrader_id,
+                            is_foil=False,
+                            price=price_data.price,
+                            price_low=price_data.price_low,
+                            price_high=price_data.price_high,
+                            currency=price_data.currency,
+                            num_listings=price_data.num_listings,
+                            source="cardtrader",
+                        ))
                         updated_card_ids.append(card_id)
                         stats["cards_fetched"] += 1
 
@@ -574,7 +570,9 @@ async def _collect_cardtrader_async(card_ids: list[int]) -> dict[str, Any]:
 
             # Batch upsert
             if snapshots_to_insert:
-                insert_stats = await batch_upsert_snapshots(db, snapshots_to_insert)
+                insert_stats = await batch_upsert_snapshots(
+                    db, snapshots_to_insert, redis=redis, job="cardtrader"
+                )
                 stats["snapshots_created"] = insert_stats["inserted"]
 
             # Update cache
@@ -680,22 +678,20 @@ async def _collect_tcgplayer_async(card_ids: list[int]) -> dict[str, Any]:
                     )
 
                     if price_data and price_data.price > 0:
-                        snapshots_to_insert.append({
-                            "time": now,
-                            "card_id": card_id,
-                            "marketplace_id": tcgplayer_id,
-                            "condition": CardCondition.NEAR_MINT.value,
-                            "is_foil": False,
-                            "language": CardLanguage.ENGLISH.value,
-                            "price": price_data.price,
-                            "price_low": price_data.price_low,
-                            "price_mid": price_data.price_mid,
-                            "price_high": price_data.price_high,
-                            "price_market": price_data.price_market,
-                            "currency": "USD",
-                            "num_listings": price_data.num_listings,
-                            "source": "tcgplayer",
-                        })
+                        snapshots_to_insert.append(prepare_copy_record(
+                            time=now,
+                            card_id=card_id,
+                            marketplace_id=tcgplayer_id,
+                            is_foil=False,
+                            price=price_data.price,
+                            price_low=price_data.price_low,
+                            price_mid=price_data.price_mid,
+                            price_high=price_data.price_high,
+                            price_market=price_data.price_market,
+                            currency="USD",
+                            num_listings=price_data.num_listings,
+                            source="tcgplayer",
+                        ))
                         updated_card_ids.append(card_id)
                         stats["cards_fetched"] += 1
 
@@ -705,7 +701,9 @@ async def _collect_tcgplayer_async(card_ids: list[int]) -> dict[str, Any]:
 
             # Batch upsert
             if snapshots_to_insert:
-                insert_stats = await batch_upsert_snapshots(db, snapshots_to_insert)
+                insert_stats = await batch_upsert_snapshots(
+                    db, snapshots_to_insert, redis=redis, job="tcgplayer"
+                )
                 stats["snapshots_created"] = insert_stats["inserted"]
 
             # Update cache
@@ -809,23 +807,21 @@ async def _collect_manapool_async() -> dict[str, Any]:
                 # Manapool prices are in cents
                 price_euros = Decimal(price_cents) / 100
 
-                snapshots_to_insert.append({
-                    "time": now,
-                    "card_id": card_id,
-                    "marketplace_id": manapool_id,
-                    "condition": CardCondition.NEAR_MINT.value,
-                    "is_foil": False,
-                    "language": CardLanguage.ENGLISH.value,
-                    "price": price_euros,
-                    "currency": "EUR",
-                    "source": "manapool",
-                })
+                snapshots_to_insert.append(prepare_copy_record(
+                    time=now,
+                    card_id=card_id,
+                    marketplace_id=manapool_id,
+                    is_foil=False,
+                    price=price_euros,
+                    currency="EUR",
+                    source="manapool",
+                ))
                 stats["cards_matched"] += 1
 
             # Batch upsert (larger batches for bulk data)
             if snapshots_to_insert:
                 insert_stats = await batch_upsert_snapshots(
-                    db, snapshots_to_insert, batch_size=1000
+                    db, snapshots_to_insert, job="manapool"
                 )
                 stats["snapshots_created"] = insert_stats["inserted"]
 
@@ -17,8 +17,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.constants import CardCondition, CardLanguage
+from app.core.data_freshness import PRICE_SNAPSHOTS_WATERMARK, record_watermark
+from app.db.transaction import savepoint
 from app.models import Card, InventoryItem, PriceSnapshot, Marketplace
-from app.services.ingestion import ScryfallAdapter
+from app.services.ingestion import (
+    ScryfallAdapter,
+    SnapshotRecord,
+    copy_snapshots,
+    prepare_copy_record,
+)
+from app.services.inventory_index import refresh_inventory_index, restate_dirty_users
 from app.services.pricing import BulkPriceImporter, ConditionPricer, InventoryValuator
 from app.tasks.utils import create_task_session_maker, run_async
 
@@ -113,6 +121,8 @@ async def _bulk_refresh_async() -> dict[str, Any]:
                     logger.warning("Failed to update inventory valuations", error=str(e))
                     results["inventory_update_error"] = str(e)
 
+                await _refresh_inventory_index(db, results)
+
                 await db.commit()
 
                 logger.info(
@@ -209,6 +219,33 @@ async def _update_inventory_valuations(db: AsyncSession) -> None:
     logger.debug("Updated inventory valuations", items_updated=updated_count)
 
 
+async def _refresh_inventory_index(db: AsyncSession, results: dict[str, Any]) -> None:
+    """Maintain the inventory index series without failing the price refresh."""
+    try:
+        async with savepoint(db, "inventory_index"):
+            results["index_rows_updated"] = await refresh_inventory_index(db)
+    except Exception as e:
+        logger.warning("Failed to refresh inventory index series", error=str(e))
+        results["index_update_error"] = str(e)
+
+
+async def _commit_snapshots(
+    db: AsyncSession,
+    pending: list[SnapshotRecord],
+    rows_written: int,
+    latest_data_at: datetime | None,
+    job: str,
+) -> None:
+    """COPY pending price snapshots and commit them with the price_snapshots watermark."""
+    await copy_snapshots(db, pending, job=job)
+    pending.clear()
+    if rows_written:
+        await record_watermark(
+            db, PRICE_SNAPSHOTS_WATERMARK, rows_written, latest_data_at=latest_data_at, job=job
+        )
+    await db.commit()
+
+
 @shared_task(
     bind=True,
     name="app.tasks.pricing.inventory_refresh",
@@ -265,6 +302,8 @@ async def _inventory_refresh_async() -> dict[str, Any]:
 
             # Initialize Scryfall adapter
             scryfall = ScryfallAdapter()
+            pending: list[SnapshotRecord] = []
+            latest_snapshot_at = None
 
             try:
                 for card in cards:
@@ -279,6 +318,7 @@ async def _inventory_refresh_async() -> dict[str, Any]:
                         results["api_calls"] += 1
 
                         now = datetime.now(timezone.utc)
+                        latest_snapshot_at = now
 
                         for price_data in all_prices:
                             if not price_data or price_data.price <= 0:
@@ -289,7 +329,7 @@ async def _inventory_refresh_async() -> dict[str, Any]:
                                 continue
 
                             # Create non-foil snapshot
-                            snapshot = PriceSnapshot(
+                            pending.append(prepare_copy_record(
                                 time=now,
                                 card_id=card.id,
                                 marketplace_id=marketplace.id,
@@ -299,13 +339,12 @@ async def _inventory_refresh_async() -> dict[str, Any]:
                                 price=price_data.price,
                                 currency=price_data.currency,
                                 source="api",
-                            )
-                            db.add(snapshot)
+                            ))
                             results["snapshots_created"] += 1
 
                             # Create foil snapshot if available
                             if price_data.price_foil and price_data.price_foil > 0:
-                                foil_snapshot = PriceSnapshot(
+                                pending.append(prepare_copy_record(
                                     time=now,
                                     card_id=card.id,
                                     marketplace_id=marketplace.id,
@@ -315,8 +354,7 @@ async def _inventory_refresh_async() -> dict[str, Any]:
                                     price=price_data.price_foil,
                                     currency=price_data.currency,
                                     source="api",
-                                )
-                                db.add(foil_snapshot)
+                                ))
                                 results["snapshots_created"] += 1
 
                         results["cards_refreshed"] += 1
@@ -327,7 +365,10 @@ async def _inventory_refresh_async() -> dict[str, Any]:
                         # Commit every 50 cards to release transaction during rate limiting
                         # This prevents "idle in transaction" while waiting for API rate limits
                         if results["cards_refreshed"] % 50 == 0:
-                            await db.commit()
+                            await _commit_snapshots(
+                                db, pending, results["snapshots_created"], latest_snapshot_at,
+                                "inventory_refresh",
+                            )
                             logger.debug(
                                 "Inventory refresh progress - committed batch",
                                 cards_refreshed=results["cards_refreshed"],
@@ -341,8 +382,17 @@ async def _inventory_refresh_async() -> dict[str, Any]:
                         logger.warning("Failed to refresh card price", card_id=card.id, error=str(e))
 
                 # Update inventory valuations after price refresh
+                await copy_snapshots(db, pending, job="inventory_refresh")
+                pending.clear()
                 await _update_inventory_valuations(db)
 
+                await _commit_snapshots(
+                    db, pending, results["snapshots_created"], latest_snapshot_at,
+                    "inventory_refresh",
+                )
+
+                # The index is a derived cache: refresh it after the prices are committed
+                await _refresh_inventory_index(db, results)
                 await db.commit()
 
             finally:
@@ -449,6 +499,7 @@ async def _condition_refresh_async() -> dict[str, Any]:
             marketplace = await _get_or_create_marketplace(db, "tcgplayer", "TCGPlayer", "https://www.tcgplayer.com", "USD")
 
             now = datetime.now(timezone.utc)
+            pending: list[SnapshotRecord] = []
 
             for card, nm_price in high_value_cards:
                 try:
@@ -471,7 +522,7 @@ async def _condition_refresh_async() -> dict[str, Any]:
                         if price <= 0:
                             continue
 
-                        snapshot = PriceSnapshot(
+                        pending.append(prepare_copy_record(
                             time=now,
                             card_id=card.id,
                             marketplace_id=marketplace.id,
@@ -481,8 +532,7 @@ async def _condition_refresh_async() -> dict[str, Any]:
                             price=price,
                             currency="USD",
                             source="condition_api" if pricer.should_use_tcgplayer(float(nm_price)) else "condition_multiplier",
-                        )
-                        db.add(snapshot)
+                        ))
                         results["snapshots_created"] += 1
 
                     results["cards_processed"] += 1
@@ -490,7 +540,9 @@ async def _condition_refresh_async() -> dict[str, Any]:
                     # Commit every 25 cards to release transaction during API calls
                     # This prevents "idle in transaction" while waiting for external APIs
                     if results["cards_processed"] % 25 == 0:
-                        await db.commit()
+                        await _commit_snapshots(
+                            db, pending, results["snapshots_created"], now, "condition_refresh"
+                        )
                         logger.debug(
                             "Condition refresh progress - committed batch",
                             cards_processed=results["cards_processed"],
@@ -503,7 +555,10 @@ async def _condition_refresh_async() -> dict[str, Any]:
                     results["errors"].append(error_msg)
                     logger.warning("Failed to get condition prices", card_id=card.id, error=str(e))
 
-            await db.commit()  # Final commit for remaining items
+            # Final commit for remaining items
+            await _commit_snapshots(
+                db, pending, results["snapshots_created"], now, "condition_refresh"
+            )
 
             results["completed_at"] = datetime.now(timezone.utc).isoformat()
             logger.info(
@@ -520,6 +575,47 @@ async def _condition_refresh_async() -> dict[str, Any]:
         await engine.dispose()
 
 
+@shared_task(
+    bind=True,
+    name="app.tasks.pricing.rebuild_inventory_index",
+    max_retries=1,
+    default_retry_delay=600,
+)
+def rebuild_inventory_index(self) -> dict[str, Any]:
+    """
+    Restate the inventory index series of users whose inventory changed.
+
+    Runs every 15 minutes so edited inventories are restated soon after
+    the edit; the pricing refresh tasks also pick up dirty users. Only
+    marked users are recomputed (see restate_dirty_users).
+
+    Returns:
+        Number of users restated.
+    """
+    return run_async(_rebuild_inventory_index_async())
+
+
+async def _rebuild_inventory_index_async() -> dict[str, Any]:
+    """Async implementation of inventory index rebuild."""
+    session_maker, engine = create_task_session_maker()
+    try:
+        users_restated = 0
+        while True:
+            # One transaction per batch of users keeps each restate step short
+            async with session_maker() as db:
+                restated = await restate_dirty_users(db)
+                await db.commit()
+            if not restated:
+                break
+            users_restated += restated
+
+        logger.info("Rebuilt inventory index series", users=users_restated)
+        return {"users_restated": users_restated}
+
+    finally:
+        await engine.dispose()
+
+
 async def _get_or_create_marketplace(
     db: AsyncSession,
     slug: str,
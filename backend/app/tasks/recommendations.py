@@ -8,6 +8,7 @@ import structlog
 from celery import shared_task
 from sqlalchemy import select, and_
 
+from app.core.data_freshness import RECOMMENDATIONS_WATERMARK, record_watermark
 from app.core.utils import parse_setting_value
 from app.models import AppSettings, Recommendation
 from app.models.price_snapshot import PriceSnapshot
@@ -111,6 +112,11 @@ async def _generate_recommendations_async(
                 card_ids=card_ids,
                 target_date=target_date,
             )
+            await record_watermark(
+                db, RECOMMENDATIONS_WATERMARK, results.get("total_recommendations", 0),
+                job="generate_recommendations",
+            )
+            await db.commit()
             
             logger.info("Recommendation generation completed", results=results)
             return results
@@ -12,7 +12,11 @@ from sqlalchemy import select
 
 from app.models import Card, CardFeatureVector
 from app.services.vectorization.service import VectorizationService
-from app.services.vectorization.ingestion import vectorize_card_by_attrs
+from app.services.vectorization.ingestion import (
+    EmbeddingCache,
+    upsert_card_vectors,
+    vectorize_cards_batch,
+)
 from app.tasks.utils import create_task_session_maker, run_async
 
 logger = structlog.get_logger()
@@ -25,113 +29,163 @@ logger = structlog.get_logger()
     default_retry_delay=600,
     autoretry_for=(Exception,),
 )
-def refresh_embeddings(self, batch_size: int = 100, force: bool = False) -> dict[str, Any]:
+def refresh_embeddings(
+    self,
+    batch_size: int = 1000,
+    force: bool = False,
+    encode_batch_size: int = 256,
+    processes: int = 0,
+) -> dict[str, Any]:
     """
     Refresh card embeddings for semantic search.
 
     Processes cards that:
     - Have no embedding yet, or
-    - Were updated since last embedding (if force=False)
+    - Changed since their embedding was built (content hash differs)
+
+    Cards are read in keyset pages of plain columns. Within and across
+    pages, each distinct embedded text (shared by reprints) is encoded
+    once, in large batches, and each page is written with one upsert.
 
     Args:
-        batch_size: Number of cards to process per batch
+        batch_size: Number of cards per page (and per commit)
         force: If True, re-embed all cards regardless of status
+        encode_batch_size: Texts per model forward pass
+        processes: If > 1, encode on this many CPU worker processes
+            (requires a non-daemon worker, e.g. --pool=solo)
 
     Returns:
         Dict with processing statistics
     """
-    return run_async(_refresh_embeddings_async(batch_size, force))
+    return run_async(_refresh_embeddings_async(batch_size, force, encode_batch_size, processes))
 
 
-async def _refresh_embeddings_async(batch_size: int, force: bool) -> dict[str, Any]:
+async def _refresh_embeddings_async(
+    batch_size: int,
+    force: bool,
+    encode_batch_size: int = 256,
+    processes: int = 0,
+) -> dict[str, Any]:
     """Async implementation of embedding refresh."""
     session_maker, engine = create_task_session_maker()
     vectorizer = VectorizationService()
+    cache = EmbeddingCache()
+    pool = None
 
     stats: dict[str, Any] = {
         "cards_processed": 0,
         "embeddings_created": 0,
         "embeddings_updated": 0,
+        "skipped_unchanged": 0,
+        "texts_encoded": 0,
         "errors": 0,
         "started_at": datetime.now(timezone.utc).isoformat(),
     }
 
     try:
+        if processes > 1:
+            pool = vectorizer.start_encode_pool(processes)
+
+        logger.info("Starting embedding refresh", force=force, page_size=batch_size)
+
         async with session_maker() as db:
-            if force:
-                # Get all cards
-                query = select(Card)
-            else:
-                # Get cards without embeddings
-                subquery = select(CardFeatureVector.card_id)
-                query = select(Card).where(Card.id.notin_(subquery))
-
-            result = await db.execute(query)
-            cards = result.scalars().all()
-
-            logger.info(
-                "Starting embedding refresh",
-                total_cards=len(cards),
-                force=force,
-            )
-
-            for card in cards:
-                try:
-                    # Prepare card attributes
+            last_id = 0
+            while True:
+                query = (
+                    select(
+                        Card.id,
+                        Card.name,
+                        Card.type_line,
+                        Card.oracle_text,
+                        Card.rarity,
+                        Card.cmc,
+                        Card.colors,
+                        Card.mana_cost,
+                        CardFeatureVector.card_id.label("vector_card_id"),
+                        CardFeatureVector.content_hash,
+                    )
+                    .outerjoin(CardFeatureVector, CardFeatureVector.card_id == Card.id)
+                    .where(Card.id > last_id)
+                    .order_by(Card.id)
+                    .limit(batch_size)
+                )
+                page = list((await db.execute(query)).all())
+                if not page:
+                    break
+                last_id = page[-1].id
+
+                pending = []
+                for row in page:
                     card_attrs = {
-                        "name": card.name,
-                        "type_line": card.type_line,
-                        "oracle_text": card.oracle_text,
-                        "rarity": card.rarity,
-                        "cmc": card.cmc,
-                        "colors": card.colors,
-                        "mana_cost": card.mana_cost,
+                        "name": row.name,
+                        "type_line": row.type_line,
+                        "oracle_text": row.oracle_text,
+                        "rarity": row.rarity,
+                        "cmc": row.cmc,
+                        "colors": row.colors,
+                        "mana_cost": row.mana_cost,
                     }
+                    content_hash = vectorizer.card_content_hash(card_attrs)
+                    if not force and row.content_hash == content_hash:
+                        stats["skipped_unchanged"] += 1
+                        continue
+                    pending.append((row, card_attrs, content_hash))
 
-                    # Check if embedding exists
-                    existing_query = select(CardFeatureVector).where(
-                        CardFeatureVector.card_id == card.id
-                    )
-                    existing_result = await db.execute(existing_query)
-                    existing = existing_result.scalar_one_or_none()
+                if not pending:
+                    continue
 
-                    # Create or update embedding
-                    vector_obj = await vectorize_card_by_attrs(
-                        db, card.id, card_attrs, vectorizer
+                try:
+                    vectors, encoded = vectorize_cards_batch(
+                        [card_attrs for _, card_attrs, _ in pending],
+                        vectorizer,
+                        cache,
+                        encode_batch_size=encode_batch_size,
+                        pool=pool,
                     )
-
-                    if vector_obj:
-                        if existing:
-                            stats["embeddings_updated"] += 1
-                        else:
-                            stats["embeddings_created"] += 1
-
-                    stats["cards_processed"] += 1
-
-                    # Commit in batches
-                    if stats["cards_processed"] % batch_size == 0:
-                        await db.commit()
-                        logger.info(
-                            "Embedding batch committed",
-                            processed=stats["cards_processed"],
-                        )
+                    await upsert_card_vectors(db, [
+                        {
+                            "card_id": row.id,
+                            "feature_vector": vector,
+                            "model_version": vectorizer.embedding_model_name,
+                            "content_hash": content_hash,
+                        }
+                        for (row, _, content_hash), vector in zip(pending, vectors)
+                    ])
+                    await db.commit()
 
                 except Exception as e:
-                    stats["errors"] += 1
+                    await db.rollback()
+                    stats["errors"] += len(pending)
                     logger.warning(
-                        "Failed to embed card",
-                        card_id=card.id,
+                        "Failed to embed card page",
+                        first_card_id=pending[0][0].id,
+                        last_card_id=last_id,
                         error=str(e),
                     )
-
-            # Final commit
-            await db.commit()
+                    continue
+
+                stats["texts_encoded"] += encoded
+                stats["cards_processed"] += len(pending)
+                for row, _, _ in pending:
+                    if row.vector_card_id is None:
+                        stats["embeddings_created"] += 1
+                    else:
+                        stats["embeddings_updated"] += 1
+
+                logger.info(
+                    "Embedding page committed",
+                    processed=stats["cards_processed"],
+                    texts_encoded=stats["texts_encoded"],
+                    last_card_id=last_id,
+                )
 
     except Exception as e:
         logger.error("Embedding refresh failed", error=str(e))
         stats["error_message"] = str(e)
 
     finally:
+        if pool is not None:
+            vectorizer.stop_encode_pool(pool)
         await engine.dispose()
         vectorizer.close()
 
@@ -31,6 +31,9 @@ except ImportError:
     )
 
 from app.core.config import settings
+from app.core.constants import CardCondition, CardLanguage
+from app.core.provider_limiter import close_shared_redis
+from app.core.query_budget import instrument_engine
 
 logger = None  # Lazy import to avoid circular dependencies
 
@@ -84,6 +87,7 @@ def create_task_session_maker():
             "command_timeout": worker_timeout,  # asyncpg command timeout (in seconds)
         },
     )
+    instrument_engine(engine)
     return async_sessionmaker(
         engine,
         class_=AsyncSession,
@@ -239,6 +243,7 @@ def run_async(coro: Coroutine[Any, Any, Any]) -> Any:
     - Runs the coroutine to completion
     - Closes the loop and cleans up async generators
     - Handles threadpool executor shutdown
+    - Closes the loop's shared provider Redis client
 
     Args:
         coro: Async coroutine to execute.
@@ -246,7 +251,14 @@ def run_async(coro: Coroutine[Any, Any, Any]) -> Any:
     Returns:
         Result of the coroutine execution.
     """
-    return asyncio.run(coro)
+    return asyncio.run(_run_and_close_shared_redis(coro))
+
+
+async def _run_and_close_shared_redis(coro: Coroutine[Any, Any, Any]) -> Any:
+    try:
+        return await coro
+    finally:
+        await close_shared_redis()
 
 
 # =============================================================================
@@ -270,9 +282,9 @@ class CollectedPriceData:
     price: Decimal
     currency: str = "USD"
     time: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
-    condition: str = "near_mint"
+    condition: str = CardCondition.NEAR_MINT.value
     is_foil: bool = False
-    language: str = "en"
+    language: str = CardLanguage.ENGLISH.value
     price_low: Optional[Decimal] = None
     price_mid: Optional[Decimal] = None
     price_high: Optional[Decimal] = None
@@ -322,79 +334,61 @@ async def short_transaction(session_maker):
 async def write_price_snapshots_batch(
     session_maker,
     collected_prices: List[CollectedPriceData],
-    batch_size: int = 100,
+    batch_size: int = 1000,
+    evaluate_alerts: bool = True,
 ) -> dict:
     """
     Write collected price data to database in short batched transactions.
 
-    Each batch is committed separately, so partial success is possible.
-    This is acceptable for price data where we'd rather have some data
-    than none due to a single failure.
+    Each batch is COPYed and committed separately (see
+    batch_upsert_snapshots), so partial success is possible. This is
+    acceptable for price data where we'd rather have some data than
+    none due to a single failure. After each committed batch the written
+    prices are checked against want list targets.
 
     Args:
         session_maker: Async session maker from create_task_session_maker()
         collected_prices: List of CollectedPriceData to write
-        batch_size: Number of records per transaction (default 100)
+        batch_size: Number of records per transaction (default 1000)
+        evaluate_alerts: Check written prices against want list targets
 
     Returns:
-        dict with 'written' and 'errors' counts
+        dict with 'written', 'errors' and 'alerts_created' counts
     """
-    from sqlalchemy.dialects.postgresql import insert
-    from app.models.price import PriceSnapshot
+    from redis.asyncio import Redis
+    from app.services.ingestion.bulk_ops import batch_upsert_snapshots
 
     log = get_logger()
-    stats = {"written": 0, "errors": 0, "batches": 0}
-
-    for i in range(0, len(collected_prices), batch_size):
-        batch = collected_prices[i:i + batch_size]
+    stats = {"written": 0, "errors": 0, "batches": 0, "alerts_created": 0}
+    redis = Redis.from_url(settings.redis_url, decode_responses=True) if evaluate_alerts else None
 
-        async with session_maker() as db:
-            try:
-                for price_data in batch:
-                    # Use upsert to handle duplicates gracefully
-                    stmt = insert(PriceSnapshot).values(
-                        time=price_data.time,
-                        card_id=price_data.card_id,
-                        marketplace_id=price_data.marketplace_id,
-                        condition=price_data.condition,
-                        is_foil=price_data.is_foil,
-                        language=price_data.language,
-                        price=price_data.price,
-                        price_low=price_data.price_low,
-                        price_mid=price_data.price_mid,
-                        price_high=price_data.price_high,
-                        price_market=price_data.price_market,
-                        currency=price_data.currency,
-                        num_listings=price_data.num_listings,
-                        total_quantity=price_data.total_quantity,
-                        source=price_data.source,
-                    ).on_conflict_do_update(
-                        index_elements=['time', 'card_id', 'marketplace_id', 'condition', 'is_foil', 'language'],
-                        set_={
-                            'price': price_data.price,
-                            'price_low': price_data.price_low,
-                            'price_mid': price_data.price_mid,
-                            'price_high': price_data.price_high,
-                            'price_market': price_data.price_market,
-                            'num_listings': price_data.num_listings,
-                            'total_quantity': price_data.total_quantity,
-                        }
+    try:
+        for i in range(0, len(collected_prices), batch_size):
+            batch = collected_prices[i:i + batch_size]
+
+            async with session_maker() as db:
+                try:
+                    batch_stats = await batch_upsert_snapshots(
+                        db, batch, redis=redis, evaluate_alerts=evaluate_alerts,
+                        job="collected_prices",
                     )
-                    await db.execute(stmt)
-                    stats["written"] += 1
-
-                await db.commit()
-                stats["batches"] += 1
-
-            except Exception as e:
-                await db.rollback()
-                stats["errors"] += len(batch)
-                log.warning(
-                    "Batch write failed",
-                    batch_start=i,
-                    batch_size=len(batch),
-                    error=str(e),
-                )
+                except Exception as e:
+                    await db.rollback()
+                    stats["errors"] += len(batch)
+                    log.warning(
+                        "Batch write failed",
+                        batch_start=i,
+                        batch_size=len(batch),
+                        error=str(e),
+                    )
+                    continue
+
+            stats["written"] += batch_stats["inserted"]
+            stats["batches"] += 1
+            stats["alerts_created"] += batch_stats.get("alerts_created", 0)
+    finally:
+        if redis is not None:
+            await redis.aclose()
 
     return stats
 
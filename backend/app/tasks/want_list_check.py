@@ -2,18 +2,23 @@
 Want list price check task.
 
 Periodically checks all want list items with alerts enabled
-and creates notifications when target prices are hit.
+and creates notifications when target prices are hit. Also rebuilds the
+Redis target index used to fire alerts as soon as prices are written
+(see app.services.want_list_alerts); this sweep remains the fallback.
 """
 from decimal import Decimal
 from typing import Any
 
 import structlog
 from celery import shared_task
+from redis.asyncio import Redis
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 
+from app.core.config import settings
 from app.models import WantListItem, PriceSnapshot
 from app.services.notifications import create_price_alert
+from app.services.want_list_alerts import rebuild_want_list_index
 from app.tasks.utils import create_task_session_maker, run_async
 
 logger = structlog.get_logger()
@@ -43,6 +48,15 @@ async def _check_want_list_prices_async() -> dict[str, Any]:
     session_maker, engine = create_task_session_maker()
     try:
         async with session_maker() as db:
+            # Refresh the write-time alert index
+            redis = Redis.from_url(settings.redis_url, decode_responses=True)
+            try:
+                await rebuild_want_list_index(db, redis)
+            except Exception as e:
+                logger.warning("Failed to rebuild want list alert index", error=str(e))
+            finally:
+                await redis.aclose()
+
             # Get all want list items with alerts enabled
             query = (
                 select(WantListItem)
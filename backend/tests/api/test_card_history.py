@@ -0,0 +1,137 @@
+"""
+Tests for aggregate-backed card price history.
+"""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.api.utils.downsampling import lttb_indices
+from app.repositories.price_repo import PriceRepository
+
+
+class TestLTTB:
+    """Tests for Largest-Triangle-Three-Buckets downsampling."""
+
+    def test_short_series_is_untouched(self):
+        """Series at or below the threshold keep every point."""
+        assert lttb_indices([0, 1, 2], [1, 2, 3], 5).tolist() == [0, 1, 2]
+
+    def test_keeps_endpoints_and_count(self):
+        """Output has exactly threshold sorted indices including both ends."""
+        x = np.arange(1000)
+        keep = lttb_indices(x, np.sin(x / 50), 100)
+        assert len(keep) == 100
+        assert keep[0] == 0 and keep[-1] == 999
+        assert (np.diff(keep) > 0).all()
+
+    def test_preserves_spike(self):
+        """A single spike in a flat series survives downsampling."""
+        y = np.zeros(500)
+        y[123] = 50.0
+        assert 123 in lttb_indices(np.arange(500), y, 20)
+
+
+class FakeSession:
+    """Records executed SQL and returns canned rows per query."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.queries = []
+
+    async def execute(self, query, params):
+        self.queries.append((str(query), params))
+        return [SimpleNamespace(_mapping=row) for row in self.results.pop(0)]
+
+
+class TestCardHistorySeries:
+    """Tests for PriceRepository.get_card_history_series."""
+
+    NOW = datetime(2026, 1, 20, 12, 34, tzinfo=timezone.utc)
+
+    @pytest.mark.asyncio
+    async def test_short_range_reads_hourly_aggregate_with_tail(self):
+        """Up to 7 days uses card_prices_hourly plus an hour-aligned tail."""
+        db = FakeSession([{"time": self.NOW - timedelta(days=1)}], [{"time": self.NOW}])
+        rows = await PriceRepository(db).get_card_history_series(
+            1, self.NOW - timedelta(days=7), now=self.NOW,
+        )
+
+        (aggregate_sql, params), (realtime_sql, _) = db.queries
+        assert "FROM card_prices_hourly" in aggregate_sql
+        assert "FROM price_snapshots" in realtime_sql
+        assert params["lag_cutoff"] == datetime(2026, 1, 20, 10, tzinfo=timezone.utc)
+        assert [r["bucket_interval"] for r in rows] == [timedelta(hours=1)] * 2
+
+    @pytest.mark.asyncio
+    async def test_default_range_keeps_daily_points(self):
+        """The endpoint's 30-day default still returns one point per day."""
+        db = FakeSession([], [])
+        await PriceRepository(db).get_card_history_series(
+            1, self.NOW - timedelta(days=30), now=self.NOW,
+        )
+
+        (aggregate_sql, params), _ = db.queries
+        assert "FROM card_prices_daily" in aggregate_sql
+        assert params["bucket"] == timedelta(days=1)
+
+    @pytest.mark.asyncio
+    async def test_long_range_reads_daily_aggregate(self):
+        """Longer ranges use the daily rollup and filter as requested."""
+        db = FakeSession([], [])
+        await PriceRepository(db).get_card_history_series(
+            1, self.NOW - timedelta(days=365), is_foil=True, has_market_price=False, now=self.NOW,
+        )
+
+        (aggregate_sql, params), (realtime_sql, _) = db.queries
+        assert "FROM card_prices_daily" in aggregate_sql
+        assert "h.avg_market_price IS NULL" in aggregate_sql
+        assert "h.avg_market_price IS NULL" in realtime_sql
+        assert "GROUP BY 1, s.marketplace_id, s.condition" in realtime_sql
+        assert params["lag_cutoff"] == datetime(2026, 1, 18, tzinfo=timezone.utc)
+        assert params["is_foil"] is True
+        assert params["exclude_0"] == "mtgo"
+
+
+class FakeConnection:
+    """Autocommit connection recording CALL statements."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execution_options(self, **options):
+        self.engine.options = options
+        return self
+
+    async def execute(self, statement, params):
+        self.engine.calls.append((str(statement), params))
+
+
+class FakeEngine:
+    def __init__(self):
+        self.calls = []
+        self.options = None
+
+    def connect(self):
+        return FakeConnection(self)
+
+
+@pytest.mark.asyncio
+async def test_refresh_card_price_aggregates():
+    """Both card aggregates are refreshed over the range, outside a transaction."""
+    engine = FakeEngine()
+    start = datetime(2025, 10, 1, tzinfo=timezone.utc)
+    end = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    await PriceRepository(SimpleNamespace(bind=engine)).refresh_card_price_aggregates(start, end)
+
+    assert engine.options == {"isolation_level": "AUTOCOMMIT"}
+    assert [sql.split("'")[1] for sql, _ in engine.calls] == ["card_prices_hourly", "card_prices_daily"]
+    assert all(params == {"start": start, "end": end} for _, params in engine.calls)
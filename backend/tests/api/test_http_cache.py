@@ -0,0 +1,145 @@
+"""Tests for watermark-versioned response caching with ETags."""
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.api import deps
+from app.api.utils import http_cache
+from app.api.utils.http_cache import cache_key, cache_response, etag_matches, normalize_query
+from app.middleware.http_cache import HttpCacheMiddleware
+
+
+class FakeRedis:
+    """Hash storage with the pipeline calls the middleware uses."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.ttls = {}
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def hset(self, key, mapping):
+        self.ops.append(lambda: self.redis.hashes.setdefault(key, {}).update(mapping))
+
+    def expire(self, key, seconds):
+        self.ops.append(lambda: self.redis.ttls.__setitem__(key, seconds))
+
+    async def execute(self):
+        for op in self.ops:
+            op()
+
+
+@pytest.fixture
+def cached_app(monkeypatch):
+    """App with one cacheable route, a fake Redis and settable watermarks."""
+    calls = {"count": 0}
+    versions = {"price_snapshots": "2026-01-01T00:00:00"}
+    redis = FakeRedis()
+
+    async def load_versions():
+        return dict(versions)
+
+    async def get_redis():
+        return redis
+
+    monkeypatch.setattr(http_cache, "_load_versions", load_versions)
+    monkeypatch.setattr(http_cache, "_versions", None)
+    monkeypatch.setattr(http_cache.settings, "http_cache_version_interval", 0)
+    monkeypatch.setattr(deps, "get_redis", get_redis)
+
+    app = FastAPI()
+    app.add_middleware(HttpCacheMiddleware)
+
+    @app.get("/prices/{card}")
+    @cache_response("price_snapshots", max_age=30)
+    async def prices(card: str, days: int = 7):
+        calls["count"] += 1
+        return {"card": card, "days": days, "call": calls["count"]}
+
+    @app.get("/uncached")
+    async def uncached():
+        return {"ok": True}
+
+    return app, calls, versions, redis
+
+
+class TestHttpCacheMiddleware:
+    """Tests for cache hits, 304s and version invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_hit_and_not_modified(self, cached_app):
+        app, calls, _, _ = cached_app
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            first = await client.get("/prices/abc?days=7")
+            again = await client.get("/prices/abc?days=7")
+            not_modified = await client.get(
+                "/prices/abc?days=7", headers={"If-None-Match": first.headers["etag"]}
+            )
+
+        assert first.headers["x-cache"] == "MISS"
+        assert first.headers["cache-control"] == "public, max-age=30, stale-while-revalidate=150"
+        assert first.headers["etag"].startswith('"') and not first.headers["etag"].startswith('W/')
+        assert again.headers["x-cache"] == "HIT"
+        assert again.content == first.content
+        assert again.headers["etag"] == first.headers["etag"]
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert calls["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_watermark_change_invalidates(self, cached_app):
+        app, calls, versions, _ = cached_app
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            first = await client.get("/prices/abc")
+            versions["price_snapshots"] = "2026-01-01T00:05:00"
+            second = await client.get("/prices/abc", headers={"If-None-Match": first.headers["etag"]})
+
+        assert second.status_code == 200
+        assert second.headers["x-cache"] == "MISS"
+        assert second.json()["call"] == 2
+
+    @pytest.mark.asyncio
+    async def test_unavailable_watermarks_bypass_cache(self, cached_app, monkeypatch):
+        app, calls, _, redis = cached_app
+
+        async def failing():
+            raise ConnectionError("db down")
+
+        monkeypatch.setattr(http_cache, "_load_versions", failing)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/prices/abc")
+            other = await client.get("/uncached")
+
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+        assert "etag" not in other.headers
+        assert redis.hashes == {}
+
+
+def test_query_normalization_and_keys():
+    assert normalize_query(b"b=2&a=1&a=0") == normalize_query("a=0&a=1&b=2")
+    key = cache_key("/api/market/index", "/api/market/index", b"range=7d", "v1")
+    assert key.startswith("httpcache:/api/market/index:")
+    assert key != cache_key("/api/market/index", "/api/market/index", b"range=7d", "v2")
+
+
+def test_etag_matches():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches(None, '"a"')
@@ -0,0 +1,162 @@
+"""
+Tests for the Trading Post radius search endpoint.
+"""
+import base64
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.dialects import postgresql
+
+from app.db.session import get_db
+from app.main import app
+from app.models.trading_post import TradingPost
+
+# (id, distance from the search origin in meters, email verified)
+STORES = [
+    (1, 1_200.0, True),
+    (2, 4_800.0, True),
+    (3, 4_800.0, True),
+    (4, 9_000.0, True),
+    (5, 2_000.0, False),
+    (6, 75_000.0, True),
+]
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeRadiusSession:
+    """
+    Evaluates the radius query's bound parameters against STORES.
+
+    PostgreSQL's earthdistance functions are not available in tests, so the
+    distances are precomputed and the radius, keyset cursor, verified filter
+    and limit are applied here from the compiled statement.
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, query):
+        compiled = query.compile(dialect=postgresql.dialect())
+        sql, params = str(compiled), compiled.params
+        self.statements.append((sql, params))
+
+        radius_m = params["earth_distance_1"]
+        assert params["earth_box_1"] == radius_m
+        rows = [
+            (id_, distance)
+            for id_, distance, verified in STORES
+            if distance <= radius_m
+            and (verified or "email_verified_at IS NOT NULL" not in sql)
+        ]
+        if "id_1" in params:
+            cursor = (params["earth_distance_2"], params["id_1"])
+            rows = [row for row in rows if (row[1], row[0]) > cursor]
+        rows.sort(key=lambda row: (row[1], row[0]))
+
+        return FakeResult([
+            (
+                TradingPost(id=id_, store_name=f"Store {id_}", country="US"),
+                distance,
+            )
+            for id_, distance in rows[:params["param_1"]]
+        ])
+
+
+@pytest_asyncio.fixture
+async def radius_client():
+    session = FakeRadiusSession()
+
+    async def override_get_db():
+        yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    mock_redis = AsyncMock()
+    mock_redis.register_script = MagicMock(return_value=AsyncMock(return_value=[1, 1, 0]))
+
+    with patch("app.middleware.rate_limit.redis.from_url", return_value=mock_redis), \
+            patch("app.middleware.rate_limit.LocalTokenBucket.consume", return_value=True):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            yield ac, session
+
+    app.dependency_overrides.clear()
+
+
+URL = "/api/trading-posts/nearby/radius"
+
+
+@pytest.mark.asyncio
+async def test_radius_filters_and_orders_by_distance(radius_client):
+    """Only verified stores inside the radius are returned, nearest first."""
+    client, session = radius_client
+
+    response = await client.get(URL, params={"lat": 47.6, "lng": -122.3, "radius_km": 10})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [1, 2, 3, 4]
+    assert [item["distance_km"] for item in data["items"]] == [1.2, 4.8, 4.8, 9.0]
+    assert data["has_more"] is False and data["next_cursor"] is None
+
+    sql, params = session.statements[0]
+    assert "earth_box" in sql
+    assert params["earth_distance_1"] == 10_000
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_through_equal_distances(radius_client):
+    """Keyset pages neither skip nor repeat stores at the same distance."""
+    client, _ = radius_client
+    params = {"lat": 47.6, "lng": -122.3, "radius_km": 100, "limit": 3, "verified_only": False}
+
+    seen, cursor = [], None
+    for _ in range(10):
+        response = await client.get(URL, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(item["id"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if not data["has_more"]:
+            break
+        assert cursor is not None
+
+    assert seen == [1, 5, 2, 3, 4, 6]
+    assert cursor is None
+
+
+@pytest.mark.asyncio
+async def test_requires_an_origin(radius_client):
+    """Without lat/lng, the postal code must resolve."""
+    client, session = radius_client
+
+    response = await client.get(URL, params={"postal_code": "00000"})
+
+    assert response.status_code == 400
+    assert session.statements == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    base64.urlsafe_b64encode(b'{"v": "far", "id": 3}').decode(),
+    base64.urlsafe_b64encode(b'{"v": 1200.0}').decode(),
+    base64.urlsafe_b64encode(b'[1200.0, 3]').decode(),
+])
+async def test_rejects_malformed_cursor(radius_client, cursor):
+    """A tampered cursor is a client error, not a server error."""
+    client, session = radius_client
+
+    response = await client.get(URL, params={"lat": 47.6, "lng": -122.3, "cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+    assert session.statements == []
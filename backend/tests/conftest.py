@@ -12,7 +12,7 @@ import asyncio
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import AsyncGenerator
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 import pytest_asyncio
@@ -21,7 +21,8 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 
 from app.main import app as fastapi_app
 from app.db.base import Base
-from app.db.session import get_db
+from app.core.query_budget import instrument_engine
+from app.db.session import get_db, get_replica_db
 
 # Import all models to register them with SQLAlchemy before create_all
 # This ensures all relationships can be resolved
@@ -49,6 +50,8 @@ async def test_engine():
         TEST_DATABASE_URL,
         echo=False,
     )
+    # Route query budgets apply in tests when QUERY_BUDGET_ENFORCE is set
+    instrument_engine(engine)
 
     async with engine.begin() as conn:
         # Drop all tables first to ensure clean state
@@ -85,14 +88,17 @@ async def client(db_session) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_replica_db] = override_get_db
 
     # Mock Redis to disable rate limiting during tests
     mock_redis = AsyncMock()
-    mock_pipeline = AsyncMock()
-    mock_pipeline.execute = AsyncMock(return_value=[1, True])  # Always under limit
-    mock_redis.pipeline = lambda: mock_pipeline
+    # Sliding-window script result: allowed, count, enumeration block TTL
+    mock_redis.register_script = MagicMock(
+        return_value=AsyncMock(return_value=[1, 1, 0])  # Always under limit
+    )
 
-    with patch("app.middleware.rate_limit.redis.from_url", return_value=mock_redis):
+    with patch("app.middleware.rate_limit.redis.from_url", return_value=mock_redis), \
+            patch("app.middleware.rate_limit.LocalTokenBucket.consume", return_value=True):
         async with AsyncClient(app=app, base_url="http://test") as ac:
             yield ac
 
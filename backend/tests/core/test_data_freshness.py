@@ -0,0 +1,97 @@
+"""Tests for watermark-based freshness checks and approximate counts."""
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import ProgrammingError
+
+from app.core.data_freshness import (
+    EXACT_COUNT_THRESHOLD,
+    PRICE_SNAPSHOTS_WATERMARK,
+    approximate_row_count,
+    get_latest_price_snapshot_time,
+    record_watermark,
+)
+from app.models import PriceSnapshot
+
+
+class FakeSession:
+    """Returns canned scalars in order and records statements."""
+
+    def __init__(self, *scalars):
+        self.scalars = list(scalars)
+        self.statements = []
+
+    async def scalar(self, statement, params=None):
+        self.statements.append(str(statement))
+        value = self.scalars.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        yield
+
+
+class TestApproximateRowCount:
+    """Tests for approximate_row_count."""
+
+    @pytest.mark.asyncio
+    async def test_large_table_uses_estimate(self):
+        """Estimates above the threshold skip the exact COUNT."""
+        db = FakeSession(EXACT_COUNT_THRESHOLD * 50)
+        assert await approximate_row_count(db, PriceSnapshot) == EXACT_COUNT_THRESHOLD * 50
+        assert len(db.statements) == 1
+        assert "approximate_row_count" in db.statements[0]
+
+    @pytest.mark.asyncio
+    async def test_small_or_unanalyzed_table_counts_exactly(self):
+        """Small and missing (-1) estimates fall back to COUNT."""
+        db = FakeSession(-1, 42)
+        assert await approximate_row_count(db, PriceSnapshot) == 42
+        assert "count(" in db.statements[1]
+
+    @pytest.mark.asyncio
+    async def test_without_timescaledb_counts_exactly(self):
+        """A missing approximate_row_count function falls back to COUNT."""
+        db = FakeSession(ProgrammingError("SELECT", {}, Exception("no function")), 7)
+        assert await approximate_row_count(db, PriceSnapshot) == 7
+
+
+class TestWatermarks:
+    """Tests for watermark reads and writes."""
+
+    @pytest.mark.asyncio
+    async def test_latest_time_prefers_watermark(self):
+        """A recorded watermark avoids the MAX() scan."""
+        latest = datetime(2026, 1, 20, tzinfo=timezone.utc)
+        db = FakeSession(latest)
+        assert await get_latest_price_snapshot_time(db) == latest
+        assert "data_watermarks" in db.statements[0]
+        assert len(db.statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_latest_time_falls_back_to_max(self):
+        """Without a watermark the table itself is queried."""
+        latest = datetime(2026, 1, 19, tzinfo=timezone.utc)
+        db = FakeSession(None, latest)
+        assert await get_latest_price_snapshot_time(db) == latest
+        assert "max(price_snapshots.time)" in db.statements[1]
+
+    @pytest.mark.asyncio
+    async def test_record_never_moves_backwards(self):
+        """The upsert keeps the newer of the stored and written timestamps."""
+        db = FakeSession()
+        await record_watermark(db, PRICE_SNAPSHOTS_WATERMARK, 0, job="collect_price_data")
+
+        compiled = db.statements[0].compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        assert "ON CONFLICT (name) DO UPDATE" in sql
+        assert "greatest(data_watermarks.latest_data_at" in sql
+        # No rows written leaves latest_data_at to the stored value
+        assert compiled.params["latest_data_at"] is None
@@ -0,0 +1,190 @@
+"""Tests for cluster-wide provider rate limiting and shared circuit breakers."""
+import asyncio
+import time
+from email.utils import formatdate
+
+import httpx
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core import circuit_breaker, provider_limiter
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from app.core.provider_limiter import (
+    ACQUIRE_SCRIPT,
+    ADJUST_SCRIPT,
+    ProviderRateLimiter,
+    parse_retry_after,
+)
+from app.tasks.utils import run_async
+
+
+class FakeRedis:
+    """Dispatches registered Lua scripts to Python handlers."""
+
+    def __init__(self, handlers=None, error=None):
+        self.handlers = handlers or {}
+        self.error = error
+        self.calls = []
+
+    def register_script(self, script):
+        async def run(keys, args):
+            self.calls.append((script, keys, args))
+            if self.error:
+                raise self.error
+            return self.handlers[script](keys, args)
+        return run
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    def install(redis):
+        monkeypatch.setattr(provider_limiter, "get_shared_redis", lambda: redis)
+        monkeypatch.setattr(circuit_breaker, "get_shared_redis", lambda: redis)
+        return redis
+    return install
+
+
+class TestParseRetryAfter:
+    """Tests for Retry-After parsing."""
+
+    def test_seconds(self):
+        assert parse_retry_after("2.5") == 2.5
+
+    def test_http_date(self):
+        assert 8 <= parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+
+    def test_invalid_and_capped(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after("3600") == provider_limiter.MAX_COOLDOWN_SECONDS
+
+
+class TestSharedRedis:
+    """Tests for the per-loop shared Redis client."""
+
+    @pytest.mark.asyncio
+    async def test_run_async_closes_loop_client(self, monkeypatch):
+        """Each task loop gets its own client, closed before the loop ends."""
+        clients = []
+
+        class FakeClient:
+            closed = False
+
+            async def aclose(self):
+                self.closed = True
+
+        def from_url(url, **kwargs):
+            clients.append(FakeClient())
+            return clients[-1]
+
+        monkeypatch.setattr(provider_limiter.Redis, "from_url", from_url)
+
+        async def task():
+            assert provider_limiter.get_shared_redis() is provider_limiter.get_shared_redis()
+            return "done"
+
+        # In a worker thread, as in Celery, so this test's loop stays current
+        assert await asyncio.to_thread(run_async, task()) == "done"
+        assert await asyncio.to_thread(run_async, task()) == "done"
+        assert len(clients) == 2
+        assert all(client.closed for client in clients)
+        assert len(provider_limiter._redis_clients) == 0
+
+
+class TestProviderRateLimiter:
+    """Tests for the shared token bucket client."""
+
+    @pytest.mark.asyncio
+    async def test_waits_until_token_granted(self, fake_redis, monkeypatch):
+        """acquire() sleeps for the wait the script returns, then retries."""
+        replies = iter([[25, "4.0"], [0, "4.0"]])
+        redis = fake_redis(FakeRedis({ACQUIRE_SCRIPT: lambda keys, args: next(replies)}))
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+
+        monkeypatch.setattr(provider_limiter.asyncio, "sleep", fake_sleep)
+        limiter = ProviderRateLimiter("scryfall", rate=10)
+        await limiter.acquire()
+
+        assert sleeps == [0.025]
+        assert limiter.rate == 4.0
+        assert redis.calls[0][1] == ["provider_limit:scryfall", "provider_limit:scryfall:cooldown"]
+
+    @pytest.mark.asyncio
+    async def test_observe_feeds_aimd(self, fake_redis):
+        """429s decrease with the Retry-After cooldown; successes increase below the ceiling."""
+        redis = fake_redis(FakeRedis({ADJUST_SCRIPT: lambda keys, args: "5.0"}))
+        limiter = ProviderRateLimiter("cardtrader", rate=20)
+
+        await limiter.observe(httpx.Response(429, headers={"Retry-After": "3"}))
+        assert redis.calls[-1][2][0] == "decrease"
+        assert redis.calls[-1][2][6] == 3000
+        assert limiter.rate == 5.0
+
+        await limiter.observe(httpx.Response(200))
+        assert redis.calls[-1][2][0] == "increase"
+
+        limiter.rate = limiter.max_rate
+        calls = len(redis.calls)
+        await limiter.observe(httpx.Response(200))
+        assert len(redis.calls) == calls
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_local_pacing(self, fake_redis):
+        """Without Redis, callers are spaced locally at the current rate."""
+        fake_redis(FakeRedis(error=RedisConnectionError("down")))
+        limiter = ProviderRateLimiter("mtgjson", rate=50)
+
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+        assert time.monotonic() - start >= 0.035
+
+        await limiter.record_throttled(None)
+        assert limiter.rate == 25
+
+
+class TestSharedCircuitBreaker:
+    """Tests for circuit breaker state shared through Redis."""
+
+    @pytest.mark.asyncio
+    async def test_open_state_from_another_worker_fails_fast(self, fake_redis):
+        """A circuit opened elsewhere rejects requests here."""
+        shared = ["state", "open", "failure_count", "5", "last_failure_time", str(time.time())]
+        fake_redis(FakeRedis({circuit_breaker.ENTER_SCRIPT: lambda keys, args: shared}))
+        breaker = CircuitBreaker(name="tcgplayer", shared=True)
+
+        with pytest.raises(CircuitOpenError):
+            async with breaker:
+                pass
+        assert breaker.failure_count == 5
+
+    @pytest.mark.asyncio
+    async def test_records_outcome_in_redis(self, fake_redis):
+        """Failures are counted by the shared script, not locally."""
+        redis = fake_redis(FakeRedis({
+            circuit_breaker.ENTER_SCRIPT: lambda keys, args: [],
+            circuit_breaker.RECORD_SCRIPT: lambda keys, args: ["state", "open", "failure_count", "1"],
+        }))
+        breaker = CircuitBreaker(name="topdeck", failure_threshold=1, shared=True)
+
+        with pytest.raises(ValueError):
+            async with breaker:
+                raise ValueError("boom")
+
+        assert redis.calls[-1][1] == ["circuit:topdeck"]
+        assert redis.calls[-1][2][0] == "failure"
+        assert breaker.state == CircuitState.OPEN
+
+    @pytest.mark.asyncio
+    async def test_uses_local_state_without_redis(self, fake_redis):
+        """Redis errors fall back to the in-process state machine."""
+        fake_redis(FakeRedis(error=RedisConnectionError("down")))
+        breaker = CircuitBreaker(name="tcgplayer", failure_threshold=1, shared=True)
+
+        with pytest.raises(ValueError):
+            async with breaker:
+                raise ValueError("boom")
+        assert breaker.state == CircuitState.OPEN
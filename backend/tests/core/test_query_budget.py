@@ -0,0 +1,156 @@
+"""Tests for per-request and per-task query instrumentation."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import query_budget
+from app.core.query_budget import (
+    QueryBudgetExceeded,
+    begin_query_scope,
+    end_query_scope,
+    instrument_engine,
+    normalize_statement,
+    route_scope,
+    track_queries,
+)
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine)
+    instrument_engine(engine)  # idempotent
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)"))
+        await conn.execute(text("INSERT INTO t (id, name) VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def budgets(monkeypatch):
+    def configure(budgets=None, default=None, enforce=True, repeat_threshold=10):
+        monkeypatch.setattr(query_budget.settings, "query_budgets", budgets or {})
+        monkeypatch.setattr(query_budget.settings, "query_budget_default", default)
+        monkeypatch.setattr(query_budget.settings, "query_budget_enforce", enforce)
+        monkeypatch.setattr(query_budget.settings, "query_repeat_threshold", repeat_threshold)
+    return configure
+
+
+class TestNormalizeStatement:
+    """Tests for SQL normalization."""
+
+    def test_values_and_in_lists_collapse(self):
+        a = normalize_statement("SELECT * FROM cards WHERE id IN ($1, $2, $3) AND name = 'x'")
+        b = normalize_statement("SELECT *\n  FROM cards WHERE id IN ($1) AND name = 'it''s'")
+        assert a == b == "SELECT * FROM cards WHERE id IN (?) AND name = ?"
+
+    def test_casts_are_kept(self):
+        assert normalize_statement("SELECT x::text WHERE y = :card_id") == "SELECT x::text WHERE y = ?"
+
+
+class TestTrackQueries:
+    """Tests for query attribution and budgets."""
+
+    @pytest.mark.asyncio
+    async def test_counts_queries_rows_and_repeats(self, engine, budgets):
+        budgets(enforce=False, repeat_threshold=2)
+        with track_queries("GET /api/things") as stats:
+            async with engine.connect() as conn:
+                for i in range(3):
+                    await conn.execute(text("SELECT name FROM t WHERE id = :id"), {"id": i + 1})
+                await conn.execute(text("SELECT * FROM t"))
+
+        assert stats.count == 4
+        assert stats.rows == 6
+        assert stats.db_time > 0
+        assert stats.repeated() == {"SELECT name FROM t WHERE id = ?": 3}
+
+    @pytest.mark.asyncio
+    async def test_untracked_queries_are_ignored(self, engine):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        assert query_budget.current_query_stats() is None
+
+    @pytest.mark.asyncio
+    async def test_enforced_budget_raises(self, engine, budgets):
+        budgets(budgets={"GET /api/things": 1})
+        with pytest.raises(QueryBudgetExceeded, match="ran 2 queries"):
+            with track_queries("GET /api/things"):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                    await conn.execute(text("SELECT 2"))
+
+    @pytest.mark.asyncio
+    async def test_budget_not_checked_when_block_fails(self, engine, budgets):
+        """The original error surfaces, not a budget failure."""
+        budgets(default=0)
+        with pytest.raises(ValueError):
+            with track_queries("GET /api/things"):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                raise ValueError("boom")
+
+    def test_task_scope_follows_into_asyncio_run(self, budgets):
+        """Celery tasks run in a new event loop, whose task copies the scope."""
+        budgets(enforce=False)
+
+        async def task_body():
+            engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+            instrument_engine(engine)
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            await engine.dispose()
+
+        token = begin_query_scope("task:run_analytics", kind="task")
+        # Like run_async, but leaves the test session's current loop alone
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(task_body())
+        finally:
+            loop.close()
+        stats = end_query_scope(token)
+
+        assert stats.kind == "task"
+        assert stats.count == 1
+
+
+class TestTaskBudget:
+    """Task runs are tracked and their budget enforced by the base task class."""
+
+    @staticmethod
+    def make_task(queries):
+        from celery import Celery
+
+        from app.tasks.error_handlers import TaskWithDLQ
+
+        app = Celery("test_query_budget", task_cls=TaskWithDLQ)
+
+        @app.task(name="test_querying_task")
+        def querying_task():
+            stats = query_budget.current_query_stats()
+            for _ in range(queries):
+                stats.record("SELECT 1", 0.0, 1)
+            return stats
+
+        return querying_task
+
+    def test_task_within_budget(self, budgets):
+        budgets(budgets={"task:test_querying_task": 2})
+        stats = self.make_task(2)()
+        assert (stats.kind, stats.count) == ("task", 2)
+        assert query_budget.current_query_stats() is None
+
+    def test_task_over_budget_fails(self, budgets):
+        budgets(budgets={"task:test_querying_task": 2})
+        with pytest.raises(QueryBudgetExceeded, match="ran 3 queries"):
+            self.make_task(3)()
+
+
+def test_route_scope():
+    route = SimpleNamespace(path_format="/api/cards/{card_id}")
+    assert route_scope({"method": "GET", "route": route}) == "GET /api/cards/{card_id}"
+    assert route_scope({"method": "GET"}) == query_budget.UNMATCHED_SCOPE
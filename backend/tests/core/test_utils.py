@@ -0,0 +1,27 @@
+"""Tests for shared core utilities."""
+import asyncio
+
+from app.core.utils import LoopLocalLock
+
+
+def test_loop_local_lock_survives_new_loops():
+    """A lock contended in one loop still works in the next (Celery run_async)."""
+    lock = LoopLocalLock()
+
+    async def contend():
+        order = []
+
+        async def worker(n):
+            async with lock:
+                order.append(n)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(worker(1), worker(2))
+        return order
+
+    for _ in range(2):
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(contend()) == [1, 2]
+        finally:
+            loop.close()
@@ -0,0 +1,109 @@
+"""
+Tests for read replica routing.
+
+Reads go to the replica only while its lag is known and under the
+threshold; read-only sessions refuse to flush.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import session as db_session_module
+from app.db.session import REPLICA_LAG_SQL, get_replica_db, get_replica_lag, use_replica
+from app.models import Card
+
+
+class FakeReplicaEngine:
+    """Answers the lag query with canned values, counting checks."""
+
+    def __init__(self, *lags):
+        self.lags = list(lags)
+        self.checks = 0
+
+    @asynccontextmanager
+    async def connect(self):
+        yield self
+
+    async def scalar(self, statement):
+        self.checks += 1
+        await asyncio.sleep(0)
+        lag = self.lags.pop(0)
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """Install a fake replica engine and clear the cached lag reading."""
+    def install(*lags, max_lag=30.0, interval=5.0):
+        engine = FakeReplicaEngine(*lags)
+        monkeypatch.setattr(db_session_module, "replica_engine", engine)
+        monkeypatch.setattr(db_session_module, "_replica_lag", None)
+        monkeypatch.setattr(db_session_module.settings, "database_replica_max_lag", max_lag)
+        monkeypatch.setattr(db_session_module.settings, "database_replica_lag_check_interval", interval)
+        return engine
+    return install
+
+
+@pytest.mark.asyncio
+async def test_no_replica_uses_primary(monkeypatch):
+    monkeypatch.setattr(db_session_module, "replica_engine", None)
+    assert await get_replica_lag() is None
+    assert await use_replica() is False
+
+
+@pytest.mark.asyncio
+async def test_lag_threshold(replica):
+    """A caught-up replica serves reads; a lagging one does not."""
+    replica(0.5, 120.0, interval=0)
+    assert await use_replica() is True
+    assert await use_replica() is False
+
+
+@pytest.mark.asyncio
+async def test_unknown_lag_falls_back(replica):
+    """Unreachable or not-yet-replaying replicas are not used."""
+    replica(ConnectionError("down"), None, interval=0)
+    assert await use_replica() is False
+    assert await use_replica() is False
+
+
+@pytest.mark.asyncio
+async def test_lag_reading_is_reused(replica):
+    engine = replica(1.0, 500.0, interval=60)
+    assert await get_replica_lag() == 1.0
+    assert await get_replica_lag() == 1.0
+    assert engine.checks == 1
+
+
+@pytest.mark.asyncio
+async def test_replica_session_is_read_only(monkeypatch):
+    """Writes through a get_replica_db session raise before reaching the database."""
+    monkeypatch.setattr(db_session_module, "replica_engine", None)
+    monkeypatch.setattr(db_session_module, "async_session_maker", AsyncSession)
+
+    dependency = get_replica_db()
+    session = await dependency.__anext__()
+    session.add(Card(scryfall_id="read-only-1", name="Nope", set_code="TST", collector_number="1"))
+    with pytest.raises(RuntimeError, match="Read-only session"):
+        await session.flush()
+    await dependency.aclose()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_checks_query_once(replica):
+    """Requests arriving as the reading expires share one lag check."""
+    engine = replica(1.0, 2.0, interval=60)
+    lags = await asyncio.gather(*(get_replica_lag() for _ in range(5)))
+    assert lags == [1.0] * 5
+    assert engine.checks == 1
+
+
+def test_lag_query_requires_streaming_receiver():
+    """Replayed-everything only means zero lag while the WAL receiver streams."""
+    sql = " ".join(str(REPLICA_LAG_SQL).split())
+    assert "pg_stat_wal_receiver WHERE status = 'streaming'" in sql
+    assert "pg_last_xact_replay_timestamp()" in sql
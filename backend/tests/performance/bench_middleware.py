@@ -0,0 +1,236 @@
+"""
+Benchmark per-request middleware overhead.
+
+Compares the previous BaseHTTPMiddleware stack (request ID, enumeration
+protection, Redis-pipeline rate limiting, request logging - reproduced
+here as it was) against the composed pure-ASGI EdgeMiddleware.
+
+Requests are driven straight through the ASGI interface against an
+in-memory Redis stand-in, so the numbers isolate middleware cost from
+networking. Use --redis-latency-ms to simulate a Redis round trip.
+
+Usage:
+    python -m tests.performance.bench_middleware --requests 5000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from collections import defaultdict
+
+import structlog
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+
+from app.middleware.edge import EdgeMiddleware
+from app.middleware.enumeration_protection import AccessPattern
+from app.middleware.rate_limit import RateLimitMiddleware
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio.Redis for both middleware stacks."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.round_trips = 0
+        self.counters: dict[str, int] = defaultdict(int)
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        else:
+            await asyncio.sleep(0)
+
+    def register_script(self, script):
+        async def run(keys=(), args=(), client=None):
+            await self._round_trip()
+            self.counters[keys[0]] += 1
+            return [1, self.counters[keys[0]], 0]
+        return run
+
+    def pipeline(self):
+        redis = self
+        ops = []
+
+        class Pipeline:
+            def incr(self, key):
+                ops.append(key)
+
+            def expire(self, key, seconds):
+                pass
+
+            async def execute(self):
+                await redis._round_trip()
+                redis.counters[ops[0]] += 1
+                return [redis.counters[ops[0]], True]
+
+        return Pipeline()
+
+    async def exists(self, key):
+        await self._round_trip()
+        return 0
+
+
+# ---------------------------------------------------------------------------
+# Previous implementation (BaseHTTPMiddleware), kept for comparison only
+# ---------------------------------------------------------------------------
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, redis_client, requests_per_minute=10**9):
+        super().__init__(app)
+        self.redis = redis_client
+        self.requests_per_minute = requests_per_minute
+
+    async def dispatch(self, request: Request, call_next):
+        forwarded = request.headers.get("X-Forwarded-For")
+        client_ip = forwarded.split(",")[0].strip() if forwarded else request.client.host
+        key = f"rate_limit:{client_ip}:{int(time.time() // 60)}"
+        pipe = self.redis.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, 60)
+        current = (await pipe.execute())[0]
+        if current > self.requests_per_minute:
+            return JSONResponse(status_code=429, content={})
+        return await call_next(request)
+
+
+class LegacyEnumerationMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app):
+        super().__init__(app)
+        self._patterns = defaultdict(AccessPattern)
+
+    async def dispatch(self, request: Request, call_next):
+        pattern = self._patterns[f"ip:{request.client.host}"]
+        if pattern.is_blocked():
+            return JSONResponse(status_code=429, content={})
+        response = await call_next(request)
+        if response.status_code == 404:
+            pattern.record_not_found()
+        return response
+
+
+class LegacyRequestIdMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/bench")
+    async def bench():
+        return {"status": "ok"}
+
+    @app.get("/bench/stream")
+    async def bench_stream():
+        async def chunks():
+            for _ in range(16):
+                yield b"x" * 1024
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return app
+
+
+def build_legacy(redis_client: FakeRedis) -> FastAPI:
+    app = build_app()
+    app.add_middleware(LegacyRateLimitMiddleware, redis_client=redis_client)
+    app.add_middleware(LegacyRequestIdMiddleware)
+    app.add_middleware(LegacyEnumerationMiddleware)
+
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        return await call_next(request)
+
+    return app
+
+
+def build_edge(redis_client: FakeRedis) -> FastAPI:
+    app = build_app()
+    app.add_middleware(EdgeMiddleware, requests_per_minute=10**9)
+
+    async def get_redis(self):
+        return redis_client
+
+    RateLimitMiddleware.get_redis = get_redis
+    return app
+
+
+async def _call(app, path: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("10.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+    status = 0
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # client stays connected
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(app, path: str, requests: int) -> list[float]:
+    for _ in range(min(200, requests)):  # warm up
+        await _call(app, path)
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await _call(app, path)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+async def main(requests: int, latency_ms: float) -> None:
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(30))
+
+    baseline = await measure(build_app(), "/bench", requests)
+    base_us = statistics.median(baseline)
+    print(f"{'stack':<10} {'path':<14} {'p50 us':>9} {'p99 us':>9} {'overhead':>9} {'redis/req':>10}")
+    print(f"{'none':<10} {'/bench':<14} {base_us:>9.1f} {sorted(baseline)[int(len(baseline) * 0.99)]:>9.1f} {0:>9.1f} {0:>10.2f}")
+
+    for name, builder in (("legacy", build_legacy), ("edge", build_edge)):
+        for path in ("/bench", "/bench/stream"):
+            redis_client = FakeRedis(latency_ms)
+            app = builder(redis_client)
+            timings = await measure(app, path, requests)
+            p50 = statistics.median(timings)
+            p99 = sorted(timings)[int(len(timings) * 0.99)]
+            per_req = redis_client.round_trips / (requests + min(200, requests))
+            print(f"{name:<10} {path:<14} {p50:>9.1f} {p99:>9.1f} {p50 - base_us:>9.1f} {per_req:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark middleware overhead")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--redis-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.redis_latency_ms))
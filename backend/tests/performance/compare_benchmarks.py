@@ -0,0 +1,116 @@
+"""
+Compare two pytest-benchmark JSON reports and flag regressions.
+
+Benchmarks are matched by group (dataset size) and name. A benchmark
+regresses when the chosen statistic grew by more than the threshold.
+
+Usage:
+    python -m tests.performance.compare_benchmarks baseline.json run.json \\
+        [--stat median] [--threshold 10]
+
+Prints a Markdown table (suitable for a CI summary) and exits with status 1
+if anything regressed.
+"""
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+STATS = ("min", "median", "mean", "max")
+
+
+@dataclass
+class Comparison:
+    """One benchmark in both runs."""
+
+    group: str
+    name: str
+    baseline: Optional[float]
+    current: Optional[float]
+    status: str  # "regression", "improvement", "ok", "new", "missing"
+
+    @property
+    def change_pct(self) -> Optional[float]:
+        if not self.baseline or self.current is None:
+            return None
+        return (self.current / self.baseline - 1) * 100
+
+
+def load_benchmarks(path: Path, stat: str = "median") -> dict[tuple[str, str], float]:
+    """Read {(group, name): seconds} from a pytest-benchmark JSON file."""
+    data = json.loads(Path(path).read_text())
+    return {
+        (bench.get("group") or "", bench["name"]): bench["stats"][stat]
+        for bench in data["benchmarks"]
+    }
+
+
+def compare(
+    baseline: dict[tuple[str, str], float],
+    current: dict[tuple[str, str], float],
+    threshold_pct: float = 10.0,
+) -> list[Comparison]:
+    """Compare two runs; changes within threshold_pct count as ok."""
+    comparisons = []
+    for key in sorted(baseline.keys() | current.keys()):
+        base, now = baseline.get(key), current.get(key)
+        if base is None:
+            status = "new"
+        elif now is None:
+            status = "missing"
+        elif now > base * (1 + threshold_pct / 100):
+            status = "regression"
+        elif now < base * (1 - threshold_pct / 100):
+            status = "improvement"
+        else:
+            status = "ok"
+        comparisons.append(Comparison(key[0], key[1], base, now, status))
+    return comparisons
+
+
+def format_report(comparisons: list[Comparison], stat: str, threshold_pct: float) -> str:
+    """Render comparisons as a Markdown table, regressions first."""
+    order = {"regression": 0, "improvement": 1, "new": 2, "missing": 3, "ok": 4}
+
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value * 1000:.2f}"
+
+    lines = [
+        f"Benchmark comparison ({stat}, threshold {threshold_pct:g}%)",
+        "",
+        "| group | benchmark | baseline ms | current ms | change | status |",
+        "|---|---|---:|---:|---:|---|",
+    ]
+    for c in sorted(comparisons, key=lambda c: (order[c.status], c.group, c.name)):
+        change = "-" if c.change_pct is None else f"{c.change_pct:+.1f}%"
+        lines.append(
+            f"| {c.group} | {c.name} | {ms(c.baseline)} | {ms(c.current)} | {change} | {c.status} |"
+        )
+
+    regressions = sum(c.status == "regression" for c in comparisons)
+    lines.append("")
+    lines.append(f"{regressions} regression(s) in {len(comparisons)} benchmark(s)")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare pytest-benchmark runs")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--stat", choices=STATS, default="median")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent")
+    args = parser.parse_args(argv)
+
+    comparisons = compare(
+        load_benchmarks(args.baseline, args.stat),
+        load_benchmarks(args.current, args.stat),
+        args.threshold,
+    )
+    print(format_report(comparisons, args.stat, args.threshold))
+    return 1 if any(c.status == "regression" for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
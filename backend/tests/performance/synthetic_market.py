@@ -0,0 +1,179 @@
+"""
+Deterministic synthetic market dataset for benchmarks.
+
+Builds N cards x M days x K marketplaces of daily price snapshots (plus a
+foil series for rares and mythics) using the random walk from
+app.scripts.generate_demo_price_history, along with one user holding an
+inventory and synthetic card embeddings for the vector index.
+
+The same scale and seed always produce the same rows, so benchmark runs
+on different commits measure the same work.
+
+Scale is read from the environment:
+    BENCH_CARDS          cards (default 1000)
+    BENCH_DAYS           days of history (default 90)
+    BENCH_MARKETPLACES   marketplaces (default 4)
+    BENCH_SEED           random seed (default 42)
+"""
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Card, InventoryItem, Marketplace, User
+from app.scripts.generate_demo_price_history import synthesize_price_history
+from app.services.ingestion.bulk_ops import batch_upsert_snapshots
+
+RARITIES = ("common", "common", "common", "uncommon", "uncommon", "rare", "mythic")
+COLORS = ("W", "U", "B", "R", "G")
+TYPE_LINES = ("Creature — Elf", "Instant", "Sorcery", "Artifact", "Enchantment", "Land")
+MARKETPLACE_CURRENCIES = ("USD", "USD", "EUR", "USD")
+
+# Share of cards held in the benchmark user's inventory
+INVENTORY_SHARE = 0.2
+
+INSERT_BATCH_ROWS = 5000
+
+
+@dataclass(frozen=True)
+class MarketScale:
+    """Size of the synthetic market."""
+
+    cards: int = 1000
+    days: int = 90
+    marketplaces: int = 4
+    seed: int = 42
+
+    @classmethod
+    def from_env(cls) -> "MarketScale":
+        return cls(
+            cards=int(os.getenv("BENCH_CARDS", cls.cards)),
+            days=int(os.getenv("BENCH_DAYS", cls.days)),
+            marketplaces=int(os.getenv("BENCH_MARKETPLACES", cls.marketplaces)),
+            seed=int(os.getenv("BENCH_SEED", cls.seed)),
+        )
+
+    @property
+    def label(self) -> str:
+        return f"{self.cards}c-{self.days}d-{self.marketplaces}m"
+
+
+def synthetic_cards(scale: MarketScale) -> list[dict[str, Any]]:
+    """Card column values for the synthetic catalog."""
+    rng = np.random.default_rng(scale.seed)
+    rarities = rng.integers(0, len(RARITIES), scale.cards)
+    colors = rng.integers(0, len(COLORS), scale.cards)
+    types = rng.integers(0, len(TYPE_LINES), scale.cards)
+    cmcs = rng.integers(0, 8, scale.cards)
+
+    return [
+        {
+            "scryfall_id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"bench-card-{scale.seed}-{i}")),
+            "name": f"Bench Card {i}",
+            "set_code": f"B{i % 50:02d}",
+            "collector_number": str(i),
+            "rarity": RARITIES[rarities[i]],
+            "colors": f'["{COLORS[colors[i]]}"]',
+            "type_line": TYPE_LINES[types[i]],
+            "cmc": float(cmcs[i]),
+        }
+        for i in range(scale.cards)
+    ]
+
+
+def history_end() -> datetime:
+    """
+    Newest snapshot time: the start of the current UTC day.
+
+    Market queries look back from now, so history must end today; prices
+    depend only on the seed, not on the date.
+    """
+    return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def synthetic_snapshots(
+    scale: MarketScale,
+    cards: list[tuple[int, str]],
+    marketplaces: list[tuple[int, str]],
+) -> Iterator[dict[str, Any]]:
+    """Price snapshot rows for the synthetic catalog."""
+    return synthesize_price_history(
+        cards, marketplaces, scale.days, seed=scale.seed, end=history_end()
+    )
+
+
+def synthetic_vector_rows(scale: MarketScale, dim: int = 384) -> list[SimpleNamespace]:
+    """Rows in the shape CardVectorIndex.from_rows expects."""
+    rng = np.random.default_rng(scale.seed)
+    cards = synthetic_cards(scale)
+    vectors = rng.standard_normal((scale.cards, dim), dtype=np.float32)
+    return [
+        SimpleNamespace(
+            card_id=i + 1,
+            feature_vector=vectors[i].tobytes(),
+            color_mask=1 << COLORS.index(card["colors"][2]),
+            legal_formats=int(rng.integers(0, 1 << 10)),
+            rarity=card["rarity"],
+            cmc=card["cmc"],
+            type_line=card["type_line"],
+        )
+        for i, card in enumerate(cards)
+    ]
+
+
+async def load_synthetic_market(db: AsyncSession, scale: MarketScale) -> dict[str, Any]:
+    """
+    Insert the synthetic market into an empty database.
+
+    Returns:
+        dict with cards as (card_id, rarity), marketplaces as
+        (marketplace_id, currency), card_ids, user_id and snapshot count
+    """
+    marketplaces = [
+        Marketplace(
+            name=f"Bench Market {i}",
+            slug=f"bench-{i}",
+            base_url=f"https://bench-{i}.example.com",
+            default_currency=MARKETPLACE_CURRENCIES[i % len(MARKETPLACE_CURRENCIES)],
+        )
+        for i in range(scale.marketplaces)
+    ]
+    cards = [Card(**values) for values in synthetic_cards(scale)]
+    user = User(email="bench@example.com", username="bench", hashed_password="x")
+    db.add_all([*marketplaces, *cards, user])
+    await db.flush()
+
+    rng = np.random.default_rng(scale.seed)
+    held = rng.choice(len(cards), int(len(cards) * INVENTORY_SHARE), replace=False)
+    db.add_all([
+        InventoryItem(user_id=user.id, card_id=cards[i].id, quantity=int(rng.integers(1, 5)))
+        for i in sorted(held)
+    ])
+    await db.commit()
+
+    card_keys = [(card.id, card.rarity) for card in cards]
+    marketplace_keys = [(m.id, m.default_currency) for m in marketplaces]
+
+    snapshots = 0
+    batch: list[dict[str, Any]] = []
+    rows = synthetic_snapshots(scale, card_keys, marketplace_keys)
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH_ROWS:
+            snapshots += (await batch_upsert_snapshots(db, batch, evaluate_alerts=False))["inserted"]
+            batch = []
+    if batch:
+        snapshots += (await batch_upsert_snapshots(db, batch, evaluate_alerts=False))["inserted"]
+
+    return {
+        "cards": card_keys,
+        "marketplaces": marketplace_keys,
+        "card_ids": [card.id for card in cards],
+        "user_id": user.id,
+        "snapshots": snapshots,
+    }
@@ -0,0 +1,72 @@
+"""Tests for the synthetic market generator and benchmark comparison."""
+import json
+from datetime import datetime, timezone
+
+from app.scripts.generate_demo_price_history import synthesize_price_history
+from app.services.search.vector_index import CardVectorIndex
+from tests.performance.compare_benchmarks import compare, format_report, load_benchmarks, main
+from tests.performance.synthetic_market import MarketScale, synthetic_cards, synthetic_vector_rows
+
+END = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class TestSyntheticMarket:
+    """Tests for the deterministic dataset."""
+
+    def test_history_is_deterministic_per_card(self):
+        """A card's series does not depend on the other cards generated."""
+        marketplaces = [(1, "USD"), (2, "EUR")]
+        both = list(synthesize_price_history([(1, "common"), (2, "rare")], marketplaces, 5, seed=7, end=END))
+        alone = list(synthesize_price_history([(2, "rare")], marketplaces, 5, seed=7, end=END))
+
+        assert [r for r in both if r["card_id"] == 2] == alone
+
+    def test_history_shape(self):
+        """Cards x (days + 1) x marketplaces rows, plus foils for rares."""
+        rows = list(synthesize_price_history([(1, "common"), (2, "mythic")], [(1, "USD")], 9, end=END))
+
+        assert len(rows) == 10 + 10 * 2
+        assert max(r["time"] for r in rows) == END
+        assert all(r["price_low"] <= r["price"] <= r["price_high"] for r in rows)
+
+    def test_catalog_and_embeddings_repeat(self):
+        scale = MarketScale(cards=50, seed=3)
+        assert synthetic_cards(scale) == synthetic_cards(scale)
+
+        index = CardVectorIndex.from_rows(synthetic_vector_rows(scale, dim=16), 16)
+        assert len(index) == 50
+
+
+class TestCompareBenchmarks:
+    """Tests for the regression report."""
+
+    @staticmethod
+    def write_run(path, medians):
+        path.write_text(json.dumps({"benchmarks": [
+            {"group": "1000c-90d-4m", "name": name, "stats": {"median": value}}
+            for name, value in medians.items()
+        ]}))
+        return path
+
+    def test_classifies_changes(self):
+        base = {("g", "fast"): 1.0, ("g", "slow"): 1.0, ("g", "same"): 1.0, ("g", "gone"): 1.0}
+        now = {("g", "fast"): 0.5, ("g", "slow"): 1.2, ("g", "same"): 1.05, ("g", "added"): 1.0}
+
+        status = {c.name: c.status for c in compare(base, now, threshold_pct=10)}
+
+        assert status == {
+            "fast": "improvement", "slow": "regression", "same": "ok",
+            "gone": "missing", "added": "new",
+        }
+
+    def test_report_and_exit_status(self, tmp_path, capsys):
+        baseline = self.write_run(tmp_path / "base.json", {"upsert": 0.010, "search": 0.002})
+        current = self.write_run(tmp_path / "run.json", {"upsert": 0.015, "search": 0.002})
+
+        assert main([str(baseline), str(current)]) == 1
+        out = capsys.readouterr().out
+        assert "| 1000c-90d-4m | upsert | 10.00 | 15.00 | +50.0% | regression |" in out
+        assert main([str(baseline), str(baseline)]) == 0
+
+        report = format_report(compare(load_benchmarks(baseline), load_benchmarks(baseline)), "median", 10)
+        assert "0 regression(s) in 2 benchmark(s)" in report
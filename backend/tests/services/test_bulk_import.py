@@ -318,3 +318,41 @@ class TestBulkPriceImporter:
         snapshots = importer._create_snapshots(parsed, now, tcgplayer_id=1, cardmarket_id=2)
 
         assert len(snapshots) == 0
+
+    @pytest.mark.asyncio
+    async def test_insert_snapshots_copies_records_for_known_cards(self, importer, monkeypatch):
+        """Snapshots are COPYed with their card ids; unknown cards are dropped."""
+        from datetime import datetime, timezone
+        from decimal import Decimal
+        from types import SimpleNamespace
+
+        from app.services.ingestion import bulk_ops
+
+        copied = []
+
+        async def copy_snapshots(db, records, job):
+            copied.append((list(records), job))
+            return len(records)
+
+        monkeypatch.setattr(bulk_ops, "copy_snapshots", copy_snapshots)
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=[SimpleNamespace(id=7, scryfall_id="abc-123")])
+
+        now = datetime.now(timezone.utc)
+        snapshots = importer._create_snapshots(
+            {"scryfall_id": "abc-123", "usd": 10.00, "usd_foil": 25.00},
+            now, tcgplayer_id=1, cardmarket_id=2,
+        ) + importer._create_snapshots(
+            {"scryfall_id": "unknown", "usd": 3.00}, now, tcgplayer_id=1, cardmarket_id=2,
+        )
+
+        await importer._insert_snapshots(db, snapshots)
+
+        (records, job), = copied
+        assert job == "scryfall_bulk_import"
+        assert [(r.card_id, r.is_foil, r.price) for r in records] == [
+            (7, False, Decimal("10.0")),
+            (7, True, Decimal("25.0")),
+        ]
+        assert all(r.time == now and r.language == "English" for r in records)
+        db.add.assert_not_called()
@@ -0,0 +1,299 @@
+"""Tests for the COPY-based snapshot writer."""
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.constants import CardCondition, CardLanguage
+from app.services.ingestion import bulk_ops
+from app.services.ingestion.base import PriceData
+from app.services.ingestion.bulk_ops import (
+    COPY_COLUMNS,
+    SnapshotRecord,
+    batch_upsert_snapshots,
+    bulk_copy_snapshots,
+    copy_snapshots,
+    prepare_copy_record,
+    to_copy_record,
+)
+from app.tasks.utils import CollectedPriceData
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeConnection:
+    """Records what an asyncpg connection would be asked to do."""
+
+    def __init__(self):
+        self.statements = []
+        self.copies = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, sql):
+        self.statements.append(" ".join(sql.split()))
+        if sql.lstrip().startswith("INSERT"):
+            return f"INSERT 0 {len(self.copies[-1])}"
+        return "OK"
+
+    async def copy_records_to_table(self, table, records, columns):
+        assert table == "snapshot_staging"
+        assert columns == COPY_COLUMNS
+        self.copies.append(list(records))
+
+
+class FakeSession:
+    def __init__(self):
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+
+class TransactionalConnection:
+    """
+    An asyncpg connection with its transaction semantics.
+
+    transaction() outside a transaction begins and commits its own; inside
+    one it is a savepoint. Merged rows become visible on commit only.
+    """
+
+    def __init__(self):
+        self.committed = []
+        self.pending = None
+        self.staging = []
+
+    def is_in_transaction(self):
+        return self.pending is not None
+
+    @asynccontextmanager
+    async def transaction(self):
+        if self.pending is None:
+            self.pending = []
+            try:
+                yield
+                self.committed.extend(self.pending)
+            finally:
+                self.pending = None
+        else:
+            mark = len(self.pending)
+            try:
+                yield
+            except BaseException:
+                del self.pending[mark:]
+                raise
+
+    async def execute(self, sql):
+        if sql.lstrip().startswith("INSERT"):
+            self.pending.extend(self.staging)
+        elif sql.lstrip().startswith("TRUNCATE"):
+            self.staging = []
+        return f"INSERT 0 {len(self.staging)}"
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.staging.extend(records)
+
+
+class TransactionalSession:
+    """
+    AsyncSession over a TransactionalConnection.
+
+    Like SQLAlchemy's asyncpg adapter, the driver transaction begins with
+    the first statement executed through the session's connection.
+    """
+
+    def __init__(self):
+        self.raw = TransactionalConnection()
+
+    async def connection(self):
+        return self
+
+    async def execute(self, statement):
+        if self.raw.pending is None:
+            self.raw.pending = []
+
+    async def get_raw_connection(self):
+        return SimpleNamespace(driver_connection=self.raw)
+
+    async def commit(self):
+        if self.raw.pending is not None:
+            self.raw.committed.extend(self.raw.pending)
+        self.raw.pending = None
+
+    async def rollback(self):
+        self.raw.pending = None
+
+
+class TestToCopyRecord:
+    """Tests for converting snapshots to COPY records."""
+
+    def test_all_input_forms_match(self):
+        expected = prepare_copy_record(
+            card_id=1, marketplace_id=2, price=1.5, time=NOW, price_low=1, source="api",
+        )
+        from_dict = {
+            "card_id": 1, "marketplace_id": 2, "price": 1.5, "time": NOW, "price_low": 1,
+        }
+        from_price_data = PriceData(
+            card_id=1, marketplace_id=2, price=1.5, currency="USD", time=NOW, price_low=1,
+            condition=CardCondition.NEAR_MINT, language=CardLanguage.ENGLISH,
+        )
+        from_collected = CollectedPriceData(
+            card_id=1, marketplace_id=2, price=Decimal("1.50"), time=NOW, price_low=Decimal("1"),
+        )
+
+        for snapshot in (from_dict, from_price_data, from_collected, tuple(expected)):
+            assert to_copy_record(snapshot) == expected
+
+    def test_defaults_and_enum_values(self):
+        record = to_copy_record(
+            {"card_id": 1, "marketplace_id": 2, "price": None, "condition": CardCondition.LIGHTLY_PLAYED},
+            source="scryfall",
+        )
+        assert record.condition == CardCondition.LIGHTLY_PLAYED.value
+        assert record.language == CardLanguage.ENGLISH.value
+        assert record.price == Decimal("0")
+        assert record.source == "scryfall"
+        assert record.time is not None
+
+
+class TestBulkCopySnapshots:
+    """Tests for the COPY + merge statement sequence."""
+
+    @pytest.mark.asyncio
+    async def test_copies_merges_and_clears_staging(self):
+        conn = FakeConnection()
+        records = [prepare_copy_record(card_id=i, marketplace_id=1, price=1, time=NOW) for i in range(3)]
+
+        assert await bulk_copy_snapshots(conn, records) == 3
+
+        create, merge, clear = conn.statements
+        assert "CREATE TEMP TABLE IF NOT EXISTS snapshot_staging" in create
+        assert "SELECT DISTINCT ON" in merge and "DO UPDATE SET" in merge
+        assert clear == "TRUNCATE snapshot_staging"
+        assert conn.copies == [records]
+
+    @pytest.mark.asyncio
+    async def test_keep_existing(self):
+        conn = FakeConnection()
+        await bulk_copy_snapshots(conn, [prepare_copy_record(1, 1, 1)], update_existing=False)
+        assert "DO NOTHING" in conn.statements[1]
+
+    @pytest.mark.asyncio
+    async def test_empty_is_noop(self):
+        conn = FakeConnection()
+        assert await bulk_copy_snapshots(conn, []) == 0
+        assert conn.statements == []
+
+
+class TestBatchUpsertSnapshots:
+    """Tests for the session-based writer used by ingestion tasks."""
+
+    @pytest.mark.asyncio
+    async def test_batches_watermark_and_alerts(self, monkeypatch):
+        conn = FakeConnection()
+        watermarks, alerted = [], []
+
+        async def driver_connection(db):
+            return conn
+
+        async def record_watermark(db, name, rows, latest_data_at=None, job=None):
+            watermarks.append((name, rows, latest_data_at, job))
+
+        async def evaluate_alerts(db, snapshots, redis=None):
+            alerted.extend(snapshots)
+            return 1
+
+        monkeypatch.setattr(bulk_ops, "_driver_connection", driver_connection)
+        monkeypatch.setattr(bulk_ops, "record_watermark", record_watermark)
+        monkeypatch.setattr(bulk_ops, "evaluate_want_list_alerts", evaluate_alerts)
+
+        snapshots = [
+            {"card_id": 1, "marketplace_id": 1, "price": 2, "time": NOW},
+            PriceData(card_id=2, marketplace_id=1, price=3, currency="USD", time=NOW),
+            prepare_copy_record(card_id=3, marketplace_id=1, price=4, time=NOW),
+        ]
+        db = FakeSession()
+
+        stats = await batch_upsert_snapshots(db, snapshots, batch_size=2, job="test_job")
+
+        assert stats == {"inserted": 3, "batches": 2, "alerts_created": 1}
+        assert [len(batch) for batch in conn.copies] == [2, 1]
+        assert watermarks == [(bulk_ops.PRICE_SNAPSHOTS_WATERMARK, 3, NOW, "test_job")]
+        assert all(isinstance(r, SnapshotRecord) for r in alerted)
+        assert db.commits == 2
+
+    @pytest.mark.asyncio
+    async def test_empty(self):
+        assert await batch_upsert_snapshots(FakeSession(), []) == {
+            "inserted": 0, "batches": 0, "alerts_created": 0,
+        }
+
+
+class TestBatchUpsertSnapshotsSafe:
+    """Tests for the per-batch committing writer."""
+
+    @pytest.mark.asyncio
+    async def test_watermark_covers_committed_batches_only(self, monkeypatch):
+        earlier = datetime(2025, 6, 1, tzinfo=timezone.utc)
+        watermarks = []
+        copies = []
+
+        async def driver_connection(db):
+            return None
+
+        async def bulk_copy(connection, batch, job=None, **kwargs):
+            if any(r.time == NOW for r in batch):
+                raise RuntimeError("copy failed")
+            copies.append(batch)
+
+        async def record_watermark(db, name, rows, latest_data_at=None, job=None):
+            watermarks.append((name, rows, latest_data_at, job))
+
+        async def rollback():
+            pass
+
+        monkeypatch.setattr(bulk_ops, "_driver_connection", driver_connection)
+        monkeypatch.setattr(bulk_ops, "bulk_copy_snapshots", bulk_copy)
+        monkeypatch.setattr(bulk_ops, "record_watermark", record_watermark)
+        db = FakeSession()
+        db.rollback = rollback
+
+        snapshots = [
+            prepare_copy_record(card_id=1, marketplace_id=1, price=1, time=earlier),
+            prepare_copy_record(card_id=2, marketplace_id=1, price=1, time=NOW),
+        ]
+        stats = await bulk_ops.batch_upsert_snapshots_safe(db, snapshots, batch_size=1, job="test_job")
+
+        assert stats == {"inserted": 1, "errors": 1, "batches": 1}
+        # The failed batch's newer data does not advance the watermark
+        assert watermarks == [(bulk_ops.PRICE_SNAPSHOTS_WATERMARK, 1, earlier, "test_job")]
+
+
+class TestSessionTransaction:
+    """COPY through a session commits and rolls back with the session."""
+
+    RECORDS = [prepare_copy_record(card_id=i, marketplace_id=1, price=1, time=NOW) for i in range(3)]
+
+    @pytest.mark.asyncio
+    async def test_rollback_discards_copied_rows(self):
+        db = TransactionalSession()
+
+        assert await copy_snapshots(db, self.RECORDS, batch_size=2) == 3
+        await db.rollback()
+
+        assert db.raw.committed == []
+
+    @pytest.mark.asyncio
+    async def test_commit_keeps_copied_rows(self):
+        db = TransactionalSession()
+
+        assert await copy_snapshots(db, self.RECORDS, batch_size=2) == 3
+        assert db.raw.committed == []
+        await db.commit()
+
+        assert db.raw.committed == self.RECORDS
@@ -0,0 +1,118 @@
+"""Tests for single-flight card refresh."""
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.card_refresh import CardRefreshService, is_fresh, refresh_lock_key
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio.Redis for the refresh lock."""
+
+    def __init__(self):
+        self.values = {}
+        self.published = []
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def eval(self, script, numkeys, key, value):
+        if self.values.get(key) == value:
+            del self.values[key]
+            return 1
+        return 0
+
+    async def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+        return 1
+
+
+class TestIsFresh:
+    """Test the freshness threshold."""
+
+    def test_thresholds(self):
+        now = datetime(2026, 1, 19, 12, tzinfo=timezone.utc)
+        assert is_fresh(now - timedelta(minutes=30), timedelta(hours=1), now=now)
+        assert not is_fresh(now - timedelta(hours=2), timedelta(hours=1), now=now)
+        assert not is_fresh(None)
+
+    def test_naive_timestamps_are_utc(self):
+        now = datetime(2026, 1, 19, 12, tzinfo=timezone.utc)
+        assert is_fresh(datetime(2026, 1, 19, 11, 30), timedelta(hours=1), now=now)
+
+
+class TestCardRefreshService:
+    """Test lock handling and completion messages."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_refresh(self):
+        redis = FakeRedis()
+        release = asyncio.Event()
+        calls = []
+
+        async def refresh(card_id, force):
+            calls.append((card_id, force))
+            await release.wait()
+
+        service = CardRefreshService(redis, refresh)
+        first = await service.request(5)
+        second = await service.request(5)
+
+        assert first.status == "started" and first.job_id
+        assert second.status == "in_progress" and second.job_id == first.job_id
+
+        release.set()
+        await asyncio.sleep(0.01)
+
+        assert calls == [(5, False)]
+        assert refresh_lock_key(5) not in redis.values
+        assert redis.published == [(
+            "channel:card:5",
+            {"type": "card_refresh", "card_id": 5, "job_id": first.job_id, "status": "completed"},
+        )]
+
+    @pytest.mark.asyncio
+    async def test_fresh_data_skips_refresh(self):
+        redis = FakeRedis()
+
+        async def refresh(card_id, force):
+            raise AssertionError("should not refresh")
+
+        job = await CardRefreshService(redis, refresh).request(5, last_updated=datetime.now(timezone.utc))
+        assert job.status == "fresh" and not job.requested and job.job_id is None
+        assert redis.values == {}
+
+    @pytest.mark.asyncio
+    async def test_force_refreshes_fresh_data(self):
+        redis = FakeRedis()
+        calls = []
+
+        async def refresh(card_id, force):
+            calls.append(force)
+
+        job = await CardRefreshService(redis, refresh).request(5, last_updated=datetime.now(timezone.utc), force=True)
+        await asyncio.sleep(0.01)
+        assert job.status == "started"
+        assert calls == [True]
+
+    @pytest.mark.asyncio
+    async def test_failure_is_published_and_releases_lock(self):
+        redis = FakeRedis()
+
+        async def refresh(card_id, force):
+            raise RuntimeError("scryfall down")
+
+        job = await CardRefreshService(redis, refresh).request(5)
+        await asyncio.sleep(0.01)
+
+        assert redis.published[0][1]["status"] == "failed"
+        assert redis.published[0][1]["job_id"] == job.job_id
+        assert refresh_lock_key(5) not in redis.values
@@ -0,0 +1,40 @@
+"""Tests for offline postal-code geocoding."""
+import pytest
+
+from app.services.geocoding import (
+    geocode_postal_code,
+    normalize_postal_code,
+)
+
+
+class TestNormalizePostalCode:
+    """Test postal code normalization."""
+
+    def test_plain_zip(self):
+        assert normalize_postal_code("02139") == "02139"
+
+    def test_zip_plus_four(self):
+        assert normalize_postal_code("02139-4307") == "02139"
+
+    def test_malformed(self):
+        assert normalize_postal_code("ABC") is None
+        assert normalize_postal_code("") is None
+
+    def test_unsupported_country(self):
+        assert normalize_postal_code("M3M 2G1", "CA") is None
+
+
+class TestGeocodePostalCode:
+    """Test postal code lookup against the bundled table."""
+
+    def test_known_zip(self):
+        coords = geocode_postal_code("98107")
+        assert coords is not None
+        lat, lng = coords
+        # Ballard, Seattle
+        assert lat == pytest.approx(47.67, abs=0.1)
+        assert lng == pytest.approx(-122.38, abs=0.1)
+
+    def test_unknown_zip(self):
+        assert geocode_postal_code("00000") is None
+
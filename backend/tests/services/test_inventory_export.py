@@ -0,0 +1,87 @@
+"""Tests for streaming inventory export."""
+import csv
+import gzip
+import io
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.inventory_export import EXPORT_FORMATS, iter_export_chunks
+
+
+def _row(name="Lightning Bolt", set_code="LEA", quantity=2, condition="NEAR_MINT",
+         is_foil=False, language="English", acquisition_price=None, current_value=None):
+    return SimpleNamespace(
+        name=name,
+        set_code=set_code,
+        quantity=quantity,
+        condition=condition,
+        is_foil=is_foil,
+        language=language,
+        acquisition_price=acquisition_price,
+        current_value=current_value,
+    )
+
+
+async def _aiter(rows):
+    for row in rows:
+        yield row
+
+
+async def _collect(rows, fmt, **kwargs) -> list[bytes]:
+    return [chunk async for chunk in iter_export_chunks(_aiter(rows), EXPORT_FORMATS[fmt], **kwargs)]
+
+
+class TestIterExportChunks:
+    """Test chunked export formatting."""
+
+    @pytest.mark.asyncio
+    async def test_csv_header_is_first_chunk(self):
+        chunks = await _collect([_row()], "csv")
+        assert chunks[0].decode().startswith("Card Name,Set,Quantity")
+        assert len(chunks) == 2
+
+    @pytest.mark.asyncio
+    async def test_csv_profit_loss(self):
+        rows = [_row(acquisition_price=Decimal("1.00"), current_value=Decimal("3.50"))]
+        chunks = await _collect(rows, "csv")
+        parsed = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+        assert parsed[1] == ["Lightning Bolt", "LEA", "2", "NEAR_MINT", "No", "English", "1.00", "3.50", "5.0"]
+
+    @pytest.mark.asyncio
+    async def test_cardtrader_format(self):
+        rows = [_row(is_foil=True, condition="LIGHTLY_PLAYED", acquisition_price=Decimal("1.25"))]
+        chunks = await _collect(rows, "cardtrader")
+        parsed = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+        assert parsed[0][0] == "name"
+        assert parsed[1] == ["Lightning Bolt", "LEA", "2", "English", "Lightly Played", "true", "125"]
+
+    @pytest.mark.asyncio
+    async def test_txt_format(self):
+        rows = [_row(), _row(name="Counterspell", quantity=1, is_foil=True)]
+        chunks = await _collect(rows, "txt")
+        assert b"".join(chunks).decode() == (
+            "2x Lightning Bolt [LEA] NEAR_MINT\n1x Counterspell [LEA] FOIL NEAR_MINT"
+        )
+
+    @pytest.mark.asyncio
+    async def test_chunks_by_row_count(self):
+        rows = [_row(name=f"Card {i}") for i in range(25)]
+        chunks = await _collect(rows, "csv", chunk_rows=10)
+        # header + 10 + 10 + 5
+        assert len(chunks) == 4
+        assert b"".join(chunks).decode().count("\n") == 26
+
+    @pytest.mark.asyncio
+    async def test_gzip_stream(self):
+        rows = [_row(name=f"Card {i}") for i in range(25)]
+        plain = b"".join(await _collect(rows, "csv", chunk_rows=10))
+        compressed = b"".join(await _collect(rows, "csv", chunk_rows=10, compress=True))
+        assert gzip.decompress(compressed) == plain
+
+    @pytest.mark.asyncio
+    async def test_empty_inventory(self):
+        assert await _collect([], "txt") == []
+        chunks = await _collect([], "csv")
+        assert len(chunks) == 1  # header only
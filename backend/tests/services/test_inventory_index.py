@@ -0,0 +1,342 @@
+"""Tests for the precomputed inventory index series."""
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import inventory_index
+from app.services.inventory_index import (
+    INTRADAY_BUCKETS,
+    PRICE_MODES,
+    build_index_points,
+    bucket_minutes_for_span,
+    inventory_fingerprint,
+    load_inventory_index,
+    pack,
+    price_mode,
+    sum_by_bucket,
+    unpack_daily,
+    unpack_intraday,
+    weighted_sums,
+)
+
+
+class TestWeightedSums:
+    """Test per-user quantity weighting."""
+
+    def test_sums_per_segment(self):
+        prices = np.array([[10.0], [20.0], [5.0]])
+        quantities = np.array([1, 3, 2])
+        result = weighted_sums(prices, quantities, np.array([0, 2]))
+        # user 0: 1*10 + 3*20 over 4 cards; user 1: 2*5 over 2 cards
+        assert result.shape == (2, 1, 2)
+        assert result[0, 0].tolist() == [70.0, 4.0]
+        assert result[1, 0].tolist() == [10.0, 2.0]
+
+    def test_unpriced_rows_are_excluded(self):
+        prices = np.array([[10.0, np.nan], [np.nan, 4.0]])
+        quantities = np.array([2, 5])
+        result = weighted_sums(prices, quantities, np.array([0]))
+        assert result[0, 0].tolist() == [20.0, 2.0]
+        assert result[0, 1].tolist() == [20.0, 5.0]
+
+
+class TestSumByBucket:
+    """Test totalling per-card rows by bucket."""
+
+    def test_sums_rows_sharing_a_bucket(self):
+        timestamps = np.array([3600, 0, 3600])
+        values = np.array([10.0, 30.0, 8.0])
+        quantities = np.array([1.0, 1.0, 2.0])
+        buckets, bucket_values, bucket_quantities = sum_by_bucket(timestamps, values, quantities)
+        assert buckets.tolist() == [0, 3600]
+        assert bucket_values.tolist() == [30.0, 18.0]
+        assert bucket_quantities.tolist() == [1.0, 3.0]
+
+
+class TestBuildIndexPoints:
+    """Test normalization to base 100."""
+
+    def test_normalizes_to_first_point(self):
+        points = build_index_points(
+            np.array([0, 86400]), np.array([20.0, 30.0]), np.array([2.0, 2.0])
+        )
+        assert points == [
+            {"timestamp": "1970-01-01T00:00:00+00:00", "indexValue": 100.0},
+            {"timestamp": "1970-01-02T00:00:00+00:00", "indexValue": 150.0},
+        ]
+
+    def test_skips_empty_buckets_and_caps(self):
+        points = build_index_points(
+            np.array([0, 1800, 3600]), np.array([0.0, 1.0, 5000.0]), np.array([0.0, 1.0, 1.0])
+        )
+        assert [p["indexValue"] for p in points] == [100.0, 1000.0]
+
+    def test_no_priced_buckets(self):
+        assert build_index_points(np.array([0]), np.array([0.0]), np.array([0.0])) == []
+
+
+class TestPacking:
+    """Test compact storage round trip."""
+
+    def test_round_trip(self):
+        intraday = np.arange(INTRADAY_BUCKETS * PRICE_MODES * 2, dtype=np.float64)
+        intraday = intraday.reshape(INTRADAY_BUCKETS, PRICE_MODES, 2)
+        data = pack(intraday)
+        assert len(data) == 78 * PRICE_MODES * 2 * 4
+        assert np.array_equal(unpack_intraday(data), intraday[:48])
+        assert np.array_equal(unpack_intraday(data, 60), intraday[48:72])
+        assert np.array_equal(unpack_intraday(data, 240), intraday[72:])
+        assert np.array_equal(unpack_daily(pack(intraday[0])), intraday[0])
+
+
+def test_inventory_fingerprint():
+    inventory = np.array([[10, 1], [20, 2]])
+    assert inventory_fingerprint(inventory) == inventory_fingerprint(inventory.tolist())
+    assert inventory_fingerprint(inventory) != inventory_fingerprint(np.array([[10, 1], [20, 3]]))
+    assert inventory_fingerprint(inventory) != inventory_fingerprint(np.array([[10, 1]]))
+
+
+def test_price_mode():
+    assert [price_mode(None), price_mode(True), price_mode(False)] == [0, 1, 2]
+
+
+def test_bucket_minutes_for_span():
+    assert bucket_minutes_for_span(timedelta(days=3)) == 30
+    assert bucket_minutes_for_span(timedelta(days=20)) == 60
+    assert bucket_minutes_for_span(timedelta(days=60)) == 240
+    assert bucket_minutes_for_span(timedelta(days=900)) == 1440
+
+
+def test_user_batches_respect_user_boundaries(monkeypatch):
+    monkeypatch.setattr(inventory_index, "ROWS_PER_BATCH", 3)
+    starts = np.array([0, 2, 4, 5, 9])
+    assert list(inventory_index._user_batches(starts, 10)) == [(0, 2), (2, 4), (4, 5)]
+
+
+class FakeIndexSession:
+    """Serves the refresh queries from in-memory prices and inventory."""
+
+    def __init__(self, price_rows, inventory):
+        self.price_rows = price_rows
+        self.inventory = inventory  # (user_id, card_id, quantity)
+        self.inventory_ranges = []
+        self.upserts = []
+
+    async def execute(self, stmt):
+        sql = str(stmt)
+        if sql.startswith("INSERT"):
+            self.upserts.append(stmt.compile().params)
+            return None
+        if sql.startswith("DELETE"):
+            return None
+        if "price_snapshots" in sql:
+            rows = self.price_rows
+        elif "count(DISTINCT" in sql:
+            users = sorted({user for user, _, _ in self.inventory})
+            rows = [
+                (user, len({card for u, card, _ in self.inventory if u == user}))
+                for user in users
+            ]
+        else:
+            low, high = stmt.compile().params.values()
+            self.inventory_ranges.append((low, high))
+            rows = sorted(row for row in self.inventory if low <= row[0] <= high)
+        return SimpleNamespace(all=lambda: rows)
+
+
+@pytest.mark.asyncio
+async def test_refresh_day_loads_inventory_per_user_batch(monkeypatch):
+    """Users are loaded in batches; unpriced cards and users are skipped."""
+    monkeypatch.setattr(inventory_index, "ROWS_PER_BATCH", 2)
+    day = date(2026, 1, 10)
+    epoch = int(datetime(2026, 1, 10, tzinfo=timezone.utc).timestamp())
+    latest = datetime(2026, 1, 10, 1, tzinfo=timezone.utc)
+
+    def price(card_id, value):
+        return SimpleNamespace(
+            card_id=card_id, bucket=epoch, latest=latest,
+            sum_regular=value, n_regular=1, sum_foil=None, n_foil=0,
+            sum_nonfoil=value, n_nonfoil=1,
+        )
+
+    db = FakeIndexSession(
+        [price(10, 2.0), price(20, 5.0)],
+        [(1, 10, 1), (1, 20, 2), (2, 30, 4), (3, 10, 3), (3, 99, 1)],
+    )
+
+    assert await inventory_index.refresh_inventory_index_day(db, day) == 2
+    assert db.inventory_ranges == [(1, 1), (2, 3)]
+
+    first, second = db.upserts
+    assert (first["user_id_m0"], second["user_id_m0"]) == (1, 3)
+    assert "user_id_m1" not in second
+    assert unpack_daily(first["daily_m0"])[0].tolist() == [12.0, 3.0]  # 1 * 2.0 + 2 * 5.0
+    assert unpack_daily(second["daily_m0"])[0].tolist() == [6.0, 3.0]
+    assert first["inventory_hash_m0"] == inventory_fingerprint(np.array([[10, 1], [20, 2]]))
+    # Unpriced cards still count towards the fingerprint
+    assert second["inventory_hash_m0"] == inventory_fingerprint(np.array([[10, 3], [99, 1]]))
+
+
+@pytest.mark.asyncio
+async def test_refresh_day_averages_each_card_over_coarse_buckets():
+    """A card priced in several half-hours counts once, by its quantity, per hour."""
+    day = datetime.now(timezone.utc).date()
+    epoch = int(datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc).timestamp())
+    latest = datetime.fromtimestamp(epoch + 3600, tz=timezone.utc)
+
+    def price(card_id, offset, value):
+        return SimpleNamespace(
+            card_id=card_id, bucket=epoch + offset, latest=latest,
+            sum_regular=value, n_regular=1, sum_foil=None, n_foil=0,
+            sum_nonfoil=value, n_nonfoil=1,
+        )
+
+    db = FakeIndexSession(
+        [price(10, 0, 2.0), price(10, 1800, 4.0), price(20, 1800, 5.0)],
+        [(1, 10, 1), (1, 20, 2)],
+    )
+
+    assert await inventory_index.refresh_inventory_index_day(db, day) == 1
+
+    data = db.upserts[0]["intraday_m0"]
+    assert unpack_intraday(data)[:2, 0].tolist() == [[2.0, 1.0], [14.0, 3.0]]
+    # 1 * avg(2.0, 4.0) + 2 * 5.0, not 2.0 + 4.0 + 2 * 5.0 over 4 cards
+    assert unpack_intraday(data, 60)[0, 0].tolist() == [13.0, 3.0]
+    assert unpack_intraday(data, 240)[0, 0].tolist() == [13.0, 3.0]
+
+
+@pytest.mark.asyncio
+async def test_refresh_day_for_given_users_only_touches_them():
+    """Restating some users filters every query and the stale-row delete to them."""
+    day = date(2026, 1, 10)
+    db = FakeIndexSession([], [(1, 10, 1)])
+    statements = []
+    execute = db.execute
+
+    async def record(stmt):
+        statements.append(stmt)
+        return await execute(stmt)
+
+    db.execute = record
+
+    assert await inventory_index.refresh_inventory_index_day(db, day, [7, 9]) == 0
+
+    price_query, stale_delete = statements
+    assert list(price_query.compile().params["user_id_1"]) == [7, 9]
+    assert stale_delete.compile().params["user_id_1"] == [7, 9]
+
+
+class FakeDirtySession:
+    """Serves the dirty-user markers and records restated days."""
+
+    def __init__(self, markers):
+        self.markers = markers
+        self.cleared = None
+
+    async def execute(self, stmt):
+        sql = str(stmt)
+        if "inventory_index_dirty_users" in sql and sql.startswith("DELETE"):
+            self.cleared = stmt.compile().params
+        return SimpleNamespace(all=lambda: self.markers)
+
+    async def flush(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_restate_dirty_users_recomputes_only_marked_users(monkeypatch):
+    marked_at = datetime(2026, 1, 10, tzinfo=timezone.utc)
+    db = FakeDirtySession([SimpleNamespace(user_id=3, marked_at=marked_at)])
+    restated = []
+
+    async def refresh_day(session, day, user_ids=None):
+        restated.append((day, user_ids))
+        return 1
+
+    monkeypatch.setattr(inventory_index, "refresh_inventory_index_day", refresh_day)
+
+    assert await inventory_index.restate_dirty_users(db) == 1
+    assert len(restated) == inventory_index.INDEX_HISTORY_DAYS + 1
+    assert {tuple(user_ids) for _, user_ids in restated} == {(3,)}
+    # Markers are only cleared if unchanged since they were read
+    assert list(db.cleared.values()) == [[(3, marked_at)]]
+
+
+@pytest.mark.asyncio
+async def test_restate_dirty_users_without_markers():
+    db = FakeDirtySession([])
+    assert await inventory_index.restate_dirty_users(db) == 0
+    assert db.cleared is None
+
+
+class FakeLoadSession:
+    """Serves the chart read queries from stored days and raw prices."""
+
+    def __init__(self, quantities, days, price_rows):
+        self.quantities = quantities  # (card_id, quantity)
+        self.days = days
+        self.price_rows = price_rows
+        self.price_queries = []
+
+    async def execute(self, stmt):
+        sql = str(stmt)
+        if "price_snapshots" in sql:
+            self.price_queries.append(stmt.compile().params)
+            rows = self.price_rows
+        elif "inventory_index_days" in sql:
+            rows = self.days
+        else:
+            rows = self.quantities
+        return SimpleNamespace(all=lambda: rows)
+
+
+class TestLoadInventoryIndex:
+    """Test reading standard ranges from the precomputed series."""
+
+    NOW = datetime(2026, 1, 10, 12, tzinfo=timezone.utc)
+    QUANTITIES = [(10, 1), (20, 2)]
+
+    def stored_day(self, day, value, quantity, inventory_hash):
+        daily = np.zeros((PRICE_MODES, 2))
+        daily[0] = value, quantity
+        return SimpleNamespace(
+            day=day, data=pack(daily), inventory_hash=inventory_hash,
+            latest_snapshot_at=datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc),
+        )
+
+    @pytest.mark.asyncio
+    async def test_computes_range_before_current_inventory_days(self):
+        """Days weighted with an older inventory are replaced by raw snapshot sums."""
+        current = inventory_fingerprint(np.array(self.QUANTITIES))
+        head_latest = datetime(2026, 1, 7, 20, tzinfo=timezone.utc)
+        jan7 = int(datetime(2026, 1, 7, tzinfo=timezone.utc).timestamp())
+        db = FakeLoadSession(
+            self.QUANTITIES,
+            [
+                self.stored_day(date(2026, 1, 7), 90.0, 1.0, current - 1),
+                self.stored_day(date(2026, 1, 8), 12.0, 3.0, current),
+                self.stored_day(date(2026, 1, 9), 15.0, 3.0, current),
+            ],
+            [SimpleNamespace(bucket=jan7, card_id=10, avg_price=2.0, latest=head_latest)],
+        )
+
+        series = await load_inventory_index(db, 1, "1y", None, self.NOW)
+
+        assert [p["timestamp"][:10] for p in series.points] == ["2026-01-07", "2026-01-08", "2026-01-09"]
+        assert [p["indexValue"] for p in series.points] == [100.0, 200.0, 250.0]
+        params, = db.price_queries
+        assert params["time_1"] == self.NOW - timedelta(days=365)
+        assert params["time_2"] == datetime(2026, 1, 8, tzinfo=timezone.utc)
+        assert series.latest_snapshot_at == datetime(2026, 1, 9, tzinfo=timezone.utc)
+
+    @pytest.mark.asyncio
+    async def test_no_day_matches_current_inventory(self):
+        """With only stale days the caller computes the whole range."""
+        db = FakeLoadSession(
+            self.QUANTITIES, [self.stored_day(date(2026, 1, 9), 15.0, 3.0, None)], [],
+        )
+
+        assert await load_inventory_index(db, 1, "30d", None, self.NOW) is None
+        assert db.price_queries == []
@@ -0,0 +1,85 @@
+"""Tests for the streaming MTGJSON price import."""
+import gzip
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from app.services.ingestion.bulk_ops import COPY_COLUMNS
+from app.services.pricing.mtgjson_import import (
+    iter_copy_batches,
+    iter_price_points,
+    iter_scryfall_ids,
+)
+
+
+def _write_gz(path, data):
+    with gzip.open(path, "wt") as f:
+        json.dump({"meta": {"version": "5.2"}, "data": data}, f)
+    return path
+
+
+def _prices(normal=None, foil=None, provider="tcgplayer"):
+    return {"paper": {provider: {"currency": "USD", "retail": {"normal": normal or {}, "foil": foil or {}}}}}
+
+
+class TestIterScryfallIds:
+    """Test uuid -> scryfall id streaming."""
+
+    def test_pairs(self, tmp_path):
+        path = _write_gz(tmp_path / "ids.json.gz", {
+            "u1": {"name": "A", "identifiers": {"scryfallId": "s1", "mtgoId": "9"}},
+            "u2": {"name": "B", "identifiers": {}},
+            "u3": {"name": "C", "identifiers": {"scryfallId": "s3"}},
+        })
+        assert list(iter_scryfall_ids(path)) == [("u1", "s1"), ("u3", "s3")]
+
+
+class TestIterPricePoints:
+    """Test retail point extraction."""
+
+    def test_filters_by_date_and_price(self):
+        prices = _prices(
+            normal={"2026-01-01": 1.5, "2026-01-10": 2.0, "2026-01-11": 0},
+            foil={"2026-01-12": 9.0},
+        )
+        points = list(iter_price_points(prices, "2026-01-05", ("tcgplayer",)))
+        assert points == [("tcgplayer", False, "2026-01-10", 2.0), ("tcgplayer", True, "2026-01-12", 9.0)]
+
+    def test_skips_other_providers_and_missing_paper(self):
+        assert list(iter_price_points(_prices({"2026-01-10": 1.0}, provider="cardkingdom"), "2026-01-01", ("tcgplayer",))) == []
+        assert list(iter_price_points({"mtgo": {}}, "2026-01-01", ("tcgplayer",))) == []
+
+
+class TestIterCopyBatches:
+    """Test COPY record batching."""
+
+    def test_maps_uuids_and_batches(self, tmp_path):
+        path = _write_gz(tmp_path / "prices.json.gz", {
+            "u1": _prices({"2026-01-10": 1.25, "2026-01-11": 1.5}, {"2026-01-10": 4.0}),
+            "unknown": _prices({"2026-01-10": 3.0}),
+            "u2": _prices({"2026-01-10": 0.1}),
+        })
+        stats = {}
+        batches = list(iter_copy_batches(
+            path, {"u1": 10, "u2": 20}, {"tcgplayer": 7}, date(2026, 1, 1), batch_rows=2, stats=stats,
+        ))
+
+        assert [len(b) for b in batches] == [3, 1]
+        assert stats == {"cards_matched": 2, "uuids_unmatched": 1, "points_read": 4}
+
+        record = dict(zip(COPY_COLUMNS, batches[0][0]))
+        assert record["time"] == datetime(2026, 1, 10, tzinfo=timezone.utc)
+        assert record["card_id"] == 10
+        assert record["marketplace_id"] == 7
+        assert record["price"] == Decimal("1.25")
+        assert record["currency"] == "USD"
+        assert record["source"] == "mtgjson"
+        assert [r[4] for r in batches[0]] == [False, False, True]
+        assert batches[1][0][1] == 20
+
+    def test_cardmarket_points_are_eur(self, tmp_path):
+        path = _write_gz(tmp_path / "prices.json.gz", {
+            "u1": _prices({"2026-01-10": 2.0}, provider="cardmarket"),
+        })
+        (batch,) = iter_copy_batches(path, {"u1": 1}, {"cardmarket": 3}, date(2026, 1, 1))
+        assert batch[0][COPY_COLUMNS.index("currency")] == "EUR"
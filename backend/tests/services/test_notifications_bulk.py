@@ -0,0 +1,99 @@
+"""Tests for bulk notification fan-out."""
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.notification import NotificationPriority, NotificationType
+from app.services.notifications import (
+    ban_change_draft,
+    create_notifications_bulk,
+    publish_notifications,
+)
+
+NOW = datetime(2026, 1, 19, tzinfo=timezone.utc)
+
+
+def _db(existing_hashes, created_ids):
+    """Session whose first execute returns existing hashes and second the inserted rows."""
+    inserted = {}
+
+    async def execute(stmt, rows=None):
+        if rows is None:
+            return [(h,) for h in existing_hashes]
+        inserted["rows"] = rows
+        return [
+            SimpleNamespace(id=created_ids[i], dedup_hash=row["dedup_hash"], created_at=NOW)
+            for i, row in enumerate(rows)
+        ]
+
+    db = AsyncMock()
+    db.execute = AsyncMock(side_effect=execute)
+    return db, inserted
+
+
+class TestCreateNotificationsBulk:
+    """Test dedup and single insert."""
+
+    @pytest.mark.asyncio
+    async def test_filters_batch_and_existing_duplicates(self):
+        drafts = [ban_change_draft(user_id, 9, "Sol Ring", "commander", "legal", "banned") for user_id in (1, 2, 2, 3)]
+        db, inserted = _db(existing_hashes=[drafts[2].dedup_hash], created_ids=[100, 101])
+
+        created = await create_notifications_bulk(db, drafts)
+
+        assert db.execute.await_count == 2
+        assert [row["user_id"] for row in inserted["rows"]] == [1, 3]
+        assert [n["id"] for n in created] == [100, 101]
+        assert created[0]["user_id"] == 1
+        assert created[0]["type"] == "ban_change"
+        assert created[0]["created_at"] == NOW.isoformat()
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_insert(self):
+        draft = ban_change_draft(1, 9, "Sol Ring", "commander", "legal", "banned")
+        db, _ = _db(existing_hashes=[draft.dedup_hash], created_ids=[])
+        assert await create_notifications_bulk(db, [draft]) == []
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_input_skips_database(self):
+        db = AsyncMock()
+        assert await create_notifications_bulk(db, []) == []
+        db.execute.assert_not_called()
+
+
+class TestBanChangeDraft:
+    """Test ban notification templates."""
+
+    def test_ban_is_urgent(self):
+        draft = ban_change_draft(1, 9, "Sol Ring", "commander", "legal", "banned")
+        assert draft.type == NotificationType.BAN_CHANGE
+        assert draft.priority == NotificationPriority.URGENT
+        assert draft.title == "Sol Ring BANNED in Commander"
+
+    def test_unban_is_high(self):
+        draft = ban_change_draft(1, 9, "Sol Ring", "commander", "banned", "legal")
+        assert draft.priority == NotificationPriority.HIGH
+
+
+@pytest.mark.asyncio
+async def test_publish_uses_one_pipeline():
+    redis = MagicMock()
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[1, 1])
+    redis.pipeline.return_value = pipe
+    notifications = [
+        {"user_id": 1, "id": 10, "type": "ban_change", "title": "t"},
+        {"user_id": 2, "id": 11, "type": "ban_change", "title": "t"},
+    ]
+
+    assert await publish_notifications(notifications, redis=redis) == 2
+
+    redis.pipeline.assert_called_once()
+    channel, message = pipe.publish.call_args_list[1].args
+    assert channel == "channel:notifications:user:2"
+    # Same message shape as NotificationService.send_realtime
+    assert json.loads(message) == {"type": "ban_change", "notification_type": "ban_change", "id": 11, "title": "t"}
@@ -0,0 +1,87 @@
+"""Tests for cached profile card rendering."""
+import os
+import time
+from dataclasses import replace
+from unittest.mock import patch
+
+import pytest
+
+from app.services.profile_card_generator import (
+    ProfileCardFields,
+    ProfileCardGenerator,
+    _load_fonts,
+)
+
+FIELDS = ProfileCardFields(
+    display_name="Jace",
+    username="jace",
+    frame_tier="gold",
+    tagline="Mind games",
+    cards_for_trade=3,
+    member_since="Jan 2026",
+)
+
+
+class TestContentHash:
+    """Test the cache key."""
+
+    def test_stable_for_same_fields(self):
+        assert FIELDS.content_hash == replace(FIELDS).content_hash
+
+    def test_changes_with_drawn_fields(self):
+        assert FIELDS.content_hash != replace(FIELDS, cards_for_trade=4).content_hash
+        assert FIELDS.content_hash != replace(FIELDS, frame_tier="silver").content_hash
+
+
+class TestGetOrRender:
+    """Test the disk render cache."""
+
+    @pytest.mark.asyncio
+    async def test_renders_once_per_hash(self, tmp_path):
+        generator = ProfileCardGenerator(cache_dir=tmp_path)
+        with patch.object(generator, "render", wraps=generator.render) as render:
+            first = await generator.get_or_render(7, FIELDS)
+            second = await generator.get_or_render(7, FIELDS)
+
+        assert first == second
+        assert first.startswith(b"\x89PNG")
+        assert render.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_new_hash_replaces_old_render(self, tmp_path):
+        generator = ProfileCardGenerator(cache_dir=tmp_path)
+        await generator.get_or_render(7, FIELDS)
+        await generator.get_or_render(8, FIELDS)
+        await generator.get_or_render(7, replace(FIELDS, tagline="New"))
+
+        files = sorted(p.name for p in tmp_path.iterdir())
+        assert len(files) == 2
+        assert files[0].startswith("7-") and files[0] != f"7-{FIELDS.content_hash}.png"
+        assert files[1] == f"8-{FIELDS.content_hash}.png"
+
+    @pytest.mark.asyncio
+    async def test_keeps_renders_newer_than_its_own(self, tmp_path):
+        """A render finishing later in another worker is not deleted."""
+        older = tmp_path / "7-older.png"
+        newer = tmp_path / "7-newer.png"
+        older.write_bytes(b"old")
+        newer.write_bytes(b"new")
+        now = time.time()
+        os.utime(older, (now - 60, now - 60))
+        os.utime(newer, (now + 60, now + 60))
+
+        generator = ProfileCardGenerator(cache_dir=tmp_path)
+        await generator.get_or_render(7, FIELDS)
+
+        files = sorted(p.name for p in tmp_path.iterdir())
+        assert files == [f"7-{FIELDS.content_hash}.png", "7-newer.png"]
+
+    @pytest.mark.asyncio
+    async def test_matches_uncached_render(self, tmp_path):
+        generator = ProfileCardGenerator(cache_dir=tmp_path)
+        uncached = await ProfileCardGenerator().generate(**vars(FIELDS))
+        assert await generator.get_or_render(1, FIELDS) == uncached
+
+
+def test_fonts_loaded_once():
+    assert _load_fonts() is _load_fonts()
@@ -0,0 +1,100 @@
+"""Tests for ranked SQL card search and normalized search columns."""
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.core.constants import (
+    card_search_fields,
+    color_mask,
+    format_bit,
+    legal_format_bits,
+    normalize_keywords,
+)
+from app.services.search.query import build_search_query, escape_like, order_by_relevance
+
+
+def _compile(query):
+    compiled = query.compile(dialect=asyncpg.dialect())
+    return compiled.string, compiled.construct_params()
+
+
+class TestCardSearchFields:
+    """Test derivation of the normalized filter columns."""
+
+    def test_color_mask_accepts_json_and_repr(self):
+        assert color_mask('["U", "R"]') == 10
+        assert color_mask("['U', 'R']") == 10
+        assert color_mask(["w", "g"]) == 17
+        assert color_mask(None) == 0
+        assert color_mask("not json") == 0
+
+    def test_legal_format_bits(self):
+        bits = legal_format_bits('{"modern": "legal", "standard": "not_legal", "legacy": "legal"}')
+        assert bits == format_bit("modern") | format_bit("legacy")
+        assert legal_format_bits(None) == 0
+
+    def test_format_bit_unknown(self):
+        assert format_bit("Modern") == format_bit("modern")
+        assert format_bit("not-a-format") is None
+
+    def test_keywords_are_lowercased_and_deduplicated(self):
+        assert normalize_keywords('["Flying", "Haste", "flying"]') == ["flying", "haste"]
+
+    def test_card_search_fields(self):
+        assert card_search_fields(["B"], {"pauper": "legal"}, ["Deathtouch"]) == {
+            "color_mask": 4,
+            "legal_formats": format_bit("pauper"),
+            "keyword_list": ["deathtouch"],
+        }
+
+
+class TestBuildSearchQuery:
+    """Test SQL generated for card search."""
+
+    def test_full_text_uses_indexed_document(self):
+        sql, params = _compile(build_search_query("bolt"))
+        assert "cards.name ILIKE" in sql
+        assert "cards.name %>" in sql
+        # Constants are inlined so the expression index matches
+        assert "to_tsvector('english'::regconfig, coalesce(cards.name, '')" in sql
+        assert params["name_1"] == "%bolt%"
+
+    def test_name_only_skips_full_text(self):
+        sql, _ = _compile(build_search_query("bolt", full_text=False))
+        assert "to_tsvector" not in sql
+
+    def test_empty_query_has_no_match_condition(self):
+        sql, _ = _compile(build_search_query(""))
+        assert "WHERE" not in sql
+
+    def test_filters_use_normalized_columns(self):
+        query = build_search_query("", {
+            "colors": ["R", "G"],
+            "format_legal": "modern",
+            "keywords": ["Haste"],
+            "set_code": "m10",
+        })
+        sql, params = _compile(query)
+        assert "cards.color_mask &" in sql
+        assert "cards.legal_formats &" in sql
+        assert "cards.keyword_list &&" in sql
+        assert "cards.colors" not in sql.split("WHERE")[1]
+        assert params["color_mask_1"] == 24
+        assert params["keyword_list_1"] == ["haste"]
+        assert params["set_code_1"] == "M10"
+
+    def test_unknown_format_matches_nothing(self):
+        sql, _ = _compile(build_search_query("", {"format_legal": "not-a-format"}))
+        assert "false" in sql.lower()
+
+    def test_ranked_order(self):
+        sql, _ = _compile(order_by_relevance(build_search_query("bolt"), "bolt"))
+        order_by = sql.split("ORDER BY")[1]
+        assert "word_similarity" in order_by and "ts_rank_cd" in order_by
+        assert order_by.strip().endswith("cards.name, cards.id")
+
+    def test_browse_orders_by_name(self):
+        sql, _ = _compile(order_by_relevance(build_search_query(""), ""))
+        assert sql.split("ORDER BY")[1].strip() == "cards.name, cards.id"
+
+
+def test_escape_like():
+    assert escape_like(r"50%_\x") == r"50\%\_\\x"
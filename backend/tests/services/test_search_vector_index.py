@@ -0,0 +1,118 @@
+"""Tests for the in-memory card vector index."""
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.core.constants import card_search_fields
+from app.services.search.vector_index import CardVectorIndex
+
+DIM = 4
+
+
+def _row(card_id, direction, colors=None, legalities=None, rarity="common", cmc=1.0, type_line="Instant"):
+    vector = np.zeros(DIM + 3, dtype=np.float32)
+    vector[direction] = 1.0
+    vector[direction + 1 if direction + 1 < DIM else 0] = 0.1 * card_id
+    fields = card_search_fields(colors, legalities)
+    return SimpleNamespace(
+        card_id=card_id,
+        feature_vector=vector.tobytes(),
+        color_mask=fields["color_mask"],
+        legal_formats=fields["legal_formats"],
+        rarity=rarity,
+        cmc=cmc,
+        type_line=type_line,
+    )
+
+
+def _index():
+    return CardVectorIndex.from_rows([
+        _row(1, 0, ["R"], {"modern": "legal"}, cmc=1.0, type_line="Instant"),
+        _row(2, 0, ["U"], {"modern": "legal"}, rarity="rare", cmc=2.0, type_line="Creature — Wizard"),
+        _row(3, 1, ["R", "G"], {"legacy": "legal"}, rarity="mythic", cmc=None, type_line="Sorcery"),
+        _row(4, 2, None, None, rarity="uncommon", cmc=5.0, type_line="Artifact Creature — Golem"),
+    ], DIM)
+
+
+QUERY = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+
+
+class TestFromRows:
+    """Test index construction."""
+
+    def test_keeps_text_embedding_normalized(self):
+        index = _index()
+        assert index.embeddings.shape == (4, DIM)
+        assert np.allclose(np.linalg.norm(index.embeddings, axis=1), 1.0)
+
+    def test_empty(self):
+        index = CardVectorIndex.from_rows([], DIM)
+        ids, _, total = index.search(QUERY, 10)
+        assert len(index) == 0 and total == 0 and len(ids) == 0
+
+
+class TestFilterMask:
+    """Test attribute pre-filters."""
+
+    def test_no_filters(self):
+        assert _index().filter_mask({"colors": None, "rarity": None}) is None
+
+    def test_colors_match_any(self):
+        index = _index()
+        assert index.card_ids[index.filter_mask({"colors": ["G", "U"]})].tolist() == [2, 3]
+
+    def test_format_and_rarity(self):
+        index = _index()
+        mask = index.filter_mask({"format_legal": "modern", "rarity": "Rare"})
+        assert index.card_ids[mask].tolist() == [2]
+
+    def test_unknown_format_matches_nothing(self):
+        assert not _index().filter_mask({"format_legal": "not-a-format"}).any()
+
+    def test_cmc_range_excludes_unknown(self):
+        index = _index()
+        assert index.card_ids[index.filter_mask({"cmc_min": 0})].tolist() == [1, 2, 4]
+        assert index.card_ids[index.filter_mask({"cmc_max": 2})].tolist() == [1, 2]
+
+    def test_card_type_is_case_insensitive_contains(self):
+        index = _index()
+        assert index.card_ids[index.filter_mask({"card_type": "CREATURE"})].tolist() == [2, 4]
+
+
+class TestSearch:
+    """Test filtered similarity search."""
+
+    def test_orders_by_similarity(self):
+        ids, scores, total = _index().search(QUERY, limit=10)
+        assert total == 4
+        assert ids.tolist()[:2] == [1, 2]
+        assert list(scores) == sorted(scores, reverse=True)
+
+    def test_filtered_pages_are_full_with_true_total(self):
+        index = _index()
+        filters = {"card_type": "creature"}
+        first, _, total = index.search(QUERY, limit=1, offset=0, filters=filters)
+        second, _, _ = index.search(QUERY, limit=1, offset=1, filters=filters)
+        assert total == 2
+        assert first.tolist() == [2]
+        assert second.tolist() == [4]
+
+    def test_offset_past_end(self):
+        ids, _, total = _index().search(QUERY, limit=5, offset=10)
+        assert total == 4 and len(ids) == 0
+
+    def test_partial_sort_matches_full_sort(self):
+        rng = np.random.default_rng(0)
+        rows = [
+            SimpleNamespace(
+                card_id=i,
+                feature_vector=rng.standard_normal(DIM).astype(np.float32).tobytes(),
+                color_mask=0, legal_formats=0, rarity=None, cmc=None, type_line=None,
+            )
+            for i in range(200)
+        ]
+        index = CardVectorIndex.from_rows(rows, DIM)
+        query = rng.standard_normal(DIM).astype(np.float32)
+        expected = index.card_ids[np.argsort(-(index.embeddings @ query), kind="stable")]
+        ids, _, _ = index.search(query, limit=10, offset=20)
+        assert ids.tolist() == expected[20:30].tolist()
@@ -0,0 +1,98 @@
+"""Tests for bitmap-based set completion."""
+from collections import namedtuple
+from decimal import Decimal
+
+import pytest
+
+from app.services import set_completion
+from app.services.set_completion import (
+    SetMembershipIndex,
+    SetProgress,
+    collector_sort_key,
+    get_set_index,
+)
+
+Row = namedtuple("Row", "id set_code collector_number")
+
+ROWS = [
+    Row(1, "NEO", "2"),
+    Row(2, "NEO", "10"),
+    Row(3, "NEO", "1"),
+    Row(4, "DMU", "1"),
+    Row(5, "DMU", "2"),
+    Row(6, "ONE", "1a"),
+    Row(7, "ONE", "1"),
+]
+
+
+@pytest.fixture
+def index():
+    return SetMembershipIndex.from_rows(ROWS, version=(7, None))
+
+
+class TestSetMembershipIndex:
+    """Tests for membership ranges and bitmap queries."""
+
+    def test_sets_are_contiguous_in_collector_order(self, index):
+        assert list(index.set_codes) == ["DMU", "NEO", "ONE"]
+        assert list(index.set_sizes) == [2, 3, 2]
+        assert list(index.card_ids) == [4, 5, 3, 1, 2, 7, 6]
+
+    def test_progress_and_completed_sets(self, index):
+        bitmap = index.owned_bitmap([4, 5, 1, 999])
+
+        assert index.progress(bitmap) == [
+            SetProgress("DMU", 2, 2),
+            SetProgress("NEO", 1, 3),
+        ]
+        assert index.progress(bitmap)[1].completion == Decimal("33.33")
+
+    def test_top_sets_break_ties_by_code(self, index):
+        bitmap = index.owned_bitmap([7, 3])
+        assert [p.set_code for p in index.top_sets(bitmap, limit=2)] == ["ONE", "NEO"]
+        assert index.top_sets(index.owned_bitmap([]), limit=1) == []
+
+    def test_missing_cards(self, index):
+        bitmap = index.owned_bitmap([1])
+        assert list(index.missing(bitmap, "NEO")) == [3, 2]
+        assert list(index.missing(bitmap, "DMU")) == [4, 5]
+        assert index.missing(bitmap, "XXX") is None
+        assert index.set_progress(bitmap, "NEO") == SetProgress("NEO", 1, 3)
+
+    def test_resolve_set_code(self, index):
+        assert index.resolve_set_code("neo") == "NEO"
+        assert index.resolve_set_code("xxx") is None
+
+    def test_empty_catalog(self):
+        empty = SetMembershipIndex.from_rows([])
+        bitmap = empty.owned_bitmap([1, 2])
+        assert empty.progress(bitmap) == []
+        assert empty.top_sets(bitmap) == []
+
+
+def test_collector_sort_key():
+    numbers = ["100", "12a", "2", "12", "★"]
+    assert sorted(numbers, key=collector_sort_key) == ["2", "12", "12a", "100", "★"]
+
+
+@pytest.mark.asyncio
+async def test_index_reloads_on_catalog_change(monkeypatch):
+    versions = [(7, None), (7, None), (8, None)]
+    loads = []
+
+    async def catalog_version(db):
+        return versions.pop(0)
+
+    async def load(db, version=None):
+        loads.append(version)
+        return SetMembershipIndex.from_rows(ROWS, version=version)
+
+    monkeypatch.setattr(set_completion, "catalog_version", catalog_version)
+    monkeypatch.setattr(SetMembershipIndex, "load", load)
+    monkeypatch.setattr(set_completion, "_index", None)
+    monkeypatch.setattr(set_completion.settings, "set_index_check_interval", 0)
+
+    first = await get_set_index(None)
+    assert await get_set_index(None) is first
+    assert (await get_set_index(None)).version == (8, None)
+    assert loads == [(7, None), (8, None)]
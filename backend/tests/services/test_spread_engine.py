@@ -0,0 +1,144 @@
+"""Tests for the vectorized cross-marketplace spread engine."""
+from collections import namedtuple
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.services.pricing import spread_engine
+from app.services.pricing.spread_engine import SpreadMatrix, get_spread_matrix
+
+Row = namedtuple("Row", "card_id marketplace_id price num_listings")
+
+ROWS = [
+    Row(10, 1, Decimal("10.00"), 4),
+    Row(10, 2, Decimal("14.00"), None),
+    Row(10, 3, Decimal("9.00"), 2),
+    Row(20, 1, Decimal("6.00"), 1),
+    Row(20, 2, Decimal("30.00"), 8),
+    Row(30, 2, Decimal("50.00"), 3),  # single marketplace
+    Row(40, 1, Decimal("2.00"), 1),
+    Row(40, 3, Decimal("8.00"), 1),
+]
+
+
+def brute_force_best(prices: dict[int, float], fee_pct: float, min_price: float):
+    """Best (profit, buy, sell) over all ordered marketplace pairs, as the old loop did."""
+    best = None
+    for buy, buy_price in prices.items():
+        for sell, sell_price in prices.items():
+            if buy == sell or buy_price < min_price or sell_price < min_price:
+                continue
+            profit = sell_price * (1 - fee_pct) - buy_price * (1 + fee_pct)
+            if best is None or profit > best[0]:
+                best = (profit, buy, sell)
+    return best
+
+
+@pytest.fixture
+def matrix():
+    return SpreadMatrix.from_rows(ROWS, version=("v1",))
+
+
+class TestSpreadMatrix:
+    """Tests for the dense matrix and best-pair kernel."""
+
+    def test_dense_layout(self, matrix):
+        assert list(matrix.card_ids) == [10, 20, 30, 40]
+        assert list(matrix.marketplace_ids) == [1, 2, 3]
+        assert np.isnan(matrix.prices[2, 0]) and matrix.prices[2, 1] == 50.0
+        assert matrix.listings[0, 1] == -1
+
+    def test_best_pairs_without_fees(self, matrix):
+        opportunities = matrix.opportunities()
+
+        assert [o.card_id for o in opportunities] == [20, 40, 10]
+        top = opportunities[0]
+        assert (top.buy_marketplace_id, top.sell_marketplace_id) == (1, 2)
+        assert top.profit == pytest.approx(24.0)
+        assert top.profit_pct == pytest.approx(4.0)
+        assert opportunities[2].buy_marketplace_id == 3
+        assert opportunities[2].buy_listings == 2 and opportunities[2].sell_listings is None
+
+    def test_fees_thresholds_and_min_price(self, matrix):
+        opportunities = matrix.opportunities(
+            fee_pct=0.10, min_price=5.0, min_profit=1.0, min_profit_pct=0.15,
+        )
+        # Card 40 is below min_price on one side; card 10 nets 14*0.9 - 9*1.1 = 2.7 (27%)
+        assert [o.card_id for o in opportunities] == [20, 10]
+        assert opportunities[1].profit == pytest.approx(2.7)
+        assert opportunities[1].profit_pct == pytest.approx(2.7 / 9.9)
+
+    def test_order_by_pct_and_limit(self, matrix):
+        opportunities = matrix.opportunities(order_by="profit_pct", limit=2)
+        assert [o.card_id for o in opportunities] == [20, 40]
+
+    def test_matches_pairwise_search(self):
+        rng = np.random.default_rng(7)
+        rows, by_card = [], {}
+        for card_id in range(200):
+            for marketplace_id in rng.choice(6, size=rng.integers(1, 6), replace=False):
+                price = round(float(rng.uniform(0.5, 60)), 2)
+                rows.append(Row(card_id, int(marketplace_id), price, None))
+                by_card.setdefault(card_id, {})[int(marketplace_id)] = price
+        matrix = SpreadMatrix.from_rows(rows)
+
+        pairs = matrix.best_pairs(0.10, 5.0)
+        for row, card_id in enumerate(matrix.card_ids):
+            expected = brute_force_best(by_card[int(card_id)], 0.10, 5.0)
+            if expected is None:
+                assert np.isnan(pairs.profit[row])
+            else:
+                assert pairs.profit[row] == pytest.approx(expected[0])
+                if expected[0] > 0:
+                    assert matrix.marketplace_ids[pairs.buy[row]] == expected[1]
+                    assert matrix.marketplace_ids[pairs.sell[row]] == expected[2]
+
+    def test_empty(self):
+        matrix = SpreadMatrix.from_rows([])
+        assert matrix.opportunities(fee_pct=0.1) == []
+
+
+@pytest.mark.asyncio
+async def test_matrix_reloads_when_prices_change(monkeypatch):
+    versions = [("v1",), ("v1",), ("v2",)]
+    loads = []
+
+    async def price_version(db):
+        return versions.pop(0)
+
+    async def load(db, currency="USD", window_hours=48, version=None):
+        loads.append((currency, version))
+        return SpreadMatrix.from_rows(ROWS, version=version)
+
+    monkeypatch.setattr(spread_engine, "price_version", price_version)
+    monkeypatch.setattr(SpreadMatrix, "load", load)
+    monkeypatch.setattr(spread_engine, "_matrices", {})
+    monkeypatch.setattr(spread_engine.settings, "spread_matrix_check_interval", 0)
+
+    first = await get_spread_matrix(None)
+    assert await get_spread_matrix(None) is first
+    assert (await get_spread_matrix(None)).version == ("v2",)
+    assert loads == [("USD", ("v1",)), ("USD", ("v2",))]
+
+
+@pytest.mark.asyncio
+async def test_matrices_are_cached_per_window(monkeypatch):
+    loads = []
+
+    async def price_version(db):
+        return ("v1",)
+
+    async def load(db, currency="USD", window_hours=48, version=None):
+        loads.append(window_hours)
+        return SpreadMatrix.from_rows(ROWS, version=version)
+
+    monkeypatch.setattr(spread_engine, "price_version", price_version)
+    monkeypatch.setattr(SpreadMatrix, "load", load)
+    monkeypatch.setattr(spread_engine, "_matrices", {})
+    monkeypatch.setattr(spread_engine.settings, "spread_matrix_check_interval", 60)
+
+    hourly = await get_spread_matrix(None, window_hours=1)
+    assert await get_spread_matrix(None) is not hourly
+    assert await get_spread_matrix(None, window_hours=1) is hourly
+    assert loads == [1, 48]
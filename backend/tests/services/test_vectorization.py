@@ -0,0 +1,98 @@
+"""Tests for batched card vectorization."""
+import numpy as np
+
+from app.services.vectorization.ingestion import EmbeddingCache, vectorize_cards_batch
+from app.services.vectorization.service import VectorizationService
+
+
+class FakeModel:
+    """Stands in for SentenceTransformer; records what it was asked to encode."""
+
+    def __init__(self):
+        self.calls: list = []
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        self.calls.append(texts)
+        if isinstance(texts, str):
+            return np.full(384, len(texts), dtype=np.float32)
+        return np.array([np.full(384, len(text), dtype=np.float32) for text in texts])
+
+
+def _vectorizer() -> tuple[VectorizationService, FakeModel]:
+    vectorizer = VectorizationService()
+    model = FakeModel()
+    vectorizer._embedding_model = model
+    return vectorizer, model
+
+
+def _card(name="Lightning Bolt", rarity="common", colors='["R"]'):
+    return {
+        "name": name,
+        "type_line": "Instant",
+        "oracle_text": "Lightning Bolt deals 3 damage to any target.",
+        "rarity": rarity,
+        "cmc": 1.0,
+        "colors": colors,
+        "mana_cost": "{R}",
+    }
+
+
+class TestVectorizeCardsBatch:
+    """Test deduplicated batch embedding."""
+
+    def test_reprints_share_one_encode(self):
+        vectorizer, model = _vectorizer()
+        cards = [_card(), _card(rarity="uncommon"), _card(name="Shock")]
+
+        vectors, encoded = vectorize_cards_batch(cards, vectorizer, EmbeddingCache())
+
+        assert encoded == 2
+        assert len(model.calls) == 1 and len(model.calls[0]) == 2
+        assert len(vectors) == 3
+        # Same text embedding, different rarity features
+        assert np.array_equal(vectors[0][:384], vectors[1][:384])
+        assert not np.array_equal(vectors[0], vectors[1])
+
+    def test_matches_single_card_vectorization(self):
+        vectorizer, _ = _vectorizer()
+        card = _card()
+        vectors, _ = vectorize_cards_batch([card], vectorizer, EmbeddingCache())
+        assert np.allclose(vectors[0], vectorizer.vectorize_card(card))
+
+    def test_cache_is_reused_across_batches(self):
+        vectorizer, model = _vectorizer()
+        cache = EmbeddingCache()
+        vectorize_cards_batch([_card()], vectorizer, cache)
+        _, encoded = vectorize_cards_batch([_card(rarity="rare")], vectorizer, cache)
+        assert encoded == 0
+        assert len(model.calls) == 1
+
+
+class TestCardContentHash:
+    """Test change detection hash."""
+
+    def test_stable_for_same_content(self):
+        vectorizer, _ = _vectorizer()
+        assert vectorizer.card_content_hash(_card()) == vectorizer.card_content_hash(_card())
+
+    def test_changes_with_embedded_attributes(self):
+        vectorizer, _ = _vectorizer()
+        base = vectorizer.card_content_hash(_card())
+        assert vectorizer.card_content_hash(_card(name="Shock")) != base
+        assert vectorizer.card_content_hash(_card(colors='["U"]')) != base
+
+    def test_changes_with_model(self):
+        vectorizer, _ = _vectorizer()
+        other = VectorizationService(embedding_model_name="other-model")
+        assert vectorizer.card_content_hash(_card()) != other.card_content_hash(_card())
+
+
+def test_embedding_cache_evicts_least_recently_used():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("a", np.zeros(1))
+    cache.put("b", np.zeros(1))
+    cache.get("a")
+    cache.put("c", np.zeros(1))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert len(cache) == 2
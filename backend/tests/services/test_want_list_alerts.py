@@ -0,0 +1,101 @@
+"""Tests for write-time want list alert evaluation."""
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.want_list_alerts import (
+    card_key,
+    evaluate_want_list_alerts,
+    lowest_written_prices,
+    match_targets,
+    sync_want_list_item,
+)
+
+
+class TestLowestWrittenPrices:
+    """Test reduction of written snapshots to one price per card."""
+
+    def test_lowest_non_foil_usd_price_per_card(self):
+        snapshots = [
+            {"card_id": 1, "price": Decimal("5.00"), "is_foil": False, "currency": "USD"},
+            {"card_id": 1, "price": Decimal("4.50"), "is_foil": False, "currency": "USD"},
+            {"card_id": 1, "price": Decimal("1.00"), "is_foil": True, "currency": "USD"},
+            {"card_id": 2, "price": Decimal("3.00"), "is_foil": False, "currency": "EUR"},
+            {"card_id": 3, "price": 0, "is_foil": False},
+        ]
+        assert lowest_written_prices(snapshots) == {1: Decimal("4.50")}
+
+    def test_accepts_collected_price_objects(self):
+        collected = [SimpleNamespace(card_id=7, price=Decimal("2.25"), is_foil=False, currency="USD")]
+        assert lowest_written_prices(collected) == {7: Decimal("2.25")}
+
+
+def _pipeline(results):
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=results)
+    return pipe
+
+
+class TestMatchTargets:
+    """Test target lookup against the Redis index."""
+
+    @pytest.mark.asyncio
+    async def test_queries_targets_at_or_above_price(self):
+        redis = MagicMock()
+        pipe = _pipeline([["11", "12"], []])
+        redis.pipeline.return_value = pipe
+
+        matched = await match_targets(redis, {1: Decimal("4.50"), 2: Decimal("9.99")})
+
+        assert matched == [11, 12]
+        pipe.zrangebyscore.assert_any_call(card_key(1), 4.5, "+inf")
+        pipe.zrangebyscore.assert_any_call(card_key(2), 9.99, "+inf")
+
+    @pytest.mark.asyncio
+    async def test_no_prices_skips_redis(self):
+        redis = MagicMock()
+        assert await match_targets(redis, {}) == []
+        redis.pipeline.assert_not_called()
+
+
+class TestSyncWantListItem:
+    """Test index maintenance for single items."""
+
+    @pytest.mark.asyncio
+    async def test_enabled_item_is_indexed(self):
+        redis = AsyncMock()
+        item = SimpleNamespace(id=5, card_id=9, target_price=Decimal("3.50"), alert_enabled=True)
+        await sync_want_list_item(redis, item)
+        redis.zadd.assert_awaited_once_with(card_key(9), {"5": 3.5})
+
+    @pytest.mark.asyncio
+    async def test_disabled_item_is_removed(self):
+        redis = AsyncMock()
+        item = SimpleNamespace(id=5, card_id=9, target_price=Decimal("3.50"), alert_enabled=False)
+        await sync_want_list_item(redis, item)
+        redis.zrem.assert_awaited_once_with(card_key(9), "5")
+
+
+class TestEvaluateWantListAlerts:
+    """Test the write-path hook."""
+
+    @pytest.mark.asyncio
+    async def test_skips_until_index_is_built(self):
+        redis = MagicMock()
+        redis.exists = AsyncMock(return_value=0)
+        db = AsyncMock()
+        snapshots = [{"card_id": 1, "price": Decimal("1.00"), "is_foil": False, "currency": "USD"}]
+
+        assert await evaluate_want_list_alerts(db, snapshots, redis=redis) == 0
+        redis.pipeline.assert_not_called()
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_do_not_raise(self):
+        redis = MagicMock()
+        redis.exists = AsyncMock(side_effect=ConnectionError("redis down"))
+        snapshots = [{"card_id": 1, "price": Decimal("1.00"), "is_foil": False, "currency": "USD"}]
+
+        assert await evaluate_want_list_alerts(AsyncMock(), snapshots, redis=redis) == 0
@@ -0,0 +1,101 @@
+"""Tests for the per-channel Redis Pub/Sub bridge."""
+import asyncio
+import json
+
+import pytest
+
+from app.services.websocket_bridge import ChannelBridge
+
+
+class FakePubSub:
+    """Records SUBSCRIBE/UNSUBSCRIBE and serves queued messages."""
+
+    def __init__(self):
+        self.calls = []
+        self.messages = asyncio.Queue()
+
+    async def subscribe(self, *channels):
+        self.calls.append(("subscribe", channels))
+
+    async def unsubscribe(self, *channels):
+        self.calls.append(("unsubscribe", channels))
+
+    async def get_message(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        pass
+
+
+class FakeRedis:
+    def __init__(self):
+        self.pubsub_instance = FakePubSub()
+
+    def pubsub(self, **kwargs):
+        return self.pubsub_instance
+
+
+def _bridge(local, received=None):
+    redis = FakeRedis()
+
+    async def get_redis():
+        return redis
+
+    async def on_message(channel, data):
+        received.append((channel, data))
+
+    bridge = ChannelBridge(get_redis, lambda channel: bool(local.get(channel)), on_message)
+    return bridge, redis.pubsub_instance
+
+
+class TestSync:
+    """Test subscription bookkeeping."""
+
+    @pytest.mark.asyncio
+    async def test_subscribes_on_first_and_unsubscribes_on_last(self):
+        local = {}
+        bridge, pubsub = _bridge(local)
+
+        local["channel:card:1"] = {"a"}
+        await bridge.sync("channel:card:1")
+        local["channel:card:1"].add("b")
+        await bridge.sync("channel:card:1")
+        local["channel:card:1"].discard("a")
+        await bridge.sync("channel:card:1")
+        local.pop("channel:card:1")
+        await bridge.sync("channel:card:1")
+
+        assert pubsub.calls == [
+            ("subscribe", ("channel:card:1",)),
+            ("unsubscribe", ("channel:card:1",)),
+        ]
+        assert bridge.subscribed == set()
+
+    @pytest.mark.asyncio
+    async def test_no_redis_for_channels_never_subscribed(self):
+        bridge, pubsub = _bridge({})
+        await bridge.sync("channel:market:USD")
+        assert pubsub.calls == []
+
+
+@pytest.mark.asyncio
+async def test_run_forwards_decoded_messages():
+    received = []
+    local = {"channel:card:1": {"a"}}
+    bridge, pubsub = _bridge(local, received)
+    await bridge.sync("channel:card:1")
+
+    for data in ('{"type": "card_update", "price": 2}', "not json"):
+        await pubsub.messages.put({"type": "message", "channel": "channel:card:1", "data": data})
+    await pubsub.messages.put({"type": "subscribe", "channel": "channel:card:1", "data": 1})
+
+    task = asyncio.create_task(bridge.run())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert received == [("channel:card:1", json.loads('{"type": "card_update", "price": 2}'))]
@@ -0,0 +1,146 @@
+"""Tests for WebSocket fan-out with slow-consumer isolation."""
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.api.routes.websocket import ConnectionManager
+from app.services.websocket_fanout import (
+    SLOW_CONSUMER_CLOSE_CODE,
+    ClientSender,
+    MessageCoalescer,
+)
+
+
+class FakeWebSocket:
+    """Records sent text; can be made to block on send."""
+
+    def __init__(self, block=False):
+        self.sent = []
+        self.closed_with = None
+        self.block = asyncio.Event()
+        if not block:
+            self.block.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.block.wait()
+        self.sent.append(json.loads(text))
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def _settle():
+    await asyncio.sleep(0.01)
+
+
+class TestClientSender:
+    """Test per-connection queues."""
+
+    @pytest.mark.asyncio
+    async def test_delivers_in_order(self):
+        ws = FakeWebSocket()
+        sender = ClientSender(ws)
+        sender.start()
+        for i in range(3):
+            sender.enqueue(json.dumps({"n": i}))
+        await _settle()
+        assert ws.sent == [{"n": 0}, {"n": 1}, {"n": 2}]
+        sender.stop()
+        await _settle()
+
+    @pytest.mark.asyncio
+    async def test_overflow_drops_oldest(self):
+        ws = FakeWebSocket(block=True)
+        sender = ClientSender(ws, queue_size=2, max_consecutive_drops=10)
+        for i in range(4):
+            sender.enqueue(json.dumps({"n": i}))
+        assert sender.dropped == 2
+        assert [json.loads(sender.queue.get_nowait())["n"] for _ in range(2)] == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_persistent_overflow_disconnects(self):
+        ws = FakeWebSocket(block=True)
+        closed = []
+
+        async def on_close(websocket):
+            closed.append(websocket)
+
+        sender = ClientSender(ws, on_close=on_close, queue_size=1, max_consecutive_drops=2)
+        sender.start()
+        accepted = [sender.enqueue(json.dumps({"n": i})) for i in range(6)]
+        abort_task = sender._abort_task
+        await _settle()
+
+        # One disconnect is scheduled and held; later messages are refused
+        assert accepted == [True, True, True, True, False, False]
+        assert abort_task is not None and abort_task.done()
+        assert closed == [ws]
+        assert ws.closed_with == SLOW_CONSUMER_CLOSE_CODE
+        assert sender.enqueue("{}") is False
+
+    @pytest.mark.asyncio
+    async def test_send_timeout_disconnects(self):
+        ws = FakeWebSocket(block=True)
+        closed = []
+
+        async def on_close(websocket):
+            closed.append(websocket)
+
+        sender = ClientSender(ws, on_close=on_close, send_timeout=0.01)
+        sender.start()
+        sender.enqueue("{}")
+        await asyncio.sleep(0.05)
+        assert closed == [ws]
+
+
+class TestBroadcast:
+    """Test manager fan-out."""
+
+    @pytest.mark.asyncio
+    async def test_serializes_once_and_isolates_slow_client(self):
+        manager = ConnectionManager()
+        fast, slow = FakeWebSocket(), FakeWebSocket(block=True)
+        for ws in (fast, slow):
+            await manager.connect(ws)
+            manager.channels["channel:market:USD"].add(ws)
+
+        with patch("app.api.routes.websocket.json.dumps", wraps=json.dumps) as dumps:
+            assert await manager.broadcast("channel:market:USD", {"type": "market_update"}) == 2
+        assert dumps.call_count == 1
+
+        await _settle()
+        assert fast.sent[0]["type"] == "market_update"
+        assert slow.sent == []
+
+        await manager.disconnect(slow)
+        await manager.disconnect(slow)
+        assert slow not in manager.senders
+        await manager.close()
+        await _settle()
+
+
+@pytest.mark.asyncio
+async def test_coalescer_merges_burst():
+    emitted = []
+
+    async def emit(channel, message):
+        emitted.append((channel, message))
+
+    coalescer = MessageCoalescer(emit, window=0.01)
+    coalescer.add("channel:card:1", {"type": "card_update", "price": 1, "foil": 3})
+    coalescer.add("channel:card:1", {"type": "card_update", "price": 2})
+    coalescer.add("channel:card:2", {"type": "card_update", "price": 5})
+    await asyncio.sleep(0.03)
+
+    assert emitted == [
+        ("channel:card:1", {"type": "card_update", "price": 2, "foil": 3}),
+        ("channel:card:2", {"type": "card_update", "price": 5}),
+    ]
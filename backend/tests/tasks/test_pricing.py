@@ -181,6 +181,61 @@ class TestConditionRefreshTask:
         from app.tasks.pricing import TCGPLAYER_PRICE_THRESHOLD
         assert TCGPLAYER_PRICE_THRESHOLD == 5.00
 
+    @patch("app.tasks.pricing.copy_snapshots")
+    @patch("app.tasks.pricing.record_watermark")
+    @patch("app.tasks.pricing._get_or_create_marketplace")
+    @patch("app.tasks.pricing.ConditionPricer")
+    @patch("app.tasks.pricing.create_task_session_maker")
+    def test_condition_refresh_records_watermark_before_commit(
+        self, mock_session_maker, mock_pricer_cls, mock_marketplace, mock_record_watermark,
+        mock_copy_snapshots,
+    ):
+        """Snapshots are COPYed and committed together with the price_snapshots watermark."""
+        events = []
+        mock_session = AsyncMock()
+        mock_session.commit = AsyncMock(side_effect=lambda: events.append("commit"))
+        mock_result = MagicMock()
+        mock_result.all.return_value = [(MagicMock(id=1, tcgplayer_product_id=None), 10.0)]
+        mock_session.execute = AsyncMock(return_value=mock_result)
+        mock_engine = MagicMock()
+        mock_engine.dispose = AsyncMock()
+
+        async_session_maker = MagicMock()
+        async_session_maker.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+        async_session_maker.return_value.__aexit__ = AsyncMock(return_value=None)
+        mock_session_maker.return_value = (async_session_maker, mock_engine)
+
+        mock_pricer = MagicMock()
+        mock_pricer.should_use_tcgplayer = MagicMock(return_value=False)
+        mock_pricer.get_prices_for_card = AsyncMock(return_value={
+            "NEAR_MINT": 10.0,
+            "LIGHTLY_PLAYED": 8.70,
+        })
+        mock_pricer_cls.return_value = mock_pricer
+        mock_marketplace.return_value = MagicMock(id=1)
+        mock_record_watermark.side_effect = lambda *args, **kwargs: events.append(("watermark", args[1:]))
+        mock_copy_snapshots.side_effect = lambda db, records, **kwargs: events.append(
+            ("copy", [(r.condition, float(r.price)) for r in records])
+        )
+
+        from app.tasks.pricing import PRICE_SNAPSHOTS_WATERMARK, _condition_refresh_async
+        import asyncio
+
+        loop = asyncio.new_event_loop()
+        try:
+            result = loop.run_until_complete(_condition_refresh_async())
+        finally:
+            loop.close()
+
+        assert result["snapshots_created"] == 2
+        assert events == [
+            ("copy", [("NEAR_MINT", 10.0), ("LIGHTLY_PLAYED", 8.70)]),
+            ("watermark", (PRICE_SNAPSHOTS_WATERMARK, 2)),
+            "commit",
+        ]
+        mock_session.add.assert_not_called()
+        assert mock_record_watermark.call_args.kwargs["job"] == "condition_refresh"
+
 
 class TestCeleryBeatSchedule:
     """Test that Celery beat schedule is properly configured."""
@@ -203,6 +258,13 @@ class TestCeleryBeatSchedule:
         assert "pricing-condition-refresh" in schedule
         assert schedule["pricing-condition-refresh"]["task"] == "app.tasks.pricing.condition_refresh"
 
+        # Check inventory index rebuild is scheduled
+        assert "pricing-rebuild-inventory-index" in schedule
+        assert (
+            schedule["pricing-rebuild-inventory-index"]["task"]
+            == "app.tasks.pricing.rebuild_inventory_index"
+        )
+
     def test_search_refresh_embeddings_scheduled(self):
         """Verify search embedding refresh is in schedule."""
         from app.tasks.celery_app import celery_app
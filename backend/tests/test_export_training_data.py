@@ -0,0 +1,81 @@
+"""Tests for the sharded training data exporter."""
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.scripts.export_training_data import (
+    SNAPSHOT_FEATURES,
+    ShardWriter,
+    rows_to_columns,
+    snapshot_features,
+)
+
+
+def _row(card_id, epoch, price, market=None, listings=None, source="bulk"):
+    return (
+        card_id, Decimal(epoch), 1, "NEAR_MINT", False, "English", "USD", source,
+        Decimal(str(price)), None if market is None else Decimal(str(market)),
+        None, None, None, listings, None,
+    )
+
+
+class TestRowsToColumns:
+    """Test row -> column conversion."""
+
+    def test_types_and_missing_values(self):
+        vocabularies = {name: {} for name in ("condition", "language", "currency", "source")}
+        columns = rows_to_columns(
+            [_row(1, 100, 1.5, listings=3), _row(2, 200, 2.25, market=2.0, source="mtgjson")],
+            vocabularies,
+        )
+        assert columns["time"].tolist() == [100, 200]
+        assert columns["price"].dtype == np.float32
+        assert np.isnan(columns["price_market"][0]) and columns["price_market"][1] == 2.0
+        assert columns["num_listings"].tolist() == [3, 0]
+        assert columns["source"].tolist() == [0, 1]
+        assert vocabularies["source"] == {"bulk": 0, "mtgjson": 1}
+
+
+class TestShardWriter:
+    """Test shard sizing and contents."""
+
+    def _columns(self, card_ids):
+        vocabularies = {name: {} for name in ("condition", "language", "currency", "source")}
+        return rows_to_columns([_row(c, 100 + i, c) for i, c in enumerate(card_ids)], vocabularies)
+
+    def test_splits_rows_into_bounded_shards(self, tmp_path):
+        vectors = {c: np.full(4, c, dtype=np.float32) for c in (1, 2, 3)}
+        writer = ShardWriter(tmp_path, vectors, 4, shard_rows=3)
+        writer.add(self._columns([1, 1]))
+        writer.add(self._columns([2, 2, 3]))
+        writer.close()
+
+        assert [s["rows"] for s in writer.shards] == [3, 2]
+        shard = np.load(tmp_path / "shard-00000.npz")
+        assert shard["card_ids"].tolist() == [1, 2]
+        assert shard["card_vectors"][shard["card_row"]][:, 0].tolist() == [1, 1, 2]
+        assert shard["labels"].tolist() == shard["price"].tolist()
+
+    def test_prune_keeps_only_buffered_cards(self, tmp_path):
+        vectors = {c: np.zeros(4, dtype=np.float32) for c in (1, 2, 3)}
+        writer = ShardWriter(tmp_path, vectors, 4, shard_rows=2)
+        writer.add(self._columns([1, 2, 3]))
+        writer.prune_vectors()
+        assert set(vectors) == {3}
+
+    def test_snapshot_features_layout(self, tmp_path):
+        vectors = {7: np.arange(4, dtype=np.float32)}
+        writer = ShardWriter(tmp_path, vectors, 4, shard_rows=10)
+        writer.add(self._columns([7]))
+        writer.close()
+        shard = dict(np.load(tmp_path / "shard-00000.npz"))
+
+        features = snapshot_features(shard["card_vectors"], shard)
+        assert features.shape == (1, 4 + len(SNAPSHOT_FEATURES))
+        assert features[0, :4].tolist() == [0, 1, 2, 3]
+        assert not np.isnan(features).any()
+
+    def test_rejects_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            ShardWriter(tmp_path, {}, 4, file_format="csv")
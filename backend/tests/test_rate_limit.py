@@ -1,12 +1,21 @@
 # backend/tests/test_rate_limit.py
 """Tests for rate limiting middleware."""
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 import redis.asyncio as redis
 
-from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.rate_limit import LocalTokenBucket, RateLimitMiddleware
+
+
+def _mock_redis(allowed: int, count: int, block_ttl_ms: int = 0):
+    """Mock Redis whose sliding-window script returns a fixed result."""
+    mock_redis = AsyncMock()
+    mock_redis.register_script = MagicMock(
+        return_value=AsyncMock(return_value=[allowed, count, block_ttl_ms])
+    )
+    return mock_redis
 
 
 @pytest.fixture
@@ -104,10 +113,7 @@ def test_rate_limit_returns_429_when_limit_exceeded(test_app):
     client = TestClient(test_app)
 
     # Create a mock Redis that returns a count over the limit
-    mock_redis = AsyncMock()
-    mock_pipeline = AsyncMock()
-    mock_pipeline.execute = AsyncMock(return_value=[100, True])  # 100 requests > 60 limit
-    mock_redis.pipeline = lambda: mock_pipeline
+    mock_redis = _mock_redis(allowed=0, count=100)  # 100 requests > 60 limit
 
     with patch.object(
         RateLimitMiddleware,
@@ -127,10 +133,7 @@ def test_rate_limit_allows_request_under_limit(test_app):
     client = TestClient(test_app)
 
     # Create a mock Redis that returns a count under the limit
-    mock_redis = AsyncMock()
-    mock_pipeline = AsyncMock()
-    mock_pipeline.execute = AsyncMock(return_value=[5, True])  # 5 requests < 60 limit
-    mock_redis.pipeline = lambda: mock_pipeline
+    mock_redis = _mock_redis(allowed=1, count=5)  # 5 requests < 60 limit
 
     with patch.object(
         RateLimitMiddleware,
@@ -149,10 +152,7 @@ def test_auth_endpoint_uses_stricter_limit(test_app):
     client = TestClient(test_app)
 
     # Create a mock Redis that returns 6 requests (over auth limit of 5)
-    mock_redis = AsyncMock()
-    mock_pipeline = AsyncMock()
-    mock_pipeline.execute = AsyncMock(return_value=[6, True])
-    mock_redis.pipeline = lambda: mock_pipeline
+    mock_redis = _mock_redis(allowed=0, count=6)
 
     with patch.object(
         RateLimitMiddleware,
@@ -165,6 +165,13 @@ def test_auth_endpoint_uses_stricter_limit(test_app):
         # Should be rate limited at 6 requests (> 5 auth limit)
         assert response.status_code == 429
 
+    # The auth limit is passed to the script, and auth keys are namespaced
+    script = mock_redis.register_script.return_value
+    keys = script.call_args.kwargs["keys"]
+    args = script.call_args.kwargs["args"]
+    assert args[0] == 5
+    assert keys[0].startswith("rate_limit:auth:")
+
 
 def test_retry_after_header_on_redis_failure(test_app):
     """503 response should include Retry-After header."""
@@ -182,3 +189,68 @@ def test_retry_after_header_on_redis_failure(test_app):
         retry_after = response.headers.get("Retry-After")
         assert retry_after is not None
         assert int(retry_after) > 0  # Should be a positive number
+
+
+def test_local_bucket_rejects_without_redis_round_trip(test_app):
+    """Once the per-worker bucket is empty, requests are rejected locally."""
+    client = TestClient(test_app)
+    mock_redis = _mock_redis(allowed=1, count=1)
+
+    with patch.object(
+        RateLimitMiddleware,
+        'get_redis',
+        new_callable=AsyncMock,
+        return_value=mock_redis
+    ):
+        # Auth limit is 5/min: the 6th request never reaches Redis
+        statuses = [client.post("/auth/login").status_code for _ in range(6)]
+
+    assert statuses == [200] * 5 + [429]
+    assert mock_redis.register_script.return_value.await_count == 5
+
+
+def test_enumeration_block_checked_in_same_round_trip():
+    """A positive block TTL from the script returns the enumeration 429."""
+    from app.middleware.enumeration_protection import BLOCK_SECONDS
+    from app.middleware.edge import EdgeMiddleware
+
+    app = FastAPI()
+    app.add_middleware(EdgeMiddleware, redis_url="redis://localhost:6379/0")
+
+    @app.get("/test")
+    async def test_endpoint():
+        return {"status": "ok"}
+
+    client = TestClient(app)
+    with patch.object(
+        RateLimitMiddleware,
+        'get_redis',
+        new_callable=AsyncMock,
+        return_value=_mock_redis(allowed=0, count=0, block_ttl_ms=10_000),
+    ):
+        response = client.get("/test")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(BLOCK_SECONDS)
+    assert "X-Request-ID" in response.headers
+
+
+class TestLocalTokenBucket:
+    """Tests for the in-process token bucket pre-check."""
+
+    def test_allows_up_to_capacity(self):
+        bucket = LocalTokenBucket(capacity=3)
+        assert [bucket.consume("a", now=0.0) for _ in range(4)] == [True, True, True, False]
+
+    def test_refills_over_time(self):
+        bucket = LocalTokenBucket(capacity=60, per_seconds=60)
+        for _ in range(60):
+            bucket.consume("a", now=0.0)
+        assert not bucket.consume("a", now=0.0)
+        assert bucket.consume("a", now=1.0)  # 1 token/second
+
+    def test_is_bounded(self):
+        bucket = LocalTokenBucket(capacity=1, max_keys=2)
+        for key in ("a", "b", "c"):
+            bucket.consume(key, now=0.0)
+        assert len(bucket) == 2